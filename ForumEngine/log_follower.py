@@ -0,0 +1,240 @@
+"""
+增量日志跟随器
+
+为 LogMonitor 提供 `tail -F` 式的日志读取：
+- 按字节偏移记录读取位置，每次只读取新追加的字节，代价与新增内容成正比；
+- 记录 (st_dev, st_ino)，可识别日志被轮转（文件被替换）或被截断/清空；
+- 末尾没有换行符的半行会暂存，等下一次写入补全后再输出，避免把一行拆成两段；
+- Linux 下通过 inotify 等待文件变化，其他平台或 inotify 不可用时退化为定时轮询。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+
+@dataclass
+class FollowResult:
+    """一次 poll 的结果"""
+    lines: List[str] = field(default_factory=list)  # 新增的完整行（已去除行尾换行符）
+    reset: bool = False                              # 文件是否被截断、轮转或删除
+
+
+class LogFollower:
+    """跟随单个日志文件的新增内容"""
+
+    # 单次最多读取的字节数，防止一次性把超大的追加内容读入内存
+    READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, file_path: Path, encoding: str = "utf-8"):
+        self.file_path = Path(file_path)
+        self.encoding = encoding
+        self.offset = 0
+        self.file_id: Optional[Tuple[int, int]] = None
+        self._partial = b""
+
+    def _stat(self) -> Optional[os.stat_result]:
+        try:
+            return self.file_path.stat()
+        except OSError:
+            return None
+
+    def seek_to_end(self):
+        """把读取位置移动到文件当前末尾（作为监控基线，不输出已有内容）"""
+        st = self._stat()
+        self._partial = b""
+        if st is None:
+            self.offset = 0
+            self.file_id = None
+            return
+        self.offset = st.st_size
+        self.file_id = (st.st_dev, st.st_ino)
+
+    def poll(self) -> FollowResult:
+        """
+        读取自上次调用以来新追加的完整行。
+
+        文件被删除、替换（inode变化）或变小时返回 reset=True，
+        并从新文件的开头重新跟随。
+        """
+        result = FollowResult()
+        st = self._stat()
+        if st is None:
+            if self.file_id is not None or self.offset:
+                result.reset = True
+            self.offset = 0
+            self.file_id = None
+            self._partial = b""
+            return result
+
+        file_id = (st.st_dev, st.st_ino)
+        if (self.file_id is not None and file_id != self.file_id) or st.st_size < self.offset:
+            result.reset = True
+            self.offset = 0
+            self._partial = b""
+        self.file_id = file_id
+
+        if st.st_size == self.offset:
+            return result
+
+        try:
+            with open(self.file_path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(min(st.st_size - self.offset, self.READ_CHUNK_SIZE))
+        except OSError as e:
+            logger.warning(f"ForumEngine: 读取日志 {self.file_path} 失败: {e}")
+            return result
+
+        self.offset += len(data)
+        data = self._partial + data
+        complete, sep, rest = data.rpartition(b"\n")
+        if not sep:
+            # 还没有出现换行符，整段都是未写完的半行
+            self._partial = data
+            return result
+        self._partial = rest
+        result.lines = [
+            line.rstrip("\r")
+            for line in complete.decode(self.encoding, errors="replace").split("\n")
+        ]
+        return result
+
+
+class _InotifyWaiter:
+    """基于 inotify 的目录变化等待器（仅 Linux）"""
+
+    _IN_MODIFY = 0x00000002
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_CLOEXEC = 0o2000000
+    _IN_NONBLOCK = 0o4000
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, directory: Path, file_names: Iterable[str]):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("未找到libc")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc不支持inotify")
+        self._file_names = {name.encode() for name in file_names}
+        self._fd = libc.inotify_init1(self._IN_CLOEXEC | self._IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1失败")
+        # 监听目录而非文件本身，这样日志被删除重建或轮转后依然能收到事件
+        mask = self._IN_MODIFY | self._IN_MOVED_TO | self._IN_CREATE | self._IN_DELETE
+        wd = libc.inotify_add_watch(self._fd, str(directory).encode(), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch失败: {directory}")
+        # 自管道：其他线程可通过 wake() 提前唤醒 select
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+
+    def wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def wait(self, timeout: float) -> bool:
+        """等待被跟随文件发生变化或被唤醒，返回是否应立即处理"""
+        readable, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if not readable:
+            return False
+        if self._wake_r in readable:
+            try:
+                while os.read(self._wake_r, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            return True
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        relevant = False
+        pos = 0
+        while pos + self._EVENT_HEADER.size <= len(data):
+            _, _, _, name_len = self._EVENT_HEADER.unpack_from(data, pos)
+            pos += self._EVENT_HEADER.size
+            name = data[pos:pos + name_len].rstrip(b"\0")
+            pos += name_len
+            if name in self._file_names:
+                relevant = True
+        return relevant
+
+    def close(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class LogChangeWaiter:
+    """
+    等待日志目录中被跟随文件的变化。
+
+    优先使用 inotify，文件一有写入即返回；不可用时退化为定时轮询，
+    调用方的语义保持一致：最多等待 timeout 秒。
+    """
+
+    COALESCE_DELAY = 0.1
+
+    def __init__(self, directory: Path, file_names: Iterable[str], use_inotify: bool = True):
+        self._wake_event = threading.Event()
+        self._inotify: Optional[_InotifyWaiter] = None
+        if use_inotify:
+            try:
+                self._inotify = _InotifyWaiter(directory, file_names)
+            except (OSError, AttributeError) as e:
+                logger.info(f"ForumEngine: inotify不可用，使用轮询模式 ({e})")
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def wait(self, timeout: float):
+        """最多等待 timeout 秒，被跟随文件有变化时提前返回"""
+        if self._inotify is None:
+            self._wake_event.wait(timeout)
+            self._wake_event.clear()
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if self._inotify.wait(remaining):
+                    # 日志通常成批写入，稍作停顿合并同一批事件
+                    time.sleep(min(self.COALESCE_DELAY, max(0.0, deadline - time.monotonic())))
+                    return
+        except OSError as e:
+            logger.warning(f"ForumEngine: inotify等待失败，改用轮询模式: {e}")
+            self.close()
+
+    def wake(self):
+        """从其他线程提前唤醒 wait()，用于有总线事件待处理时"""
+        inotify = self._inotify
+        if inotify is not None:
+            inotify.wake()
+        else:
+            self._wake_event.set()
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -9,10 +9,19 @@ from pathlib import Path
 from datetime import datetime
 import re
 import json
-from typing import Dict, Optional, List
+import queue
+from typing import Any, Dict, Optional, List
 from threading import Lock
 from loguru import logger
 
+from .log_follower import LogChangeWaiter, LogFollower
+
+try:
+    from utils.forum_bus import TOPIC_AGENT_SUMMARY, TOPIC_HOST_SPEECH, create_hub
+    FORUM_BUS_AVAILABLE = True
+except ImportError:
+    FORUM_BUS_AVAILABLE = False
+
 # 导入论坛主持人模块
 try:
     from .llm_host import generate_host_speech
@@ -39,12 +48,20 @@ class LogMonitor:
         # 监控状态
         self.is_monitoring = False
         self.monitor_thread = None
-        self.file_positions = {}  # 记录每个文件的读取位置
-        self.file_line_counts = {}  # 记录每个文件的行数
+        # 增量跟随器：按字节偏移+inode记录读取位置，只读取新追加的内容
+        self.log_followers = {
+            app_name: LogFollower(log_file)
+            for app_name, log_file in self.monitored_logs.items()
+        }
         self.is_searching = False  # 是否正在搜索
         self.search_inactive_count = 0  # 搜索非活跃计数器
         self.write_lock = Lock()  # 写入锁，防止并发写入冲突
         
+        # 结构化事件总线：引擎直接发布段落总结，已连接总线的引擎不再解析其日志内容
+        self.event_hub = None
+        self.bus_events = queue.Queue()  # 总线事件在监控线程中统一处理，避免并发修改状态
+        self.change_waiter: Optional[LogChangeWaiter] = None
+        
         # 主持人相关状态
         self.agent_speeches_buffer = []  # agent发言缓冲区
         self.host_speech_threshold = 5  # 每5条agent发言触发一次主持人发言
@@ -87,6 +104,8 @@ class LogMonitor:
             with open(self.forum_log_file, 'w', encoding='utf-8') as f:
                 pass  # 先创建空文件
             self.write_to_forum_log(f"=== ForumEngine 监控开始 - {start_time} ===", "SYSTEM")
+            if self.event_hub is not None:
+                self.event_hub.reset_session()
                
             logger.info(f"ForumEngine: forum.log 已清空并初始化")
             
@@ -376,51 +395,22 @@ class LogMonitor:
         except:
             return 0
    
-    def get_file_line_count(self, file_path: Path) -> int:
-        """获取文件行数"""
-        try:
-            if not file_path.exists():
-                return 0
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
+    def _reset_capture_state(self, app_name: str):
+        """重置某个app的多行JSON捕获状态"""
+        self.capturing_json[app_name] = False
+        self.json_buffer[app_name] = []
+        self.in_error_block[app_name] = False
    
     def read_new_lines(self, file_path: Path, app_name: str) -> List[str]:
-        """读取文件中的新行"""
-        new_lines = []
-       
-        try:
-            if not file_path.exists():
-                return new_lines
-           
-            current_size = self.get_file_size(file_path)
-            last_position = self.file_positions.get(app_name, 0)
-           
-            # 如果文件变小了，说明被清空了，重新从头开始
-            if current_size < last_position:
-                last_position = 0
-                # 重置JSON捕获状态
-                self.capturing_json[app_name] = False
-                self.json_buffer[app_name] = []
-                self.in_error_block[app_name] = False
-           
-            if current_size > last_position:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    f.seek(last_position)
-                    new_content = f.read()
-                    new_lines = new_content.split('\n')
-                   
-                    # 更新位置
-                    self.file_positions[app_name] = f.tell()
-                   
-                    # 过滤空行
-                    new_lines = [line.strip() for line in new_lines if line.strip()]
-                   
-        except Exception as e:
-            logger.exception(f"ForumEngine: 读取{app_name}日志失败: {e}")
-       
-        return new_lines
+        """读取文件中的新行（文件被截断或轮转时从头读取）"""
+        follower = self.log_followers.get(app_name)
+        if follower is None or follower.file_path != Path(file_path):
+            follower = self.log_followers[app_name] = LogFollower(file_path)
+        result = follower.poll()
+        if result.reset:
+            self._reset_capture_state(app_name)
+        # 过滤空行
+        return [line.strip() for line in result.lines if line.strip()]
    
     def process_lines_for_json(self, lines: List[str], app_name: str) -> List[str]:
         """处理行以捕获多行JSON内容
@@ -542,8 +532,10 @@ class LogMonitor:
             host_speech = generate_host_speech(recent_speeches)
             
             if host_speech:
-                # 写入主持人发言到forum.log
+                # 写入主持人发言到forum.log，并通过事件总线推送给订阅的引擎
                 self.write_to_forum_log(host_speech, "HOST")
+                if self.event_hub is not None:
+                    self.event_hub.publish(TOPIC_HOST_SPEECH, {"content": host_speech})
                 logger.info(f"ForumEngine: 主持人发言已记录")
                 
                 # 清空已处理的5条发言
@@ -581,18 +573,62 @@ class LogMonitor:
         
         return content.strip()
    
+    def _record_agent_speech(self, content: str, app_name: str):
+        """记录一条Agent发言到forum.log与主持人缓冲区，必要时触发主持人发言"""
+        # 将app_name转换为大写作为标签（如 insight -> INSIGHT）
+        source_tag = app_name.upper()
+        self.write_to_forum_log(content, source_tag)
+        
+        # 将发言添加到缓冲区（格式化为完整的日志行）
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        log_line = f"[{timestamp}] [{source_tag}] {content}"
+        self.agent_speeches_buffer.append(log_line)
+        
+        # 检查是否需要触发主持人发言
+        if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
+            # 同步触发主持人发言
+            self._trigger_host_speech()
+   
+    def _on_bus_event(self, event: Dict[str, Any]):
+        """事件总线回调（在总线线程中执行），转交监控线程处理"""
+        self.bus_events.put(event)
+        if self.change_waiter is not None:
+            self.change_waiter.wake()
+   
+    def _drain_bus_events(self) -> bool:
+        """处理所有待处理的总线事件，返回是否记录了新的发言"""
+        captured = False
+        while True:
+            try:
+                event = self.bus_events.get_nowait()
+            except queue.Empty:
+                return captured
+            app_name = (event.get("source") or "").lower()
+            payload = event.get("payload") or {}
+            content = payload.get("content")
+            if app_name not in self.monitored_logs or not content:
+                continue
+            if not self.is_searching:
+                # 与日志模式一致：以首次总结作为论坛会话的开始
+                if payload.get("node") != "FirstSummaryNode":
+                    continue
+                logger.info(f"ForumEngine: 在{app_name}中检测到第一次论坛发表内容")
+                self.is_searching = True
+                self.search_inactive_count = 0
+                self.clear_forum_log()
+            self._record_agent_speech(self._clean_content_tags(content, app_name), app_name)
+            captured = True
+   
     def monitor_logs(self):
         """智能监控日志文件"""
         logger.info("ForumEngine: 论坛创建中...")
        
-        # 初始化文件行数和位置 - 记录当前状态作为基线
-        for app_name, log_file in self.monitored_logs.items():
-            self.file_line_counts[app_name] = self.get_file_line_count(log_file)
-            self.file_positions[app_name] = self.get_file_size(log_file)
-            self.capturing_json[app_name] = False
-            self.json_buffer[app_name] = []
-            self.in_error_block[app_name] = False
-            # logger.info(f"ForumEngine: {app_name} 基线行数: {self.file_line_counts[app_name]}")
+        # 初始化读取位置 - 以当前文件末尾作为基线，已有内容不进入论坛
+        for app_name, follower in self.log_followers.items():
+            follower.seek_to_end()
+            self._reset_capture_state(app_name)
+        waiter = LogChangeWaiter(self.log_dir, [path.name for path in self.monitored_logs.values()])
+        self.change_waiter = waiter
        
         while self.is_monitoring:
             try:
@@ -602,14 +638,21 @@ class LogMonitor:
                 captured_any = False
                
                 # 为每个log文件独立处理
-                for app_name, log_file in self.monitored_logs.items():
-                    current_lines = self.get_file_line_count(log_file)
-                    previous_lines = self.file_line_counts.get(app_name, 0)
+                bus_sources = self.event_hub.connected_sources() if self.event_hub is not None else set()
+                for app_name, follower in self.log_followers.items():
+                    result = follower.poll()
                    
-                    if current_lines > previous_lines:
+                    if result.reset:
+                        any_shrink = True
+                        # 日志被清空或轮转：新文件中已有的内容不补读，从其末尾开始跟随
+                        follower.seek_to_end()
+                        self._reset_capture_state(app_name)
+                    elif result.lines and app_name in bus_sources:
+                        # 该引擎的总结已通过事件总线送达，日志只用于判断活跃度与会话重置
+                        any_growth = True
+                    elif result.lines:
                         any_growth = True
-                        # 立即读取新增内容
-                        new_lines = self.read_new_lines(log_file, app_name)
+                        new_lines = [line.strip() for line in result.lines if line.strip()]
                        
                         # 先检查是否需要触发搜索（只触发一次）
                         if not self.is_searching:
@@ -631,34 +674,12 @@ class LogMonitor:
                             captured_contents = self.process_lines_for_json(new_lines, app_name)
                             
                             for content in captured_contents:
-                                # 将app_name转换为大写作为标签（如 insight -> INSIGHT）
-                                source_tag = app_name.upper()
-                                self.write_to_forum_log(content, source_tag)
-                                # logger.info(f"ForumEngine: 捕获 - {content}")
+                                self._record_agent_speech(content, app_name)
                                 captured_any = True
-                                
-                                # 将发言添加到缓冲区（格式化为完整的日志行）
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                log_line = f"[{timestamp}] [{source_tag}] {content}"
-                                self.agent_speeches_buffer.append(log_line)
-                                
-                                # 检查是否需要触发主持人发言
-                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
-                                    # 同步触发主持人发言
-                                    self._trigger_host_speech()
-                   
-                    elif current_lines < previous_lines:
-                        any_shrink = True
-                        # logger.info(f"ForumEngine: 检测到 {app_name} 日志缩短，将重置基线")
-                        # 重置文件位置到新的文件末尾
-                        self.file_positions[app_name] = self.get_file_size(log_file)
-                        # 重置JSON捕获状态
-                        self.capturing_json[app_name] = False
-                        self.json_buffer[app_name] = []
-                        self.in_error_block[app_name] = False
-                   
-                    # 更新行数记录
-                    self.file_line_counts[app_name] = current_lines
+                
+                # 处理事件总线送达的段落总结
+                if self._drain_bus_events():
+                    captured_any = True
                
                 # 检查是否应该结束当前搜索会话
                 if self.is_searching:
@@ -690,8 +711,8 @@ class LogMonitor:
                     else:
                         self.search_inactive_count = 0  # 重置计数器
                
-                # 短暂休眠
-                time.sleep(1)
+                # 等待日志变化（inotify可用时有写入即唤醒，否则轮询），最长1秒
+                waiter.wait(1)
                
             except Exception as e:
                 logger.exception(f"ForumEngine: 论坛记录中出错: {e}")
@@ -699,6 +720,8 @@ class LogMonitor:
                 traceback.print_exc()
                 time.sleep(2)
        
+        self.change_waiter = None
+        waiter.close()
         logger.info("ForumEngine: 停止论坛日志文件")
    
     def start_monitoring(self):
@@ -708,6 +731,13 @@ class LogMonitor:
             return False
        
         try:
+            # 启动事件总线（失败时仅依赖日志解析）
+            if FORUM_BUS_AVAILABLE and self.event_hub is None:
+                hub = create_hub()
+                if hub is not None and hub.start():
+                    hub.subscribe(self._on_bus_event, topics=[TOPIC_AGENT_SUMMARY])
+                    self.event_hub = hub
+            
             # 启动监控
             self.is_monitoring = True
             self.monitor_thread = threading.Thread(target=self.monitor_logs, daemon=True)
@@ -730,8 +760,14 @@ class LogMonitor:
         try:
             self.is_monitoring = False
            
+            if self.change_waiter is not None:
+                self.change_waiter.wake()
             if self.monitor_thread and self.monitor_thread.is_alive():
                 self.monitor_thread.join(timeout=2)
+            
+            if self.event_hub is not None:
+                self.event_hub.stop()
+                self.event_hub = None
            
             # 写入结束标记
             end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -6,6 +6,7 @@ Deep Search Agent状态管理
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 import json
+import threading
 from datetime import datetime
 
 
@@ -149,6 +150,8 @@ class State:
     is_completed: bool = False                                     # 是否完成
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    # 并发处理段落时保护状态写入与序列化，不参与序列化与比较
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
     
     def add_paragraph(self, title: str, content: str) -> int:
         """
@@ -173,6 +176,30 @@ class State:
             return self.paragraphs[index]
         return None
     
+    def update_paragraph_summary(self, index: int, summary: str, increment_reflection: bool = False):
+        """
+        线程安全地更新段落总结
+        
+        Args:
+            index: 段落索引
+            summary: 新的段落总结
+            increment_reflection: 是否同时增加反思次数
+        """
+        with self._lock:
+            if not 0 <= index < len(self.paragraphs):
+                raise ValueError(f"段落索引 {index} 超出范围")
+            research = self.paragraphs[index].research
+            research.latest_summary = summary
+            if increment_reflection:
+                research.increment_reflection()
+            self.update_timestamp()
+    
+    def mark_paragraph_completed(self, index: int):
+        """线程安全地标记段落研究完成"""
+        with self._lock:
+            self.paragraphs[index].research.mark_completed()
+            self.update_timestamp()
+    
     def get_completed_paragraphs_count(self) -> int:
         """获取已完成段落数量"""
         return sum(1 for p in self.paragraphs if p.is_completed())
@@ -210,15 +237,16 @@ class State:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
-        return {
-            "query": self.query,
-            "report_title": self.report_title,
-            "paragraphs": [p.to_dict() for p in self.paragraphs],
-            "final_report": self.final_report,
-            "is_completed": self.is_completed,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
+        with self._lock:
+            return {
+                "query": self.query,
+                "report_title": self.report_title,
+                "paragraphs": [p.to_dict() for p in self.paragraphs],
+                "final_report": self.final_report,
+                "is_completed": self.is_completed,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at
+            }
     
     def to_json(self, indent: int = 2) -> str:
         """转换为JSON字符串"""
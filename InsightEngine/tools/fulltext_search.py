@@ -0,0 +1,201 @@
+"""
+话题检索的全文索引后端
+
+MediaCrawlerDB 的话题类工具（search_topic_globally / search_topic_by_date /
+get_comments_for_topic / search_topic_on_platform）都需要在若干文本列上做关键词匹配。
+本模块按数据库方言生成匹配子句，优先使用真实的全文索引：
+
+- MySQL:      FULLTEXT 索引（ngram 分词器），MATCH ... AGAINST 布尔模式短语匹配
+- PostgreSQL: pg_trgm GIN 索引，`LIKE '%term%'` 可直接命中索引
+- SQLite:     FTS5 外部内容表（trigram 分词器），通过 rowid 子查询过滤
+
+只有在探测到索引完整覆盖所需列时才会走索引查询，否则退化为 `LIKE '%term%'`。
+索引由 MindSpider/schema/init_fulltext_index.py 创建，两边的表/列约定需保持一致。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+__all__ = [
+    "TopicSearchBackend",
+    "LikeSearchBackend",
+    "MySQLFullTextBackend",
+    "PostgresTrigramBackend",
+    "SQLiteFTS5Backend",
+    "get_search_backend",
+]
+
+ProbeQuery = Tuple[str, Dict[str, Any]]
+
+
+class TopicSearchBackend:
+    """
+    话题匹配子句生成器基类（默认实现即 LIKE 回退）。
+
+    子类通过覆盖 probe_query / index_covers 声明如何探测索引，
+    通过覆盖 _indexed_clause 声明命中索引时的查询写法。
+    """
+
+    name: str = "like"
+    # 低于该长度的关键词无法被索引分词命中，直接走 LIKE
+    min_indexed_term_length: int = 1
+
+    def __init__(self, dialect: Optional[str] = None):
+        self.dialect = (dialect or "mysql").lower()
+
+    def quote(self, identifier: str) -> str:
+        if self.dialect in ("postgresql", "postgres", "sqlite"):
+            return f'"{identifier}"'
+        return f"`{identifier}`"
+
+    def probe_query(self, table: str) -> Optional[ProbeQuery]:
+        """返回用于探测表上全文索引的查询；None 表示该后端不使用索引"""
+        return None
+
+    def index_covers(self, rows: List[Dict[str, Any]], table: str, fields: Sequence[str]) -> bool:
+        """根据探测结果判断索引是否完整覆盖 fields"""
+        return False
+
+    def build_clause(
+        self,
+        table: str,
+        fields: Sequence[str],
+        topic: str,
+        indexed: bool,
+        param_prefix: str = "term",
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        生成话题匹配的 WHERE 子句（不含 WHERE 关键字）及其命名参数。
+
+        Args:
+            table: 表名
+            fields: 参与匹配的文本列
+            topic: 搜索关键词
+            indexed: 该表是否已探测到可用的全文索引
+            param_prefix: 参数名前缀，UNION 多表时用于避免参数名冲突
+        """
+        if indexed and len(topic.strip()) >= self.min_indexed_term_length:
+            return self._indexed_clause(table, fields, topic, param_prefix)
+        return self._like_clause(fields, topic, param_prefix)
+
+    def _like_clause(self, fields: Sequence[str], topic: str, param_prefix: str) -> Tuple[str, Dict[str, Any]]:
+        pname = f"{param_prefix}_like"
+        clause = " OR ".join(f"{self.quote(field)} LIKE :{pname}" for field in fields)
+        return f"({clause})", {pname: f"%{topic}%"}
+
+    def _indexed_clause(self, table: str, fields: Sequence[str], topic: str, param_prefix: str) -> Tuple[str, Dict[str, Any]]:
+        return self._like_clause(fields, topic, param_prefix)
+
+
+class LikeSearchBackend(TopicSearchBackend):
+    """始终使用 LIKE '%term%'，用于未知方言或显式关闭全文索引时"""
+
+
+class MySQLFullTextBackend(TopicSearchBackend):
+    """MySQL FULLTEXT（WITH PARSER ngram）索引后端"""
+
+    name = "mysql_fulltext"
+    # 与 MySQL 默认 ngram_token_size=2 保持一致
+    min_indexed_term_length = 2
+
+    def probe_query(self, table: str) -> Optional[ProbeQuery]:
+        return (
+            "SELECT INDEX_NAME AS index_name, COLUMN_NAME AS column_name "
+            "FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_TYPE = 'FULLTEXT'",
+            {"table": table},
+        )
+
+    def index_covers(self, rows: List[Dict[str, Any]], table: str, fields: Sequence[str]) -> bool:
+        # MATCH() 的列清单必须与某一个 FULLTEXT 索引的列完全一致
+        index_columns: Dict[str, set] = {}
+        for row in rows:
+            index_columns.setdefault(row.get("index_name"), set()).add(row.get("column_name"))
+        return set(fields) in index_columns.values()
+
+    def _indexed_clause(self, table: str, fields: Sequence[str], topic: str, param_prefix: str) -> Tuple[str, Dict[str, Any]]:
+        pname = f"{param_prefix}_ft"
+        columns = ", ".join(self.quote(field) for field in fields)
+        # 双引号包裹为短语查询，ngram 下等价于连续子串匹配，语义与 LIKE 接近
+        phrase = '"' + topic.replace('"', " ").strip() + '"'
+        return f"MATCH({columns}) AGAINST (:{pname} IN BOOLEAN MODE)", {pname: phrase}
+
+
+class PostgresTrigramBackend(TopicSearchBackend):
+    """
+    PostgreSQL pg_trgm GIN 索引后端。
+
+    trigram GIN 索引可以直接加速 `LIKE '%term%'`，因此命中索引时查询写法不变，
+    探测结果仅用于日志与诊断；关键词少于 3 个字符时规划器会自动回退为顺序扫描。
+    """
+
+    name = "postgres_trgm"
+    min_indexed_term_length = 3
+
+    def probe_query(self, table: str) -> Optional[ProbeQuery]:
+        return ("SELECT indexdef FROM pg_indexes WHERE tablename = :table", {"table": table})
+
+    def index_covers(self, rows: List[Dict[str, Any]], table: str, fields: Sequence[str]) -> bool:
+        definitions = [row.get("indexdef") or "" for row in rows]
+        for field in fields:
+            pattern = re.compile(rf'\(\s*"?{re.escape(field)}"?\s+gin_trgm_ops', re.IGNORECASE)
+            if not any(pattern.search(defn) for defn in definitions):
+                return False
+        return True
+
+
+class SQLiteFTS5Backend(TopicSearchBackend):
+    """SQLite FTS5（tokenize='trigram'）外部内容表后端，适合本地运行"""
+
+    name = "sqlite_fts5"
+    # trigram 分词器要求查询串至少 3 个字符
+    min_indexed_term_length = 3
+
+    @staticmethod
+    def fts_table_name(table: str) -> str:
+        return f"{table}_fts"
+
+    def probe_query(self, table: str) -> Optional[ProbeQuery]:
+        return (
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name",
+            {"name": self.fts_table_name(table)},
+        )
+
+    def index_covers(self, rows: List[Dict[str, Any]], table: str, fields: Sequence[str]) -> bool:
+        if not rows:
+            return False
+        ddl = (rows[0].get("sql") or "").lower()
+        return "fts5" in ddl and all(
+            re.search(rf'["`\s(,]{re.escape(field.lower())}["`\s,)]', ddl) for field in fields
+        )
+
+    def _indexed_clause(self, table: str, fields: Sequence[str], topic: str, param_prefix: str) -> Tuple[str, Dict[str, Any]]:
+        pname = f"{param_prefix}_fts"
+        fts_table = self.quote(self.fts_table_name(table))
+        phrase = '"' + topic.replace('"', '""') + '"'
+        return f"{self.quote('id')} IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :{pname})", {pname: phrase}
+
+
+_BACKENDS_BY_DIALECT = {
+    "mysql": MySQLFullTextBackend,
+    "mariadb": MySQLFullTextBackend,
+    "postgresql": PostgresTrigramBackend,
+    "postgres": PostgresTrigramBackend,
+    "sqlite": SQLiteFTS5Backend,
+}
+
+
+def get_search_backend(dialect: Optional[str], mode: str = "auto") -> TopicSearchBackend:
+    """
+    根据数据库方言选择话题检索后端。
+
+    Args:
+        dialect: SQLAlchemy 方言名，如 mysql / postgresql / sqlite
+        mode: "auto" 按方言选择全文索引后端；"like" 强制使用 LIKE
+    """
+    if (mode or "auto").lower() == "like":
+        return LikeSearchBackend(dialect)
+    backend_cls = _BACKENDS_BY_DIALECT.get((dialect or "").lower(), LikeSearchBackend)
+    return backend_cls(dialect)
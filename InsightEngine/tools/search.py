@@ -25,11 +25,13 @@ V3.0 核心更新:
 
 import os
 import json
+import time
 from loguru import logger
 import asyncio
-from typing import List, Dict, Any, Optional, Literal
+from typing import List, Dict, Any, Optional, Literal, Tuple, Coroutine
 from dataclasses import dataclass, field
-from ..utils.db import fetch_all
+from ..utils.db import fetch_all, fetch_all_concurrently, get_async_engine, run_sync
+from .fulltext_search import TopicSearchBackend, get_search_backend
 from datetime import datetime, timedelta, date
 from InsightEngine.utils.config import settings
 
@@ -73,27 +75,47 @@ class MediaCrawlerDB:
         """
         初始化客户端。
         """
-        pass
+        self._search_backend: Optional[TopicSearchBackend] = None
         
+    @staticmethod
+    def _run_coroutine(coro: Coroutine) -> Any:
+        """同步运行数据库协程（统一提交到后台事件循环，可在多线程中调用）"""
+        return run_sync(coro)
+
     def _execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         try:
-            # 获取或创建event loop
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # 直接运行协程
-            return loop.run_until_complete(fetch_all(query, params))
-        
+            return self._run_coroutine(fetch_all(query, params))
         except Exception as e:
             logger.exception(f"数据库查询时发生错误: {e}")
             return []
 
+    def _execute_queries_concurrently(self, queries: List[Tuple[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        并发执行多条查询，返回与输入顺序一致的结果列表。
+
+        并发上限与单条超时由 DB_QUERY_CONCURRENCY / DB_QUERY_TIMEOUT 配置；
+        单条查询失败或超时只记录日志并返回空列表，不影响其他表的结果。
+        """
+        if not queries:
+            return []
+        try:
+            outcomes = self._run_coroutine(fetch_all_concurrently(queries))
+        except Exception as e:
+            logger.exception(f"并发数据库查询时发生错误: {e}")
+            return [[] for _ in queries]
+
+        results: List[List[Dict[str, Any]]] = []
+        for (query, _), outcome in zip(queries, outcomes):
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    logger.warning(f"数据库查询超时（{settings.DB_QUERY_TIMEOUT}s），已跳过: {query[:120]}")
+                else:
+                    logger.opt(exception=outcome).error(f"数据库查询时发生错误: {outcome}")
+                results.append([])
+            else:
+                results.append(outcome)
+        return results
+
     @staticmethod
     def _to_datetime(ts: Any) -> Optional[datetime]:
         if not ts: return None
@@ -127,6 +149,21 @@ class MediaCrawlerDB:
                     break
         return engagement
 
+    def _row_to_query_result(self, row: Dict[str, Any], table: str, content_type: str) -> QueryResult:
+        """将多表话题搜索的原始行统一转换为 QueryResult"""
+        content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
+        time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
+        return QueryResult(
+            platform=table.split('_')[0], content_type=content_type,
+            title_or_content=content if content else '',
+            author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
+            url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
+            publish_time=self._to_datetime(time_key),
+            engagement=self._extract_engagement(row),
+            source_keyword=row.get('source_keyword'),
+            source_table=table
+        )
+
     def search_hot_content(
         self,
         time_period: Literal['24h', 'week', 'year'] = 'week',
@@ -186,9 +223,60 @@ class MediaCrawlerDB:
 
     def _wrap_query_field_with_dialect(self, field: str) -> str:
         """根据数据库方言包装SQL查询"""
-        if settings.DB_DIALECT == 'postgresql':
-            return f'"{field}"'
-        return f'`{field}`'
+        return self._get_search_backend().quote(field)
+
+    def _get_search_backend(self) -> TopicSearchBackend:
+        """按实际连接的数据库方言选择话题检索后端（全文索引或 LIKE 回退）"""
+        if self._search_backend is None:
+            try:
+                dialect = get_async_engine().dialect.name
+            except Exception as e:
+                logger.warning(f"无法确定数据库方言，使用配置项 DB_DIALECT: {e}")
+                dialect = settings.DB_DIALECT
+            self._search_backend = get_search_backend(dialect, settings.TOPIC_SEARCH_BACKEND)
+            logger.info(f"话题检索后端: {self._search_backend.name} (dialect={dialect})")
+        return self._search_backend
+
+    # 已探测到的索引永久缓存；未探测到的结果在 _FULLTEXT_NEGATIVE_TTL 秒后重新探测，之后建立的索引也能生效
+    _fulltext_index_cache: Dict[Tuple[str, Tuple[str, ...]], bool] = {}
+    _fulltext_index_missing_at: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+    _FULLTEXT_NEGATIVE_TTL = 300
+
+    def _fulltext_cache_valid(self, key: Tuple[str, Tuple[str, ...]]) -> bool:
+        if key not in self._fulltext_index_cache:
+            return False
+        if self._fulltext_index_cache[key]:
+            return True
+        missing_at = self._fulltext_index_missing_at.get(key)
+        return missing_at is None or time.monotonic() - missing_at < self._FULLTEXT_NEGATIVE_TTL
+
+    def _resolve_fulltext_indexes(self, table_fields: Dict[str, List[str]]) -> Dict[str, bool]:
+        """探测各表是否存在覆盖所需列的全文索引，结果按 (表, 列) 缓存"""
+        backend = self._get_search_backend()
+        pending = [(table, tuple(fields)) for table, fields in table_fields.items() if not self._fulltext_cache_valid((table, tuple(fields)))]
+        probes = [(key, backend.probe_query(key[0])) for key in pending]
+        for key, probe in probes:
+            if probe is None:
+                # 后端不支持全文索引（如 LIKE 后端），无需重新探测
+                self._fulltext_index_cache[key] = False
+                self._fulltext_index_missing_at.pop(key, None)
+        probes = [(key, probe) for key, probe in probes if probe is not None]
+        if probes:
+            for (key, _), rows in zip(probes, self._execute_queries_concurrently([probe for _, probe in probes])):
+                covered = backend.index_covers(rows, key[0], key[1])
+                self._fulltext_index_cache[key] = covered
+                if covered:
+                    self._fulltext_index_missing_at.pop(key, None)
+                else:
+                    self._fulltext_index_missing_at[key] = time.monotonic()
+            missing = [key[0] for key, _ in probes if not self._fulltext_index_cache[key]]
+            if missing:
+                logger.info(f"以下表未建立全文索引，话题匹配回退为 LIKE: {', '.join(missing)}")
+        return {table: self._fulltext_index_cache[(table, tuple(fields))] for table, fields in table_fields.items()}
+
+    def _topic_clause(self, table: str, fields: List[str], topic: str, indexed: bool, param_prefix: str = "term") -> Tuple[str, Dict[str, Any]]:
+        """生成单表话题匹配子句及参数"""
+        return self._get_search_backend().build_clause(table, fields, topic, indexed, param_prefix)
 
     def search_topic_globally(self, topic: str, limit_per_table: int = 100) -> DBResponse:
         """
@@ -204,33 +292,20 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit_per_table': limit_per_table}
         logger.info(f"--- TOOL: 全局话题搜索 (params: {params_for_log}) ---")
         
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
         
+        indexed = self._resolve_fulltext_indexes({table: config['fields'] for table, config in search_configs.items()})
+        queries = []
         for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
+            where_clause, param_dict = self._topic_clause(table, config['fields'], topic, indexed[table])
             param_dict['limit'] = limit_per_table
-            where_clause = " OR ".join(where_clauses)
             query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+            queries.append((query, param_dict))
+
+        # 各表查询互不依赖，一次性并发下发，耗时取决于最慢的单表查询
+        for (table, config), raw_results in zip(search_configs.items(), self._execute_queries_concurrently(queries)):
+            all_results.extend(self._row_to_query_result(row, table, config['type']) for row in raw_results)
         return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results))
 
     def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
@@ -254,7 +329,7 @@ class MediaCrawlerDB:
         except ValueError:
             return DBResponse("search_topic_by_date", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
         
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         search_configs = {
             'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
             'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
@@ -262,30 +337,17 @@ class MediaCrawlerDB:
             'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
         }
 
+        indexed = self._resolve_fulltext_indexes({table: config['fields'] for table, config in search_configs.items()})
+        queries = []
         for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
+            where_clause, param_dict = self._topic_clause(table, config['fields'], topic, indexed[table])
             param_dict['limit'] = limit_per_table
-            where_clause = ' OR '.join(where_clauses)
             query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+            queries.append((query, param_dict))
+
+        # 各表查询互不依赖，一次性并发下发，耗时取决于最慢的单表查询
+        for (table, config), raw_results in zip(search_configs.items(), self._execute_queries_concurrently(queries)):
+            all_results.extend(self._row_to_query_result(row, table, config['type']) for row in raw_results)
         return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results))
         
     def get_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
@@ -302,24 +364,27 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit': limit}
         logger.info(f"--- TOOL: 获取话题评论 (params: {params_for_log}) ---")
         
-        search_term = f"%{topic}%"
         comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
+        indexed = self._resolve_fulltext_indexes({table: ['content'] for table in comment_tables})
         
-        all_queries = []
-        for table in comment_tables:
+        all_queries, params = [], {}
+        for idx, table in enumerate(comment_tables):
             cols = self._get_table_columns(table)
             author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
             like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
             time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
             like_select = f"`{like_col}` as likes" if like_col else "'0' as likes"
+            # UNION ALL 共享参数命名空间，按表编号区分参数名
+            topic_clause, topic_params = self._topic_clause(table, ['content'], topic, indexed[table], param_prefix=f"t{idx}")
+            params.update(topic_params)
             
             query = (f"SELECT '{table.split('_')[0]}' as platform, `content`, `{author_col}` as author, "
                      f"`{time_col}` as ts, {like_select}, '{table}' as source_table "
-                     f"FROM `{table}` WHERE `content` LIKE %s")
+                     f"FROM `{table}` WHERE {topic_clause}")
             all_queries.append(query)
 
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT %s"
-        params = (search_term,) * len(comment_tables) + (limit,)
+        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT :limit"
+        params['limit'] = limit
         raw_results = self._execute_query(final_query, params)
         
         formatted = [QueryResult(platform=r['platform'], content_type='comment', title_or_content=r['content'], author_nickname=r['author'], publish_time=self._to_datetime(r['ts']), engagement={'likes': int(r['likes']) if str(r['likes']).isdigit() else 0}, source_table=r['source_table']) for r in raw_results]
@@ -354,7 +419,7 @@ class MediaCrawlerDB:
         if platform not in all_configs:
             return DBResponse("search_topic_on_platform", params_for_log, error_message=f"不支持的平台: {platform}")
 
-        search_term, all_results = f"%{topic}%", []
+        all_results = []
         platform_configs = all_configs[platform]
 
         time_clause, time_params_tuple = "", ()
@@ -366,11 +431,12 @@ class MediaCrawlerDB:
         else:
             start_dt, end_dt = None, None
 
+        indexed = self._resolve_fulltext_indexes({config['table']: config['fields'] for config in platform_configs})
+        queries = []
         for config in platform_configs:
             table = config['table']
-            topic_clause = " OR ".join([f"`{field}` LIKE %s" for field in config['fields']])
+            topic_clause, params = self._topic_clause(table, config['fields'], topic, indexed[table])
             query = f"SELECT * FROM `{table}` WHERE {topic_clause}"
-            params = [search_term] * len(config['fields'])
 
             if start_dt and end_dt and 'time_col' in config:
                 time_col, time_type = config['time_col'], config['time_type']
@@ -379,16 +445,18 @@ class MediaCrawlerDB:
                 elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
                 else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
                 
-                t_clause = f"`{time_col}` >= %s AND `{time_col}` < %s"
-                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= %s AND CAST(`{time_col}` AS UNSIGNED) < %s"
+                t_clause = f"`{time_col}` >= :start_ts AND `{time_col}` < :end_ts"
+                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= :start_ts AND CAST(`{time_col}` AS UNSIGNED) < :end_ts"
                 
                 query += f" AND ({t_clause})"
-                params.extend(t_params)
+                params.update({'start_ts': t_params[0], 'end_ts': t_params[1]})
 
-            query += f" ORDER BY id DESC LIMIT %s"
-            params.append(limit)
+            query += f" ORDER BY id DESC LIMIT :limit"
+            params['limit'] = limit
+            queries.append((query, params))
 
-            raw_results = self._execute_query(query, tuple(params))
+        for config, raw_results in zip(platform_configs, self._execute_queries_concurrently(queries)):
+            table = config['table']
             for row in raw_results:
                 content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
                 time_key = config.get('time_col') and row.get(config.get('time_col'))
@@ -3,8 +3,10 @@
 基于WeiboMultilingualSentiment模型为InsightEngine提供情感分析功能
 """
 
+import contextlib
 import os
 import sys
+import threading
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import re
@@ -31,6 +33,13 @@ except ImportError:
 # INFO：若想跳过情感分析，可手动切换此开关为False
 SENTIMENT_ANALYSIS_ENABLED = True
 
+# 批量推理时每个mini-batch的文本条数
+SENTIMENT_BATCH_SIZE = 32
+# 模型最大输入长度（token）
+SENTIMENT_MAX_LENGTH = 512
+# INFO：仅CPU推理时生效，开启后对Linear层做动态int8量化，速度更快但精度略有下降
+SENTIMENT_CPU_DYNAMIC_QUANTIZATION = False
+
 
 def _describe_missing_dependencies() -> str:
     missing = []
@@ -82,14 +91,31 @@ class WeiboMultilingualSentimentAnalyzer:
     封装WeiboMultilingualSentiment模型，为AI Agent提供情感分析功能
     """
 
-    def __init__(self):
-        """初始化情感分析器"""
+    def __init__(
+        self,
+        batch_size: int = SENTIMENT_BATCH_SIZE,
+        max_length: int = SENTIMENT_MAX_LENGTH,
+        quantize_on_cpu: bool = SENTIMENT_CPU_DYNAMIC_QUANTIZATION,
+    ):
+        """
+        初始化情感分析器
+
+        Args:
+            batch_size: 批量推理时每个mini-batch的文本条数
+            max_length: 模型最大输入长度（token），超出部分截断
+            quantize_on_cpu: 在CPU上推理时是否启用动态int8量化
+        """
         self.model = None
         self.tokenizer = None
         self.device = None
         self.is_initialized = False
         self.is_disabled = False
         self.disable_reason: Optional[str] = None
+        self.batch_size = max(1, int(batch_size))
+        self.max_length = max_length
+        self.quantize_on_cpu = quantize_on_cpu
+        self._init_lock = threading.Lock()
+        self.is_quantized = False
 
         # 情感标签映射（5级分类）
         self.sentiment_map = {
@@ -173,71 +199,126 @@ class WeiboMultilingualSentimentAnalyzer:
             print(f"缺少依赖: {missing}，无法加载情感分析模型。")
             return False
 
-        if self.is_initialized:
-            print("模型已经初始化，无需重复加载")
-            return True
+        # 多个段落线程可能同时触发懒加载，加锁保证模型只加载一次
+        with self._init_lock:
+            if self.is_initialized:
+                print("模型已经初始化，无需重复加载")
+                return True
+
+            try:
+                print("正在加载多语言情感分析模型...")
+                assert AutoTokenizer is not None
+                assert AutoModelForSequenceClassification is not None
+
+                # 使用多语言情感分析模型
+                model_name = "tabularisai/multilingual-sentiment-analysis"
+                local_model_path = os.path.join(weibo_sentiment_path, "model")
+
+                # 检查本地是否已有模型
+                if os.path.exists(local_model_path):
+                    print("从本地加载模型...")
+                    self.tokenizer = AutoTokenizer.from_pretrained(local_model_path)
+                    self.model = AutoModelForSequenceClassification.from_pretrained(
+                        local_model_path
+                    )
+                else:
+                    print("首次使用，正在下载模型到本地...")
+                    # 下载并保存到本地
+                    self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+                    self.model = AutoModelForSequenceClassification.from_pretrained(
+                        model_name
+                    )
 
+                    # 保存到本地
+                    os.makedirs(local_model_path, exist_ok=True)
+                    self.tokenizer.save_pretrained(local_model_path)
+                    self.model.save_pretrained(local_model_path)
+                    print(f"模型已保存到: {local_model_path}")
+
+                # 设置设备
+                device = self._select_device()
+                if device is None:
+                    raise RuntimeError("未检测到可用的计算设备")
+
+                self.device = device
+                self.model.to(self.device)
+                self.model.eval()
+                if self.quantize_on_cpu and getattr(self.device, "type", "") == "cpu":
+                    self._apply_dynamic_quantization()
+                self.is_initialized = True
+                self.enable()
+
+                device_type = getattr(self.device, "type", str(self.device))
+                if device_type == "cuda":
+                    print("检测到可用 GPU，已优先使用 CUDA 进行推理。")
+                elif device_type == "mps":
+                    print("检测到 Apple MPS 设备，已使用 MPS 进行推理。")
+                else:
+                    print("未检测到 GPU，自动使用 CPU 进行推理。")
+
+                if self.is_quantized:
+                    print("已启用动态int8量化（CPU）。")
+                print(f"模型加载成功! 使用设备: {self.device}")
+                print("支持语言: 中文、英文、西班牙文、阿拉伯文、日文、韩文等22种语言")
+                print("情感等级: 非常负面、负面、中性、正面、非常正面")
+
+                return True
+
+            except Exception as e:
+                error_message = f"模型加载失败: {e}"
+                print(error_message)
+                print("请检查网络连接或模型文件")
+                self.disable(error_message, drop_state=True)
+                return False
+
+    def _apply_dynamic_quantization(self) -> None:
+        """对模型的Linear层做动态int8量化，失败时保留原始模型"""
+        assert torch is not None
         try:
-            print("正在加载多语言情感分析模型...")
-            assert AutoTokenizer is not None
-            assert AutoModelForSequenceClassification is not None
-
-            # 使用多语言情感分析模型
-            model_name = "tabularisai/multilingual-sentiment-analysis"
-            local_model_path = os.path.join(weibo_sentiment_path, "model")
-
-            # 检查本地是否已有模型
-            if os.path.exists(local_model_path):
-                print("从本地加载模型...")
-                self.tokenizer = AutoTokenizer.from_pretrained(local_model_path)
-                self.model = AutoModelForSequenceClassification.from_pretrained(
-                    local_model_path
-                )
-            else:
-                print("首次使用，正在下载模型到本地...")
-                # 下载并保存到本地
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.model = AutoModelForSequenceClassification.from_pretrained(
-                    model_name
-                )
+            quantize_dynamic = getattr(getattr(torch, "ao", torch), "quantization").quantize_dynamic
+            self.model = quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.is_quantized = True
+        except Exception as e:
+            print(f"动态量化失败，继续使用FP32模型: {e}")
+            self.is_quantized = False
+
+    def _inference_context(self):
+        """优先使用 torch.inference_mode，旧版本回退为 no_grad"""
+        if torch is None:
+            return contextlib.nullcontext()
+        inference_mode = getattr(torch, "inference_mode", None)
+        return inference_mode() if inference_mode is not None else torch.no_grad()
+
+    def _build_result(self, text: str, probabilities) -> SentimentResult:
+        """根据单条文本的概率向量构建 SentimentResult"""
+        prediction = int(torch.argmax(probabilities).item())
+        prob_dist = {
+            label_name: prob.item()
+            for label_name, prob in zip(self.sentiment_map.values(), probabilities)
+        }
+        return SentimentResult(
+            text=text,
+            sentiment_label=self.sentiment_map[prediction],
+            confidence=probabilities[prediction].item(),
+            probability_distribution=prob_dist,
+            success=True,
+        )
 
-                # 保存到本地
-                os.makedirs(local_model_path, exist_ok=True)
-                self.tokenizer.save_pretrained(local_model_path)
-                self.model.save_pretrained(local_model_path)
-                print(f"模型已保存到: {local_model_path}")
-
-            # 设置设备
-            device = self._select_device()
-            if device is None:
-                raise RuntimeError("未检测到可用的计算设备")
-
-            self.device = device
-            self.model.to(self.device)
-            self.model.eval()
-            self.is_initialized = True
-            self.enable()
-
-            device_type = getattr(self.device, "type", str(self.device))
-            if device_type == "cuda":
-                print("检测到可用 GPU，已优先使用 CUDA 进行推理。")
-            elif device_type == "mps":
-                print("检测到 Apple MPS 设备，已使用 MPS 进行推理。")
-            else:
-                print("未检测到 GPU，自动使用 CPU 进行推理。")
-
-            print(f"模型加载成功! 使用设备: {self.device}")
-            print("支持语言: 中文、英文、西班牙文、阿拉伯文、日文、韩文等22种语言")
-            print("情感等级: 非常负面、负面、中性、正面、非常正面")
-
-            return True
+    def _predict_batch(self, encodings: List[Dict[str, Any]]):
+        """
+        对一组已分词（未填充）的输入做一次前向推理
 
-        except Exception as e:
-            error_message = f"模型加载失败: {e}"
-            print(error_message)
-            print("请检查网络连接或模型文件")
-            self.disable(error_message, drop_state=True)
-            return False
+        Returns:
+            形如 (batch, num_labels) 的概率张量（CPU）
+        """
+        assert torch is not None
+        assert self.tokenizer is not None
+        assert self.model is not None
+        inputs = self.tokenizer.pad(encodings, padding=True, return_tensors="pt")
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with self._inference_context():
+            logits = self.model(**inputs).logits
+            return torch.softmax(logits.float(), dim=-1).cpu()
 
     def _preprocess_text(self, text: str) -> str:
         """
@@ -308,7 +389,7 @@ class WeiboMultilingualSentimentAnalyzer:
             # 分词编码
             inputs = self.tokenizer(
                 processed_text,
-                max_length=512,
+                max_length=self.max_length,
                 padding=True,
                 truncation=True,
                 return_tensors="pt",
@@ -320,28 +401,11 @@ class WeiboMultilingualSentimentAnalyzer:
             # 预测
             assert torch is not None
             assert self.model is not None
-            with torch.no_grad():
+            with self._inference_context():
                 outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                prediction = int(torch.argmax(probabilities, dim=1).item())
-
-            # 构建结果
-            confidence = probabilities[0][prediction].item()
-            label = self.sentiment_map[prediction]
+                probabilities = torch.softmax(outputs.logits.float(), dim=1).cpu()
 
-            # 构建概率分布字典
-            prob_dist = {}
-            for label_name, prob in zip(self.sentiment_map.values(), probabilities[0]):
-                prob_dist[label_name] = prob.item()
-
-            return SentimentResult(
-                text=text,
-                sentiment_label=label,
-                confidence=confidence,
-                probability_distribution=prob_dist,
-                success=True,
-            )
+            return self._build_result(text, probabilities[0])
 
         except Exception as e:
             return SentimentResult(
@@ -399,18 +463,29 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
-        results = []
-        success_count = 0
-        total_confidence = 0.0
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        processed_texts = [self._preprocess_text(text) for text in texts]
+        valid_indices = [i for i, processed in enumerate(processed_texts) if processed]
 
-        for i, text in enumerate(texts):
-            if show_progress and len(texts) > 1:
-                print(f"处理进度: {i + 1}/{len(texts)}")
+        for i, processed in enumerate(processed_texts):
+            if not processed:
+                results[i] = SentimentResult(
+                    text=texts[i],
+                    sentiment_label="输入错误",
+                    confidence=0.0,
+                    probability_distribution={},
+                    success=False,
+                    error_message="输入文本为空或无效内容",
+                    analysis_performed=False,
+                )
 
-            result = self.analyze_single_text(text)
-            results.append(result)
+        if valid_indices:
+            self._analyze_in_batches(texts, processed_texts, valid_indices, results, show_progress)
 
-            if result.success:
+        success_count = 0
+        total_confidence = 0.0
+        for result in results:
+            if result is not None and result.success:
                 success_count += 1
                 total_confidence += result.confidence
 
@@ -420,7 +495,7 @@ class WeiboMultilingualSentimentAnalyzer:
         failed_count = len(texts) - success_count
 
         return BatchSentimentResult(
-            results=results,
+            results=[r for r in results if r is not None],
             total_processed=len(texts),
             success_count=success_count,
             failed_count=failed_count,
@@ -428,6 +503,61 @@ class WeiboMultilingualSentimentAnalyzer:
             analysis_performed=True,
         )
 
+    def _analyze_in_batches(
+        self,
+        texts: List[str],
+        processed_texts: List[str],
+        valid_indices: List[int],
+        results: List[Optional[SentimentResult]],
+        show_progress: bool,
+    ) -> None:
+        """
+        按长度分桶的mini-batch推理，结果按原始位置写回 results
+
+        先一次性分词（不填充），按token长度排序后切分为 batch_size 大小的批次，
+        每批只填充到批内最大长度，避免短文本被长文本拖累。
+        某一批推理失败时，该批退化为逐条推理，不影响其他批次。
+        """
+        assert self.tokenizer is not None
+        encoded = self.tokenizer(
+            [processed_texts[i] for i in valid_indices],
+            max_length=self.max_length,
+            truncation=True,
+            padding=False,
+        )
+        features = [
+            {key: encoded[key][pos] for key in encoded.keys()}
+            for pos in range(len(valid_indices))
+        ]
+        order = sorted(
+            range(len(valid_indices)), key=lambda pos: len(features[pos]["input_ids"])
+        )
+        total_batches = (len(order) + self.batch_size - 1) // self.batch_size
+
+        for batch_no, start in enumerate(range(0, len(order), self.batch_size), 1):
+            batch_positions = order[start : start + self.batch_size]
+            if show_progress and total_batches > 1:
+                print(
+                    f"处理进度: 批次 {batch_no}/{total_batches}"
+                    f"（{min(start + self.batch_size, len(order))}/{len(order)}）"
+                )
+            try:
+                probabilities = self._predict_batch(
+                    [features[pos] for pos in batch_positions]
+                )
+                for row, pos in enumerate(batch_positions):
+                    original_index = valid_indices[pos]
+                    results[original_index] = self._build_result(
+                        texts[original_index], probabilities[row]
+                    )
+            except Exception as e:
+                print(f"批量推理失败，改为逐条推理: {e}")
+                for pos in batch_positions:
+                    original_index = valid_indices[pos]
+                    results[original_index] = self.analyze_single_text(
+                        texts[original_index]
+                    )
+
     def _build_passthrough_analysis(
         self,
         original_data: List[Dict[str, Any]],
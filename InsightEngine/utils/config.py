@@ -22,8 +22,12 @@ class Settings(BaseSettings):
     DB_PORT: int = Field(3306, description="数据库端口")
     DB_CHARSET: str = Field("utf8mb4", description="数据库字符集")
     DB_DIALECT: Optional[str] = Field("mysql", description="数据库方言，如mysql、postgresql等，SQLAlchemy后端选择")
+    DB_QUERY_CONCURRENCY: int = Field(8, description="多表搜索时最大并发查询数")
+    DB_QUERY_TIMEOUT: float = Field(30.0, description="单条数据库查询超时（秒），<=0表示不限制")
+    TOPIC_SEARCH_BACKEND: str = Field("auto", description="话题检索后端：auto按方言使用全文索引（无索引时回退LIKE），like强制使用LIKE")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
+    PARAGRAPH_CONCURRENCY: int = Field(1, description="段落并发研究的最大线程数，1表示按顺序处理")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
     MAX_CONTENT_LENGTH: int = Field(500000, description="搜索最大内容长度")
     DEFAULT_SEARCH_HOT_CONTENT_LIMIT: int = Field(100, description="热榜内容默认最大数")
@@ -10,7 +10,8 @@ from __future__ import annotations
 from urllib.parse import quote_plus
 import asyncio
 import os
-from typing import Any, Dict, Iterable, List, Optional, Union
+import threading
+from typing import Any, Coroutine, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy import text
@@ -19,10 +20,16 @@ from InsightEngine.utils.config import settings
 __all__ = [
     "get_async_engine",
     "fetch_all",
+    "fetch_all_concurrently",
+    "run_sync",
 ]
 
+QueryParams = Optional[Union[Iterable[Any], Dict[str, Any]]]
+
 
 _engine: Optional[AsyncEngine] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
 
 
 def _build_database_url() -> str:
@@ -50,15 +57,19 @@ def get_async_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
         database_url: str = _build_database_url()
+        # 连接池容量需覆盖并发查询上限，否则并发请求会在连接池上排队
+        pool_size: int = max(5, settings.DB_QUERY_CONCURRENCY)
         _engine = create_async_engine(
             database_url,
             pool_pre_ping=True,
             pool_recycle=1800,
+            pool_size=pool_size,
+            max_overflow=pool_size,
         )
     return _engine
 
 
-async def fetch_all(query: str, params: Optional[Union[Iterable[Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+async def fetch_all(query: str, params: QueryParams = None) -> List[Dict[str, Any]]:
     """
     执行只读查询并返回字典列表。
     """
@@ -70,3 +81,60 @@ async def fetch_all(query: str, params: Optional[Union[Iterable[Any], Dict[str,
         return [dict(row) for row in rows]
 
 
+async def fetch_all_concurrently(
+    queries: Sequence[Tuple[str, QueryParams]],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[Union[List[Dict[str, Any]], BaseException]]:
+    """
+    并发执行多条只读查询，结果顺序与传入顺序一致。
+
+    每条查询独立占用连接池中的一个连接，通过信号量限制同时在途的查询数量，
+    并对单条查询施加超时。单条查询失败或超时不会影响其他查询，
+    对应位置返回异常对象，由调用方决定如何处理。
+
+    Args:
+        queries: (SQL, 参数) 二元组序列
+        max_concurrency: 最大并发查询数，默认读取 DB_QUERY_CONCURRENCY
+        timeout: 单条查询超时时间（秒），默认读取 DB_QUERY_TIMEOUT，<=0 表示不限制
+
+    Returns:
+        与 queries 等长的列表，元素为字典列表或异常对象
+    """
+    limit: int = max(1, max_concurrency or settings.DB_QUERY_CONCURRENCY)
+    per_query_timeout: Optional[float] = settings.DB_QUERY_TIMEOUT if timeout is None else timeout
+    if per_query_timeout is not None and per_query_timeout <= 0:
+        per_query_timeout = None
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(query: str, params: QueryParams) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await asyncio.wait_for(fetch_all(query, params), timeout=per_query_timeout)
+
+    return await asyncio.gather(
+        *(_run(query, params) for query, params in queries),
+        return_exceptions=True,
+    )
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """获取（必要时启动）专用于数据库访问的后台事件循环"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="insight-db-loop", daemon=True)
+            thread.start()
+            _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """
+    在同步代码中运行数据库协程并等待结果。
+
+    异步引擎的连接池与创建它的事件循环绑定，多线程各自 run_until_complete 会导致
+    连接跨事件循环复用而报错。这里统一把协程提交到同一个后台事件循环执行，
+    任意线程（包括并发处理段落的工作线程）都可以安全调用。
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
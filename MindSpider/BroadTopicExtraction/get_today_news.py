@@ -9,6 +9,7 @@ import sys
 import asyncio
 import httpx
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime, date
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -49,6 +50,7 @@ class NewsCollector:
         """初始化新闻收集器"""
         self.db_manager = DatabaseManager()
         self.supported_sources = list(SOURCE_NAMES.keys())
+        self._http_client: Optional[httpx.AsyncClient] = None
     
     def close(self):
         """关闭资源"""
@@ -69,6 +71,19 @@ class NewsCollector:
     
     # ==================== 新闻API调用 ====================
     
+    @asynccontextmanager
+    async def _http_session(self):
+        """一轮收集内共用的长连接客户端，各新闻源的请求复用同一条到 newsnow 的连接；单独调用时临时创建"""
+        if self._http_client is not None:
+            yield self._http_client
+            return
+        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            self._http_client = client
+            try:
+                yield client
+            finally:
+                self._http_client = None
+    
     async def fetch_news(self, source: str) -> dict:
         """从指定源获取最新新闻"""
         url = f"{BASE_URL}/api/s?id={source}&latest"
@@ -85,7 +100,7 @@ class NewsCollector:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            async with self._http_session() as client:
                 response = await client.get(url, headers=headers)
                 response.raise_for_status()
                 
@@ -128,24 +143,25 @@ class NewsCollector:
         logger.info("=" * 80)
         
         results = []
-        for source in sources:
-            source_name = SOURCE_NAMES.get(source, source)
-            logger.info(f"正在获取 {source_name} 的新闻...")
-            result = await self.fetch_news(source)
-            results.append(result)
-            
-            if result["status"] == "success":
-                data = result["data"]
-                if 'items' in data and isinstance(data['items'], list):
-                    count = len(data['items'])
-                    logger.info(f"✓ {source_name}: 获取成功，共 {count} 条新闻")
+        async with self._http_session():
+            for source in sources:
+                source_name = SOURCE_NAMES.get(source, source)
+                logger.info(f"正在获取 {source_name} 的新闻...")
+                result = await self.fetch_news(source)
+                results.append(result)
+                
+                if result["status"] == "success":
+                    data = result["data"]
+                    if 'items' in data and isinstance(data['items'], list):
+                        count = len(data['items'])
+                        logger.info(f"✓ {source_name}: 获取成功，共 {count} 条新闻")
+                    else:
+                        logger.info(f"✓ {source_name}: 获取成功")
                 else:
-                    logger.info(f"✓ {source_name}: 获取成功")
-            else:
-                logger.error(f"✗ {source_name}: {result.get('error', '获取失败')}")
-            
-            # 避免请求过快
-            await asyncio.sleep(0.5)
+                    logger.error(f"✗ {source_name}: {result.get('error', '获取失败')}")
+                
+                # 避免请求过快
+                await asyncio.sleep(0.5)
         
         return results
     
@@ -9,7 +9,7 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserContext, BrowserType, Playwright
 
@@ -90,6 +90,20 @@ class AbstractStore(ABC):
     async def store_creator(self, creator: Dict):
         pass
 
+    async def store_contents(self, content_items: List[Dict]):
+        """批量存储内容，默认逐条调用 store_content，数据库存储会覆盖为批量upsert"""
+        for content_item in content_items:
+            await self.store_content(content_item)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """批量存储评论，默认逐条调用 store_comment，数据库存储会覆盖为批量upsert"""
+        for comment_item in comment_items:
+            await self.store_comment(comment_item)
+
+    async def flush(self):
+        """落库缓冲中的数据，无缓冲的存储实现无需覆盖"""
+        pass
+
 
 class AbstractStoreImage(ABC):
     # TODO: support all platform
@@ -116,3 +130,11 @@ class AbstractApiClient(ABC):
     @abstractmethod
     async def update_cookies(self, browser_context: BrowserContext):
         pass
+
+    async def update_proxy(self, proxy: Optional[str]):
+        """
+        代理轮换：之后的请求改走新代理的连接池
+        :param proxy: httpx 代理地址
+        """
+        self.proxy = proxy
+        await self.http_client.set_proxy(proxy)
@@ -10,4 +10,15 @@
 
 
 from .base_config import *
-from .db_config import *
\ No newline at end of file
+from .db_config import *
+
+# 单次运行的配置覆盖：调度方并发启动多个爬虫进程时，用环境变量传入各自的配置（JSON对象，键为配置项名），
+# 不再改写共享的配置文件
+import json as _json
+import os as _os
+
+_config_overrides = _os.getenv("MEDIACRAWLER_CONFIG_OVERRIDES")
+if _config_overrides:
+    for _name, _value in _json.loads(_config_overrides).items():
+        if _name.isupper():
+            globals()[_name] = _value
@@ -60,8 +60,36 @@ BROWSER_LAUNCH_TIMEOUT = 30
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、postgresql, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "postgresql"  # csv or db or json or sqlite or postgresql
+# 数据保存类型选项配置,支持六种类型：csv、db、json、jsonl、sqlite、postgresql, 最好保存到DB，有排重的功能。
+# jsonl 为逐行追加写入，json 每存一条都要读改写整个文件，数据量大时请使用 jsonl
+SAVE_DATA_OPTION = "postgresql"  # csv or db or json or jsonl or sqlite or postgresql
+
+# 数据库批量写入：缓冲的内容/评论达到 DB_BATCH_SIZE 条，或首条缓冲后超过 DB_FLUSH_INTERVAL 秒时批量upsert
+DB_BATCH_SIZE = 200
+DB_FLUSH_INTERVAL = 3
+# 批量落库连续失败时，这批数据保留在缓冲中重试的最大次数，超过后丢弃并记录错误
+DB_FLUSH_MAX_RETRIES = 3
+
+# 文件存储（csv / jsonl）缓冲多少条后追加写入一次，首条缓冲后超过 FILE_FLUSH_INTERVAL 秒也会写出，爬取结束时写出剩余数据
+FILE_WRITE_BATCH_SIZE = 100
+FILE_FLUSH_INTERVAL = 3
+
+# jsonl 存储的压缩方式："" 不压缩，"zstd" 写为 .jsonl.zst（需 pip install zstandard）
+JSONL_COMPRESSION = ""
+
+# jsonl 存储结束时是否另外导出旧版 JSON 数组文件，供仍读取 .json 的下游使用
+JSONL_EXPORT_JSON = False
+
+# HTTP 连接池：每个平台客户端持有一个长连接客户端，请求之间复用连接，代理轮换时重建（贴吧的 requests 会话同样使用连接上限）
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+HTTP_KEEPALIVE_EXPIRY = 30  # 空闲连接保留秒数
+
+# 是否启用 HTTP/2（需 pip install h2，未安装时仍使用 HTTP/1.1）
+HTTP2_ENABLED = False
+
+# 媒体文件流式写盘的分块大小（字节）
+MEDIA_DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
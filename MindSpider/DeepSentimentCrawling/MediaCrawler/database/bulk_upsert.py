@@ -0,0 +1,361 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 缓冲批量写入：按条数/时间阈值把内容、评论批量upsert到数据库
+#
+# 原先每条数据单独开会话、SELECT判断存在、再插入或更新并提交，评论入库完全受数据库往返延迟限制。
+# BulkUpsertWriter 把同一张表的行缓冲起来，满 DB_BATCH_SIZE 条或首条缓冲后超过 DB_FLUSH_INTERVAL 秒时
+# 在一个事务内落库：
+#   - 表上存在覆盖业务键的唯一索引时，使用方言原生upsert：
+#     MySQL INSERT ... ON DUPLICATE KEY UPDATE，PostgreSQL / SQLite INSERT ... ON CONFLICT DO UPDATE；
+#   - 否则（MediaCrawler 自带表结构的业务键只有普通索引）退化为一次 SELECT ... IN 查出已存在的键，
+#     再以 executemany 批量 UPDATE / INSERT，每批固定三次往返。
+# 落库失败时这批行放回缓冲等待下次重试，连续失败超过 DB_FLUSH_MAX_RETRIES 次才丢弃并记录错误。
+# 同一张表在进程内共享一个写入器（各平台的 StoreFactory 每次调用都会创建新的存储实例）。
+
+import asyncio
+import logging
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, insert, inspect, select, tuple_, update
+
+import config
+from database.db_session import get_session
+from tools.crawl_metrics import crawl_metrics
+from tools.time_util import get_current_timestamp
+
+logger = logging.getLogger("MediaCrawler")
+
+# 插入时写入、更新时保持不变的列
+_INSERT_ONLY_COLUMNS = ("add_ts",)
+
+
+def _coerce(column, value: Any) -> Any:
+    """业务键按列类型归一（如B站的BigInteger键可能以字符串传入），保证缓冲去重与库内比较一致"""
+    if value is None or value == "":
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, python_type):
+        return value
+    try:
+        return python_type(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _group_by_columns(rows: List[Dict]) -> Iterable[Tuple[Tuple[str, ...], List[Dict]]]:
+    """executemany 要求参数列一致，按列集合分组"""
+    keyed = sorted(((tuple(sorted(row)), row) for row in rows), key=lambda pair: pair[0])
+    for names, group in groupby(keyed, key=lambda pair: pair[0]):
+        yield names, [row for _, row in group]
+
+
+class BulkUpsertWriter:
+    """单表的缓冲批量upsert写入器"""
+
+    def __init__(
+        self,
+        model,
+        key_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        session_factory: Callable = get_session,
+        insert_required_columns: Sequence[str] = (),
+        item_type: Optional[str] = None,
+    ):
+        """
+        Args:
+            model: ORM模型
+            key_columns: 业务键列（如 note_id、comment_id）
+            update_columns: 已存在时需要更新的列，None表示更新本次提供的全部列
+            batch_size: 缓冲条数阈值，默认 config.DB_BATCH_SIZE
+            flush_interval: 缓冲时间阈值（秒），<= 0 表示只按条数与显式 flush 落库
+            session_factory: 返回异步会话上下文的工厂，默认 get_session
+            insert_required_columns: 新增行时必须非空的列，缺少这些列的行只更新库中已有的记录
+            item_type: 爬取指标中的数据类型（contents / comments / creators），落库成功后计数
+        """
+        self.table = model.__table__
+        self.key_columns = tuple(key_columns)
+        self.update_columns = set(update_columns) if update_columns is not None else None
+        self.batch_size = max(1, batch_size or config.DB_BATCH_SIZE)
+        self.flush_interval = config.DB_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.session_factory = session_factory
+        self.insert_required_columns = tuple(insert_required_columns)
+        self.item_type = item_type
+        self._columns = {column.name: column for column in self.table.columns if not column.primary_key}
+        self._buffer: Dict[tuple, Dict] = {}
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._pending: set = set()
+        # 表上是否存在覆盖业务键的唯一索引，首次落库时探测
+        self._native_upsert: Optional[bool] = None
+        # 连续落库失败的次数
+        self._failures = 0
+
+    async def add(self, items: Iterable[Dict]) -> int:
+        """
+        缓冲一批行，达到条数阈值时立即落库
+
+        只保留表中存在的列；业务键为空的行被忽略；缓冲中键相同的行合并（后到的字段覆盖先到的）。
+        Returns:
+            实际缓冲的行数
+        """
+        now = get_current_timestamp()
+        added = 0
+        for item in items:
+            row = {name: value for name, value in item.items() if name in self._columns}
+            key = []
+            for name in self.key_columns:
+                value = _coerce(self._columns[name], row.get(name))
+                if value is None:
+                    break
+                row[name] = value
+                key.append(value)
+            else:
+                if "last_modify_ts" in self._columns:
+                    row["last_modify_ts"] = now
+                previous = self._buffer.get(tuple(key))
+                self._buffer[tuple(key)] = {**previous, **row} if previous else row
+                added += 1
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        else:
+            self._schedule_flush()
+        return added
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def _schedule_flush(self):
+        if self._buffer and self._timer is None and self.flush_interval > 0:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_later)
+
+    def _flush_later(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._pending.add(task)
+        task.add_done_callback(self._on_timed_flush_done)
+
+    def _on_timed_flush_done(self, task: asyncio.Task):
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # 失败的行已放回缓冲并安排了下次定时落库
+            logger.error(f"[BulkUpsertWriter] timed flush of {self.table.name} failed: {task.exception()}")
+
+    async def flush(self) -> int:
+        """
+        把缓冲的行写入数据库，返回写入行数
+
+        落库失败时这批行放回缓冲（不覆盖期间新到的同键字段）后重新抛出异常，
+        连续失败超过 DB_FLUSH_MAX_RETRIES 次时丢弃这批行。
+        """
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, {}
+            rows = list(batch.values())
+            now = get_current_timestamp()
+            for row in rows:
+                for name in _INSERT_ONLY_COLUMNS:
+                    if name in self._columns:
+                        row.setdefault(name, now)
+            try:
+                async with self.session_factory() as session:
+                    if session is None:
+                        return 0
+                    await self._write(session, rows)
+                    await session.commit()
+            except Exception as e:
+                self._requeue(batch, e)
+                raise
+            self._failures = 0
+            if self.item_type:
+                crawl_metrics.record_items(self.item_type, len(rows))
+            logger.info(f"[BulkUpsertWriter] flushed {len(rows)} rows into {self.table.name}")
+            return len(rows)
+
+    def _requeue(self, batch: Dict[tuple, Dict], error: Exception):
+        self._failures += 1
+        if self._failures > config.DB_FLUSH_MAX_RETRIES:
+            logger.error(
+                f"[BulkUpsertWriter] dropped {len(batch)} rows of {self.table.name} "
+                f"after {self._failures} failed flushes: {error}"
+            )
+            self._failures = 0
+            return
+        for key, row in batch.items():
+            newer = self._buffer.get(key)
+            self._buffer[key] = {**row, **newer} if newer else row
+        logger.warning(
+            f"[BulkUpsertWriter] flush of {self.table.name} failed "
+            f"({self._failures}/{config.DB_FLUSH_MAX_RETRIES}), {len(batch)} rows kept for retry: {error}"
+        )
+        self._schedule_flush()
+
+    async def _write(self, session, rows: List[Dict]):
+        insertable, update_only = [], []
+        for row in rows:
+            if all(row.get(name) for name in self.insert_required_columns):
+                insertable.append(row)
+            else:
+                update_only.append(row)
+        if insertable:
+            if self._native_upsert is None:
+                self._native_upsert = await self._has_unique_key(session)
+            if self._native_upsert:
+                await self._upsert_native(session, insertable)
+            else:
+                await self._upsert_by_lookup(session, insertable)
+        if update_only:
+            await self._upsert_by_lookup(session, update_only, insert_new=False)
+
+    def _set_columns(self, names: Sequence[str]) -> List[str]:
+        return [
+            name for name in names
+            if name not in self.key_columns
+            and name not in _INSERT_ONLY_COLUMNS
+            and (self.update_columns is None or name in self.update_columns or name == "last_modify_ts")
+        ]
+
+    async def _has_unique_key(self, session) -> bool:
+        keys = set(self.key_columns)
+
+        def probe(sync_conn) -> bool:
+            inspector = inspect(sync_conn)
+            if not inspector.has_table(self.table.name):
+                return False
+            for index in inspector.get_indexes(self.table.name):
+                if index.get("unique") and set(index["column_names"]) == keys:
+                    return True
+            try:
+                constraints = inspector.get_unique_constraints(self.table.name)
+            except NotImplementedError:
+                constraints = []
+            return any(set(constraint["column_names"]) == keys for constraint in constraints)
+
+        connection = await session.connection()
+        return await connection.run_sync(probe)
+
+    async def _upsert_native(self, session, rows: List[Dict]):
+        dialect = session.bind.dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            await self._upsert_by_lookup(session, rows)
+            return
+
+        for names, group in _group_by_columns(rows):
+            stmt = dialect_insert(self.table)
+            set_columns = self._set_columns(names)
+            if dialect == "mysql":
+                # 没有可更新的列时用业务键自赋值，等价于忽略重复
+                updates = {name: stmt.inserted[name] for name in set_columns or self.key_columns[:1]}
+                stmt = stmt.on_duplicate_key_update(updates)
+            elif set_columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(self.key_columns),
+                    set_={name: stmt.excluded[name] for name in set_columns},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(self.key_columns))
+            await session.execute(stmt, group)
+
+    async def _upsert_by_lookup(self, session, rows: List[Dict], insert_new: bool = True):
+        key_columns = [self.table.c[name] for name in self.key_columns]
+        keys = [tuple(row[name] for name in self.key_columns) for row in rows]
+        if len(key_columns) == 1:
+            condition = key_columns[0].in_([key[0] for key in keys])
+        else:
+            condition = tuple_(*key_columns).in_(keys)
+        result = await session.execute(select(*key_columns).where(condition).distinct())
+        existing = {tuple(record) for record in result}
+
+        if insert_new:
+            new_rows = [row for row, key in zip(rows, keys) if key not in existing]
+            for _, group in _group_by_columns(new_rows):
+                await session.execute(insert(self.table), group)
+
+        old_rows = [row for row, key in zip(rows, keys) if key in existing]
+        for names, group in _group_by_columns(old_rows):
+            set_columns = self._set_columns(names)
+            if not set_columns:
+                continue
+            # 按业务键更新（而非主键），与旧实现一致地覆盖库中该键的记录
+            stmt = (
+                update(self.table)
+                .where(and_(*(column == bindparam(f"_key_{column.name}") for column in key_columns)))
+                .values({name: bindparam(f"_set_{name}") for name in set_columns})
+            )
+            params = [
+                {
+                    **{f"_key_{name}": row[name] for name in self.key_columns},
+                    **{f"_set_{name}": row[name] for name in set_columns},
+                }
+                for row in group
+            ]
+            await session.execute(stmt, params)
+
+
+_writers: Dict[Tuple[str, Tuple[str, ...]], BulkUpsertWriter] = {}
+
+
+def get_bulk_writer(
+    model,
+    key_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    insert_required_columns: Sequence[str] = (),
+    item_type: Optional[str] = None,
+) -> BulkUpsertWriter:
+    """获取进程内共享的写入器，同一张表、同一业务键只创建一次"""
+    registry_key = (model.__tablename__, tuple(key_columns))
+    writer = _writers.get(registry_key)
+    if writer is None:
+        writer = BulkUpsertWriter(
+            model, key_columns, update_columns,
+            insert_required_columns=insert_required_columns, item_type=item_type,
+        )
+        _writers[registry_key] = writer
+    return writer
+
+
+async def flush_bulk_writers() -> int:
+    """
+    落库全部写入器中缓冲的行，爬取结束时调用
+
+    每个写入器失败后按重试上限反复落库直到写完或丢弃，一张表失败不影响其他表；
+    全部处理完后重新抛出最后一个错误。
+    """
+    total = 0
+    error: Optional[Exception] = None
+    for writer in list(_writers.values()):
+        while writer.buffered:
+            try:
+                total += await writer.flush()
+            except Exception as e:
+                error = e
+                await asyncio.sleep(1)
+    if error is not None:
+        raise error
+    return total
@@ -10,12 +10,14 @@
 
 
 import asyncio
+import signal
 import sys
 from typing import Optional
 
 import cmd_arg
 import config
 from database import db
+from database.bulk_upsert import flush_bulk_writers
 from base.base_crawler import AbstractCrawler
 from media_platform.bilibili import BilibiliCrawler
 from media_platform.douyin import DouYinCrawler
@@ -24,7 +26,10 @@ from media_platform.tieba import TieBaCrawler
 from media_platform.weibo import WeiboCrawler
 from media_platform.xhs import XiaoHongShuCrawler
 from media_platform.zhihu import ZhihuCrawler
-from tools.async_file_writer import AsyncFileWriter
+from tools import utils
+from tools.async_file_writer import AsyncFileWriter, close_file_writers
+from tools.crawl_metrics import crawl_metrics
+from tools.http_client import close_http_clients
 from var import crawler_type_var
 
 
@@ -72,11 +77,22 @@ async def main():
 
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        await crawler.start()
+    finally:
+        # 数据库与文件存储都按批写入，结束时写出剩余的缓冲数据，并关闭各平台的连接池
+        try:
+            await flush_bulk_writers()
+        except Exception as e:
+            utils.logger.error(f"[main] flush buffered db rows failed: {e}")
+        await close_file_writers()
+        await close_http_clients()
+        # 调度方经输出管道读取本次爬取的汇总指标
+        crawl_metrics.emit_summary()
 
     # Generate wordcloud after crawling is complete
-    # Only for JSON save mode
-    if config.SAVE_DATA_OPTION == "json" and config.ENABLE_GET_WORDCLOUD:
+    # Only for JSON / JSONL save mode
+    if config.SAVE_DATA_OPTION in ("json", "jsonl") and config.ENABLE_GET_WORDCLOUD:
         try:
             file_writer = AsyncFileWriter(
                 platform=config.PLATFORM,
@@ -95,8 +111,25 @@ def cleanup():
         asyncio.run(db.close())
 
 
+def cancel_on_sigterm(loop: asyncio.AbstractEventLoop, task: asyncio.Task):
+    """
+    调度方超时后先发送 SIGTERM：取消爬取任务，使 main() 的 finally 写出缓冲数据、关闭连接后再退出
+    Windows 不支持事件循环信号处理，调度方的终止信号直接结束进程
+    """
+    try:
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, AttributeError):
+        pass
+
+
 if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    main_task = loop.create_task(main())
+    cancel_on_sigterm(loop, main_task)
     try:
-        asyncio.get_event_loop().run_until_complete(main())
+        loop.run_until_complete(main_task)
+    except asyncio.CancelledError:
+        utils.logger.warning("[main] crawl terminated by SIGTERM, buffered data has been flushed")
+        sys.exit(1)
     finally:
         cleanup()
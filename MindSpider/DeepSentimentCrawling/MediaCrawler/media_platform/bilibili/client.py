@@ -24,6 +24,7 @@ from playwright.async_api import BrowserContext, Page
 import config
 from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.http_client import PooledHttpClient
 
 from .exception import DataFetchError
 from .field import CommentOrderType, SearchOrderType
@@ -43,14 +44,14 @@ class BilibiliClient(AbstractApiClient):
     ):
         self.proxy = proxy
         self.timeout = timeout
+        self.http_client = PooledHttpClient(proxy, timeout)
         self.headers = headers
         self._host = "https://api.bilibili.com"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
 
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        response = await self.http_client.request(method, url, timeout=self.timeout, **kwargs)
         try:
             data: Dict = response.json()
         except json.JSONDecodeError:
@@ -203,19 +204,37 @@ class BilibiliClient(AbstractApiClient):
 
     async def get_video_media(self, url: str) -> Union[bytes, None]:
         # Follow CDN 302 redirects and treat any 2xx as success (some endpoints return 206)
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=True) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-                response.raise_for_status()
-                if 200 <= response.status_code < 300:
-                    return response.content
-                utils.logger.error(
-                    f"[BilibiliClient.get_video_media] Unexpected status {response.status_code} for {url}"
-                )
-                return None
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[BilibiliClient.get_video_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
-                return None
+        try:
+            response = await self.http_client.request(
+                "GET", url, timeout=self.timeout, headers=self.headers, follow_redirects=True
+            )
+            response.raise_for_status()
+            if 200 <= response.status_code < 300:
+                return response.content
+            utils.logger.error(
+                f"[BilibiliClient.get_video_media] Unexpected status {response.status_code} for {url}"
+            )
+            return None
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[BilibiliClient.get_video_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+            return None
+
+    async def download_video_media(self, url: str, file_path: str) -> bool:
+        """
+        流式下载视频到文件，长视频不必整个读入内存
+        :param url: 视频地址
+        :param file_path: 保存路径
+        :return: 是否下载成功
+        """
+        try:
+            size = await self.http_client.download(
+                url, file_path, timeout=self.timeout, headers=self.headers, follow_redirects=True
+            )
+            utils.logger.info(f"[BilibiliClient.download_video_media] saved {size} bytes to {file_path}")
+            return True
+        except httpx.HTTPError as exc:
+            utils.logger.error(f"[BilibiliClient.download_video_media] {exc.__class__.__name__} for {url} - {exc}")
+            return False
 
     async def get_video_comments(
         self,
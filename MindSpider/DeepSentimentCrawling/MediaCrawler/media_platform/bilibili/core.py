@@ -36,6 +36,7 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import bilibili as bilibili_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.crawl_metrics import crawl_metrics
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
@@ -178,6 +179,7 @@ class BilibiliCrawler(AbstractCrawler):
         start_page = config.START_PAGE  # start page number
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Current search keyword: {keyword}")
             page = 1
             while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
@@ -234,6 +236,7 @@ class BilibiliCrawler(AbstractCrawler):
 
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Current search keyword: {keyword}")
             total_notes_crawled_for_keyword = 0
 
@@ -580,13 +583,11 @@ class BilibiliCrawler(AbstractCrawler):
             utils.logger.info("[BilibiliCrawler.get_bilibili_video] get video url failed")
             return
 
-        content = await self.bili_client.get_video_media(video_url)
+        # 边下载边写盘，长视频不必整个读入内存
+        save_file_name = bilibili_store.get_video_save_path(aid, "video.mp4")
+        await self.bili_client.download_video_media(video_url, save_file_name)
         await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
         utils.logger.info(f"[BilibiliCrawler.get_bilibili_video] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video {aid}")
-        if content is None:
-            return
-        extension_file_name = f"video.mp4"
-        await bilibili_store.store_video(aid, content, extension_file_name)
 
     async def get_all_creator_details(self, creator_url_list: List[str]):
         """
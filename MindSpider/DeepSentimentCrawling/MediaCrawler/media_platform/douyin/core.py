@@ -28,6 +28,7 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import douyin as douyin_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.crawl_metrics import crawl_metrics
 from var import crawler_type_var, source_keyword_var
 
 from .client import DouYinClient
@@ -112,6 +113,7 @@ class DouYinCrawler(AbstractCrawler):
         start_page = config.START_PAGE  # start page number
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(f"[DouYinCrawler.search] Current keyword: {keyword}")
             aweme_list: List[str] = []
             page = 0
@@ -31,6 +31,7 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import kuaishou as kuaishou_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.crawl_metrics import crawl_metrics
 from var import comment_tasks_var, crawler_type_var, source_keyword_var
 
 from .client import KuaiShouClient
@@ -124,6 +125,7 @@ class KuaishouCrawler(AbstractCrawler):
         for keyword in config.KEYWORDS.split(","):
             search_session_id = ""
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(
                 f"[KuaishouCrawler.search] Current search keyword: {keyword}"
             )
@@ -14,6 +14,7 @@ from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode, quote
 
 import requests
+from requests.adapters import HTTPAdapter
 from playwright.async_api import BrowserContext, Page
 from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
@@ -22,6 +23,7 @@ from base.base_crawler import AbstractApiClient
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.crawl_metrics import crawl_metrics
 
 from .field import SearchNoteType, SearchSortType
 from .help import TieBaExtractor
@@ -48,11 +50,41 @@ class BaiduTieBaClient(AbstractApiClient):
         self._page_extractor = TieBaExtractor()
         self.default_ip_proxy = default_ip_proxy
         self.playwright_page = playwright_page  # Playwright页面对象
+        self._session: Optional[requests.Session] = None
+        self._session_proxy: Optional[str] = None
 
-    def _sync_request(self, method, url, proxy=None, **kwargs):
+    def _get_session(self, proxy: Optional[str]) -> requests.Session:
+        """
+        长连接会话，同一代理下复用连接池，代理变化时关闭旧会话并重建
+        Args:
+            proxy: 代理IP
+
+        Returns:
+            requests会话
+        """
+        if self._session is None or proxy != self._session_proxy:
+            if self._session is not None:
+                self._session.close()
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS, pool_maxsize=config.HTTP_MAX_CONNECTIONS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session, self._session_proxy = session, proxy
+        return self._session
+
+    async def update_proxy(self, proxy: Optional[str]):
+        """
+        代理轮换：之后的请求改走新代理的会话
+        Args:
+            proxy: 代理IP
+        """
+        self.default_ip_proxy = proxy
+
+    def _sync_request(self, session: requests.Session, method, url, proxy=None, **kwargs):
         """
         同步的requests请求方法
         Args:
+            session: 复用连接的requests会话
             method: 请求方法
             url: 请求的URL
             proxy: 代理IP
@@ -70,7 +102,7 @@ class BaiduTieBaClient(AbstractApiClient):
             }
 
         # 发送请求
-        response = requests.request(
+        response = session.request(
             method=method,
             url=url,
             headers=self.headers,
@@ -80,7 +112,7 @@ class BaiduTieBaClient(AbstractApiClient):
         )
         return response
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1), before_sleep=crawl_metrics.record_retry)
     async def request(self, method, url, return_ori_content=False, proxy=None, **kwargs) -> Union[str, Any]:
         """
         封装requests的公共请求方法，对请求响应做一些处理
@@ -96,14 +128,16 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         actual_proxy = proxy if proxy else self.default_ip_proxy
 
-        # 在线程池中执行同步的requests请求
+        # 在线程池中执行同步的requests请求，会话在事件循环线程中取得，避免多个线程同时重建
         response = await asyncio.to_thread(
             self._sync_request,
+            self._get_session(actual_proxy),
             method,
             url,
             actual_proxy,
             **kwargs
         )
+        crawl_metrics.record_request(response.status_code, len(response.content))
 
         if response.status_code != 200:
             utils.logger.error(f"Request failed, method: {method}, url: {url}, status code: {response.status_code}")
@@ -111,6 +145,7 @@ class BaiduTieBaClient(AbstractApiClient):
             raise Exception(f"Request failed, method: {method}, url: {url}, status code: {response.status_code}")
 
         if response.text == "" or response.text == "blocked":
+            crawl_metrics.record_rate_limit()
             utils.logger.error(f"request params incorrect, response.text: {response.text}")
             raise Exception("account blocked")
 
@@ -142,7 +177,7 @@ class BaiduTieBaClient(AbstractApiClient):
                 proxie_model = await self.ip_pool.get_proxy()
                 _, proxy = utils.format_proxy_info(proxie_model)
                 res = await self.request(method="GET", url=f"{self._host}{final_uri}", return_ori_content=return_ori_content, proxy=proxy, **kwargs)
-                self.default_ip_proxy = proxy
+                await self.update_proxy(proxy)
                 return res
 
             utils.logger.error(f"[BaiduTieBaClient.get] 达到了最大重试次数，IP已经被Block，请尝试更换新的IP代理: {e}")
@@ -29,6 +29,7 @@ from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import tieba as tieba_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.crawl_metrics import crawl_metrics
 from var import crawler_type_var, source_keyword_var
 
 from .client import BaiduTieBaClient
@@ -147,6 +148,7 @@ class TieBaCrawler(AbstractCrawler):
         start_page = config.START_PAGE
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(
                 f"[BaiduTieBaCrawler.search] Current search keyword: {keyword}"
             )
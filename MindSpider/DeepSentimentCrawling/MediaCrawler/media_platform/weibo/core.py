@@ -33,6 +33,7 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import weibo as weibo_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.crawl_metrics import crawl_metrics
 from var import crawler_type_var, source_keyword_var
 
 from .client import WeiboClient
@@ -143,6 +144,7 @@ class WeiboCrawler(AbstractCrawler):
 
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(f"[WeiboCrawler.search] Current search keyword: {keyword}")
             page = 1
             while (page - start_page + 1) * weibo_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
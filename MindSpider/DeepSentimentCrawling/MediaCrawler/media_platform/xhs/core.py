@@ -31,6 +31,7 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import xhs as xhs_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.crawl_metrics import crawl_metrics
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
@@ -122,6 +123,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         start_page = config.START_PAGE
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            crawl_metrics.start_keyword(keyword)
             utils.logger.info(f"[XiaoHongShuCrawler.search] Current search keyword: {keyword}")
             page = 1
             search_id = get_search_id()
@@ -474,13 +476,13 @@ class XiaoHongShuCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.xhs_client.get_note_media(url)
+            extension_file_name = f"{picNum}.jpg"
+            save_file_name = xhs_store.get_note_image_save_path(note_id, extension_file_name)
+            downloaded = await self.xhs_client.download_note_media(url, save_file_name)
             await asyncio.sleep(random.random())
-            if content is None:
+            if not downloaded:
                 continue
-            extension_file_name = f"{picNum}.jpg"
             picNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
 
     async def get_notice_video(self, note_item: Dict):
         """
@@ -498,10 +500,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
             return
         videoNum = 0
         for url in videos:
-            content = await self.xhs_client.get_note_media(url)
+            extension_file_name = f"{videoNum}.mp4"
+            save_file_name = xhs_store.get_note_video_save_path(note_id, extension_file_name)
+            downloaded = await self.xhs_client.download_note_media(url, save_file_name)
             await asyncio.sleep(random.random())
-            if content is None:
+            if not downloaded:
                 continue
-            extension_file_name = f"{videoNum}.mp4"
             videoNum += 1
-            await xhs_store.update_xhs_note_video(note_id, content, extension_file_name)
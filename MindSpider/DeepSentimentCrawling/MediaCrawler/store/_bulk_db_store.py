@@ -0,0 +1,84 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 各平台数据库存储的公共基类，内容/评论/创作者经共享的批量写入器入库
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from base.base_crawler import AbstractStore
+from database.bulk_upsert import flush_bulk_writers, get_bulk_writer
+
+
+class BulkDbStoreImplement(AbstractStore):
+    """
+    数据库存储基类
+
+    子类声明各类数据对应的模型与业务键，需要字段转换的平台覆盖 build_*_row；
+    build_*_row 返回 None 的数据不入库；*_insert_required 中的列为空的数据只更新库中已有的记录。
+    """
+
+    content_model = None
+    content_key: Tuple[str, ...] = ()
+    content_update_columns: Optional[Sequence[str]] = None
+    content_insert_required: Tuple[str, ...] = ()
+
+    comment_model = None
+    comment_key: Tuple[str, ...] = ()
+    comment_update_columns: Optional[Sequence[str]] = None
+    comment_insert_required: Tuple[str, ...] = ()
+
+    creator_model = None
+    creator_key: Tuple[str, ...] = ("user_id",)
+    creator_update_columns: Optional[Sequence[str]] = None
+    creator_insert_required: Tuple[str, ...] = ()
+
+    def build_content_row(self, content_item: Dict) -> Optional[Dict]:
+        return content_item
+
+    def build_comment_row(self, comment_item: Dict) -> Optional[Dict]:
+        return comment_item
+
+    def build_creator_row(self, creator: Dict) -> Optional[Dict]:
+        return creator
+
+    async def store_content(self, content_item: Dict):
+        await self.store_contents([content_item])
+
+    async def store_contents(self, content_items: List[Dict]):
+        await self._write("content", content_items, self.build_content_row)
+
+    async def store_comment(self, comment_item: Dict):
+        await self.store_comments([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        await self._write("comment", comment_items, self.build_comment_row)
+
+    async def store_creator(self, creator: Dict):
+        await self._write("creator", [creator], self.build_creator_row)
+
+    async def flush(self):
+        await flush_bulk_writers()
+
+    async def _write(self, kind: str, items: List[Dict], build_row):
+        model = getattr(self, f"{kind}_model")
+        if model is None or not items:
+            return
+        rows = [row for row in map(build_row, items) if row]
+        if not rows:
+            return
+        writer = get_bulk_writer(
+            model,
+            getattr(self, f"{kind}_key"),
+            getattr(self, f"{kind}_update_columns"),
+            insert_required_columns=getattr(self, f"{kind}_insert_required"),
+            item_type=f"{kind}s",
+        )
+        await writer.add(rows)
@@ -13,7 +13,7 @@
 # @Time    : 2024/1/14 19:34
 # @Desc    :
 
-from typing import List
+from typing import Dict, List, Optional
 
 import config
 from var import source_keyword_var
@@ -27,6 +27,7 @@ class BiliStoreFactory:
         "csv": BiliCsvStoreImplement,
         "db": BiliDbStoreImplement,
         "json": BiliJsonStoreImplement,
+        "jsonl": BiliJsonStoreImplement,
         "sqlite": BiliSqliteStoreImplement,
         "postgresql": BiliDbStoreImplement,
     }
@@ -35,7 +36,7 @@ class BiliStoreFactory:
     def create_store() -> AbstractStore:
         store_class = BiliStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or postgresql ...")
+            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or postgresql ...")
         return store_class()
 
 
@@ -96,11 +97,20 @@ async def update_up_info(video_item: Dict):
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_bilibili_video_comment(video_id, comment_item)
+    save_comment_items = [build_bilibili_video_comment(video_id, comment_item) for comment_item in comments]
+    await BiliStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
 async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+    save_comment_item = build_bilibili_video_comment(video_id, comment_item)
+    if save_comment_item:
+        await BiliStoreFactory.create_store().store_comment(save_comment_item)
+
+
+def build_bilibili_video_comment(video_id: str, comment_item: Dict) -> Optional[Dict]:
+    """
+    组装评论的入库字段，数据无效时返回None
+    """
     # comment_id 和 video_id 需要保持为整数类型，匹配数据库 BigInteger 字段
     rpid_value = comment_item.get("rpid")
     comment_id = int(rpid_value) if rpid_value else None
@@ -129,7 +139,7 @@ async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
         "last_modify_ts": utils.get_current_timestamp(),
     }
     utils.logger.info(f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def store_video(aid, video_content, extension_file_name):
@@ -147,6 +157,16 @@ async def store_video(aid, video_content, extension_file_name):
     })
 
 
+def get_video_save_path(aid, extension_file_name) -> str:
+    """
+    流式下载视频时的本地保存路径（目录不存在时创建）
+    Args:
+        aid:
+        extension_file_name:
+    """
+    return BilibiliVideo().prepare_save_path(str(aid), extension_file_name)
+
+
 async def batch_update_bilibili_creator_fans(creator_info: Dict, fans_list: List[Dict]):
     if not fans_list:
         return
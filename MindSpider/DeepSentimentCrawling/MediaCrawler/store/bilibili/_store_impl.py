@@ -26,6 +26,7 @@ from sqlalchemy.orm import sessionmaker
 
 import config
 from base.base_crawler import AbstractStore
+from store._bulk_db_store import BulkDbStoreImplement
 from database.db_session import get_session
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
 from tools.async_file_writer import AsyncFileWriter
@@ -111,75 +112,15 @@ class BiliCsvStoreImplement(AbstractStore):
         )
 
 
-class BiliDbStoreImplement(AbstractStore):
-    async def store_content(self, content_item: Dict):
-        """
-        Bilibili content DB storage implementation
-        Args:
-            content_item: content item dict
-        """
-        video_id = content_item.get("video_id")
-        # 确保 video_id 为整数类型，匹配数据库 BigInteger 字段
-        if video_id is not None:
-            video_id = int(video_id) if not isinstance(video_id, int) else video_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = BilibiliVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
-
-    async def store_comment(self, comment_item: Dict):
-        """
-        Bilibili comment DB storage implementation
-        Args:
-            comment_item: comment item dict
-        """
-        comment_id = comment_item.get("comment_id")
-        # 确保 comment_id 为整数类型，匹配数据库 BigInteger 字段
-        if comment_id is not None:
-            comment_id = int(comment_id) if not isinstance(comment_id, int) else comment_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = BilibiliVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
-
-    async def store_creator(self, creator: Dict):
-        """
-        Bilibili creator DB storage implementation
-        Args:
-            creator: creator item dict
-        """
-        creator_id = creator.get("user_id")
-        # 确保 creator_id 为整数类型，匹配数据库 BigInteger 字段
-        if creator_id is not None:
-            creator_id = int(creator_id) if not isinstance(creator_id, int) else creator_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpInfo).where(BilibiliUpInfo.user_id == creator_id))
-            creator_detail = result.scalar_one_or_none()
-
-            if not creator_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = BilibiliUpInfo(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(creator_detail, key, value)
-            await session.commit()
+class BiliDbStoreImplement(BulkDbStoreImplement):
+    """
+    Bilibili DB storage implementation, rows are buffered and upserted in batches
+    """
+    content_model = BilibiliVideo
+    content_key = ("video_id",)
+    comment_model = BilibiliVideoComment
+    comment_key = ("comment_id",)
+    creator_model = BilibiliUpInfo
 
     async def store_contact(self, contact_item: Dict):
         """
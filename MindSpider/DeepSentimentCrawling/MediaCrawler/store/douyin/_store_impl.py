@@ -19,13 +19,11 @@ import os
 import pathlib
 from typing import Dict
 
-from sqlalchemy import select
-
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
+from store._bulk_db_store import BulkDbStoreImplement
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
-from tools import utils, words
+from tools import words
 from tools.async_file_writer import AsyncFileWriter
 from var import crawler_type_var
 
@@ -80,67 +78,17 @@ class DouyinCsvStoreImplement(AbstractStore):
         )
 
 
-class DouyinDbStoreImplement(AbstractStore):
-    async def store_content(self, content_item: Dict):
-        """
-        Douyin content DB storage implementation
-        Args:
-            content_item: content item dict
-        """
-        aweme_id = content_item.get("aweme_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
-            aweme_detail = result.scalar_one_or_none()
-
-            if not aweme_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                if content_item.get("title"):
-                    new_content = DouyinAweme(**content_item)
-                    session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(aweme_detail, key, value)
-            await session.commit()
-
-    async def store_comment(self, comment_item: Dict):
-        """
-        Douyin comment DB storage implementation
-        Args:
-            comment_item: comment item dict
-        """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAwemeComment).where(DouyinAwemeComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = DouyinAwemeComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
-
-    async def store_creator(self, creator: Dict):
-        """
-        Douyin creator DB storage implementation
-        Args:
-            creator: creator dict
-        """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            result = await session.execute(select(DyCreator).where(DyCreator.user_id == user_id))
-            user_detail = result.scalar_one_or_none()
-
-            if not user_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = DyCreator(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(user_detail, key, value)
-            await session.commit()
+class DouyinDbStoreImplement(BulkDbStoreImplement):
+    """
+    Douyin DB storage implementation, rows are buffered and upserted in batches
+    """
+    content_model = DouyinAweme
+    content_key = ("aweme_id",)
+    # 与旧实现一致：没有标题的作品不新增，但已入库的作品照常更新
+    content_insert_required = ("title",)
+    comment_model = DouyinAwemeComment
+    comment_key = ("comment_id",)
+    creator_model = DyCreator
 
 
 class DouyinJsonStoreImplement(AbstractStore):
@@ -21,15 +21,14 @@ import pathlib
 from typing import Dict
 
 import aiofiles
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
 from base.base_crawler import AbstractStore
+from store._bulk_db_store import BulkDbStoreImplement
 from database.models import WeiboCreator, WeiboNote, WeiboNoteComment
-from tools import utils, words
+from tools import words
 from tools.async_file_writer import AsyncFileWriter
-from database.db_session import get_session
 from var import crawler_type_var
 
 
@@ -87,85 +86,15 @@ class WeiboCsvStoreImplement(AbstractStore):
         await self.writer.write_to_csv(item_type="creators", item=creator)
 
 
-class WeiboDbStoreImplement(AbstractStore):
-
-    async def store_content(self, content_item: Dict):
-        """
-        Weibo content DB storage implementation
-        Args:
-            content_item: content item dict
-
-        Returns:
-
-        """
-        note_id = content_item.get("note_id")
-        async with get_session() as session:
-            stmt = select(WeiboNote).where(WeiboNote.note_id == note_id)
-            res = await session.execute(stmt)
-            db_note = res.scalar_one_or_none()
-            if db_note:
-                db_note.last_modify_ts = utils.get_current_timestamp()
-                for key, value in content_item.items():
-                    if hasattr(db_note, key):
-                        setattr(db_note, key, value)
-            else:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                content_item["last_modify_ts"] = utils.get_current_timestamp()
-                db_note = WeiboNote(**content_item)
-                session.add(db_note)
-            await session.commit()
-
-    async def store_comment(self, comment_item: Dict):
-        """
-        Weibo content DB storage implementation
-        Args:
-            comment_item: comment item dict
-
-        Returns:
-
-        """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(WeiboNoteComment).where(WeiboNoteComment.comment_id == comment_id)
-            res = await session.execute(stmt)
-            db_comment = res.scalar_one_or_none()
-            if db_comment:
-                db_comment.last_modify_ts = utils.get_current_timestamp()
-                for key, value in comment_item.items():
-                    if hasattr(db_comment, key):
-                        setattr(db_comment, key, value)
-            else:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                comment_item["last_modify_ts"] = utils.get_current_timestamp()
-                db_comment = WeiboNoteComment(**comment_item)
-                session.add(db_comment)
-            await session.commit()
-
-    async def store_creator(self, creator: Dict):
-        """
-        Weibo creator DB storage implementation
-        Args:
-            creator:
-
-        Returns:
-
-        """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            stmt = select(WeiboCreator).where(WeiboCreator.user_id == user_id)
-            res = await session.execute(stmt)
-            db_creator = res.scalar_one_or_none()
-            if db_creator:
-                db_creator.last_modify_ts = utils.get_current_timestamp()
-                for key, value in creator.items():
-                    if hasattr(db_creator, key):
-                        setattr(db_creator, key, value)
-            else:
-                creator["add_ts"] = utils.get_current_timestamp()
-                creator["last_modify_ts"] = utils.get_current_timestamp()
-                db_creator = WeiboCreator(**creator)
-                session.add(db_creator)
-            await session.commit()
+class WeiboDbStoreImplement(BulkDbStoreImplement):
+    """
+    Weibo DB storage implementation, rows are buffered and upserted in batches
+    """
+    content_model = WeiboNote
+    content_key = ("note_id",)
+    comment_model = WeiboNoteComment
+    comment_key = ("comment_id",)
+    creator_model = WeiboCreator
 
 
 class WeiboJsonStoreImplement(AbstractStore):
@@ -12,7 +12,7 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 17:34
 # @Desc    :
-from typing import List
+from typing import Dict, List, Optional
 
 import config
 from var import source_keyword_var
@@ -26,6 +26,7 @@ class XhsStoreFactory:
         "csv": XhsCsvStoreImplement,
         "db": XhsDbStoreImplement,
         "json": XhsJsonStoreImplement,
+        "jsonl": XhsJsonStoreImplement,
         "sqlite": XhsSqliteStoreImplement,
         "postgresql": XhsDbStoreImplement,
     }
@@ -34,7 +35,7 @@ class XhsStoreFactory:
     def create_store() -> AbstractStore:
         store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or postgresql ...")
+            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or postgresql ...")
         return store_class()
 
 
@@ -125,8 +126,8 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_xhs_note_comment(note_id, comment_item)
+    save_comment_items = [build_xhs_note_comment(note_id, comment_item) for comment_item in comments]
+    await XhsStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
 async def update_xhs_note_comment(note_id: str, comment_item: Dict):
@@ -138,6 +139,15 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
 
     Returns:
 
+    """
+    save_comment_item = build_xhs_note_comment(note_id, comment_item)
+    if save_comment_item:
+        await XhsStoreFactory.create_store().store_comment(save_comment_item)
+
+
+def build_xhs_note_comment(note_id: str, comment_item: Dict) -> Optional[Dict]:
+    """
+    组装评论的入库字段，数据无效时返回None
     """
     user_info = comment_item.get("user_info", {})
     comment_id = comment_item.get("id")
@@ -159,7 +169,7 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
         "like_count": comment_item.get("like_count", 0),
     }
     utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
-    await XhsStoreFactory.create_store().store_comment(local_db_item)
+    return local_db_item
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -239,3 +249,29 @@ async def update_xhs_note_video(note_id, video_content, extension_file_name):
     """
 
     await XiaoHongShuVideo().store_video({"notice_id": note_id, "video_content": video_content, "extension_file_name": extension_file_name})
+
+
+def get_note_image_save_path(note_id, extension_file_name) -> str:
+    """
+    流式下载小红书笔记图片时的本地保存路径（目录不存在时创建）
+    Args:
+        note_id:
+        extension_file_name:
+
+    Returns:
+
+    """
+    return XiaoHongShuImage().prepare_save_path(note_id, extension_file_name)
+
+
+def get_note_video_save_path(note_id, extension_file_name) -> str:
+    """
+    流式下载小红书笔记视频时的本地保存路径（目录不存在时创建）
+    Args:
+        note_id:
+        extension_file_name:
+
+    Returns:
+
+    """
+    return XiaoHongShuVideo().prepare_save_path(note_id, extension_file_name)
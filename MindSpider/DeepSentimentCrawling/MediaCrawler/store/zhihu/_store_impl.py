@@ -21,12 +21,11 @@ import pathlib
 from typing import Dict
 
 import aiofiles
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
 from base.base_crawler import AbstractStore
-from database.db_session import get_session
+from store._bulk_db_store import BulkDbStoreImplement
 from database.models import ZhihuContent, ZhihuComment, ZhihuCreator
 from tools import utils, words
 from var import crawler_type_var
@@ -86,63 +85,15 @@ class ZhihuCsvStoreImplement(AbstractStore):
         await self.writer.write_to_csv(item_type="creators", item=creator)
 
 
-class ZhihuDbStoreImplement(AbstractStore):
-    async def store_content(self, content_item: Dict):
-        """
-        Zhihu content DB storage implementation
-        Args:
-            content_item: content item dict
-        """
-        content_id = content_item.get("content_id")
-        async with get_session() as session:
-            stmt = select(ZhihuContent).where(ZhihuContent.content_id == content_id)
-            result = await session.execute(stmt)
-            existing_content = result.scalars().first()
-            if existing_content:
-                for key, value in content_item.items():
-                    setattr(existing_content, key, value)
-            else:
-                new_content = ZhihuContent(**content_item)
-                session.add(new_content)
-            await session.commit()
-
-    async def store_comment(self, comment_item: Dict):
-        """
-        Zhihu content DB storage implementation
-        Args:
-            comment_item: comment item dict
-        """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(ZhihuComment).where(ZhihuComment.comment_id == comment_id)
-            result = await session.execute(stmt)
-            existing_comment = result.scalars().first()
-            if existing_comment:
-                for key, value in comment_item.items():
-                    setattr(existing_comment, key, value)
-            else:
-                new_comment = ZhihuComment(**comment_item)
-                session.add(new_comment)
-            await session.commit()
-
-    async def store_creator(self, creator: Dict):
-        """
-        Zhihu content DB storage implementation
-        Args:
-            creator: creator dict
-        """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            stmt = select(ZhihuCreator).where(ZhihuCreator.user_id == user_id)
-            result = await session.execute(stmt)
-            existing_creator = result.scalars().first()
-            if existing_creator:
-                for key, value in creator.items():
-                    setattr(existing_creator, key, value)
-            else:
-                new_creator = ZhihuCreator(**creator)
-                session.add(new_creator)
-            await session.commit()
+class ZhihuDbStoreImplement(BulkDbStoreImplement):
+    """
+    Zhihu DB storage implementation, rows are buffered and upserted in batches
+    """
+    content_model = ZhihuContent
+    content_key = ("content_id",)
+    comment_model = ZhihuComment
+    comment_key = ("comment_id",)
+    creator_model = ZhihuCreator
 
 
 class ZhihuJsonStoreImplement(AbstractStore):
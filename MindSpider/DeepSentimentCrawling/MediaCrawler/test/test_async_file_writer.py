@@ -0,0 +1,91 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 文件存储：jsonl 按批/定时追加、流式读取与旧版JSON转换，CSV 句柄复用
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import config
+from tools.async_file_writer import (AsyncFileWriter, close_file_writers,
+                                     convert_jsonl_to_json, iter_json_items)
+
+
+class TestAsyncFileWriter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.saved = (
+            config.SAVE_DATA_OPTION, config.FILE_WRITE_BATCH_SIZE, config.FILE_FLUSH_INTERVAL, config.JSONL_COMPRESSION
+        )
+        config.SAVE_DATA_OPTION = "jsonl"
+        config.FILE_WRITE_BATCH_SIZE = 3
+        config.FILE_FLUSH_INTERVAL = 0
+        config.JSONL_COMPRESSION = ""
+
+    def tearDown(self):
+        (config.SAVE_DATA_OPTION, config.FILE_WRITE_BATCH_SIZE,
+         config.FILE_FLUSH_INTERVAL, config.JSONL_COMPRESSION) = self.saved
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    async def test_jsonl_batched_append_and_legacy_conversion(self):
+        writer = AsyncFileWriter(platform="wb", crawler_type="search")
+        for i in range(7):
+            # 每次新建写入器，与各平台 StoreFactory 的用法一致
+            await AsyncFileWriter(platform="wb", crawler_type="search").write_single_item_to_json(
+                {"comment_id": i, "content": f"评论{i}"}, "comments"
+            )
+        file_path = writer._get_file_path("jsonl", "comments")
+        self.assertEqual(len(list(iter_json_items(file_path))), 6)
+
+        await close_file_writers()
+        items = list(iter_json_items(file_path))
+        self.assertEqual([item["comment_id"] for item in items], list(range(7)))
+
+        json_path = convert_jsonl_to_json(file_path)
+        with open(json_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), items)
+
+    async def test_timed_flush(self):
+        config.FILE_FLUSH_INTERVAL = 0.05
+        writer = AsyncFileWriter(platform="wb", crawler_type="search")
+        await writer.write_single_item_to_json({"comment_id": 1}, "comments")
+        file_path = writer._get_file_path("jsonl", "comments")
+        self.assertEqual(list(iter_json_items(file_path)), [])
+        await asyncio.sleep(0.3)
+        self.assertEqual(list(iter_json_items(file_path)), [{"comment_id": 1}])
+        await close_file_writers()
+
+    async def test_csv_keeps_header_columns(self):
+        writer = AsyncFileWriter(platform="wb", crawler_type="search")
+        await writer.write_to_csv({"a": 1, "b": "x,y"}, "contents")
+        await writer.write_to_csv({"b": "only", "c": 3}, "contents")
+        with self.assertLogs("MediaCrawler", "WARNING") as logs:
+            await close_file_writers()
+        # 表头之外的字段提示一次
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("['c']", logs.output[0])
+        await writer.write_to_csv({"b": "later", "a": 9}, "contents")
+        await close_file_writers()
+
+        with open(writer._get_file_path("csv", "contents"), encoding="utf-8-sig") as f:
+            self.assertEqual(f.read().splitlines(), ["a,b", '1,"x,y"', ",only", "9,later"])
+
+
+if __name__ == "__main__":
+    unittest.main()
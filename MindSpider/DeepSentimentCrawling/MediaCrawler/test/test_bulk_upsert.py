@@ -0,0 +1,153 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 批量upsert写入器：无唯一索引的表走 SELECT+批量写入，有唯一索引的表走 ON CONFLICT
+
+import asyncio
+import os
+import tempfile
+import unittest
+from contextlib import asynccontextmanager
+from unittest import mock
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from database.bulk_upsert import BulkUpsertWriter
+from database.models import Base, BilibiliVideo, WeiboNoteComment
+from tools.crawl_metrics import CrawlMetrics
+
+
+class TestBulkUpsertWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    @asynccontextmanager
+    async def session(self):
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            yield session
+
+    async def fetch_all(self, model):
+        async with self.session() as session:
+            return (await session.execute(select(model).order_by(model.id))).scalars().all()
+
+    async def test_lookup_upsert_without_unique_index(self):
+        writer = BulkUpsertWriter(
+            WeiboNoteComment, ("comment_id",), batch_size=100, flush_interval=0, session_factory=self.session
+        )
+        await writer.add([
+            {"comment_id": "1", "note_id": "9", "content": "first"},
+            {"comment_id": 2, "note_id": 9, "content": "second", "unknown_field": "ignored"},
+            {"comment_id": "", "content": "no key"},
+        ])
+        self.assertEqual(await writer.flush(), 2)
+        self.assertFalse(writer._native_upsert)
+        add_ts = (await self.fetch_all(WeiboNoteComment))[0].add_ts
+
+        # 缓冲内同键合并，已存在的行按业务键更新且保留 add_ts
+        await writer.add([{"comment_id": 1, "content": "edited"}, {"comment_id": 1, "comment_like_count": "5"}])
+        await writer.add([{"comment_id": 3, "note_id": 9, "content": "third"}])
+        self.assertEqual(await writer.flush(), 2)
+
+        rows = await self.fetch_all(WeiboNoteComment)
+        self.assertEqual([row.comment_id for row in rows], [1, 2, 3])
+        self.assertEqual((rows[0].content, rows[0].comment_like_count, rows[0].note_id), ("edited", "5", 9))
+        self.assertEqual(rows[0].add_ts, add_ts)
+
+    async def test_native_upsert_with_unique_index(self):
+        writer = BulkUpsertWriter(
+            BilibiliVideo, ("video_id",), update_columns=("liked_count",),
+            batch_size=2, flush_interval=0, session_factory=self.session,
+        )
+        await writer.add([{"video_id": "100", "video_url": "u1", "title": "t1", "liked_count": 1}])
+        # 达到条数阈值时自动落库
+        await writer.add([{"video_id": 200, "video_url": "u2", "title": "t2", "liked_count": 2}])
+        self.assertTrue(writer._native_upsert)
+        self.assertEqual(len(await self.fetch_all(BilibiliVideo)), 2)
+
+        await writer.add([{"video_id": 100, "video_url": "u1", "title": "changed", "liked_count": 10}])
+        await writer.flush()
+        rows = await self.fetch_all(BilibiliVideo)
+        self.assertEqual(len(rows), 2)
+        # 只更新 update_columns 中的列
+        self.assertEqual((rows[0].title, rows[0].liked_count), ("t1", 10))
+
+    async def test_timed_flush(self):
+        writer = BulkUpsertWriter(
+            WeiboNoteComment, ("comment_id",), batch_size=100, flush_interval=0.05, session_factory=self.session
+        )
+        await writer.add([{"comment_id": 7, "content": "later"}])
+        await asyncio.sleep(0.3)
+        async with self.session() as session:
+            count = (await session.execute(select(func.count()).select_from(WeiboNoteComment))).scalar()
+        self.assertEqual(count, 1)
+
+
+    async def test_failed_flush_keeps_rows_for_retry(self):
+        attempts = []
+
+        @asynccontextmanager
+        async def flaky_session():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("db down")
+            async with self.session() as session:
+                yield session
+
+        writer = BulkUpsertWriter(
+            WeiboNoteComment, ("comment_id",), batch_size=100, flush_interval=0, session_factory=flaky_session,
+            item_type="comments",
+        )
+        metrics = CrawlMetrics()
+        with mock.patch("database.bulk_upsert.crawl_metrics", metrics):
+            await writer.add([{"comment_id": 1, "content": "old"}, {"comment_id": 2, "content": "kept"}])
+            with self.assertRaises(ConnectionError):
+                await writer.flush()
+            self.assertEqual(writer.buffered, 2)
+            self.assertEqual(metrics.items, {})
+
+            # 失败期间新到的同键字段不被放回的旧行覆盖
+            await writer.add([{"comment_id": 1, "content": "new"}])
+            self.assertEqual(await writer.flush(), 2)
+        # 落库成功后才计入指标
+        self.assertEqual(metrics.items, {"comments": 2})
+        rows = await self.fetch_all(WeiboNoteComment)
+        self.assertEqual([(row.comment_id, row.content) for row in rows], [(1, "new"), (2, "kept")])
+
+    async def test_rows_missing_insert_columns_only_update(self):
+        writer = BulkUpsertWriter(
+            BilibiliVideo, ("video_id",), batch_size=100, flush_interval=0,
+            session_factory=self.session, insert_required_columns=("title",),
+        )
+        await writer.add([{"video_id": 1, "video_url": "u1", "title": "t1", "liked_count": 1}])
+        await writer.flush()
+
+        await writer.add([
+            {"video_id": 1, "video_url": "u1", "title": "", "liked_count": 5},
+            {"video_id": 2, "video_url": "u2", "title": "", "liked_count": 2},
+        ])
+        await writer.flush()
+        rows = await self.fetch_all(BilibiliVideo)
+        self.assertEqual([(row.video_id, row.liked_count) for row in rows], [(1, 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 爬取指标：计数与按前缀输出的JSON行
+
+import contextlib
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from tools.crawl_metrics import METRICS_ENV, METRICS_LINE_PREFIX, CrawlMetrics
+
+
+class TestCrawlMetrics(unittest.TestCase):
+
+    def emitted(self, metrics: CrawlMetrics, action) -> list:
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, {METRICS_ENV: "1"}), contextlib.redirect_stdout(out):
+            action(metrics)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(all(line.startswith(METRICS_LINE_PREFIX) for line in lines))
+        return [json.loads(line[len(METRICS_LINE_PREFIX):]) for line in lines]
+
+    def test_summary_contains_counters(self):
+        def crawl(metrics: CrawlMetrics):
+            metrics.start_keyword("k1")
+            metrics.record_request(200, 100)
+            metrics.record_request(429, 10)
+            metrics.record_retry()
+            metrics.record_items("contents", 2)
+            metrics.record_items("comments", 5)
+            metrics.start_keyword("k2")
+            metrics.record_bytes(1000)
+            metrics.emit_summary()
+
+        events = self.emitted(CrawlMetrics(), crawl)
+        self.assertEqual([event["event"] for event in events], ["progress", "keyword", "keyword", "summary"])
+        self.assertEqual([event.get("keyword") for event in events[1:3]], ["k1", "k2"])
+        summary = events[-1]
+        self.assertEqual(summary["items"], {"contents": 2, "comments": 5})
+        self.assertEqual(
+            (summary["requests"], summary["retries"], summary["rate_limited"], summary["bytes_downloaded"]),
+            (2, 1, 1, 1110),
+        )
+        self.assertEqual(sorted(summary["keyword_seconds"]), ["k1", "k2"])
+
+    def test_silent_without_env(self):
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, {METRICS_ENV: ""}), contextlib.redirect_stdout(out):
+            metrics = CrawlMetrics()
+            metrics.record_items("contents")
+            metrics.emit_summary()
+        self.assertEqual(out.getvalue(), "")
+        self.assertEqual(metrics.items, {"contents": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
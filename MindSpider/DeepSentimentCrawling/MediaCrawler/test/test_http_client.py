@@ -0,0 +1,77 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 长连接客户端：请求间复用连接池，代理轮换时旧连接池在请求结束后关闭，媒体流式写盘
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from tools.http_client import PooledHttpClient, close_http_clients
+
+
+class TestPooledHttpClient(unittest.IsolatedAsyncioTestCase):
+
+    async def test_reuses_client_between_requests(self):
+        client = PooledHttpClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": 1})))
+        await client.request("GET", "https://example.com/a")
+        pooled = client._client
+        response = await client.request("GET", "https://example.com/b")
+        self.assertEqual(response.json(), {"ok": 1})
+        self.assertIs(client._client, pooled)
+        await close_http_clients()
+        self.assertTrue(pooled.is_closed)
+
+    async def test_proxy_rotation_waits_for_in_flight_requests(self):
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200, text="done")
+
+        client = PooledHttpClient(transport=httpx.MockTransport(handler))
+        task = asyncio.create_task(client.request("GET", "https://example.com/slow"))
+        await asyncio.sleep(0.01)
+        old_client = client._client
+
+        await client.set_proxy("http://127.0.0.1:8888")
+        self.assertIsNone(client._client)
+        self.assertFalse(old_client.is_closed)
+
+        release.set()
+        self.assertEqual((await task).text, "done")
+        self.assertTrue(old_client.is_closed)
+        await client.aclose()
+
+    async def test_download_streams_to_file(self):
+        body = os.urandom(200 * 1024)
+        client = PooledHttpClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200 if request.url.path == "/video.mp4" else 404, content=body)
+        ))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "video.mp4")
+            self.assertEqual(await client.download("https://cdn.example.com/video.mp4", file_path), len(body))
+            with open(file_path, "rb") as f:
+                self.assertEqual(f.read(), body)
+
+            missing_path = os.path.join(tmpdir, "missing.mp4")
+            with self.assertRaises(httpx.HTTPStatusError):
+                await client.download("https://cdn.example.com/missing.mp4", missing_path)
+            self.assertEqual(os.listdir(tmpdir), ["video.mp4"])
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,243 @@
+import abc
 import asyncio
 import csv
+import io
 import json
 import os
 import pathlib
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 import aiofiles
 import config
+from tools.crawl_metrics import crawl_metrics
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
+# 同一文件的写入句柄在进程内共享：各平台的 StoreFactory 每次调用都会创建新的存储实例，
+# 句柄若挂在实例上就只能每条数据重新打开文件
+_sinks: Dict[str, "_FileSink"] = {}
+
+
+def _zstd_module():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _jsonl_suffix() -> str:
+    """JSONL文件后缀，配置了zstd压缩且已安装 zstandard 时为 .jsonl.zst"""
+    if config.JSONL_COMPRESSION == "zstd":
+        if _zstd_module() is not None:
+            return "jsonl.zst"
+        utils.logger.warning("[AsyncFileWriter] JSONL_COMPRESSION=zstd but zstandard is not installed, writing plain jsonl")
+    return "jsonl"
+
+
+def iter_json_items(file_path: str) -> Iterator[Dict]:
+    """
+    流式读取存储文件中的数据项
+
+    支持 .jsonl、.jsonl.zst（逐行解析，内存占用与文件大小无关）以及旧版 .json 数组文件；
+    JSONL 中无法解析的行（如进程中断留下的半行）会被跳过。
+    """
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return
+    if file_path.endswith(".json"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                return
+        yield from (data if isinstance(data, list) else [data])
+        return
+
+    if file_path.endswith(".zst"):
+        zstandard = _zstd_module()
+        if zstandard is None:
+            raise RuntimeError(f"reading {file_path} requires the zstandard package")
+        raw = open(file_path, "rb")
+        # 追加写入会产生多个zstd帧，需跨帧读取
+        stream = io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True), encoding="utf-8"
+        )
+    else:
+        raw = None
+        stream = open(file_path, "r", encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                utils.logger.warning(f"[iter_json_items] skip malformed line in {file_path}")
+    finally:
+        stream.close()
+        if raw is not None:
+            raw.close()
+
+
+def convert_jsonl_to_json(jsonl_path: str, json_path: Optional[str] = None) -> str:
+    """
+    把JSONL（可为.zst）转换为旧版 JSON 数组文件（indent=4），供依赖旧格式的下游使用
+
+    逐条读取、逐条写出，不会把全部数据载入内存。
+    Returns:
+        生成的JSON文件路径
+    """
+    if json_path is None:
+        base = jsonl_path[:-len(".zst")] if jsonl_path.endswith(".zst") else jsonl_path
+        json_path = base[:-len(".jsonl")] + ".json" if base.endswith(".jsonl") else base + ".json"
+    with open(json_path, "w", encoding="utf-8") as out:
+        out.write("[")
+        first = True
+        for item in iter_json_items(jsonl_path):
+            out.write("\n" if first else ",\n")
+            first = False
+            out.write(json.dumps(item, ensure_ascii=False, indent=4))
+        out.write("]" if first else "\n]")
+    return json_path
+
+
+class _FileSink(abc.ABC):
+    """单个文件的持久写入句柄，缓冲数据项，满 FILE_WRITE_BATCH_SIZE 条或首条缓冲后超过 FILE_FLUSH_INTERVAL 秒时追加"""
+
+    def __init__(self, file_path: str, item_type: Optional[str] = None):
+        self.file_path = file_path
+        # 爬取指标中的数据类型，写入文件后计数
+        self.item_type = item_type
+        self.lock = asyncio.Lock()
+        self.pending: List[Dict] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+
+    async def add(self, item: Dict):
+        async with self.lock:
+            self.pending.append(item)
+            if len(self.pending) >= max(1, config.FILE_WRITE_BATCH_SIZE):
+                await self._write_out()
+            elif self._timer is None and config.FILE_FLUSH_INTERVAL > 0:
+                self._timer = asyncio.get_running_loop().call_later(config.FILE_FLUSH_INTERVAL, self._flush_later)
+
+    def _flush_later(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._on_timed_flush_done)
+
+    def _on_timed_flush_done(self, task: asyncio.Task):
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            utils.logger.error(f"[AsyncFileWriter] timed flush of {self.file_path} failed: {task.exception()}")
+
+    async def flush(self):
+        async with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.pending:
+                await self._write_out()
+
+    async def _write_out(self):
+        count = len(self.pending)
+        await self._write_pending()
+        if self.item_type:
+            crawl_metrics.record_items(self.item_type, count)
+
+    async def close(self):
+        await self.flush()
+
+    @abc.abstractmethod
+    async def _write_pending(self):
+        """把 self.pending 中的数据项追加到文件并清空缓冲，调用方持有 self.lock"""
+
+
+class _JsonlSink(_FileSink):
+    """追加写JSONL；zstd压缩时每批写为一个独立帧，文件始终可被完整解压"""
+
+    def __init__(self, file_path: str, item_type: Optional[str] = None):
+        super().__init__(file_path, item_type)
+        self.compressor = _zstd_module().ZstdCompressor() if file_path.endswith(".zst") else None
+
+    async def _write_pending(self):
+        payload = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in self.pending).encode("utf-8")
+        self.pending = []
+        if self.compressor is not None:
+            payload = self.compressor.compress(payload)
+        await asyncio.to_thread(self._append, payload)
+
+    def _append(self, payload: bytes):
+        with open(self.file_path, "ab") as f:
+            f.write(payload)
+
+
+class _CsvSink(_FileSink):
+    """CSV文件保持打开，表头取自已有文件或第一条数据，之后的行按表头列写入"""
+
+    def __init__(self, file_path: str, item_type: Optional[str] = None):
+        super().__init__(file_path, item_type)
+        self.file = None
+        self.writer: Optional[csv.DictWriter] = None
+        # 已提示过的表头之外的字段，避免每行重复告警
+        self._dropped_fields: set = set()
+
+    async def _open(self, first_item: Dict):
+        fieldnames = list(first_item.keys())
+        exists = os.path.exists(self.file_path) and os.path.getsize(self.file_path) > 0
+        if exists:
+            async with aiofiles.open(self.file_path, "r", newline="", encoding="utf-8-sig") as f:
+                header = next(csv.reader([await f.readline()]), None)
+            if header:
+                fieldnames = header
+        self.file = await aiofiles.open(self.file_path, "a", newline="", encoding="utf-8-sig")
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, restval="", extrasaction="ignore")
+        if not exists:
+            await self.writer.writeheader()
+
+    async def _write_pending(self):
+        if self.writer is None:
+            await self._open(self.pending[0])
+        fieldnames = set(self.writer.fieldnames)
+        for item in self.pending:
+            dropped = item.keys() - fieldnames - self._dropped_fields
+            if dropped:
+                self._dropped_fields |= dropped
+                utils.logger.warning(
+                    f"[AsyncFileWriter] fields {sorted(dropped)} are not in the csv header of {self.file_path}, "
+                    f"they are not written"
+                )
+            await self.writer.writerow(item)
+        self.pending = []
+        await self.file.flush()
+
+    async def close(self):
+        await super().close()
+        if self.file is not None:
+            await self.file.close()
+            self.file = None
+            self.writer = None
+
+
+def _get_sink(file_path: str, sink_class, item_type: Optional[str] = None) -> _FileSink:
+    sink = _sinks.get(file_path)
+    if sink is None:
+        sink = sink_class(file_path, item_type)
+        _sinks[file_path] = sink
+    return sink
+
+
+async def close_file_writers():
+    """写出全部缓冲并关闭文件句柄，爬取结束时调用；配置了 JSONL_EXPORT_JSON 时同时导出旧版JSON数组"""
+    for file_path, sink in list(_sinks.items()):
+        await sink.close()
+        _sinks.pop(file_path, None)
+        if isinstance(sink, _JsonlSink) and config.JSONL_EXPORT_JSON:
+            json_path = await asyncio.to_thread(convert_jsonl_to_json, file_path)
+            utils.logger.info(f"[close_file_writers] exported legacy json: {json_path}")
+
+
 class AsyncFileWriter:
     def __init__(self, platform: str, crawler_type: str):
         self.lock = asyncio.Lock()
@@ -17,22 +246,22 @@ class AsyncFileWriter:
         self.wordcloud_generator = AsyncWordCloudGenerator() if config.ENABLE_GET_WORDCLOUD else None
 
     def _get_file_path(self, file_type: str, item_type: str) -> str:
-        base_path = f"data/{self.platform}/{file_type}"
+        base_path = f"data/{self.platform}/{file_type.split('.')[0]}"
         pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
         file_name = f"{self.crawler_type}_{item_type}_{utils.get_current_date()}.{file_type}"
         return f"{base_path}/{file_name}"
 
     async def write_to_csv(self, item: Dict, item_type: str):
         file_path = self._get_file_path('csv', item_type)
-        async with self.lock:
-            file_exists = os.path.exists(file_path)
-            async with aiofiles.open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=item.keys())
-                if not file_exists or await f.tell() == 0:
-                    await writer.writeheader()
-                await writer.writerow(item)
+        sink = _get_sink(file_path, _CsvSink, item_type)
+        await sink.add(item)
 
     async def write_single_item_to_json(self, item: Dict, item_type: str):
+        # jsonl 模式：追加一行，不再整文件读改写
+        if config.SAVE_DATA_OPTION == "jsonl":
+            await self.write_to_jsonl(item, item_type)
+            return
+
         file_path = self._get_file_path('json', item_type)
         async with self.lock:
             existing_data = []
@@ -46,11 +275,28 @@ class AsyncFileWriter:
                             existing_data = [existing_data]
                     except json.JSONDecodeError:
                         existing_data = []
-            
+
             existing_data.append(item)
 
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
+            crawl_metrics.record_items(item_type)
+
+    async def write_to_jsonl(self, item: Dict, item_type: str):
+        file_path = self._get_file_path(_jsonl_suffix(), item_type)
+        sink = _get_sink(file_path, _JsonlSink, item_type)
+        await sink.add(item)
+
+    def _get_comments_file_path(self) -> Optional[str]:
+        """当前存储模式下的评论文件，jsonl 模式找不到时回退旧版json"""
+        candidates = []
+        if config.SAVE_DATA_OPTION == "jsonl":
+            candidates.append(self._get_file_path(_jsonl_suffix(), 'comments'))
+        candidates.append(self._get_file_path('json', 'comments'))
+        for file_path in candidates:
+            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+                return file_path
+        return None
 
     async def generate_wordcloud_from_comments(self):
         """
@@ -64,31 +310,26 @@ class AsyncFileWriter:
             return
 
         try:
-            # Read comments from JSON file
-            comments_file_path = self._get_file_path('json', 'comments')
-            if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
-                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
+            # 先写出缓冲中的评论
+            await close_file_writers()
+            comments_file_path = self._get_comments_file_path()
+            if not comments_file_path:
+                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found for {self.platform}")
                 return
 
-            async with aiofiles.open(comments_file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                if not content:
-                    utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Comments file is empty")
-                    return
-
-                comments_data = json.loads(content)
-                if not isinstance(comments_data, list):
-                    comments_data = [comments_data]
-
             # Filter comments data to only include 'content' field
             # Handle different comment data structures across platforms
-            filtered_data = []
-            for comment in comments_data:
-                if isinstance(comment, dict):
-                    # Try different possible content field names
-                    content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
-                    if content_text:
-                        filtered_data.append({'content': content_text})
+            def collect_contents() -> List[Dict]:
+                filtered = []
+                for comment in iter_json_items(comments_file_path):
+                    if isinstance(comment, dict):
+                        # Try different possible content field names
+                        content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
+                        if content_text:
+                            filtered.append({'content': content_text})
+                return filtered
+
+            filtered_data = await asyncio.to_thread(collect_contents)
 
             if not filtered_data:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
@@ -104,4 +345,4 @@ class AsyncFileWriter:
             utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix}")
 
         except Exception as e:
-            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
\ No newline at end of file
+            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
@@ -0,0 +1,117 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 爬取指标统计：入库条数、请求/重试/限流次数、下载字节数与各关键词耗时
+#
+# 由调度方启动时（环境变量 MEDIACRAWLER_METRICS=1）以 JSON 行的形式写到标准输出，每行带 METRICS_LINE_PREFIX 前缀，
+# 调度方从子进程的输出管道中按前缀区分指标与普通日志。
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+METRICS_ENV = "MEDIACRAWLER_METRICS"
+METRICS_LINE_PREFIX = "@@crawl_metrics@@ "
+
+# 视为被限流/风控的响应状态码（461/471 为小红书的验证码拦截）
+RATE_LIMIT_STATUS_CODES = {429, 461, 471}
+
+# 两次进度上报之间的最短间隔（秒）
+PROGRESS_INTERVAL = 5
+
+
+class CrawlMetrics:
+    """进程内的爬取指标计数器"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.items: Dict[str, int] = {}
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.bytes_downloaded = 0
+        self.keyword_seconds: Dict[str, float] = {}
+        self._current_keyword: Optional[str] = None
+        self._keyword_started_at = 0.0
+        self._last_progress_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv(METRICS_ENV) == "1"
+
+    def snapshot(self) -> Dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "items": dict(self.items),
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "bytes_downloaded": self.bytes_downloaded,
+            "keyword_seconds": {keyword: round(seconds, 3) for keyword, seconds in self.keyword_seconds.items()},
+        }
+
+    def emit(self, event: str, **data):
+        if not self.enabled:
+            return
+        line = json.dumps({"event": event, **data, **self.snapshot()}, ensure_ascii=False)
+        sys.stdout.write(METRICS_LINE_PREFIX + line + "\n")
+        sys.stdout.flush()
+
+    def _maybe_emit_progress(self):
+        now = time.monotonic()
+        if now - self._last_progress_at >= PROGRESS_INTERVAL:
+            self._last_progress_at = now
+            self.emit("progress")
+
+    def record_items(self, item_type: str, count: int = 1):
+        """记录存储的数据条数，item_type 与文件存储一致：contents / comments / creators 等"""
+        self.items[item_type] = self.items.get(item_type, 0) + count
+        self._maybe_emit_progress()
+
+    def record_request(self, status_code: Optional[int] = None, num_bytes: int = 0):
+        self.requests += 1
+        self.bytes_downloaded += num_bytes
+        if status_code in RATE_LIMIT_STATUS_CODES:
+            self.rate_limited += 1
+
+    def record_bytes(self, num_bytes: int):
+        self.bytes_downloaded += num_bytes
+
+    def record_retry(self, retry_state=None):
+        """可直接作为 tenacity 的 before_sleep 回调"""
+        self.retries += 1
+
+    def record_rate_limit(self):
+        self.rate_limited += 1
+
+    def start_keyword(self, keyword: str):
+        """开始爬取一个关键词，上一个关键词随之计时结束"""
+        self.finish_keyword()
+        self._current_keyword = keyword
+        self._keyword_started_at = time.monotonic()
+
+    def finish_keyword(self):
+        if self._current_keyword is None:
+            return
+        keyword, self._current_keyword = self._current_keyword, None
+        seconds = time.monotonic() - self._keyword_started_at
+        self.keyword_seconds[keyword] = self.keyword_seconds.get(keyword, 0.0) + seconds
+        self.emit("keyword", keyword=keyword, seconds=round(seconds, 3))
+
+    def emit_summary(self):
+        self.finish_keyword()
+        self.emit("summary")
+
+
+crawl_metrics = CrawlMetrics()
@@ -0,0 +1,144 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 平台客户端共用的长连接 httpx 客户端，连接池在请求之间复用，代理轮换时重建
+import os
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+import aiofiles
+import httpx
+
+import config
+from tools.crawl_metrics import crawl_metrics
+
+# 进程内所有连接池客户端，爬取结束时统一关闭
+_clients: "weakref.WeakSet[PooledHttpClient]" = weakref.WeakSet()
+
+
+def _http2_enabled() -> bool:
+    """配置开启HTTP/2且已安装 h2 时才启用，否则使用HTTP/1.1"""
+    if not config.HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class PooledHttpClient:
+    """
+    长连接的 httpx.AsyncClient 封装，每个平台客户端持有一个
+
+    请求之间复用 TCP/TLS 连接；代理变化时新建连接池，旧连接池等其上进行中的请求结束后再关闭。
+    """
+
+    def __init__(self, proxy: Optional[str] = None, timeout: float = 10, **client_kwargs):
+        self.proxy = proxy
+        self.timeout = timeout
+        self._client_kwargs = client_kwargs
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight: Dict[httpx.AsyncClient, int] = {}
+        self._retired: Set[httpx.AsyncClient] = set()
+        _clients.add(self)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            proxy=self.proxy, timeout=self.timeout, limits=limits, http2=_http2_enabled(), **self._client_kwargs
+        )
+
+    async def set_proxy(self, proxy: Optional[str]):
+        """切换代理：之后的请求使用新的连接池"""
+        if proxy == self.proxy:
+            return
+        self.proxy = proxy
+        old_client, self._client = self._client, None
+        if old_client is not None:
+            await self._retire(old_client)
+
+    async def _retire(self, client: httpx.AsyncClient):
+        if self._in_flight.get(client):
+            self._retired.add(client)
+            return
+        self._in_flight.pop(client, None)
+        await client.aclose()
+
+    @asynccontextmanager
+    async def _borrow(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self._client is None:
+            self._client = self._build_client()
+        client = self._client
+        self._in_flight[client] = self._in_flight.get(client, 0) + 1
+        try:
+            yield client
+        finally:
+            self._in_flight[client] -= 1
+            if client in self._retired and not self._in_flight[client]:
+                self._retired.discard(client)
+                await self._retire(client)
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        async with self._borrow() as client:
+            response = await client.request(method, url, **kwargs)
+        crawl_metrics.record_request(response.status_code, response.num_bytes_downloaded)
+        return response
+
+    async def download(self, url, file_path: str, **kwargs) -> int:
+        """
+        流式下载到文件，先写入 .part 临时文件，完成后再改名，中途失败不会留下残缺文件
+
+        Returns:
+            写入的字节数
+        Raises:
+            httpx.HTTPError: 连接错误或响应状态码不是2xx
+        """
+        tmp_path = f"{file_path}.part"
+        size = 0
+        async with self._borrow() as client:
+            async with client.stream("GET", url, **kwargs) as response:
+                crawl_metrics.record_request(response.status_code)
+                response.raise_for_status()
+                try:
+                    async with aiofiles.open(tmp_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(config.MEDIA_DOWNLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+                            size += len(chunk)
+                            crawl_metrics.record_bytes(len(chunk))
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+        os.replace(tmp_path, file_path)
+        return size
+
+    async def aclose(self):
+        clients = set(self._in_flight) | self._retired
+        if self._client is not None:
+            clients.add(self._client)
+        self._client = None
+        self._in_flight.clear()
+        self._retired.clear()
+        for client in clients:
+            await client.aclose()
+
+
+async def close_http_clients():
+    """关闭全部连接池，爬取结束时调用"""
+    for client in list(_clients):
+        await client.aclose()
@@ -5,10 +5,15 @@ DeepSentimentCrawling模块 - 平台爬虫管理器
 负责配置和调用MediaCrawler进行多平台爬取
 """
 
+import codecs
+import importlib.util
 import os
 import sys
 import subprocess
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -24,6 +29,37 @@ try:
 except ImportError:
     raise ImportError("无法导入config.py配置文件")
 
+# MediaCrawler 读取该环境变量中的JSON作为本次运行的配置覆盖
+CONFIG_OVERRIDES_ENV = "MEDIACRAWLER_CONFIG_OVERRIDES"
+# 并发运行时每个平台使用独立的CDP调试端口，避免多个进程争用同一端口
+CDP_BASE_PORT = 9222
+
+
+def _load_crawl_metrics_module():
+    """
+    按文件路径加载 MediaCrawler/tools/crawl_metrics.py（只依赖标准库），与子进程共用指标协议常量；
+    不把 MediaCrawler 加入 sys.path，避免其 config 包遮蔽 MindSpider 的 config.py
+    """
+    path = Path(__file__).parent / "MediaCrawler" / "tools" / "crawl_metrics.py"
+    spec = importlib.util.spec_from_file_location("mediacrawler_crawl_metrics", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# 爬虫子进程经标准输出管道上报JSON行格式的指标
+_crawl_metrics = _load_crawl_metrics_module()
+METRICS_ENV = _crawl_metrics.METRICS_ENV
+METRICS_LINE_PREFIX = _crawl_metrics.METRICS_LINE_PREFIX
+# 保留子进程最近的输出行数，用于解析登录提示与错误
+OUTPUT_TAIL_LINES = 2000
+# 单次从子进程输出管道读取的最大字节数
+OUTPUT_READ_SIZE = 4096
+# 并发的各平台子进程共用控制台，按块加锁写出
+_console_lock = threading.Lock()
+# 超时后先发送终止信号，等待子进程写出缓冲数据、关闭连接的最长秒数，之后强制结束
+TERMINATE_GRACE_SECONDS = 30
+
 class PlatformCrawler:
     """平台爬虫管理器"""
     
@@ -32,6 +68,13 @@ class PlatformCrawler:
         self.mediacrawler_path = Path(__file__).parent / "MediaCrawler"
         self.supported_platforms = ['xhs', 'dy', 'ks', 'bili', 'wb', 'tieba', 'zhihu']
         self.crawl_stats = {}
+        # 各平台爬虫子进程的运行状态：pending / running / success / failed / timeout / error
+        self.run_status: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._db_configured = False
+        # 每次运行的指标文件：MediaCrawler/data/crawl_metrics/<run_id>/<platform>.jsonl 与 summary.json，
+        # 与爬取的数据文件放在同一输出目录下（已被 git 忽略）
+        self.metrics_dir = self.mediacrawler_path / "data" / "crawl_metrics"
         
         # 确保MediaCrawler目录存在
         if not self.mediacrawler_path.exists():
@@ -40,7 +83,9 @@ class PlatformCrawler:
         logger.info(f"初始化平台爬虫管理器，MediaCrawler路径: {self.mediacrawler_path}")
     
     def configure_mediacrawler_db(self):
-        """配置MediaCrawler使用我们的数据库（MySQL或PostgreSQL）"""
+        """配置MediaCrawler使用我们的数据库（MySQL或PostgreSQL），同一实例只写一次配置文件"""
+        if self._db_configured:
+            return True
         try:
             # 判断数据库类型
             db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
@@ -128,6 +173,7 @@ postgresql_db_config = {{
             with open(db_config_path, 'w', encoding='utf-8') as f:
                 f.write(new_config)
             
+            self._db_configured = True
             db_type = "PostgreSQL" if is_postgresql else "MySQL"
             logger.info(f"已配置MediaCrawler使用MindSpider {db_type}数据库")
             return True
@@ -136,10 +182,10 @@ postgresql_db_config = {{
             logger.exception(f"配置MediaCrawler数据库失败: {e}")
             return False
     
-    def create_base_config(self, platform: str, keywords: List[str], 
-                          crawler_type: str = "search", max_notes: int = 50) -> bool:
+    def build_run_config(self, platform: str, keywords: List[str],
+                         crawler_type: str = "search", max_notes: int = 50) -> Dict:
         """
-        创建MediaCrawler的基础配置
+        生成单次爬取的MediaCrawler配置覆盖，经环境变量传给子进程，不改写共享的 base_config.py
         
         Args:
             platform: 平台名称
@@ -148,60 +194,128 @@ postgresql_db_config = {{
             max_notes: 最大爬取数量
         
         Returns:
-            是否配置成功
+            配置项名到取值的映射
+        """
+        # 判断数据库类型，确定 SAVE_DATA_OPTION
+        db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
+        is_postgresql = db_dialect in ("postgresql", "postgres")
+        save_data_option = "postgresql" if is_postgresql else "db"
+        
+        return {
+            "PLATFORM": platform,
+            "KEYWORDS": ",".join(keywords),
+            "CRAWLER_TYPE": crawler_type,
+            "SAVE_DATA_OPTION": save_data_option,
+            "CRAWLER_MAX_NOTES_COUNT": max_notes,
+            "ENABLE_GET_COMMENTS": True,
+            "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES": 20,
+            "HEADLESS": True,  # 使用无头模式
+            "CDP_DEBUG_PORT": CDP_BASE_PORT + 10 * self.supported_platforms.index(platform),
+        }
+    
+    def _update_run_status(self, platform: str, **fields):
+        with self._lock:
+            self.run_status.setdefault(platform, {}).update(fields)
+    
+    def get_run_status(self) -> Dict[str, Dict]:
+        """获取各平台爬虫子进程的运行状态"""
+        with self._lock:
+            return {platform: dict(status) for platform, status in self.run_status.items()}
+    
+    @staticmethod
+    def _new_run_id() -> str:
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    def _consume_output(self, platform: str, process: subprocess.Popen, metrics_path: Path, state: Dict):
+        """
+        读取子进程输出：指标行写入指标文件并更新最新快照，其余内容按块立即转发到控制台
+
+        不等待换行，扫码登录等不以换行结尾的提示也能立即显示；每行行首带平台前缀。
         """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        prefix = f"[{platform}] "
+        pending = ""         # 尚未转发的文本
+        current_line = ""    # 已转发但尚未换行的当前行，换行后计入 state["lines"]
+        with open(metrics_path, "a", encoding="utf-8") as metrics_file:
+            while True:
+                chunk = process.stdout.read(OUTPUT_READ_SIZE)
+                pending += decoder.decode(chunk, final=not chunk)
+                out: List[str] = []
+                while "\n" in pending:
+                    line, pending = pending.split("\n", 1)
+                    if not current_line and line.startswith(METRICS_LINE_PREFIX):
+                        self._record_metrics_line(platform, line[len(METRICS_LINE_PREFIX):], metrics_file, state)
+                        continue
+                    out.append(line + "\n" if current_line else prefix + line + "\n")
+                    state["lines"].append((current_line + line).rstrip("\r"))
+                    current_line = ""
+                # 行首的残片可能是指标行的开头，等到换行再判断；其余残片立即转发
+                maybe_metrics = not current_line and (
+                    METRICS_LINE_PREFIX.startswith(pending) or pending.startswith(METRICS_LINE_PREFIX)
+                )
+                if pending and (not maybe_metrics or not chunk):
+                    out.append(pending if current_line else prefix + pending)
+                    current_line += pending
+                    pending = ""
+                if out:
+                    with _console_lock:
+                        sys.stdout.write("".join(out))
+                        sys.stdout.flush()
+                if not chunk:
+                    break
+        if current_line:
+            state["lines"].append(current_line)
+
+    def _record_metrics_line(self, platform: str, payload: str, metrics_file, state: Dict):
         try:
-            # 判断数据库类型，确定 SAVE_DATA_OPTION
-            db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
-            is_postgresql = db_dialect in ("postgresql", "postgres")
-            save_data_option = "postgresql" if is_postgresql else "db"
-            
-            base_config_path = self.mediacrawler_path / "config" / "base_config.py"
-            
-            # 将关键词列表转换为逗号分隔的字符串
-            keywords_str = ",".join(keywords)
-            
-            # 读取原始配置文件
-            with open(base_config_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 修改关键配置项
-            lines = content.split('\n')
-            new_lines = []
-            
-            for line in lines:
-                if line.startswith('PLATFORM = '):
-                    new_lines.append(f'PLATFORM = "{platform}"  # 平台，xhs | dy | ks | bili | wb | tieba | zhihu')
-                elif line.startswith('KEYWORDS = '):
-                    new_lines.append(f'KEYWORDS = "{keywords_str}"  # 关键词搜索配置，以英文逗号分隔')
-                elif line.startswith('CRAWLER_TYPE = '):
-                    new_lines.append(f'CRAWLER_TYPE = "{crawler_type}"  # 爬取类型，search(关键词搜索) | detail(帖子详情)| creator(创作者主页数据)')
-                elif line.startswith('SAVE_DATA_OPTION = '):
-                    new_lines.append(f'SAVE_DATA_OPTION = "{save_data_option}"  # csv or db or json or sqlite or postgresql')
-                elif line.startswith('CRAWLER_MAX_NOTES_COUNT = '):
-                    new_lines.append(f'CRAWLER_MAX_NOTES_COUNT = {max_notes}')
-                elif line.startswith('ENABLE_GET_COMMENTS = '):
-                    new_lines.append('ENABLE_GET_COMMENTS = True')
-                elif line.startswith('CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = '):
-                    new_lines.append('CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 20')
-                elif line.startswith('HEADLESS = '):
-                    new_lines.append('HEADLESS = True')  # 使用无头模式
-                else:
-                    new_lines.append(line)
-            
-            # 写入新配置
-            with open(base_config_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(new_lines))
-            
-            logger.info(f"已配置 {platform} 平台，爬取类型: {crawler_type}，关键词数量: {len(keywords)}，最大爬取数量: {max_notes}，保存数据方式: {save_data_option}")
-            return True
-            
-        except Exception as e:
-            logger.exception(f"创建基础配置失败: {e}")
-            return False
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            return
+        metrics_file.write(payload + "\n")
+        metrics_file.flush()
+        state["metrics"] = event
+        self._update_run_status(platform, metrics=event)
+    
+    def _build_crawl_stats(self, platform: str, keywords: List[str], start_time: datetime,
+                           end_time: datetime, return_code: Optional[int], state: Dict) -> Dict:
+        """由子进程上报的指标生成平台统计；子进程未上报指标时回退到解析输出文本"""
+        duration = (end_time - start_time).total_seconds()
+        parsed = self._parse_crawl_output(list(state["lines"]))
+        metrics = state.get("metrics")
+        
+        crawl_stats = {
+            "platform": platform,
+            "keywords_count": len(keywords),
+            "duration_seconds": duration,
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "return_code": return_code,
+            "success": return_code == 0,
+            "notes_count": parsed["notes_count"],
+            "comments_count": parsed["comments_count"],
+            "errors_count": parsed["errors_count"],
+            "login_required": parsed["login_required"],
+            "metrics_file": str(state["metrics_path"]),
+        }
+        if metrics:
+            items = metrics.get("items", {})
+            total_items = sum(items.values())
+            crawl_stats.update({
+                "notes_count": items.get("contents", 0),
+                "comments_count": items.get("comments", 0),
+                "items": items,
+                "requests": metrics.get("requests", 0),
+                "retries": metrics.get("retries", 0),
+                "rate_limited": metrics.get("rate_limited", 0),
+                "bytes_downloaded": metrics.get("bytes_downloaded", 0),
+                "keyword_seconds": metrics.get("keyword_seconds", {}),
+                "items_per_second": round(total_items / duration, 3) if duration > 0 else 0.0,
+            })
+        return crawl_stats
     
     def run_crawler(self, platform: str, keywords: List[str], 
-                   login_type: str = "qrcode", max_notes: int = 50) -> Dict:
+                   login_type: str = "qrcode", max_notes: int = 50,
+                   timeout: Optional[int] = None, run_id: Optional[str] = None) -> Dict:
         """
         运行爬虫
         
@@ -210,6 +324,8 @@ postgresql_db_config = {{
             keywords: 关键词列表
             login_type: 登录方式
             max_notes: 最大爬取数量
+            timeout: 子进程超时时间（秒），默认取 CRAWL_TIMEOUT_SECONDS
+            run_id: 运行标识，决定指标文件目录；单独调用时自动生成
         
         Returns:
             爬取结果统计
@@ -220,25 +336,30 @@ postgresql_db_config = {{
         if not keywords:
             raise ValueError("关键词列表不能为空")
         
+        if timeout is None:
+            timeout = config.settings.CRAWL_TIMEOUT_SECONDS
+        run_id = run_id or self._new_run_id()
+        
         start_message = f"\n开始爬取平台: {platform}"
         start_message += f"\n关键词: {keywords[:5]}{'...' if len(keywords) > 5 else ''} (共{len(keywords)}个)"
         logger.info(start_message)
         
         start_time = datetime.now()
+        self._update_run_status(platform, status="pending", start_time=start_time.isoformat(), pid=None)
         
         try:
             # 配置数据库
             if not self.configure_mediacrawler_db():
-                return {"success": False, "error": "数据库配置失败"}
+                self._update_run_status(platform, status="error", error="数据库配置失败")
+                return {"success": False, "error": "数据库配置失败", "platform": platform}
             
-            # 创建基础配置
-            if not self.create_base_config(platform, keywords, "search", max_notes):
-                return {"success": False, "error": "基础配置创建失败"}
-            
-            # 判断数据库类型，确定 save_data_option
-            db_dialect = (config.settings.DB_DIALECT or "mysql").lower()
-            is_postgresql = db_dialect in ("postgresql", "postgres")
-            save_data_option = "postgresql" if is_postgresql else "db"
+            run_config = self.build_run_config(platform, keywords, "search", max_notes)
+            env = os.environ.copy()
+            env[CONFIG_OVERRIDES_ENV] = json.dumps(run_config, ensure_ascii=False)
+            env[METRICS_ENV] = "1"
+            env["PYTHONUNBUFFERED"] = "1"
+            env["PYTHONIOENCODING"] = "utf-8"
+            logger.info(f"已配置 {platform} 平台，爬取类型: search，关键词数量: {len(keywords)}，最大爬取数量: {max_notes}，保存数据方式: {run_config['SAVE_DATA_OPTION']}")
             
             # 构建命令
             cmd = [
@@ -246,54 +367,85 @@ postgresql_db_config = {{
                 "--platform", platform,
                 "--lt", login_type,
                 "--type", "search",
-                "--save_data_option", save_data_option
+                "--save_data_option", run_config["SAVE_DATA_OPTION"]
             ]
             
             logger.info(f"执行命令: {' '.join(cmd)}")
             
-            # 切换到MediaCrawler目录并执行
-            result = subprocess.run(
+            metrics_path = self.metrics_dir / run_id / f"{platform}.jsonl"
+            metrics_path.parent.mkdir(parents=True, exist_ok=True)
+            state = {"metrics": None, "lines": deque(maxlen=OUTPUT_TAIL_LINES), "metrics_path": metrics_path}
+            
+            # 切换到MediaCrawler目录并执行，输出经无缓冲管道按块读取
+            process = subprocess.Popen(
                 cmd,
                 cwd=self.mediacrawler_path,
-                timeout=3600  # 60分钟超时
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
             )
+            self._update_run_status(platform, status="running", pid=process.pid)
+            reader = threading.Thread(
+                target=self._consume_output, args=(platform, process, metrics_path, state),
+                name=f"crawl-output-{platform}", daemon=True,
+            )
+            reader.start()
+            
+            timed_out = False
+            try:
+                return_code = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                process.terminate()
+                try:
+                    return_code = process.wait(timeout=TERMINATE_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"{platform} 进程 {process.pid} 在 {TERMINATE_GRACE_SECONDS} 秒内未退出，强制结束")
+                    process.kill()
+                    return_code = process.wait()
+            reader.join(timeout=30)
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
             
             # 创建统计信息
-            crawl_stats = {
-                "platform": platform,
-                "keywords_count": len(keywords),
-                "duration_seconds": duration,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "return_code": result.returncode,
-                "success": result.returncode == 0,
-                "notes_count": 0,
-                "comments_count": 0,
-                "errors_count": 0
-            }
+            crawl_stats = self._build_crawl_stats(platform, keywords, start_time, end_time, return_code, state)
+            if timed_out:
+                crawl_stats.update({"success": False, "error": "爬取超时"})
             
             # 保存统计信息
-            self.crawl_stats[platform] = crawl_stats
+            with self._lock:
+                self.crawl_stats[platform] = crawl_stats
+            
+            if timed_out:
+                self._update_run_status(platform, status="timeout", end_time=end_time.isoformat())
+                logger.error(f"❌ {platform} 爬取超时（{timeout}秒），已终止进程 {process.pid}")
+                return crawl_stats
+            
+            self._update_run_status(
+                platform, status="success" if return_code == 0 else "failed",
+                end_time=end_time.isoformat(), return_code=return_code
+            )
             
-            if result.returncode == 0:
-                logger.info(f"✅ {platform} 爬取完成，耗时: {duration:.1f}秒")
+            if return_code == 0:
+                logger.info(
+                    f"✅ {platform} 爬取完成，耗时: {duration:.1f}秒，"
+                    f"{crawl_stats['notes_count']} 条内容，{crawl_stats['comments_count']} 条评论，"
+                    f"{crawl_stats.get('items_per_second', 0)} 条/秒"
+                )
             else:
-                logger.error(f"❌ {platform} 爬取失败，返回码: {result.returncode}")
+                logger.error(f"❌ {platform} 爬取失败，返回码: {return_code}")
             
             return crawl_stats
             
-        except subprocess.TimeoutExpired:
-            logger.exception(f"❌ {platform} 爬取超时")
-            return {"success": False, "error": "爬取超时", "platform": platform}
         except Exception as e:
+            self._update_run_status(platform, status="error", error=str(e), end_time=datetime.now().isoformat())
             logger.exception(f"❌ {platform} 爬取异常: {e}")
             return {"success": False, "error": str(e), "platform": platform}
     
-    def _parse_crawl_output(self, output_lines: List[str], error_lines: List[str]) -> Dict:
-        """解析爬取输出，提取统计信息"""
+    def _parse_crawl_output(self, output_lines: List[str]) -> Dict:
+        """解析爬取输出（标准错误已合并到标准输出），提取统计信息"""
         stats = {
             "notes_count": 0,
             "comments_count": 0,
@@ -322,38 +474,75 @@ postgresql_db_config = {{
                     pass
             elif "登录" in line or "扫码" in line:
                 stats["login_required"] = True
-        
-        # 解析错误行
-        for line in error_lines:
             if "error" in line.lower() or "异常" in line:
                 stats["errors_count"] += 1
         
         return stats
     
+    def _record_platform_result(self, total_stats: Dict, platform: str, keywords: List[str], result: Dict):
+        """把单个平台的爬取结果汇总进总体统计"""
+        platform_summary = total_stats["platform_summary"][platform]
+        if result.get("success"):
+            total_stats["successful_tasks"] += len(keywords)
+            platform_summary["successful_keywords"] = len(keywords)
+            
+            notes_count = result.get("notes_count", 0)
+            comments_count = result.get("comments_count", 0)
+            
+            total_stats["total_notes"] += notes_count
+            total_stats["total_comments"] += comments_count
+            platform_summary["total_notes"] = notes_count
+            platform_summary["total_comments"] = comments_count
+            for key in ("items_per_second", "requests", "retries", "rate_limited", "bytes_downloaded"):
+                if key in result:
+                    platform_summary[key] = result[key]
+            
+            logger.info(f"   ✅ {platform} 成功: {notes_count} 条内容, {comments_count} 条评论")
+        else:
+            total_stats["failed_tasks"] += len(keywords)
+            platform_summary["failed_keywords"] = len(keywords)
+            logger.error(f"   ❌ {platform} 失败: {result.get('error', '未知错误')}")
+        
+        # 为每个关键词记录结果
+        for keyword in keywords:
+            total_stats["keyword_results"].setdefault(keyword, {})[platform] = result
+    
     def run_multi_platform_crawl_by_keywords(self, keywords: List[str], platforms: List[str],
-                                            login_type: str = "qrcode", max_notes_per_keyword: int = 50) -> Dict:
+                                            login_type: str = "qrcode", max_notes_per_keyword: int = 50,
+                                            parallelism: Optional[int] = None,
+                                            timeout: Optional[int] = None) -> Dict:
         """
         基于关键词的多平台爬取 - 每个关键词在所有平台上都进行爬取
         
+        各平台的 MediaCrawler 子进程最多 parallelism 个同时运行，每个进程的配置经环境变量单独传入。
+        
         Args:
             keywords: 关键词列表
             platforms: 平台列表
             login_type: 登录方式
             max_notes_per_keyword: 每个关键词在每个平台的最大爬取数量
+            parallelism: 同时运行的平台数，默认取 CRAWL_PARALLELISM
+            timeout: 单个平台的超时时间（秒），默认取 CRAWL_TIMEOUT_SECONDS
         
         Returns:
             总体爬取统计
         """
+        if parallelism is None:
+            parallelism = config.settings.CRAWL_PARALLELISM
+        parallelism = max(1, min(parallelism, len(platforms) or 1))
         
         start_message = f"\n🚀 开始全平台关键词爬取"
         start_message += f"\n   关键词数量: {len(keywords)}"
         start_message += f"\n   平台数量: {len(platforms)}"
+        start_message += f"\n   并发平台数: {parallelism}"
         start_message += f"\n   登录方式: {login_type}"
         start_message += f"\n   每个关键词在每个平台的最大爬取数量: {max_notes_per_keyword}"
         start_message += f"\n   总爬取任务: {len(keywords)} × {len(platforms)} = {len(keywords) * len(platforms)}"
         logger.info(start_message)
         
+        run_id = self._new_run_id()
         total_stats = {
+            "run_id": run_id,
             "total_keywords": len(keywords),
             "total_platforms": len(platforms),
             "total_tasks": len(keywords) * len(platforms),
@@ -373,59 +562,33 @@ postgresql_db_config = {{
                 "total_notes": 0,
                 "total_comments": 0
             }
+            self._update_run_status(platform, status="pending")
         
-        # 对每个平台一次性爬取所有关键词
-        for platform in platforms:
-            logger.info(f"\n📝 在 {platform} 平台爬取所有关键词")
-            logger.info(f"   关键词: {', '.join(keywords[:5])}{'...' if len(keywords) > 5 else ''}")
-            
-            try:
-                # 一次性传递所有关键词给平台
-                result = self.run_crawler(platform, keywords, login_type, max_notes_per_keyword)
-                
-                if result.get("success"):
-                    total_stats["successful_tasks"] += len(keywords)
-                    total_stats["platform_summary"][platform]["successful_keywords"] = len(keywords)
-                    
-                    notes_count = result.get("notes_count", 0)
-                    comments_count = result.get("comments_count", 0)
-                    
-                    total_stats["total_notes"] += notes_count
-                    total_stats["total_comments"] += comments_count
-                    total_stats["platform_summary"][platform]["total_notes"] = notes_count
-                    total_stats["platform_summary"][platform]["total_comments"] = comments_count
-                    
-                    # 为每个关键词记录结果
-                    for keyword in keywords:
-                        if keyword not in total_stats["keyword_results"]:
-                            total_stats["keyword_results"][keyword] = {}
-                        total_stats["keyword_results"][keyword][platform] = result
-                    
-                    logger.info(f"   ✅ 成功: {notes_count} 条内容, {comments_count} 条评论")
-                else:
-                    total_stats["failed_tasks"] += len(keywords)
-                    total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
-                    
-                    # 为每个关键词记录失败结果
-                    for keyword in keywords:
-                        if keyword not in total_stats["keyword_results"]:
-                            total_stats["keyword_results"][keyword] = {}
-                        total_stats["keyword_results"][keyword][platform] = result
-                    
-                    logger.error(f"   ❌ 失败: {result.get('error', '未知错误')}")
+        # 数据库配置文件在启动子进程前写好，子进程之间不再改写共享文件
+        self.configure_mediacrawler_db()
+        
+        # 每个平台一次性爬取所有关键词，平台之间并发
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="crawl") as executor:
+            futures = {}
+            for platform in platforms:
+                logger.info(f"\n📝 在 {platform} 平台爬取所有关键词")
+                logger.info(f"   关键词: {', '.join(keywords[:5])}{'...' if len(keywords) > 5 else ''}")
+                future = executor.submit(
+                    self.run_crawler, platform, keywords, login_type, max_notes_per_keyword, timeout, run_id
+                )
+                futures[future] = platform
             
-            except Exception as e:
-                total_stats["failed_tasks"] += len(keywords)
-                total_stats["platform_summary"][platform]["failed_keywords"] = len(keywords)
-                error_result = {"success": False, "error": str(e)}
-                
-                # 为每个关键词记录异常结果
-                for keyword in keywords:
-                    if keyword not in total_stats["keyword_results"]:
-                        total_stats["keyword_results"][keyword] = {}
-                    total_stats["keyword_results"][keyword][platform] = error_result
-                
-                logger.error(f"   ❌ 异常: {e}")
+            for future in as_completed(futures):
+                platform = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                    logger.error(f"   ❌ {platform} 异常: {e}")
+                self._record_platform_result(total_stats, platform, keywords, result)
+        
+        total_stats["run_status"] = self.get_run_status()
+        self._save_run_summary(run_id, total_stats)
         
         # 打印详细统计
         finish_message = f"\n📊 全平台关键词爬取完成!"
@@ -441,11 +604,25 @@ postgresql_db_config = {{
         for platform, stats in total_stats["platform_summary"].items():
             success_rate = stats["successful_keywords"] / len(keywords) * 100 if keywords else 0
             platform_summary_message += f"\n   {platform}: {stats['successful_keywords']}/{len(keywords)} 关键词成功 ({success_rate:.1f}%), "
-            platform_summary_message += f"{stats['total_notes']} 条内容"
+            platform_summary_message += f"{stats['total_notes']} 条内容, {stats['total_comments']} 条评论"
+            if "items_per_second" in stats:
+                platform_summary_message += f", {stats['items_per_second']} 条/秒, 请求 {stats['requests']} 次, 限流 {stats['rate_limited']} 次"
         logger.info(platform_summary_message)
         
         return total_stats
     
+    def _save_run_summary(self, run_id: str, total_stats: Dict):
+        """持久化本次运行的汇总统计，与各平台的指标流放在同一目录"""
+        summary_path = self.metrics_dir / run_id / "summary.json"
+        try:
+            summary_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                json.dump(total_stats, f, ensure_ascii=False, indent=2)
+            total_stats["summary_file"] = str(summary_path)
+            logger.info(f"本次爬取指标已保存到: {summary_path}")
+        except Exception as e:
+            logger.exception(f"保存爬取指标失败: {e}")
+    
     def get_crawl_statistics(self) -> Dict:
         """获取爬取统计信息"""
         return {
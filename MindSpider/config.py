@@ -25,6 +25,8 @@ class Settings(BaseSettings):
     MINDSPIDER_API_KEY: Optional[str] = Field(None, description="MINDSPIDER API密钥")
     MINDSPIDER_BASE_URL: Optional[str] = Field("https://api.deepseek.com", description="MINDSPIDER API基础URL，推荐deepseek-chat模型使用https://api.deepseek.com")
     MINDSPIDER_MODEL_NAME: Optional[str] = Field("deepseek-chat", description="MINDSPIDER API模型名称, 推荐deepseek-chat")
+    CRAWL_PARALLELISM: int = Field(1, description="多平台爬取时同时运行的MediaCrawler进程数，默认1为逐个平台串行；调大前请确认各平台已配置Cookie登录，否则会同时弹出多个扫码登录窗口")
+    CRAWL_TIMEOUT_SECONDS: int = Field(3600, description="单个平台爬取进程的超时时间（秒），超时后终止该进程")
 
     class Config:
         env_file = ENV_FILE
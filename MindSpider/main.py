@@ -256,10 +256,13 @@ class MindSpider:
             
             logger.info(f"执行命令: {' '.join(cmd)}")
             
+            # 各平台按 CRAWL_PARALLELISM 分批并发，每批最长 CRAWL_TIMEOUT_SECONDS，另留出收尾时间
+            platform_count = len(platforms) if platforms else 7
+            batches = -(-platform_count // max(1, settings.CRAWL_PARALLELISM))
             result = subprocess.run(
                 cmd,
                 cwd=self.deep_sentiment_path,
-                timeout=3600  # 60分钟超时
+                timeout=batches * settings.CRAWL_TIMEOUT_SECONDS + 600
             )
             
             if result.returncode == 0:
@@ -0,0 +1,170 @@
+"""
+MindSpider 话题检索全文索引迁移（SQLAlchemy 2.x 异步引擎）
+
+为 models_bigdata / models_sa 中被 InsightEngine 话题搜索工具扫描的文本列创建全文索引，
+替代 `LIKE '%term%'` 的全表扫描：
+- MySQL:      FULLTEXT INDEX ... WITH PARSER ngram（每表一个覆盖全部检索列的索引）
+- PostgreSQL: pg_trgm 扩展 + 每列一个 GIN(gin_trgm_ops) 索引
+- SQLite:     FTS5 外部内容表（tokenize='trigram'）+ 同步触发器
+
+索引的列清单需与 InsightEngine/tools/search.py 中各工具的 fields 配置保持一致，
+InsightEngine/tools/fulltext_search.py 会在查询前探测索引，不存在时自动回退为 LIKE。
+
+用法:
+    python init_fulltext_index.py            # 创建缺失的索引
+    python init_fulltext_index.py --dry-run  # 只打印将要执行的 DDL
+
+数据模型定义位置：
+- MindSpider/schema/models_bigdata.py
+- MindSpider/schema/models_sa.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from typing import Dict, List
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from models_sa import Base
+import models_bigdata  # noqa: F401  # 导入以注册所有表类
+
+from init_database import _build_database_url
+
+
+# 表 -> 话题检索列（与 InsightEngine/tools/search.py 的 search_configs 一致）
+TOPIC_SEARCH_FIELDS: Dict[str, List[str]] = {
+    "bilibili_video": ["title", "desc", "source_keyword"],
+    "bilibili_video_comment": ["content"],
+    "douyin_aweme": ["title", "desc", "source_keyword"],
+    "douyin_aweme_comment": ["content"],
+    "kuaishou_video": ["title", "desc", "source_keyword"],
+    "kuaishou_video_comment": ["content"],
+    "weibo_note": ["content", "source_keyword"],
+    "weibo_note_comment": ["content"],
+    "xhs_note": ["title", "desc", "tag_list", "source_keyword"],
+    "xhs_note_comment": ["content"],
+    "zhihu_content": ["title", "desc", "content_text", "source_keyword"],
+    "zhihu_comment": ["content"],
+    "tieba_note": ["title", "desc", "source_keyword"],
+    "tieba_comment": ["content"],
+    "daily_news": ["title"],
+}
+
+
+def _validated_fields() -> Dict[str, List[str]]:
+    """过滤掉 ORM 元数据中不存在的表或列，避免在旧库上执行失败"""
+    result: Dict[str, List[str]] = {}
+    for table_name, fields in TOPIC_SEARCH_FIELDS.items():
+        table = Base.metadata.tables.get(table_name)
+        if table is None:
+            logger.warning(f"[fulltext] 模型中不存在表 {table_name}，跳过")
+            continue
+        missing = [f for f in fields if f not in table.c]
+        if missing:
+            logger.warning(f"[fulltext] 表 {table_name} 缺少列 {missing}，跳过")
+            continue
+        result[table_name] = fields
+    return result
+
+
+def mysql_ddl(table: str, fields: List[str]) -> List[str]:
+    columns = ", ".join(f"`{f}`" for f in fields)
+    return [f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `ft_{table}_topic` ({columns}) WITH PARSER ngram"]
+
+
+def postgresql_ddl(table: str, fields: List[str]) -> List[str]:
+    return [
+        f'CREATE INDEX IF NOT EXISTS "ix_{table}_{field}_trgm" ON "{table}" USING gin ("{field}" gin_trgm_ops)'
+        for field in fields
+    ]
+
+
+def sqlite_ddl(table: str, fields: List[str]) -> List[str]:
+    fts = f"{table}_fts"
+    cols = ", ".join(f'"{f}"' for f in fields)
+    new_vals = ", ".join(f'new."{f}"' for f in fields)
+    old_vals = ", ".join(f'old."{f}"' for f in fields)
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS "{fts}" USING fts5({cols}, content="{table}", content_rowid="id", tokenize="trigram")',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table}" BEGIN '
+        f'INSERT INTO "{fts}"(rowid, {cols}) VALUES (new."id", {new_vals}); END',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table}" BEGIN '
+        f'INSERT INTO "{fts}"("{fts}", rowid, {cols}) VALUES (\'delete\', old."id", {old_vals}); END',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE ON "{table}" BEGIN '
+        f'INSERT INTO "{fts}"("{fts}", rowid, {cols}) VALUES (\'delete\', old."id", {old_vals}); '
+        f'INSERT INTO "{fts}"(rowid, {cols}) VALUES (new."id", {new_vals}); END',
+        # 为已有数据建立索引
+        f'INSERT INTO "{fts}"("{fts}") VALUES (\'rebuild\')',
+    ]
+
+
+async def _mysql_has_index(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :name LIMIT 1"
+        ),
+        {"table": table, "name": f"ft_{table}_topic"},
+    )
+    return result.first() is not None
+
+
+async def _sqlite_has_index(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": f"{table}_fts"},
+    )
+    return result.first() is not None
+
+
+async def migrate(dry_run: bool = False) -> None:
+    database_url = os.getenv("DATABASE_URL") or _build_database_url()
+    engine = create_async_engine(database_url, pool_pre_ping=True, pool_recycle=1800)
+    dialect = engine.dialect.name
+    table_fields = _validated_fields()
+
+    async with engine.begin() as conn:
+        if dialect == "postgresql":
+            statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+            for table, fields in table_fields.items():
+                statements.extend(postgresql_ddl(table, fields))
+        elif dialect in ("mysql", "mariadb"):
+            statements = []
+            for table, fields in table_fields.items():
+                if not dry_run and await _mysql_has_index(conn, table):
+                    logger.info(f"[fulltext] {table} 已存在 FULLTEXT 索引，跳过")
+                    continue
+                statements.extend(mysql_ddl(table, fields))
+        elif dialect == "sqlite":
+            statements = []
+            for table, fields in table_fields.items():
+                if not dry_run and await _sqlite_has_index(conn, table):
+                    logger.info(f"[fulltext] {table} 已存在 FTS5 表，跳过")
+                    continue
+                statements.extend(sqlite_ddl(table, fields))
+        else:
+            logger.warning(f"[fulltext] 不支持的数据库方言: {dialect}，话题检索将继续使用 LIKE")
+            statements = []
+
+        for stmt in statements:
+            if dry_run:
+                print(f"{stmt};")
+                continue
+            logger.info(f"[fulltext] {stmt}")
+            await conn.execute(text(stmt))
+
+    await engine.dispose()
+    if not dry_run:
+        logger.info(f"[fulltext] 全文索引迁移完成（{dialect}，共 {len(statements)} 条语句）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="为话题检索列创建全文索引")
+    parser.add_argument("--dry-run", action="store_true", help="只打印DDL，不执行")
+    args = parser.parse_args()
+    asyncio.run(migrate(dry_run=args.dry_run))
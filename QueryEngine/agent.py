@@ -6,6 +6,7 @@ Deep Search Agent主类
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
@@ -20,7 +21,7 @@ from .nodes import (
 )
 from .state import State
 from .tools import TavilyNewsAgency, TavilyResponse
-from .utils import Settings, format_search_results_for_prompt
+from .utils import Settings
 from loguru import logger
 
 class DeepSearchAgent:
@@ -195,24 +196,57 @@ class DeepSearchAgent:
         logger.info(_message)
     
     def _process_paragraphs(self):
-        """处理所有段落"""
+        """处理所有段落（PARAGRAPH_CONCURRENCY > 1 时并发研究各段落）"""
         total_paragraphs = len(self.state.paragraphs)
+        max_workers = min(max(1, self.config.PARAGRAPH_CONCURRENCY), total_paragraphs)
+        
+        if max_workers <= 1:
+            for i in range(total_paragraphs):
+                self._research_paragraph(i)
+                progress = (i + 1) / total_paragraphs * 100
+                logger.info(f"段落处理完成 ({progress:.1f}%)")
+            return
+        
+        # 段落之间互不依赖：各线程只写入自己索引对应的段落，
+        # 报告与状态中的段落顺序始终按规划顺序，与完成先后无关
+        logger.info(f"并发研究 {total_paragraphs} 个段落（并发数: {max_workers}）")
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="query-paragraph"
+        ) as executor:
+            futures = {
+                executor.submit(self._research_paragraph, i): i
+                for i in range(total_paragraphs)
+            }
+            completed = 0
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    completed += 1
+                    progress = completed / total_paragraphs * 100
+                    logger.info(
+                        f"段落 {futures[future] + 1} 处理完成 ({progress:.1f}%)"
+                    )
+            except Exception:
+                # 任一段落失败即取消尚未开始的段落，并将异常抛给 research()
+                for future in futures:
+                    future.cancel()
+                raise
+    
+    def _research_paragraph(self, paragraph_index: int):
+        """完成单个段落的初始搜索、总结与反思循环"""
+        logger.info(
+            f"\n[步骤 2.{paragraph_index + 1}] 处理段落: {self.state.paragraphs[paragraph_index].title}"
+        )
+        logger.info("-" * 50)
         
-        for i in range(total_paragraphs):
-            logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
-            logger.info("-" * 50)
-            
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-            
-            # 反思循环
-            self._reflection_loop(i)
-            
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-            
-            progress = (i + 1) / total_paragraphs * 100
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
+        # 初始搜索和总结
+        self._initial_search_and_summary(paragraph_index)
+        
+        # 反思循环
+        self._reflection_loop(paragraph_index)
+        
+        # 标记段落完成
+        self.state.mark_paragraph_completed(paragraph_index)
     
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
@@ -292,9 +326,7 @@ class DeepSearchAgent:
             "title": paragraph.title,
             "content": paragraph.content,
             "search_query": search_query,
-            "search_results": format_search_results_for_prompt(
-                search_results, self.config.SEARCH_CONTENT_MAX_LENGTH
-            )
+            "search_results": search_results
         }
         
         # 更新状态
@@ -382,9 +414,7 @@ class DeepSearchAgent:
                 "title": paragraph.title,
                 "content": paragraph.content,
                 "search_query": search_query,
-                "search_results": format_search_results_for_prompt(
-                    search_results, self.config.SEARCH_CONTENT_MAX_LENGTH
-                ),
+                "search_results": search_results,
                 "paragraph_latest_state": paragraph.research.latest_summary
             }
             
@@ -30,6 +30,14 @@ except ImportError:
     FORUM_READER_AVAILABLE = False
     logger.warning("警告: 无法导入forum_reader模块，将跳过HOST发言读取功能")
 
+from utils.prompt_budget import build_budgeted_message
+
+# 导入论坛事件总线（不可用时ForumEngine会回退为解析引擎日志）
+try:
+    from utils.forum_bus import publish_agent_summary
+except ImportError:
+    publish_agent_summary = None
+
 
 class FirstSummaryNode(StateMutationNode):
     """根据搜索结果生成段落首次总结的节点"""
@@ -89,13 +97,16 @@ class FirstSummaryNode(StateMutationNode):
                 except Exception as e:
                     logger.exception(f"读取HOST发言失败: {str(e)}")
             
-            # 转换为JSON字符串
-            message = json.dumps(data, ensure_ascii=False)
-            
             # 如果有HOST发言，添加到消息前面作为参考
+            formatted_host = ""
             if FORUM_READER_AVAILABLE and 'host_speech' in data and data['host_speech']:
                 formatted_host = format_host_speech_for_prompt(data['host_speech'])
-                message = formatted_host + "\n" + message
+            
+            # 按token预算装入搜索结果（热度/相关度/多样性优先），再转换为JSON字符串
+            message, packed = build_budgeted_message(
+                SYSTEM_PROMPT_FIRST_SUMMARY, data, prefix=formatted_host
+            )
+            logger.info(packed.describe())
             
             logger.info("正在生成首次段落总结")
             
@@ -184,14 +195,12 @@ class FirstSummaryNode(StateMutationNode):
             # 生成总结
             summary = self.run(input_data, **kwargs)
             
-            # 更新状态
-            if 0 <= paragraph_index < len(state.paragraphs):
-                state.paragraphs[paragraph_index].research.latest_summary = summary
-                logger.info(f"已更新段落 {paragraph_index} 的首次总结")
-            else:
-                raise ValueError(f"段落索引 {paragraph_index} 超出范围")
-            
-            state.update_timestamp()
+            # 更新状态（加锁，支持多段落并发处理）
+            state.update_paragraph_summary(paragraph_index, summary)
+            if publish_agent_summary is not None:
+                publish_agent_summary("query", self.node_name, summary,
+                                      paragraph_title=state.paragraphs[paragraph_index].title)
+            logger.info(f"已更新段落 {paragraph_index} 的首次总结")
             return state
             
         except Exception as e:
@@ -257,13 +266,16 @@ class ReflectionSummaryNode(StateMutationNode):
                 except Exception as e:
                     logger.exception(f"读取HOST发言失败: {str(e)}")
             
-            # 转换为JSON字符串
-            message = json.dumps(data, ensure_ascii=False)
-            
             # 如果有HOST发言，添加到消息前面作为参考
+            formatted_host = ""
             if FORUM_READER_AVAILABLE and 'host_speech' in data and data['host_speech']:
                 formatted_host = format_host_speech_for_prompt(data['host_speech'])
-                message = formatted_host + "\n" + message
+            
+            # 按token预算装入搜索结果（热度/相关度/多样性优先），再转换为JSON字符串
+            message, packed = build_budgeted_message(
+                SYSTEM_PROMPT_REFLECTION_SUMMARY, data, prefix=formatted_host
+            )
+            logger.info(packed.describe())
             
             logger.info("正在生成反思总结")
             
@@ -352,15 +364,12 @@ class ReflectionSummaryNode(StateMutationNode):
             # 生成更新后的总结
             updated_summary = self.run(input_data, **kwargs)
             
-            # 更新状态
-            if 0 <= paragraph_index < len(state.paragraphs):
-                state.paragraphs[paragraph_index].research.latest_summary = updated_summary
-                state.paragraphs[paragraph_index].research.increment_reflection()
-                logger.info(f"已更新段落 {paragraph_index} 的反思总结")
-            else:
-                raise ValueError(f"段落索引 {paragraph_index} 超出范围")
-            
-            state.update_timestamp()
+            # 更新状态（加锁，支持多段落并发处理）
+            state.update_paragraph_summary(paragraph_index, updated_summary, increment_reflection=True)
+            if publish_agent_summary is not None:
+                publish_agent_summary("query", self.node_name, updated_summary,
+                                      paragraph_title=state.paragraphs[paragraph_index].title)
+            logger.info(f"已更新段落 {paragraph_index} 的反思总结")
             return state
             
         except Exception as e:
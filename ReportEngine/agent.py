@@ -8,8 +8,11 @@ Report Agent主类。
 3. 负责错误兜底、流式事件分发、落盘清单与最终成果保存。
 """
 
+import contextvars
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import deepcopy
 from pathlib import Path
 from uuid import uuid4
@@ -20,6 +23,7 @@ from loguru import logger
 
 from .core import (
     ChapterStorage,
+    ContextRetriever,
     DocumentComposer,
     TemplateSection,
     parse_template_sections,
@@ -37,6 +41,7 @@ from .nodes import (
 )
 from .renderers import HTMLRenderer
 from .state import ReportState
+from .utils.cancellation import TaskCancelledError, raise_if_cancelled
 from .utils.config import settings, Settings
 
 
@@ -184,12 +189,13 @@ class ReportAgent:
     _CONTENT_SPARSE_WARNING_TEXT = "本章LLM生成的内容字数可能过低，必要时可以尝试重新运行程序。"
     _STRUCTURAL_RETRY_ATTEMPTS = 2
     
-    def __init__(self, config: Optional[Settings] = None):
+    def __init__(self, config: Optional[Settings] = None, file_baseline: Optional[FileCountBaseline] = None):
         """
         初始化Report Agent。
         
         Args:
             config: 配置对象，如果不提供则自动加载
+            file_baseline: 共享的文件数量基准；传入时不再重新初始化基准（见 `create_worker`）
         
         步骤概览：
             1. 解析配置并接入日志/LLM/渲染等核心组件；
@@ -201,7 +207,9 @@ class ReportAgent:
         self.config = config or settings
         
         # 初始化文件基准管理器
-        self.file_baseline = FileCountBaseline()
+        self.file_baseline = file_baseline or FileCountBaseline()
+        # 当前任务的取消标记，由 bind_cancel_event 绑定
+        self.cancel_event: Optional[threading.Event] = None
         
         # 初始化日志
         self._setup_logging()
@@ -214,13 +222,18 @@ class ReportAgent:
         self.chapter_storage = ChapterStorage(self.config.CHAPTER_OUTPUT_DIR)
         self.document_composer = DocumentComposer()
         self.validator = IRValidator()
-        self.renderer = HTMLRenderer()
+        self.renderer = HTMLRenderer({
+            "assetMode": self.config.HTML_ASSET_MODE,
+            "assetDir": self.config.HTML_ASSET_DIR,
+            "assetUrlPrefix": self.config.HTML_ASSET_URL_PREFIX,
+        })
         
         # 初始化节点
         self._initialize_nodes()
         
-        # 初始化文件数量基准
-        self._initialize_file_baseline()
+        # 初始化文件数量基准（工作线程副本沿用主实例的基准，避免重置“新文件”判断）
+        if file_baseline is None:
+            self._initialize_file_baseline()
         
         # 状态
         self.state = ReportState()
@@ -402,6 +415,27 @@ class ReportAgent:
             error_log_dir=self.config.JSON_ERROR_LOG_DIR,
         )
     
+    def create_worker(self) -> "ReportAgent":
+        """
+        为报告调度器创建一个独立的工作实例。
+
+        `state`、LLM客户端与各节点都是按任务可变的，并发生成时每个工作线程
+        需要各自一份；文件数量基准则与主实例共享。
+        """
+        return ReportAgent(self.config, file_baseline=self.file_baseline)
+
+    def bind_cancel_event(self, cancel_event: Optional[threading.Event]):
+        """
+        绑定（或以None解除）当前任务的取消标记。
+
+        标记同时下发给主LLM与跨引擎修复用的全部客户端，置位后
+        进行中的流式请求会在下一个分片处中断。
+        """
+        self.cancel_event = cancel_event
+        clients = [self.llm_client] + [client for _, client in self.json_rescue_clients]
+        for client in clients:
+            client.cancel_event = cancel_event
+
     def generate_report(self, query: str, reports: List[Any], forum_logs: str = "",
                         custom_template: str = "", save_report: bool = True,
                         stream_handler: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
@@ -411,7 +445,7 @@ class ReportAgent:
         主要阶段：
             1. 归一化三引擎报告 + 论坛日志，并输出流式事件；
             2. 模板选择 → 模板切片 → 文档布局 → 篇幅规划；
-            3. 结合篇幅目标逐章调用LLM，遇到解析错误会自动重试；
+            3. 结合篇幅目标逐章（或按 CHAPTER_CONCURRENCY 并发）调用LLM，遇到解析错误会自动重试；
             4. 将章节装订成Document IR，再交给HTML渲染器生成成品；
             5. 可选地将HTML/IR/状态落盘，并向外界回传路径信息。
 
@@ -438,12 +472,18 @@ class ReportAgent:
 
         normalized_reports = self._normalize_reports(reports)
 
+        emit_lock = threading.Lock()
+
         def emit(event_type: str, payload: Dict[str, Any]):
             """面向Report Engine流通道的事件分发器，保证错误不外泄。"""
+            # 阶段之间的事件点同时作为取消检查点
+            raise_if_cancelled(self.cancel_event)
             if not stream_handler:
                 return
             try:
-                stream_handler(event_type, payload)
+                # 并发生成章节时多个线程会同时推送事件，串行化以保证单条事件完整送达
+                with emit_lock:
+                    stream_handler(event_type, payload)
             except Exception as callback_error:  # pragma: no cover - 仅记录
                 logger.warning(f"流式事件回调失败: {callback_error}")
 
@@ -558,154 +598,7 @@ class ReportAgent:
             self._persist_planning_artifacts(run_dir, layout_design, word_plan, template_overview)
             emit('stage', {'stage': 'storage_ready', 'run_dir': str(run_dir)})
 
-            chapters = []
-            chapter_max_attempts = max(
-                self._CONTENT_SPARSE_MIN_ATTEMPTS, self.config.CHAPTER_JSON_MAX_ATTEMPTS
-            )
-            total_chapters = len(sections)  # 总章节数
-            completed_chapters = 0  # 已完成章节数
-
-            for section in sections:
-                logger.info(f"生成章节: {section.title}")
-                emit('chapter_status', {
-                    'chapterId': section.chapter_id,
-                    'title': section.title,
-                    'status': 'running'
-                })
-                # 章节流式回调：把LLM返回的delta透传给SSE，便于前端实时渲染
-                def chunk_callback(delta: str, meta: Dict[str, Any], section_ref: TemplateSection = section):
-                    """
-                    章节内容流式回调。
-
-                    Args:
-                        delta: LLM最新输出的增量文本。
-                        meta: 节点回传的章节元数据，兜底时使用。
-                        section_ref: 默认指向当前章节，保证在缺失元信息时也能定位。
-                    """
-                    emit('chapter_chunk', {
-                        'chapterId': meta.get('chapterId') or section_ref.chapter_id,
-                        'title': meta.get('title') or section_ref.title,
-                        'delta': delta
-                    })
-
-                chapter_payload: Dict[str, Any] | None = None
-                attempt = 1
-                best_sparse_candidate: Dict[str, Any] | None = None
-                best_sparse_score = -1
-                fallback_used = False
-                while attempt <= chapter_max_attempts:
-                    try:
-                        chapter_payload = self.chapter_generation_node.run(
-                            section,
-                            generation_context,
-                            run_dir,
-                            stream_callback=chunk_callback
-                        )
-                        break
-                    except (ChapterJsonParseError, ChapterContentError, ChapterValidationError) as structured_error:
-                        if isinstance(structured_error, ChapterContentError):
-                            error_kind = "content_sparse"
-                            readable_label = "内容密度异常"
-                        elif isinstance(structured_error, ChapterValidationError):
-                            error_kind = "validation"
-                            readable_label = "结构校验失败"
-                        else:
-                            error_kind = "json_parse"
-                            readable_label = "JSON解析失败"
-                        if isinstance(structured_error, ChapterContentError):
-                            candidate = getattr(structured_error, "chapter_payload", None)
-                            candidate_score = getattr(structured_error, "body_characters", 0) or 0
-                            if isinstance(candidate, dict) and candidate_score >= 0:
-                                if candidate_score > best_sparse_score:
-                                    best_sparse_candidate = deepcopy(candidate)
-                                    best_sparse_score = candidate_score
-                        will_fallback = (
-                            isinstance(structured_error, ChapterContentError)
-                            and attempt >= chapter_max_attempts
-                            and attempt >= self._CONTENT_SPARSE_MIN_ATTEMPTS
-                            and best_sparse_candidate is not None
-                        )
-                        logger.warning(
-                            "章节 {title} {label}（第 {attempt}/{total} 次尝试）: {error}",
-                            title=section.title,
-                            label=readable_label,
-                            attempt=attempt,
-                            total=chapter_max_attempts,
-                            error=structured_error,
-                        )
-                        status_value = 'retrying' if attempt < chapter_max_attempts or will_fallback else 'error'
-                        status_payload = {
-                            'chapterId': section.chapter_id,
-                            'title': section.title,
-                            'status': status_value,
-                            'attempt': attempt,
-                            'error': str(structured_error),
-                            'reason': error_kind,
-                        }
-                        if isinstance(structured_error, ChapterValidationError):
-                            validation_errors = getattr(structured_error, "errors", None)
-                            if validation_errors:
-                                status_payload['errors'] = validation_errors
-                        if will_fallback:
-                            status_payload['warning'] = 'content_sparse_fallback_pending'
-                        emit('chapter_status', status_payload)
-                        if will_fallback:
-                            logger.warning(
-                                "章节 {title} 达到最大尝试次数，保留字数最多（约 {score} 字）的版本作为兜底输出",
-                                title=section.title,
-                                score=best_sparse_score,
-                            )
-                            chapter_payload = self._finalize_sparse_chapter(best_sparse_candidate)
-                            fallback_used = True
-                            break
-                        if attempt >= chapter_max_attempts:
-                            raise
-                        attempt += 1
-                        continue
-                    except Exception as chapter_error:
-                        if not self._should_retry_inappropriate_content_error(chapter_error):
-                            raise
-                        logger.warning(
-                            "章节 {title} 触发内容安全限制（第 {attempt}/{total} 次尝试），准备重新生成: {error}",
-                            title=section.title,
-                            attempt=attempt,
-                            total=chapter_max_attempts,
-                            error=chapter_error,
-                        )
-                        emit('chapter_status', {
-                            'chapterId': section.chapter_id,
-                            'title': section.title,
-                            'status': 'retrying' if attempt < chapter_max_attempts else 'error',
-                            'attempt': attempt,
-                            'error': str(chapter_error),
-                            'reason': 'content_filter'
-                        })
-                        if attempt >= chapter_max_attempts:
-                            raise
-                        attempt += 1
-                        continue
-                if chapter_payload is None:
-                    raise ChapterJsonParseError(
-                        f"{section.title} 章节JSON在 {chapter_max_attempts} 次尝试后仍无法解析"
-                    )
-                chapters.append(chapter_payload)
-                completed_chapters += 1  # 更新已完成章节数
-                # 计算当前进度：20% + 80% * (已完成章节数 / 总章节数)，四舍五入
-                chapter_progress = 20 + round(80 * completed_chapters / total_chapters)
-                emit('progress', {
-                    'progress': chapter_progress,
-                    'message': f'章节 {completed_chapters}/{total_chapters} 已完成'
-                })
-                completion_status = {
-                    'chapterId': section.chapter_id,
-                    'title': section.title,
-                    'status': 'completed',
-                    'attempt': attempt,
-                }
-                if fallback_used:
-                    completion_status['warning'] = 'content_sparse_fallback'
-                    completion_status['warningMessage'] = self._CONTENT_SPARSE_WARNING_TEXT
-                emit('chapter_status', completion_status)
+            chapters = self._generate_chapters(sections, generation_context, run_dir, emit)
 
             document_ir = self.document_composer.build_document(
                 report_id,
@@ -734,12 +627,249 @@ class ReportAgent:
                 **saved_files
             }
 
+        except TaskCancelledError:
+            self.state.mark_failed("任务已取消")
+            logger.warning(f"报告 {report_id} 已取消")
+            raise
         except Exception as e:
             self.state.mark_failed(str(e))
             logger.exception(f"报告生成过程中发生错误: {str(e)}")
             emit('error', {'stage': 'agent_failed', 'message': str(e)})
             raise
     
+    def _generate_chapters(
+        self,
+        sections: List[TemplateSection],
+        generation_context: Dict[str, Any],
+        run_dir: Path,
+        emit: Callable[[str, Dict[str, Any]], None],
+    ) -> List[Dict[str, Any]]:
+        """
+        调度全部章节的生成，返回按模板顺序排列的章节列表。
+
+        章节之间只共享只读的 `generation_context`，且分别落盘到独立目录，
+        因此当 `CHAPTER_CONCURRENCY` > 1 时使用有界线程池并发生成：
+        各章的 `chapter_chunk` 事件按 `chapterId` 交错推送，重试与稀疏兜底
+        仍在各自章节内完成；任一章节最终失败会取消尚未开始的章节并抛出异常。
+
+        参数:
+            sections: 模板切片得到的章节序列。
+            generation_context: 所有章节共享的生成上下文。
+            run_dir: 本次报告的章节输出目录。
+            emit: 流式事件分发器。
+
+        返回:
+            list[dict]: 与 `sections` 顺序一致的章节JSON列表。
+        """
+        max_attempts = max(
+            self._CONTENT_SPARSE_MIN_ATTEMPTS, self.config.CHAPTER_JSON_MAX_ATTEMPTS
+        )
+        total_chapters = len(sections)  # 总章节数
+        max_workers = min(max(1, self.config.CHAPTER_CONCURRENCY), total_chapters)
+        chapters: List[Optional[Dict[str, Any]]] = [None] * total_chapters
+        progress_lock = threading.Lock()
+        completed_chapters = 0  # 已完成章节数
+
+        def on_chapter_done(index: int, chapter_payload: Dict[str, Any]):
+            """记录章节结果并推送整体进度。"""
+            nonlocal completed_chapters
+            with progress_lock:
+                chapters[index] = chapter_payload
+                completed_chapters += 1
+                # 计算当前进度：20% + 80% * (已完成章节数 / 总章节数)，四舍五入
+                chapter_progress = 20 + round(80 * completed_chapters / total_chapters)
+                emit('progress', {
+                    'progress': chapter_progress,
+                    'message': f'章节 {completed_chapters}/{total_chapters} 已完成'
+                })
+
+        if max_workers <= 1:
+            for index, section in enumerate(sections):
+                chapter_payload = self._generate_chapter(
+                    section, generation_context, run_dir, max_attempts, emit
+                )
+                on_chapter_done(index, chapter_payload)
+            return chapters
+
+        logger.info(f"并发生成 {total_chapters} 个章节（并发数: {max_workers}）")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-chapter") as executor:
+            # 复制上下文，使工作线程内的日志仍带有调用方绑定的任务信息
+            futures = {
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._generate_chapter,
+                    section,
+                    generation_context,
+                    run_dir,
+                    max_attempts,
+                    emit,
+                ): index
+                for index, section in enumerate(sections)
+            }
+            try:
+                for future in as_completed(futures):
+                    on_chapter_done(futures[future], future.result())
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return chapters
+
+    def _generate_chapter(
+        self,
+        section: TemplateSection,
+        generation_context: Dict[str, Any],
+        run_dir: Path,
+        max_attempts: int,
+        emit: Callable[[str, Dict[str, Any]], None],
+    ) -> Dict[str, Any]:
+        """
+        生成单个章节，包含结构化错误重试、内容安全重试与稀疏内容兜底。
+
+        参数:
+            section: 待生成的章节。
+            generation_context: 共享生成上下文（只读）。
+            run_dir: 章节输出目录。
+            max_attempts: 最大尝试次数。
+            emit: 流式事件分发器。
+
+        返回:
+            dict: 章节JSON。
+        """
+        logger.info(f"生成章节: {section.title}")
+        emit('chapter_status', {
+            'chapterId': section.chapter_id,
+            'title': section.title,
+            'status': 'running'
+        })
+        # 章节流式回调：把LLM返回的delta透传给SSE，便于前端实时渲染
+        def chunk_callback(delta: str, meta: Dict[str, Any], section_ref: TemplateSection = section):
+            """
+            章节内容流式回调。
+
+            Args:
+                delta: LLM最新输出的增量文本。
+                meta: 节点回传的章节元数据，兜底时使用。
+                section_ref: 默认指向当前章节，保证在缺失元信息时也能定位。
+            """
+            emit('chapter_chunk', {
+                'chapterId': meta.get('chapterId') or section_ref.chapter_id,
+                'title': meta.get('title') or section_ref.title,
+                'delta': delta
+            })
+
+        chapter_payload: Dict[str, Any] | None = None
+        attempt = 1
+        best_sparse_candidate: Dict[str, Any] | None = None
+        best_sparse_score = -1
+        fallback_used = False
+        while attempt <= max_attempts:
+            try:
+                chapter_payload = self.chapter_generation_node.run(
+                    section,
+                    generation_context,
+                    run_dir,
+                    stream_callback=chunk_callback
+                )
+                break
+            except (ChapterJsonParseError, ChapterContentError, ChapterValidationError) as structured_error:
+                if isinstance(structured_error, ChapterContentError):
+                    error_kind = "content_sparse"
+                    readable_label = "内容密度异常"
+                elif isinstance(structured_error, ChapterValidationError):
+                    error_kind = "validation"
+                    readable_label = "结构校验失败"
+                else:
+                    error_kind = "json_parse"
+                    readable_label = "JSON解析失败"
+                if isinstance(structured_error, ChapterContentError):
+                    candidate = getattr(structured_error, "chapter_payload", None)
+                    candidate_score = getattr(structured_error, "body_characters", 0) or 0
+                    if isinstance(candidate, dict) and candidate_score >= 0:
+                        if candidate_score > best_sparse_score:
+                            best_sparse_candidate = deepcopy(candidate)
+                            best_sparse_score = candidate_score
+                will_fallback = (
+                    isinstance(structured_error, ChapterContentError)
+                    and attempt >= max_attempts
+                    and attempt >= self._CONTENT_SPARSE_MIN_ATTEMPTS
+                    and best_sparse_candidate is not None
+                )
+                logger.warning(
+                    "章节 {title} {label}（第 {attempt}/{total} 次尝试）: {error}",
+                    title=section.title,
+                    label=readable_label,
+                    attempt=attempt,
+                    total=max_attempts,
+                    error=structured_error,
+                )
+                status_value = 'retrying' if attempt < max_attempts or will_fallback else 'error'
+                status_payload = {
+                    'chapterId': section.chapter_id,
+                    'title': section.title,
+                    'status': status_value,
+                    'attempt': attempt,
+                    'error': str(structured_error),
+                    'reason': error_kind,
+                }
+                if isinstance(structured_error, ChapterValidationError):
+                    validation_errors = getattr(structured_error, "errors", None)
+                    if validation_errors:
+                        status_payload['errors'] = validation_errors
+                if will_fallback:
+                    status_payload['warning'] = 'content_sparse_fallback_pending'
+                emit('chapter_status', status_payload)
+                if will_fallback:
+                    logger.warning(
+                        "章节 {title} 达到最大尝试次数，保留字数最多（约 {score} 字）的版本作为兜底输出",
+                        title=section.title,
+                        score=best_sparse_score,
+                    )
+                    chapter_payload = self._finalize_sparse_chapter(best_sparse_candidate)
+                    fallback_used = True
+                    break
+                if attempt >= max_attempts:
+                    raise
+                attempt += 1
+                continue
+            except Exception as chapter_error:
+                if not self._should_retry_inappropriate_content_error(chapter_error):
+                    raise
+                logger.warning(
+                    "章节 {title} 触发内容安全限制（第 {attempt}/{total} 次尝试），准备重新生成: {error}",
+                    title=section.title,
+                    attempt=attempt,
+                    total=max_attempts,
+                    error=chapter_error,
+                )
+                emit('chapter_status', {
+                    'chapterId': section.chapter_id,
+                    'title': section.title,
+                    'status': 'retrying' if attempt < max_attempts else 'error',
+                    'attempt': attempt,
+                    'error': str(chapter_error),
+                    'reason': 'content_filter'
+                })
+                if attempt >= max_attempts:
+                    raise
+                attempt += 1
+                continue
+        if chapter_payload is None:
+            raise ChapterJsonParseError(
+                f"{section.title} 章节JSON在 {max_attempts} 次尝试后仍无法解析"
+            )
+        completion_status = {
+            'chapterId': section.chapter_id,
+            'title': section.title,
+            'status': 'completed',
+            'attempt': attempt,
+        }
+        if fallback_used:
+            completion_status['warning'] = 'content_sparse_fallback'
+            completion_status['warningMessage'] = self._CONTENT_SPARSE_WARNING_TEXT
+        emit('chapter_status', completion_status)
+        return chapter_payload
+    
     def _select_template(self, query: str, reports: List[Any], forum_logs: str, custom_template: str):
         """
         选择报告模板。
@@ -861,12 +991,26 @@ class ReportAgent:
             layout_design.get("themeTokens")
             if layout_design else None
         ) or self._default_theme_tokens()
+        forum_text = self._stringify(forum_logs)
+        # 报告与论坛日志只建一次索引，各章节按标题/提纲检索相关段落
+        context_retriever = ContextRetriever(
+            reports,
+            forum_text,
+            max_tokens=self.config.CHAPTER_CONTEXT_MAX_TOKENS,
+            passage_chars=self.config.CHAPTER_CONTEXT_PASSAGE_CHARS,
+        )
+        if context_retriever.enabled:
+            logger.info(
+                f"章节上下文检索已启用：原文 {context_retriever.total_tokens} token，"
+                f"{len(context_retriever.passages)} 个段落，每章预算 {context_retriever.max_tokens} token"
+            )
 
         return {
             "query": query,
             "template_name": template_result.get("template_name"),
             "reports": reports,
-            "forum_logs": self._stringify(forum_logs),
+            "forum_logs": forum_text,
+            "context_retriever": context_retriever,
             "theme_tokens": theme_tokens,
             "style_directives": {
                 "tone": "analytical",
@@ -8,6 +8,7 @@
 from __future__ import annotations
 
 import json
+import threading
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -67,6 +68,8 @@ class ChapterStorage:
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self._manifests: Dict[str, Dict[str, object]] = {}
+        # 章节可能并发生成，manifest 的读-改-写需要串行化
+        self._manifest_lock = threading.Lock()
 
     # ======== 会话与清单 ========
 
@@ -91,8 +94,9 @@ class ChapterStorage:
             "metadata": metadata,
             "chapters": [],
         }
-        self._manifests[self._key(run_dir)] = manifest
-        self._write_manifest(run_dir, manifest)
+        with self._manifest_lock:
+            self._manifests[self._key(run_dir)] = manifest
+            self._write_manifest(run_dir, manifest)
         return run_dir
 
     def begin_chapter(self, run_dir: Path, chapter_meta: Dict[str, object]) -> Path:
@@ -273,18 +277,19 @@ class ChapterStorage:
         """
         更新或追加manifest中的章节记录，保证顺序一致。
 
-        内部会自动排序并写回缓存+磁盘。
+        内部会自动排序并写回缓存+磁盘，并发章节通过锁串行化更新。
         """
         key = self._key(run_dir)
-        manifest = self._manifests.get(key) or self._read_manifest(run_dir)
-        chapters: List[Dict[str, object]] = manifest.get("chapters", [])
-        chapters = [c for c in chapters if c.get("chapterId") != record.chapter_id]
-        chapters.append(record.to_dict())
-        chapters.sort(key=lambda x: x.get("order", 0))
-        manifest["chapters"] = chapters
-        manifest.setdefault("updatedAt", datetime.utcnow().isoformat() + "Z")
-        self._manifests[key] = manifest
-        self._write_manifest(run_dir, manifest)
+        with self._manifest_lock:
+            manifest = self._manifests.get(key) or self._read_manifest(run_dir)
+            chapters: List[Dict[str, object]] = manifest.get("chapters", [])
+            chapters = [c for c in chapters if c.get("chapterId") != record.chapter_id]
+            chapters.append(record.to_dict())
+            chapters.sort(key=lambda x: x.get("order", 0))
+            manifest["chapters"] = chapters
+            manifest.setdefault("updatedAt", datetime.utcnow().isoformat() + "Z")
+            self._manifests[key] = manifest
+            self._write_manifest(run_dir, manifest)
 
 
 __all__ = ["ChapterStorage", "ChapterRecord"]
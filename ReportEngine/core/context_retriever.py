@@ -0,0 +1,323 @@
+"""
+章节级上下文检索。
+
+原实现把三引擎报告与论坛日志全文塞进每一章的提示词，同样的数万字在每章重复发送。
+ContextRetriever 在一次报告生成中只建立一次索引：
+    - 三引擎Markdown按标题切成段落，过长的小节再按空行拆分；论坛日志按行聚合成段；
+    - 使用 jieba 分词（未安装时退化为中文二元组）建立 BM25 索引；
+    - 每章以标题、提纲、篇幅规划中的强调点为查询，在token预算内选出最相关的段落
+      （计数器取自 utils.prompt_budget，与各引擎提示词预算一致），
+      并保证每个有命中的来源至少保留一段，便于 engineQuote 覆盖三类Agent。
+原文总token数不超过预算时直接返回全文，行为与旧实现一致。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import jieba
+
+    jieba.setLogLevel(logging.WARNING)
+except ImportError:  # pragma: no cover - 依赖缺失时退化为二元组切分
+    jieba = None
+
+from utils.prompt_budget import TokenCounter, get_token_counter
+
+from .template_parser import TemplateSection
+
+REPORT_SOURCES = ("query_engine", "media_engine", "insight_engine")
+FORUM_SOURCE = "forum_logs"
+EXCERPT_SEPARATOR = "\n\n……\n\n"
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_CJK_RE = re.compile(r"[一-鿿]")
+_WORD_RE = re.compile(r"[a-z0-9]+|[一-鿿]+")
+
+
+@dataclass
+class Passage:
+    """检索单元：来源、在来源内的顺序、所属标题路径与正文"""
+
+    source: str
+    index: int
+    heading: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    检索分词：jieba搜索引擎模式切词，去掉单字与标点。
+
+    jieba 不可用时，英文数字按词、中文按相邻二元组切分。
+    """
+    lowered = (text or "").lower()
+    if jieba is not None:
+        return [
+            token for token in jieba.lcut_for_search(lowered)
+            if len(token) > 1 and (_CJK_RE.search(token) or token.isalnum())
+        ]
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(lowered):
+        if _CJK_RE.match(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1:
+            tokens.append(word)
+    return tokens
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """按空行把过长文本聚合成不超过 max_chars 的块，单段超长时硬切"""
+    chunks: List[str] = []
+    buffer = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if buffer:
+                chunks.append(buffer)
+                buffer = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if buffer and len(buffer) + len(paragraph) + 2 > max_chars:
+            chunks.append(buffer)
+            buffer = ""
+        buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+    if buffer:
+        chunks.append(buffer)
+    return chunks
+
+
+def split_markdown(text: str, source: str, max_chars: int = 800) -> List[Passage]:
+    """按Markdown标题切分报告，标题路径随段落保存，过长小节再拆分"""
+    sections: List[tuple] = []
+    heading_stack: List[tuple] = []  # (层级, 标题)
+    lines: List[str] = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            sections.append((" / ".join(title for _, title in heading_stack), body))
+        lines.clear()
+
+    for line in (text or "").splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            while heading_stack and heading_stack[-1][0] >= level:
+                heading_stack.pop()
+            heading_stack.append((level, match.group(2)))
+        lines.append(line)
+    flush()
+
+    passages: List[Passage] = []
+    for heading, body in sections:
+        for chunk in _split_long(body, max_chars):
+            passages.append(Passage(source, len(passages), heading, chunk))
+    return passages
+
+
+def split_lines(text: str, source: str, max_chars: int = 800) -> List[Passage]:
+    """按行聚合论坛日志，每段不超过 max_chars"""
+    passages: List[Passage] = []
+    buffer: List[str] = []
+    size = 0
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if buffer and size + len(line) + 1 > max_chars:
+            passages.append(Passage(source, len(passages), "", "\n".join(buffer)))
+            buffer, size = [], 0
+        buffer.append(line[:max_chars])
+        size += len(buffer[-1]) + 1
+    if buffer:
+        passages.append(Passage(source, len(passages), "", "\n".join(buffer)))
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 打分"""
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(doc) for doc in documents]
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.doc_lengths) / len(documents)) if documents else 0.0
+        doc_freq: Counter = Counter()
+        for freqs in self.term_freqs:
+            doc_freq.update(freqs.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5))
+            for term, count in doc_freq.items()
+        }
+
+    def scores(self, query_tokens: Iterable[str]) -> List[float]:
+        terms = [term for term in set(query_tokens) if term in self.idf]
+        results: List[float] = []
+        for freqs, length in zip(self.term_freqs, self.doc_lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+class ContextRetriever:
+    """为每个章节挑选相关的报告与论坛段落"""
+
+    def __init__(
+        self,
+        reports: Dict[str, str],
+        forum_logs: str = "",
+        max_tokens: int = 16000,
+        passage_chars: int = 800,
+        counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Args:
+            reports: 归一化后的 query/media/insight 报告映射
+            forum_logs: 论坛日志全文
+            max_tokens: 每章报告+论坛摘录的token预算，<= 0 表示不检索、始终返回全文
+            passage_chars: 单个检索段落的最大字符数
+            counter: token计数器，默认取全局提示词预算配置
+        """
+        self.reports = {source: reports.get(source, "") or "" for source in REPORT_SOURCES}
+        self.forum_logs = forum_logs or ""
+        self.max_tokens = max_tokens
+        self.counter = counter or get_token_counter()
+        self.total_tokens = (
+            sum(self.counter.count(text) for text in self.reports.values())
+            + self.counter.count(self.forum_logs)
+        ) if max_tokens > 0 else 0
+        self.passages: List[Passage] = []
+        self.passage_tokens: List[int] = []
+        self.index: Optional[BM25Index] = None
+        if self.enabled:
+            for source in REPORT_SOURCES:
+                self.passages.extend(split_markdown(self.reports[source], source, passage_chars))
+            self.passages.extend(split_lines(self.forum_logs, FORUM_SOURCE, passage_chars))
+            self.passage_tokens = [self.counter.count(p.text) for p in self.passages]
+            # 标题路径一并参与索引，小节标题往往比正文更贴近章节主题
+            self.index = BM25Index([tokenize(f"{p.heading}\n{p.text}") for p in self.passages])
+
+    @property
+    def enabled(self) -> bool:
+        """原文超过预算时才需要检索"""
+        return self.max_tokens > 0 and self.total_tokens > self.max_tokens
+
+    def full_context(self) -> Dict[str, Any]:
+        return {"reports": dict(self.reports), "forum_logs": self.forum_logs}
+
+    def select(
+        self,
+        section: TemplateSection,
+        chapter_plan: Optional[Dict[str, Any]] = None,
+        query: str = "",
+    ) -> Dict[str, Any]:
+        """
+        选出与章节相关的段落。
+
+        Returns:
+            {"reports": {来源: 摘录文本}, "forum_logs": 摘录文本}，
+            同一来源内的段落保持原文顺序，不相邻的段落之间以省略号分隔。
+        """
+        if not self.enabled or self.index is None:
+            return self.full_context()
+
+        scores = self.index.scores(tokenize(self._query_text(section, chapter_plan, query)))
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score > 0),
+            key=lambda i: (-scores[i], i),
+        )
+        chosen: List[int] = []
+        used = 0
+
+        def take(i: int) -> bool:
+            nonlocal used
+            size = self.passage_tokens[i]
+            if i in chosen or used + size > self.max_tokens:
+                return False
+            chosen.append(i)
+            used += size
+            return True
+
+        # 每个来源先保留得分最高的一段，再按全局得分填满预算
+        for source in REPORT_SOURCES + (FORUM_SOURCE,):
+            best = next((i for i in ranked if self.passages[i].source == source), None)
+            if best is not None:
+                take(best)
+        for i in ranked:
+            take(i)
+        if not chosen:
+            # 章节标题与原文没有任何共同词时，退回各来源开头的段落（通常是摘要）
+            for i in sorted(range(len(self.passages)), key=lambda i: (self.passages[i].index, i)):
+                take(i)
+        return self._assemble(chosen)
+
+    @staticmethod
+    def _query_text(
+        section: TemplateSection,
+        chapter_plan: Optional[Dict[str, Any]],
+        query: str,
+    ) -> str:
+        parts: List[str] = [query, section.title, *section.outline]
+        plan = chapter_plan or {}
+        emphasis = plan.get("emphasis")
+        if isinstance(emphasis, list):
+            parts.extend(str(item) for item in emphasis)
+        elif emphasis:
+            parts.append(str(emphasis))
+        for entry in plan.get("sections") or []:
+            if isinstance(entry, dict):
+                parts.extend(str(entry.get(key) or "") for key in ("title", "notes", "focus"))
+        return "\n".join(part for part in parts if part)
+
+    def _assemble(self, chosen: List[int]) -> Dict[str, Any]:
+        by_source: Dict[str, List[Passage]] = {}
+        for i in chosen:
+            passage = self.passages[i]
+            by_source.setdefault(passage.source, []).append(passage)
+
+        def join(source: str) -> str:
+            pieces: List[str] = []
+            previous = -1
+            for passage in sorted(by_source.get(source, []), key=lambda p: p.index):
+                if pieces and passage.index != previous + 1:
+                    pieces.append(EXCERPT_SEPARATOR)
+                elif pieces:
+                    pieces.append("\n\n")
+                text = passage.text
+                # 从小节中间截出的段落补上标题路径，保留出处
+                if passage.heading and not _HEADING_RE.match(text.split("\n", 1)[0]):
+                    text = f"[{passage.heading}]\n{text}"
+                pieces.append(text)
+                previous = passage.index
+            return "".join(pieces)
+
+        return {
+            "reports": {source: join(source) for source in REPORT_SOURCES},
+            "forum_logs": join(FORUM_SOURCE),
+        }
+
+
+__all__ = [
+    "BM25Index",
+    "ContextRetriever",
+    "Passage",
+    "split_lines",
+    "split_markdown",
+    "tokenize",
+]
@@ -0,0 +1,265 @@
+"""
+PDF导出后台任务队列。
+
+原实现在HTTP请求线程里完整执行WeasyPrint渲染并直接返回字节，
+并发或重复点击导出都会重新跑一遍整条流水线。PDFExportQueue：
+    - 以IR内容、布局优化开关、基础布局配置与渲染代码指纹计算内容哈希，
+      生成的PDF按哈希落盘，相同输入直接复用已生成的文件；
+    - 导出目录由 DiskLRUCache 管理，总大小超过上限时淘汰最久未下载的PDF；
+    - 同一哈希正在生成时复用该任务，不重复提交；
+    - 渲染在容量有限的线程池中执行，各阶段进度通过回调以事件形式广播。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from ReportEngine.utils.disk_cache import DiskLRUCache, file_fingerprint, make_cache_key
+
+# 事件广播函数：(job_id, event)
+BroadcastFn = Callable[[str, Dict[str, Any]], None]
+# 渲染函数：(document_ir, optimize, progress_callback) -> PDF字节
+RenderFn = Callable[[Dict[str, Any], bool, Callable[[str, int], None]], bytes]
+
+JOB_TERMINAL_STATUSES = {"completed", "error"}
+
+
+class PDFExportJob:
+    """
+    单个PDF导出任务。
+
+    与 ReportTask 一致地维护状态、进度与事件历史，
+    SSE 接口可直接按 job_id 回放与订阅。
+    """
+
+    def __init__(self, job_id: str, cache_key: str, filename: str, broadcast: Optional[BroadcastFn] = None):
+        self.job_id = job_id
+        self.cache_key = cache_key
+        self.filename = filename
+        self.status = "pending"  # pending/running/completed/error
+        self.progress = 0
+        self.stage = "排队中"
+        self.error_message = ""
+        self.file_path = ""
+        self.cached = False
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+        self.done = threading.Event()
+        self.event_history: deque = deque(maxlen=200)
+        self._event_lock = threading.Lock()
+        self.last_event_id = 0
+        self._broadcast = broadcast
+
+    def update(self, status: str, progress: Optional[int] = None, stage: str = "", error_message: str = ""):
+        """更新状态并推送 status 事件，终态时唤醒等待者"""
+        self.status = status
+        if progress is not None:
+            self.progress = progress
+        if stage:
+            self.stage = stage
+        if error_message:
+            self.error_message = error_message
+        self.updated_at = datetime.now()
+        self.publish_event('status', self.to_dict())
+        if status in JOB_TERMINAL_STATUSES:
+            self.publish_event(status, self.to_dict())
+            self.done.set()
+
+    def publish_event(self, event_type: str, payload: Dict[str, Any]) -> None:
+        event: Dict[str, Any] = {
+            'id': 0,
+            'type': event_type,
+            'task_id': self.job_id,
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'payload': payload,
+        }
+        with self._event_lock:
+            self.last_event_id += 1
+            event['id'] = self.last_event_id
+            self.event_history.append(event)
+        if self._broadcast is not None:
+            try:
+                self._broadcast(self.job_id, event)
+            except Exception:
+                logger.exception("推送PDF导出事件失败")
+
+    def history_since(self, last_event_id: Optional[int]) -> List[Dict[str, Any]]:
+        with self._event_lock:
+            if last_event_id is None:
+                return list(self.event_history)
+            return [evt for evt in self.event_history if evt['id'] > last_event_id]
+
+    @property
+    def file_ready(self) -> bool:
+        """已完成且PDF仍在磁盘上（导出目录超出容量时可能已被淘汰）"""
+        return self.status == 'completed' and bool(self.file_path) and os.path.exists(self.file_path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'progress': self.progress,
+            'stage': self.stage,
+            'error_message': self.error_message,
+            'filename': self.filename,
+            'etag': self.cache_key,
+            'cached': self.cached,
+            'file_ready': self.file_ready,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+        }
+
+
+class PDFExportQueue:
+    """按内容哈希去重并缓存结果的PDF导出线程池"""
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        render_fn: RenderFn,
+        max_workers: int = 2,
+        broadcast: Optional[BroadcastFn] = None,
+        max_jobs: int = 50,
+        cache_salt: Any = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        """
+        Args:
+            output_dir: PDF落盘目录
+            render_fn: 实际执行渲染的函数
+            max_workers: 同时渲染的最大任务数
+            broadcast: 事件广播函数（通常为 flask_interface._broadcast_event）
+            max_jobs: 内存中保留的任务数上限
+            cache_salt: 参与内容哈希的附加信息（如基础布局配置、渲染代码指纹）
+            max_bytes: 落盘PDF的总大小上限（字节），超出后按最近使用淘汰
+        """
+        self.output_dir = Path(output_dir)
+        self._store = DiskLRUCache(self.output_dir, max(1, max_bytes), suffix=".pdf")
+        self.render_fn = render_fn
+        self.broadcast = broadcast
+        self.max_jobs = max_jobs
+        self.cache_salt = cache_salt
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pdf-export")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, PDFExportJob]" = OrderedDict()
+        self._inflight: Dict[str, PDFExportJob] = {}
+
+    def cache_key(self, document_ir: Dict[str, Any], optimize: bool) -> str:
+        return make_cache_key("pdf", document_ir, bool(optimize), self.cache_salt)
+
+    def submit(self, document_ir: Dict[str, Any], optimize: bool, filename: str) -> PDFExportJob:
+        """
+        提交导出任务
+
+        已有相同内容的PDF时返回一个已完成的任务；同一内容正在生成时返回进行中的任务。
+        """
+        cache_key = self.cache_key(document_ir, optimize)
+        with self._lock:
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                return inflight
+            job = PDFExportJob(f"pdf-{uuid.uuid4().hex[:12]}", cache_key, filename, self.broadcast)
+            self._remember(job)
+            path = self._store.get_path(cache_key)
+            if path is not None:
+                job.file_path = str(path)
+                job.cached = True
+                job.update('completed', 100, stage="已复用缓存的PDF")
+                return job
+            self._inflight[cache_key] = job
+        job.update('pending', 0, stage="排队中")
+        self._executor.submit(self._run, job, document_ir, bool(optimize))
+        return job
+
+    def get(self, job_id: str) -> Optional[PDFExportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _remember(self, job: PDFExportJob):
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status not in JOB_TERMINAL_STATUSES:
+                break
+            self._jobs.pop(oldest_id)
+
+    def _run(self, job: PDFExportJob, document_ir: Dict[str, Any], optimize: bool):
+        job.update('running', 1, stage="开始生成PDF")
+        try:
+            pdf_bytes = self.render_fn(
+                document_ir,
+                optimize,
+                lambda stage, progress: job.update('running', progress, stage=stage),
+            )
+            path = self._store.put_bytes(job.cache_key, pdf_bytes)
+            if path is None:
+                raise OSError(f"PDF写入导出目录失败或超过容量上限（{len(pdf_bytes)} 字节）")
+            job.file_path = str(path)
+        except Exception as e:
+            logger.exception(f"PDF导出任务失败: {job.job_id}")
+            self._finish(job)
+            job.update('error', stage="生成失败", error_message=str(e))
+            return
+        self._finish(job)
+        job.update('completed', 100, stage="PDF已生成")
+        logger.info(f"PDF导出任务完成: {job.job_id} -> {job.file_path}")
+
+    def _finish(self, job: PDFExportJob):
+        # 先移出进行中列表再进入终态，等待者醒来后重新提交可直接命中磁盘结果
+        with self._lock:
+            self._inflight.pop(job.cache_key, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _package_version(name: str) -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        return version(name)
+    except PackageNotFoundError:
+        return ""
+
+
+def renderer_fingerprint() -> Dict[str, Any]:
+    """
+    PDF渲染代码、图表/公式SVG转换器、字体文件与基础布局配置的指纹，
+    任一变化后旧的PDF缓存不再命中
+    """
+    from ReportEngine.renderers import (
+        chart_to_svg,
+        html_renderer,
+        math_to_svg,
+        pdf_layout_optimizer,
+        pdf_renderer,
+    )
+    from ReportEngine.renderers.pdf_layout_optimizer import PDFLayoutOptimizer
+    from ReportEngine.renderers.svg_cache import mathtext_font_fingerprint
+
+    try:
+        font_path = str(pdf_renderer.PDFRenderer._get_font_path())
+    except FileNotFoundError:
+        font_path = ""
+    return {
+        'code': [
+            file_fingerprint(module.__file__)
+            for module in (pdf_renderer, html_renderer, pdf_layout_optimizer, chart_to_svg, math_to_svg)
+        ],
+        'packages': {name: _package_version(name) for name in ('matplotlib', 'weasyprint')},
+        'mathtext': mathtext_font_fingerprint(),
+        'font': file_fingerprint(font_path),
+        'layout': json.loads(json.dumps(PDFLayoutOptimizer().config.to_dict(), default=str)),
+    }
+
+
+__all__ = ["PDFExportJob", "PDFExportQueue", "JOB_TERMINAL_STATUSES", "renderer_fingerprint"]
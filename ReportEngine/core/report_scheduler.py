@@ -0,0 +1,187 @@
+"""
+报告生成任务调度器。
+
+原实现同一时刻只允许一个 current_task，其余请求直接拒绝。ReportScheduler：
+    - 维护按优先级排序、同优先级先进先出的等待队列；
+    - 由固定数量的工作线程消费队列，每个线程可持有独立的 ReportAgent；
+    - 队列变化时回调各排队任务的最新位置，供上层以SSE事件推送；
+    - 排队中的任务取消时直接出队，运行中的任务通过其 cancel_event 协作式中断。
+
+调度器只依赖任务对象的 ``task_id``、``priority`` 与 ``cancel_event`` 属性，
+具体的执行逻辑由 run_fn 决定。
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# 执行函数：(task, worker_index) -> None
+RunFn = Callable[[Any, int], None]
+# 排队位置回调：(task, position, queued_total)，position 从1开始
+PositionFn = Callable[[Any, int, int], None]
+
+
+class SchedulerQueueFull(RuntimeError):
+    """等待队列已满"""
+
+
+class ReportScheduler:
+    """固定工作线程数的优先级任务队列"""
+
+    def __init__(
+        self,
+        run_fn: RunFn,
+        max_workers: int = 1,
+        max_queue: int = 0,
+        on_position: Optional[PositionFn] = None,
+    ):
+        """
+        Args:
+            run_fn: 在工作线程中执行单个任务的函数
+            max_workers: 工作线程数（同时运行的任务数）
+            max_queue: 等待队列上限，<= 0 表示不限
+            on_position: 排队位置变化时的回调
+        """
+        self.run_fn = run_fn
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self.on_position = on_position
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int, Any]] = []
+        self._seq = itertools.count()
+        self._running: Dict[str, Any] = {}
+        self._positions: Dict[str, int] = {}
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+
+    def submit(self, task: Any) -> int:
+        """
+        任务入队，返回排队位置（1表示下一个执行）。
+
+        Raises:
+            SchedulerQueueFull: 等待队列已满
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("调度器已关闭")
+            if self.max_queue > 0 and len(self._heap) >= self.max_queue:
+                raise SchedulerQueueFull(f"排队任务已达上限（{self.max_queue}）")
+            # heapq 为小顶堆，优先级取负使数值越大越先执行；序号保证同优先级先进先出
+            heapq.heappush(self._heap, (-int(getattr(task, "priority", 0) or 0), next(self._seq), task))
+            self._ensure_workers_locked()
+            changes = self._position_changes_locked()
+            self._cond.notify()
+        self._notify_positions(changes)
+        return changes.get(task.task_id, (task, 0, 0))[1]
+
+    def cancel(self, task_id: str) -> Optional[str]:
+        """
+        取消任务
+
+        Returns:
+            "dequeued": 任务仍在排队，已移出队列；
+            "signalled": 任务运行中，已置位其 cancel_event；
+            None: 调度器中没有该任务
+        """
+        with self._cond:
+            running = self._running.get(task_id)
+            if running is not None:
+                running.cancel_event.set()
+                return "signalled"
+            for index, (_, _, task) in enumerate(self._heap):
+                if task.task_id == task_id:
+                    self._heap.pop(index)
+                    heapq.heapify(self._heap)
+                    self._positions.pop(task_id, None)
+                    changes = self._position_changes_locked()
+                    break
+            else:
+                return None
+        self._notify_positions(changes)
+        return "dequeued"
+
+    def position(self, task_id: str) -> int:
+        """返回排队位置，不在队列中时为0"""
+        with self._cond:
+            return self._positions.get(task_id, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'workers': self.max_workers,
+                'running': len(self._running),
+                'queued': len(self._heap),
+                'running_task_ids': list(self._running),
+                'queued_task_ids': [task.task_id for _, _, task in sorted(self._heap)],
+            }
+
+    def shutdown(self):
+        """停止接收新任务，丢弃排队任务并通知运行中的任务取消"""
+        with self._cond:
+            self._shutdown = True
+            self._heap.clear()
+            self._positions.clear()
+            for task in self._running.values():
+                task.cancel_event.set()
+            self._cond.notify_all()
+
+    def _ensure_workers_locked(self):
+        # 工作线程按需创建，直到达到 max_workers
+        busy = len(self._running)
+        idle = len(self._workers) - busy
+        if idle >= len(self._heap) or len(self._workers) >= self.max_workers:
+            return
+        index = len(self._workers)
+        worker = threading.Thread(
+            target=self._worker_loop, args=(index,), name=f"report-worker-{index}", daemon=True
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _position_changes_locked(self) -> Dict[str, Tuple[Any, int, int]]:
+        # 只返回位置发生变化的任务，避免每次入队都向全部排队任务重复推送
+        ordered = [task for _, _, task in sorted(self._heap)]
+        total = len(ordered)
+        changes: Dict[str, Tuple[Any, int, int]] = {}
+        for position, task in enumerate(ordered, start=1):
+            if self._positions.get(task.task_id) != position:
+                self._positions[task.task_id] = position
+                changes[task.task_id] = (task, position, total)
+        return changes
+
+    def _notify_positions(self, changes: Dict[str, Tuple[Any, int, int]]):
+        if self.on_position is None:
+            return
+        for task, position, total in changes.values():
+            try:
+                self.on_position(task, position, total)
+            except Exception:
+                logger.exception("推送排队位置失败")
+
+    def _worker_loop(self, index: int):
+        while True:
+            with self._cond:
+                while not self._heap and not self._shutdown:
+                    self._cond.wait()
+                if self._shutdown:
+                    return
+                _, _, task = heapq.heappop(self._heap)
+                self._positions.pop(task.task_id, None)
+                self._running[task.task_id] = task
+                changes = self._position_changes_locked()
+            self._notify_positions(changes)
+            try:
+                self.run_fn(task, index)
+            except BaseException:
+                logger.exception(f"报告任务执行异常: {task.task_id}")
+            finally:
+                with self._cond:
+                    self._running.pop(task.task_id, None)
+
+
+__all__ = ["ReportScheduler", "SchedulerQueueFull"]
@@ -9,17 +9,28 @@ Report Engine Flask接口。
 
 import os
 import json
+import sys
 import threading
 import time
+import uuid
 from collections import deque, defaultdict
 from datetime import datetime
 from queue import Queue, Empty
-from flask import Blueprint, request, jsonify, Response, send_file, stream_with_context
+from flask import Blueprint, request, jsonify, Response, send_file, send_from_directory, stream_with_context
 from typing import Dict, Any, List, Optional
 from loguru import logger
 from .agent import ReportAgent, create_agent
 from .nodes import ChapterJsonParseError
+from .utils.cancellation import TaskCancelledError, raise_if_cancelled
 from .utils.config import settings
+from .core.pdf_export_queue import (
+    JOB_TERMINAL_STATUSES,
+    PDFExportJob,
+    PDFExportQueue,
+    renderer_fingerprint,
+)
+from .core.report_scheduler import ReportScheduler, SchedulerQueueFull
+from utils.log_reader import read_since, read_tail, stream_lines
 
 
 # 创建Blueprint
@@ -27,12 +38,19 @@ report_bp = Blueprint('report_engine', __name__)
 
 # 全局变量
 report_agent = None
+# 最近一次提交的任务，仅用于 /status 的兼容字段；调度以 report_scheduler 为准
 current_task = None
 task_lock = threading.Lock()
+# 报告任务调度器（首次提交时创建），工作线程 i 使用 worker_agents[i]
+report_scheduler: Optional[ReportScheduler] = None
+report_scheduler_lock = threading.Lock()
+worker_agents: Dict[int, ReportAgent] = {}
+# PDF导出队列（首次导出时创建）
+pdf_export_queue: Optional[PDFExportQueue] = None
+pdf_export_queue_lock = threading.Lock()
 
 # ====== 流式推送与任务历史管理 ======
 # 通过有界deque缓存最近的事件，方便SSE断线后快速补发
-MAX_TASK_HISTORY = 5
 STREAM_HEARTBEAT_INTERVAL = 15  # 心跳间隔秒
 STREAM_IDLE_TIMEOUT = 120  # 终态后最长保活时间，避免孤儿SSE阻塞
 STREAM_TERMINAL_STATUSES = {"completed", "error", "cancelled"}
@@ -72,9 +90,10 @@ def _is_excluded_engine_log(record: Dict[str, Any]) -> bool:
 
 def _stream_log_to_task(message):
     """
-    将loguru日志同步到当前任务的SSE事件，保证前端实时可见。
+    将loguru日志同步到所属任务的SSE事件，保证前端实时可见。
 
-    仅在存在运行中的任务时推送，避免无关日志刷屏。
+    工作线程通过 `logger.contextualize(report_task_id=...)` 标记日志所属任务；
+    未标记的日志仅在恰好只有一个运行中任务时推送给它，避免多任务间串流。
     """
     try:
         record = message.record
@@ -84,8 +103,13 @@ def _stream_log_to_task(message):
         if _is_excluded_engine_log(record):
             return
 
+        task_id = record["extra"].get("report_task_id")
         with task_lock:
-            task = current_task
+            if task_id:
+                task = tasks_registry.get(task_id)
+            else:
+                running = [t for t in tasks_registry.values() if t.status == "running"]
+                task = running[0] if len(running) == 1 else None
 
         if not task or task.status not in ("running", "pending"):
             return
@@ -180,22 +204,33 @@ def _prune_task_history_locked():
     """
     在task_lock持有期间调用，清理过多的历史任务。
 
-    仅保留最近 `MAX_TASK_HISTORY` 个任务，避免长时间运行占用过多内存。
+    只淘汰已结束的任务（排队/运行中的任务由调度器的队列上限约束），
+    按创建时间从旧到新移除，直到数量不超过 `REPORT_TASK_HISTORY`
+    且估算占用不超过 `REPORT_TASK_HISTORY_MAX_MB`；最新一个已结束任务总会保留，
+    保证刚完成的超大报告仍可读取。
 
     说明:
         该函数假设调用方已获取 `task_lock`，否则存在竞态风险。
     """
-    if len(tasks_registry) <= MAX_TASK_HISTORY:
-        return
-    # 按创建时间排序，移除最旧的任务
-    sorted_tasks = sorted(tasks_registry.values(), key=lambda t: t.created_at)
-    for task in sorted_tasks[:-MAX_TASK_HISTORY]:
+    max_count = max(1, settings.REPORT_TASK_HISTORY)
+    max_bytes = max(0, settings.REPORT_TASK_HISTORY_MAX_MB) * 1024 * 1024
+    finished = sorted(
+        (t for t in tasks_registry.values() if t.status in STREAM_TERMINAL_STATUSES),
+        key=lambda t: t.created_at,
+    )
+    total_bytes = sum(t.approx_bytes() for t in finished)
+    while finished and (
+        len(finished) > max_count
+        or (max_bytes and total_bytes > max_bytes and len(finished) > 1)
+    ):
+        task = finished.pop(0)
+        total_bytes -= task.approx_bytes()
         tasks_registry.pop(task.task_id, None)
 
 
 def _get_task(task_id: str) -> Optional['ReportTask']:
     """
-    统一的任务查找方法，优先返回当前任务。
+    统一的任务查找方法。
 
     避免重复写锁逻辑，便于多个API共享。
 
@@ -206,8 +241,6 @@ def _get_task(task_id: str) -> Optional['ReportTask']:
         ReportTask | None: 命中时返回任务实例，否则为None。
     """
     with task_lock:
-        if current_task and current_task.task_id == task_id:
-            return current_task
         return tasks_registry.get(task_id)
 
 
@@ -265,19 +298,24 @@ class ReportTask:
     既供后台线程更新，也供HTTP接口读取。
     """
 
-    def __init__(self, query: str, task_id: str, custom_template: str = ""):
+    def __init__(self, query: str, task_id: str, custom_template: str = "", priority: int = 0):
         """
         初始化任务对象，记录查询词、自定义模板与运行期元数据。
 
         Args:
             query: 最终需要生成的报告主题
-            task_id: 任务唯一ID，通常由时间戳构造
+            task_id: 任务唯一ID，由时间戳与随机串构造
             custom_template: 可选的自定义Markdown模板
+            priority: 调度优先级，数值越大越先执行，同优先级先进先出
         """
         self.task_id = task_id
         self.query = query
         self.custom_template = custom_template
-        self.status = "pending"  # 四种状态（pending/running/completed/error）
+        self.priority = priority
+        self.status = "pending"  # 五种状态（pending/running/completed/error/cancelled）
+        self.queue_position = 0
+        # 取消标记：调度器与LLM客户端据此中断排队或进行中的生成
+        self.cancel_event = threading.Event()
         self.progress = 0
         self.result = None
         self.error_message = ""
@@ -332,6 +370,8 @@ class ReportTask:
             'task_id': self.task_id,
             'query': self.query,
             'status': self.status,
+            'priority': self.priority,
+            'queue_position': self.queue_position,
             'progress': self.progress,
             'error_message': self.error_message,
             'created_at': self.created_at.isoformat(),
@@ -383,6 +423,10 @@ class ReportTask:
                 return list(self.event_history)
             return [evt for evt in self.event_history if evt['id'] > last_event_id]
 
+    def approx_bytes(self) -> int:
+        """估算任务占用的内存（HTML正文 + 每条事件约512字节），用于历史淘汰。"""
+        return sys.getsizeof(self.html_content) + len(self.event_history) * 512
+
 
 def check_engines_ready() -> Dict[str, Any]:
     """
@@ -413,21 +457,25 @@ def check_engines_ready() -> Dict[str, Any]:
     )
 
 
-def run_report_generation(task: ReportTask, query: str, custom_template: str = ""):
+def run_report_generation(task: ReportTask, query: str, custom_template: str = "",
+                          agent: Optional[ReportAgent] = None):
     """
     在后台线程中运行报告生成。
 
     包括：检查输入→加载文档→调用ReportAgent→持久化输出→
-    推送阶段性事件。出现错误会自动推送并写状态。
+    推送阶段性事件。出现错误会自动推送并写状态；任务的 cancel_event
+    置位后在下一个检查点停止，并以 cancelled 状态收尾。
 
     参数:
         task: 本次任务对象，内部持有事件队列。
         query: 报告主题。
         custom_template: 可选的自定义模板字符串。
+        agent: 执行生成的ReportAgent，默认使用全局实例。
     """
-    global current_task
+    agent = agent or report_agent
 
     try:
+        raise_if_cancelled(task.cancel_event)
         # 在局部闭包内封装推送逻辑，便于传递给ReportAgent
         def stream_handler(event_type: str, payload: Dict[str, Any]):
             """所有阶段事件都通过同一个接口分发，保证日志一致。"""
@@ -436,6 +484,7 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
             if event_type == 'progress' and 'progress' in payload:
                 task.update_status("running", payload['progress'])
 
+        task.queue_position = 0
         task.update_status("running", 5)
         task.publish_event('stage', {'message': '任务已启动，正在检查输入文件', 'stage': 'prepare'})
 
@@ -452,7 +501,7 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
         })
 
         # 加载输入文件
-        content = report_agent.load_input_files(check_result['latest_files'])
+        content = agent.load_input_files(check_result['latest_files'])
         task.publish_event('stage', {'message': '源数据加载完成，启动生成流程', 'stage': 'data_loaded'})
 
         # 生成报告（附带兜底重试，缓解瞬时网络抖动）
@@ -463,7 +512,7 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
                     'stage': 'agent_running',
                     'attempt': attempt
                 })
-                generation_result = report_agent.generate_report(
+                generation_result = agent.generate_report(
                     query=query,
                     reports=content['reports'],
                     forum_logs=content['forum_logs'],
@@ -507,7 +556,8 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
                     'stage': 'retry_wait',
                     'wait_seconds': backoff
                 })
-                time.sleep(backoff)
+                if task.cancel_event.wait(backoff):
+                    raise TaskCancelledError("任务已被取消")
 
         if isinstance(generation_result, dict):
             html_report = generation_result.get('html_content', '')
@@ -540,6 +590,9 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
             'task': task.to_dict(),
         })
 
+    except TaskCancelledError:
+        logger.info(f"报告任务已取消: {task.task_id}")
+        _mark_task_cancelled(task)
     except Exception as e:
         logger.exception(f"报告生成过程中发生错误: {str(e)}")
         task.update_status("error", 0, str(e))
@@ -548,10 +601,76 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
             'stage': 'failed',
             'task': task.to_dict(),
         })
-        # 只在出错时清理任务
+
+
+def _mark_task_cancelled(task: ReportTask):
+    """将任务置为cancelled并推送终止事件。"""
+    task.queue_position = 0
+    task.update_status("cancelled", task.progress, "用户取消任务")
+    task.publish_event('cancelled', {
+        'message': '任务被用户主动终止',
+        'task': task.to_dict(),
+    })
+
+
+def _get_worker_agent(worker_index: int) -> ReportAgent:
+    """
+    获取工作线程专属的ReportAgent。
+
+    0号线程直接使用全局实例，其余线程首次使用时由 `create_worker` 派生，
+    各自持有独立的状态与LLM客户端，互不干扰。
+    """
+    if worker_index == 0:
+        return report_agent
+    with report_scheduler_lock:
+        agent = worker_agents.get(worker_index)
+        if agent is None:
+            agent = report_agent.create_worker()
+            worker_agents[worker_index] = agent
+        return agent
+
+
+def _run_scheduled_task(task: ReportTask, worker_index: int):
+    """调度器工作线程的执行入口：绑定取消标记与日志归属后运行生成流程。"""
+    try:
+        agent = _get_worker_agent(worker_index)
+    except Exception as e:
+        logger.exception(f"创建报告工作实例失败: {str(e)}")
+        task.update_status("error", 0, f"创建报告工作实例失败: {str(e)}")
+        return
+    agent.bind_cancel_event(task.cancel_event)
+    try:
+        with logger.contextualize(report_task_id=task.task_id):
+            run_report_generation(task, task.query, task.custom_template, agent)
+    finally:
+        agent.bind_cancel_event(None)
         with task_lock:
-            if current_task and current_task.task_id == task.task_id:
-                current_task = None
+            _prune_task_history_locked()
+
+
+def _publish_queue_position(task: ReportTask, position: int, queued_total: int):
+    """调度器回调：推送任务的最新排队位置。"""
+    task.queue_position = position
+    task.publish_event('queue', {
+        'position': position,
+        'queued': queued_total,
+        'message': f'排队中，前方还有 {position - 1} 个任务',
+        'task': task.to_dict(),
+    })
+
+
+def _get_report_scheduler() -> ReportScheduler:
+    """获取报告任务调度器（首次调用时创建，并发数与队列上限取自配置）。"""
+    global report_scheduler
+    with report_scheduler_lock:
+        if report_scheduler is None:
+            report_scheduler = ReportScheduler(
+                _run_scheduled_task,
+                max_workers=settings.REPORT_WORKERS,
+                max_queue=settings.REPORT_QUEUE_MAX,
+                on_position=_publish_queue_position,
+            )
+        return report_scheduler
 
 
 @report_bp.route('/status', methods=['GET'])
@@ -571,7 +690,8 @@ def get_status():
             'engines_ready': engines_status['ready'],
             'files_found': engines_status.get('files_found', []),
             'missing_files': engines_status.get('missing_files', []),
-            'current_task': current_task.to_dict() if current_task else None
+            'current_task': current_task.to_dict() if current_task else None,
+            'scheduler': _get_report_scheduler().stats()
         })
     except Exception as e:
         logger.exception(f"获取Report Engine状态失败: {str(e)}")
@@ -586,31 +706,20 @@ def generate_report():
     """
     开始生成报告。
 
-    负责排队、创建后台线程、清空日志并返回SSE地址。
+    负责校验输入、创建任务并提交到调度器排队，返回SSE地址。
+    排队期间通过 `queue` 事件推送最新排队位置。
 
     请求体:
         query: 报告主题（可选）。
         custom_template: 自定义模板字符串（可选）。
+        priority: 调度优先级（可选，整数，越大越先执行，默认0）。
 
     返回:
-        Response: JSON，包含 task_id 与 SSE stream url。
+        Response: JSON，包含 task_id、排队位置与 SSE stream url。
     """
     global current_task
 
     try:
-        # 检查是否有任务在运行
-        with task_lock:
-            if current_task and current_task.status == "running":
-                return jsonify({
-                    'success': False,
-                    'error': '已有报告生成任务在运行中',
-                    'current_task': current_task.to_dict()
-                }), 400
-
-            # 如果有已完成的任务，清理它
-            if current_task and current_task.status in ["completed", "error"]:
-                current_task = None
-
         # 获取请求参数
         data = request.get_json() or {}
         if not isinstance(data, dict):
@@ -618,9 +727,19 @@ def generate_report():
             data = {}
         query = data.get('query', '智能舆情分析报告')
         custom_template = data.get('custom_template', '')
+        try:
+            priority = int(data.get('priority') or 0)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'priority 必须为整数'
+            }), 400
 
-        # 清空日志文件
-        clear_report_log()
+        scheduler = _get_report_scheduler()
+        # 仅在没有其他任务排队或运行时清空日志文件，避免抹掉并发任务的日志
+        scheduler_stats = scheduler.stats()
+        if not scheduler_stats['running'] and not scheduler_stats['queued']:
+            clear_report_log()
 
         # 检查Report Engine是否初始化
         if not report_agent:
@@ -638,14 +757,12 @@ def generate_report():
                 'missing_files': engines_status.get('missing_files', [])
             }), 400
 
-        # 创建新任务
-        task_id = f"report_{int(time.time())}"
-        task = ReportTask(query, task_id, custom_template)
+        # 创建新任务（时间戳便于排序，随机串保证同一秒内的提交也不冲突）
+        task_id = f"report_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        task = ReportTask(query, task_id, custom_template, priority=priority)
 
         with task_lock:
-            current_task = task
             tasks_registry[task_id] = task
-            _prune_task_history_locked()
 
         # 通过主动推送pending事件告知前端任务已经排队
         task.publish_event(
@@ -658,18 +775,26 @@ def generate_report():
             }
         )
 
-        # 在后台线程中运行报告生成
-        thread = threading.Thread(
-            target=run_report_generation,
-            args=(task, query, custom_template),
-            daemon=True
-        )
-        thread.start()
+        try:
+            scheduler.submit(task)
+        except SchedulerQueueFull as e:
+            with task_lock:
+                tasks_registry.pop(task_id, None)
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'scheduler': scheduler.stats()
+            }), 429
+
+        with task_lock:
+            current_task = task
+            _prune_task_history_locked()
 
         return jsonify({
             'success': True,
             'task_id': task_id,
-            'message': '报告生成已启动',
+            'message': '报告生成任务已提交',
+            'queue_position': task.queue_position,
             'task': task.to_dict(),
             'stream_url': f"/api/report/stream/{task_id}"
         })
@@ -917,6 +1042,19 @@ def get_result_json(task_id: str):
         }), 500
 
 
+@report_bp.route('/assets/<path:filename>', methods=['GET'])
+def get_report_asset(filename: str):
+    """
+    提供external资源模式下的第三方库文件。
+
+    文件名带内容哈希，内容变化即换名，因此可设置一年期的immutable缓存。
+    """
+    asset_dir = os.path.abspath(settings.HTML_ASSET_DIR)
+    response = send_from_directory(asset_dir, filename, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @report_bp.route('/download/<task_id>', methods=['GET'])
 def download_report(task_id: str):
     """
@@ -969,41 +1107,47 @@ def cancel_task(task_id: str):
     """
     取消报告生成任务。
 
+    排队中的任务直接出队并置为cancelled；运行中的任务置位取消标记，
+    进行中的LLM流式请求会在下一个分片处被关闭，随后由工作线程推送 cancelled 事件。
+
     参数:
         task_id: 需要被取消的任务ID。
 
     返回:
         Response: JSON，包含取消结果或错误信息。
     """
-    global current_task
-
     try:
-        with task_lock:
-            if current_task and current_task.task_id == task_id:
-                if current_task.status == "running":
-                    current_task.update_status("cancelled", 0, "用户取消任务")
-                    current_task.publish_event('cancelled', {
-                        'message': '任务被用户主动终止',
-                        'task': current_task.to_dict(),
-                    })
-                current_task = None
-            task = tasks_registry.get(task_id)
-            if task and task.status == 'running':
-                task.update_status("cancelled", task.progress, "用户取消任务")
-                task.publish_event('cancelled', {
-                    'message': '任务被用户主动终止',
-                    'task': task.to_dict(),
-                })
+        task = _get_task(task_id)
+        if not task or task.status not in ('pending', 'running'):
+            return jsonify({
+                'success': False,
+                'error': '任务不存在或无法取消'
+            }), 404
 
-                return jsonify({
-                    'success': True,
-                    'message': '任务已取消'
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': '任务不存在或无法取消'
-                }), 404
+        task.cancel_event.set()
+        outcome = _get_report_scheduler().cancel(task_id)
+        if outcome == 'signalled':
+            task.publish_event('stage', {
+                'message': '已发送取消信号，正在停止生成',
+                'stage': 'cancelling',
+            })
+            return jsonify({
+                'success': True,
+                'message': '已发送取消信号，任务即将停止',
+                'task': task.to_dict()
+            })
+        if outcome is None and task.status != 'pending':
+            return jsonify({
+                'success': False,
+                'error': '任务已结束，无法取消'
+            }), 404
+
+        _mark_task_cancelled(task)
+        return jsonify({
+            'success': True,
+            'message': '任务已取消',
+            'task': task.to_dict()
+        })
 
     except Exception as e:
         logger.exception(f"取消报告生成任务失败: {str(e)}")
@@ -1117,44 +1261,62 @@ def get_report_log():
     """
     获取report.log内容，并按行去除空白返回。
 
-    【修复】优化大文件读取，添加错误处理和文件锁
+    查询参数（均可选）：
+        since: 上次返回的cursor，只返回其后新增的行（轮询时应使用）
+        tail: 只返回最后N行，从文件末尾反向读取
+        stream: 为1时以分块文本流返回（可配合since）
+    不传参数时返回最后10MB内的日志行。
 
     返回:
-        Response: JSON，包含最新日志行数组。
+        Response: JSON，包含日志行数组与下次轮询使用的cursor。
     """
     try:
         log_file = settings.LOG_FILE
 
+        since = request.args.get('since', type=int)
+        tail = request.args.get('tail', type=int)
+
+        if request.args.get('stream') == '1':
+            return Response(
+                stream_with_context(stream_lines(log_file, since or 0)),
+                mimetype='text/plain; charset=utf-8'
+            )
+
         if not os.path.exists(log_file):
             return jsonify({
                 'success': True,
-                'log_lines': []
+                'log_lines': [],
+                'cursor': 0
             })
 
-        # 【修复】检查文件大小，避免读取过大文件导致内存问题
-        file_size = os.path.getsize(log_file)
-        max_size = 10 * 1024 * 1024  # 10MB限制
-
-        if file_size > max_size:
-            # 文件过大，只读取最后10MB
-            with open(log_file, 'rb') as f:
-                f.seek(-max_size, 2)  # 从文件末尾往前10MB
-                # 跳过可能不完整的第一行
-                f.readline()
-                content = f.read().decode('utf-8', errors='replace')
-            lines = content.splitlines()
-            logger.warning(f"日志文件过大 ({file_size} bytes)，仅返回最后 {max_size} bytes")
-        else:
-            # 正常大小，完整读取
-            with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-                lines = f.readlines()
+        if tail:
+            chunk = read_tail(log_file, tail)
+            return jsonify({
+                'success': True,
+                'log_lines': chunk.lines,
+                'cursor': chunk.cursor
+            })
+
+        max_size = 10 * 1024 * 1024  # 单次最多读取10MB
+        if since is None:
+            # 首次读取：文件过大时只读取最后10MB，并跳过可能不完整的第一行
+            file_size = os.path.getsize(log_file)
+            since = 0
+            if file_size > max_size:
+                with open(log_file, 'rb') as f:
+                    f.seek(-max_size, 2)
+                    f.readline()
+                    since = f.tell()
+                logger.warning(f"日志文件过大 ({file_size} bytes)，仅返回最后 {max_size} bytes")
 
-        # 清理行尾的换行符和空行
-        log_lines = [line.rstrip('\n\r') for line in lines if line.strip()]
+        chunk = read_since(log_file, since, max_bytes=max_size)
 
         return jsonify({
             'success': True,
-            'log_lines': log_lines
+            'log_lines': chunk.lines,
+            'cursor': chunk.cursor,
+            'has_more': chunk.has_more,
+            'reset': chunk.reset
         })
 
     except PermissionError as e:
@@ -1199,34 +1361,152 @@ def clear_log():
         }), 500
 
 
+def _render_pdf_bytes(document_ir: Dict[str, Any], optimize: bool, progress_callback) -> bytes:
+    """PDF导出队列的渲染函数，在后台线程中执行。"""
+    from .renderers import PDFRenderer
+    renderer = PDFRenderer()
+    return renderer.render_to_bytes(
+        document_ir,
+        optimize_layout=optimize,
+        progress_callback=progress_callback
+    )
+
+
+def _get_pdf_export_queue() -> PDFExportQueue:
+    """
+    获取PDF导出队列（首次调用时创建）。
+
+    导出任务的事件通过 `_broadcast_event` 推送，与报告任务共用SSE基础设施。
+    """
+    global pdf_export_queue
+    with pdf_export_queue_lock:
+        if pdf_export_queue is None:
+            pdf_export_queue = PDFExportQueue(
+                settings.PDF_EXPORT_DIR,
+                _render_pdf_bytes,
+                max_workers=settings.PDF_EXPORT_WORKERS,
+                broadcast=_broadcast_event,
+                cache_salt=renderer_fingerprint(),
+                max_bytes=settings.PDF_EXPORT_MAX_MB * 1024 * 1024,
+            )
+        return pdf_export_queue
+
+
+def _pdf_dependency_error():
+    """检测 Pango 依赖，缺失时返回503响应，否则返回None。"""
+    from .utils.dependency_check import check_pango_available
+    pango_available, pango_message = check_pango_available()
+    if pango_available:
+        return None
+    return jsonify({
+        'success': False,
+        'error': 'PDF 导出功能不可用：缺少系统依赖',
+        'details': '请查看根目录 README.md “源码启动”的第二步（PDF 导出依赖）了解安装方法',
+        'help_url': 'https://github.com/666ghj/BettaFish#2-安装-pdf-导出所需系统依赖可选',
+        'system_message': pango_message
+    }), 503
+
+
+def _pdf_download_name(document_ir: Dict[str, Any]) -> str:
+    """根据报告主题生成下载文件名。"""
+    topic = document_ir.get('metadata', {}).get('topic', 'report')
+    return f"report_{topic}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+def _is_truthy(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or '').lower() in ('1', 'true', 'yes')
+
+
+def _submit_pdf_export(document_ir: Dict[str, Any], optimize: bool, run_async: bool):
+    """
+    提交PDF导出任务。
+
+    run_async 为真时立即返回任务信息（202，已有缓存时200）；
+    否则等待任务完成后直接返回PDF文件，兼容原有的同步下载方式。
+    同步等待超过 PDF_EXPORT_SYNC_TIMEOUT 秒时返回202与任务信息，任务继续在后台执行；
+    完成的PDF在发送前已被导出目录的容量上限淘汰时重新生成一次。
+    """
+    queue = _get_pdf_export_queue()
+    filename = _pdf_download_name(document_ir)
+    job = queue.submit(document_ir, optimize, filename)
+    if run_async:
+        status_code = 200 if job.status == 'completed' else 202
+        return jsonify({'success': True, 'job': job.to_dict()}), status_code
+
+    for attempt in range(2):
+        if not job.done.wait(max(1, settings.PDF_EXPORT_SYNC_TIMEOUT)):
+            return jsonify({
+                'success': True,
+                'message': 'PDF仍在生成中，请通过导出任务接口查询进度并下载',
+                'job': job.to_dict()
+            }), 202
+        if job.status != 'completed':
+            return jsonify({
+                'success': False,
+                'error': f'导出PDF失败: {job.error_message}',
+                'job': job.to_dict()
+            }), 500
+        if job.file_ready or attempt:
+            break
+        job = queue.submit(document_ir, optimize, filename)
+    return _send_pdf_job_file(job)
+
+
+def _pdf_file_gone(job: PDFExportJob):
+    """PDF已因导出目录容量上限被清理，提示重新导出。"""
+    return jsonify({
+        'success': False,
+        'error': 'PDF文件已被清理，请重新提交导出',
+        'job': job.to_dict()
+    }), 410
+
+
+def _send_pdf_job_file(job: PDFExportJob):
+    """
+    从磁盘发送已生成的PDF，文件已被淘汰时返回410。
+
+    ETag 即内容哈希，配合 conditional 支持 If-None-Match 与 Range 断点续传。
+    """
+    try:
+        response = send_file(
+            job.file_path,
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=job.filename,
+            conditional=True,
+            etag=job.cache_key,
+            max_age=0,
+        )
+    except FileNotFoundError:
+        return _pdf_file_gone(job)
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
 @report_bp.route('/export/pdf/<task_id>', methods=['GET'])
 def export_pdf(task_id: str):
     """
     导出报告为PDF格式。
 
     从IR JSON文件生成优化的PDF，支持自动布局调整。
+    渲染在后台导出队列中进行，相同IR与配置的PDF直接复用磁盘上的结果。
 
     参数:
         task_id: 任务ID
 
     查询参数:
         optimize: 是否启用布局优化（默认true）
+        async: 为true时立即返回导出任务，进度通过 /export/pdf/jobs/<job_id>/stream 订阅
 
     返回:
-        Response: PDF文件流或错误信息
+        Response: PDF文件流、导出任务信息或错误信息
     """
     try:
-        # 检测 Pango 依赖
-        from .utils.dependency_check import check_pango_available
-        pango_available, pango_message = check_pango_available()
-        if not pango_available:
-            return jsonify({
-                'success': False,
-                'error': 'PDF 导出功能不可用：缺少系统依赖',
-                'details': '请查看根目录 README.md “源码启动”的第二步（PDF 导出依赖）了解安装方法',
-                'help_url': 'https://github.com/666ghj/BettaFish#2-安装-pdf-导出所需系统依赖可选',
-                'system_message': pango_message
-            }), 503
+        dependency_error = _pdf_dependency_error()
+        if dependency_error:
+            return dependency_error
 
         # 获取任务信息
         task = tasks_registry.get(task_id)
@@ -1257,28 +1537,8 @@ def export_pdf(task_id: str):
         # 检查是否启用布局优化
         optimize = request.args.get('optimize', 'true').lower() == 'true'
 
-        # 创建PDF渲染器并生成PDF
-        from .renderers import PDFRenderer
-        renderer = PDFRenderer()
-
         logger.info(f"开始导出PDF，任务ID: {task_id}，布局优化: {optimize}")
-
-        # 生成PDF字节流
-        pdf_bytes = renderer.render_to_bytes(document_ir, optimize_layout=optimize)
-
-        # 确定下载文件名
-        topic = document_ir.get('metadata', {}).get('topic', 'report')
-        pdf_filename = f"report_{topic}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-
-        # 返回PDF文件
-        return Response(
-            pdf_bytes,
-            mimetype='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="{pdf_filename}"',
-                'Content-Type': 'application/pdf'
-            }
-        )
+        return _submit_pdf_export(document_ir, optimize, _is_truthy(request.args.get('async')))
 
     except Exception as e:
         logger.exception(f"导出PDF失败: {str(e)}")
@@ -1298,24 +1558,17 @@ def export_pdf_from_ir():
     请求体:
         {
             "document_ir": {...},  // Document IR JSON
-            "optimize": true       // 是否启用布局优化（可选）
+            "optimize": true,      // 是否启用布局优化（可选）
+            "async": false         // 为true时立即返回导出任务（可选）
         }
 
     返回:
-        Response: PDF文件流或错误信息
+        Response: PDF文件流、导出任务信息或错误信息
     """
     try:
-        # 检测 Pango 依赖
-        from .utils.dependency_check import check_pango_available
-        pango_available, pango_message = check_pango_available()
-        if not pango_available:
-            return jsonify({
-                'success': False,
-                'error': 'PDF 导出功能不可用：缺少系统依赖',
-                'details': '请查看根目录 README.md “源码启动”的第二步（PDF 导出依赖）了解安装方法',
-                'help_url': 'https://github.com/666ghj/BettaFish#2-安装-pdf-导出所需系统依赖可选',
-                'system_message': pango_message
-            }), 503
+        dependency_error = _pdf_dependency_error()
+        if dependency_error:
+            return dependency_error
 
         data = request.get_json() or {}
         if not isinstance(data, dict):
@@ -1334,28 +1587,8 @@ def export_pdf_from_ir():
         document_ir = data['document_ir']
         optimize = data.get('optimize', True)
 
-        # 创建PDF渲染器并生成PDF
-        from .renderers import PDFRenderer
-        renderer = PDFRenderer()
-
         logger.info(f"从IR直接导出PDF，布局优化: {optimize}")
-
-        # 生成PDF字节流
-        pdf_bytes = renderer.render_to_bytes(document_ir, optimize_layout=optimize)
-
-        # 确定下载文件名
-        topic = document_ir.get('metadata', {}).get('topic', 'report')
-        pdf_filename = f"report_{topic}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-
-        # 返回PDF文件
-        return Response(
-            pdf_bytes,
-            mimetype='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="{pdf_filename}"',
-                'Content-Type': 'application/pdf'
-            }
-        )
+        return _submit_pdf_export(document_ir, optimize, _is_truthy(data.get('async')))
 
     except Exception as e:
         logger.exception(f"从IR导出PDF失败: {str(e)}")
@@ -1363,3 +1596,90 @@ def export_pdf_from_ir():
             'success': False,
             'error': f'导出PDF失败: {str(e)}'
         }), 500
+
+
+@report_bp.route('/export/pdf/jobs/<job_id>', methods=['GET'])
+def get_pdf_export_job(job_id: str):
+    """查询PDF导出任务状态。"""
+    job = _get_pdf_export_queue().get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': '导出任务不存在'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+
+@report_bp.route('/export/pdf/jobs/<job_id>/download', methods=['GET'])
+def download_pdf_export(job_id: str):
+    """下载已完成的PDF导出结果，支持ETag与Range。"""
+    job = _get_pdf_export_queue().get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': '导出任务不存在'}), 404
+    if job.status != 'completed':
+        return jsonify({
+            'success': False,
+            'error': f'PDF尚未生成，当前状态: {job.status}',
+            'job': job.to_dict()
+        }), 409
+    if not job.file_ready:
+        return _pdf_file_gone(job)
+    return _send_pdf_job_file(job)
+
+
+@report_bp.route('/export/pdf/jobs/<job_id>/stream', methods=['GET'])
+def stream_pdf_export(job_id: str):
+    """
+    基于SSE推送PDF导出进度。
+
+    事件格式与报告任务的 /stream 一致（status/completed/error/heartbeat），
+    支持 Last-Event-ID 补发。
+    """
+    job = _get_pdf_export_queue().get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': '导出任务不存在'}), 404
+
+    last_event_header = request.headers.get('Last-Event-ID')
+    try:
+        last_event_id = int(last_event_header) if last_event_header else None
+    except ValueError:
+        last_event_id = None
+
+    def event_generator():
+        queue = _register_stream(job_id)
+        try:
+            # 先回放历史事件；注册监听后产生的事件可能同时出现在队列中，按ID去重
+            sent_id = last_event_id or 0
+            finished = False
+            for event in job.history_since(last_event_id):
+                yield _format_sse(event)
+                sent_id = event['id']
+                finished = finished or event.get('type') in JOB_TERMINAL_STATUSES
+            while not finished:
+                try:
+                    event = queue.get(timeout=STREAM_HEARTBEAT_INTERVAL)
+                except Empty:
+                    if job.status in JOB_TERMINAL_STATUSES:
+                        break
+                    event = {
+                        'id': f"hb-{int(time.time() * 1000)}",
+                        'type': 'heartbeat',
+                        'task_id': job_id,
+                        'timestamp': datetime.utcnow().isoformat() + 'Z',
+                        'payload': {'status': job.status}
+                    }
+                else:
+                    if event['id'] <= sent_id:
+                        continue
+                    sent_id = event['id']
+                yield _format_sse(event)
+                finished = event.get('type') in JOB_TERMINAL_STATUSES
+        except (GeneratorExit, ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+            logger.info(f"PDF导出SSE连接关闭: {job_id}")
+        finally:
+            _unregister_stream(job_id, queue)
+
+    response = Response(
+        stream_with_context(event_generator()),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -6,11 +6,14 @@ Report Engine 默认的OpenAI兼容LLM客户端封装。
 
 import os
 import sys
+import threading
 from typing import Any, Dict, Optional, Generator
 from loguru import logger
 
 from openai import OpenAI
 
+from ReportEngine.utils.cancellation import raise_if_cancelled
+
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 utils_dir = os.path.join(project_root, "utils")
@@ -64,6 +67,8 @@ class LLMClient:
         if base_url:
             client_kwargs["base_url"] = base_url
         self.client = OpenAI(**client_kwargs)
+        # 由报告调度器在任务开始时绑定，置位后中断进行中的请求
+        self.cancel_event: Optional[threading.Event] = None
 
     @with_retry(LLM_RETRY_CONFIG)
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
@@ -88,6 +93,7 @@ class LLMClient:
 
         timeout = kwargs.pop("timeout", self.timeout)
 
+        raise_if_cancelled(self.cancel_event)
         response = self.client.chat.completions.create(
             model=self.model_name,
             messages=messages,
@@ -123,6 +129,7 @@ class LLMClient:
 
         timeout = kwargs.pop("timeout", self.timeout)
 
+        raise_if_cancelled(self.cancel_event)
         try:
             stream = self.client.chat.completions.create(
                 model=self.model_name,
@@ -131,11 +138,18 @@ class LLMClient:
                 **extra_params,
             )
             
-            for chunk in stream:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if delta and delta.content:
-                        yield delta.content
+            try:
+                for chunk in stream:
+                    # 每个分片之间检查取消标记，关闭连接让服务端停止继续生成
+                    raise_if_cancelled(self.cancel_event)
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if delta and delta.content:
+                            yield delta.content
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
         except Exception as e:
             logger.error(f"流式请求失败: {str(e)}")
             raise e
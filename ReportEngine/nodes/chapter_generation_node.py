@@ -11,6 +11,7 @@ import json
 from datetime import datetime
 from pathlib import Path
 import re
+import threading
 from typing import Any, Dict, List, Tuple, Callable, Optional, Set
 
 from loguru import logger
@@ -158,6 +159,8 @@ class ChapterGenerationNode(BaseNode):
         error_dir.mkdir(parents=True, exist_ok=True)
         self.error_log_dir = error_dir
         self._failed_block_counter = 0
+        # 章节可能由多个线程并发生成，运行级状态与错误编号需加锁维护
+        self._state_lock = threading.Lock()
         self._active_run_id: Optional[str] = None
         self._rescue_attempted_labels: Dict[str, Set[str]] = {}
         self._skipped_placeholder_chapters: Set[str] = set()
@@ -302,11 +305,25 @@ class ChapterGenerationNode(BaseNode):
         返回:
             dict: 可以直接序列化进提示词的payload，兼顾章节信息与全局约束。
         """
-        reports = context.get("reports", {})
         # 章节篇幅规划（来自WordBudgetNode），用于指导字数与强调点
         chapter_plan_map = context.get("chapter_directives", {})
         chapter_plan = chapter_plan_map.get(section.chapter_id) if chapter_plan_map else {}
 
+        # 原文超出预算时只携带与本章相关的报告/论坛段落
+        retriever = context.get("context_retriever")
+        if retriever is not None and retriever.enabled:
+            excerpt = retriever.select(section, chapter_plan, context.get("query") or "")
+            reports = excerpt["reports"]
+            forum_logs = excerpt["forum_logs"]
+            logger.debug(
+                f"{section.title} 检索上下文 "
+                f"{sum(map(retriever.counter.count, reports.values())) + retriever.counter.count(forum_logs)}"
+                f"/{retriever.total_tokens} token"
+            )
+        else:
+            reports = context.get("reports", {})
+            forum_logs = context.get("forum_logs", "")
+
         # 从 layout 的 tocPlan 中查找该章节是否允许使用SWOT块和PEST块
         allow_swot = self._get_chapter_swot_permission(section.chapter_id, context)
         allow_pest = self._get_chapter_pest_permission(section.chapter_id, context)
@@ -334,7 +351,7 @@ class ChapterGenerationNode(BaseNode):
                 "media_engine": reports.get("media_engine", ""),
                 "insight_engine": reports.get("insight_engine", ""),
             },
-            "forumLogs": context.get("forum_logs", ""),
+            "forumLogs": forum_logs,
             "dataBundles": context.get("data_bundles", []),
             "constraints": {
                 "language": "zh-CN",
@@ -536,12 +553,13 @@ class ChapterGenerationNode(BaseNode):
 
     def _ensure_run_state(self, run_id: str):
         """确保每次报告运行时的修复状态隔离，防止上一份任务的记录影响新任务。"""
-        if self._active_run_id == run_id:
-            return
-        self._active_run_id = run_id
-        self._rescue_attempted_labels = {}
-        self._skipped_placeholder_chapters = set()
-        self._archived_failed_json = {}
+        with self._state_lock:
+            if self._active_run_id == run_id:
+                return
+            self._active_run_id = run_id
+            self._rescue_attempted_labels = {}
+            self._skipped_placeholder_chapters = set()
+            self._archived_failed_json = {}
 
     def _archive_failed_output(self, section: TemplateSection, raw_text: str):
         """缓存当前章节的原始错误JSON，以便后续占位或人工使用。"""
@@ -695,8 +713,9 @@ class ChapterGenerationNode(BaseNode):
     ) -> Optional[Dict[str, str]]:
         """将无法解析的JSON文本落盘，便于在HTML中指向具体文件。"""
         try:
-            self._failed_block_counter += 1
-            entry_id = f"E{self._failed_block_counter:04d}"
+            with self._state_lock:
+                self._failed_block_counter += 1
+                entry_id = f"E{self._failed_block_counter:04d}"
             timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
             slug = section.slug or "section"
             filename = f"{timestamp}-{slug}-{entry_id}.json"
@@ -4,6 +4,7 @@
 新增要点：
 1. 内置Chart.js数据验证/修复（ChartValidator+LLM兜底），杜绝非法配置导致的注入或崩溃；
 2. 将MathJax/Chart.js/html2canvas/jspdf等依赖内联并带CDN fallback，适配离线或被墙环境；
+   也可切换为external模式：按内容哈希写出静态文件并以<script src>引用，且只加载正文用到的库；
 3. 预置思源宋体子集的Base64字体，用于PDF/HTML一体化导出，避免缺字或额外系统依赖。
 """
 
@@ -11,11 +12,13 @@ from __future__ import annotations
 
 import ast
 import copy
+import hashlib
 import html
 import json
 import os
 import re
 import base64
+import threading
 from pathlib import Path
 from typing import Any, Dict, List
 from loguru import logger
@@ -75,6 +78,57 @@ class HTMLRenderer:
     TABLE_COMPLEX_CHARS = set(
         "@％%（）()，,。；;：:、？?！!·…-—_+<>[]{}|\\/\"'`~$^&*#"
     )
+    # 第三方库：key -> (libs目录下的文件名, CDN备用链接, 加载检测表达式, 库名称, 是否defer)
+    # 字典顺序即<head>中的加载顺序（sankey插件依赖Chart.js）
+    THIRD_PARTY_LIBS = {
+        "chartjs": (
+            "chart.js",
+            "https://cdn.jsdelivr.net/npm/chart.js",
+            "typeof Chart !== 'undefined'",
+            "Chart.js",
+            False,
+        ),
+        "sankey": (
+            "chartjs-chart-sankey.js",
+            "https://cdn.jsdelivr.net/npm/chartjs-chart-sankey@4",
+            "typeof Chart !== 'undefined' && Chart.controllers && Chart.controllers.sankey",
+            "chartjs-chart-sankey",
+            False,
+        ),
+        "wordcloud": (
+            "wordcloud2.min.js",
+            "https://cdnjs.cloudflare.com/ajax/libs/wordcloud2.js/1.2.2/wordcloud2.min.js",
+            "typeof WordCloud !== 'undefined'",
+            "wordcloud2",
+            False,
+        ),
+        "html2canvas": (
+            "html2canvas.min.js",
+            "https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js",
+            "typeof html2canvas !== 'undefined'",
+            "html2canvas",
+            False,
+        ),
+        "jspdf": (
+            "jspdf.umd.min.js",
+            "https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js",
+            "typeof jspdf !== 'undefined'",
+            "jsPDF",
+            False,
+        ),
+        "mathjax": (
+            "mathjax.js",
+            "https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js",
+            "typeof MathJax !== 'undefined'",
+            "MathJax",
+            True,
+        ),
+    }
+    DEFAULT_ASSET_DIR = "final_reports/assets"
+    DEFAULT_ASSET_URL_PREFIX = "/api/report/assets"
+    # external模式已写出的库：(静态目录, 文件名) -> 带内容哈希的文件名，进程内共享
+    _published_assets: Dict[tuple, str] = {}
+    _published_assets_lock = threading.Lock()
 
     def __init__(self, config: Dict[str, Any] | None = None):
         """
@@ -85,10 +139,14 @@ class HTMLRenderer:
           典型键值：
             - themeOverride: 覆盖元数据里的 themeTokens；
             - enableDebug: bool，是否输出额外日志。
+            - assetMode: "inline"（默认，第三方库内联，自包含可离线）或 "external"
+              （库按内容哈希写入 assetDir，HTML 通过 <script src> 引用，可被浏览器长期缓存）；
+            - assetDir / assetUrlPrefix: external 模式下的静态目录与引用URL前缀。
         内部状态：
         - self.document/metadata/chapters：保存一次渲染周期的 IR；
         - self.widget_scripts：收集图表配置 JSON，后续在 _render_body 尾部注水；
         - self._lib_cache/_pdf_font_base64：缓存本地库与字体，避免重复IO；
+        - self.static_widget_html/static_math_svg：PDF导出时的图表/公式静态替身，渲染时直接输出；
         - self.chart_validator/chart_repairer：Chart.js 配置的本地与 LLM 兜底修复器；
         - self.chart_validation_stats：记录总量/修复来源/失败数量，便于日志审计。
         """
@@ -109,6 +167,9 @@ class HTMLRenderer:
         self._current_chapter: Dict[str, Any] | None = None
         self._lib_cache: Dict[str, str] = {}
         self._pdf_font_base64: str | None = None
+        # PDF模式下由PDFRenderer提供的静态替身：widgetId -> 替换canvas的HTML，mathId -> 公式SVG
+        self.static_widget_html: Dict[str, str] = {}
+        self.static_math_svg: Dict[str, str] = {}
 
         # 初始化图表验证和修复器
         self.chart_validator = create_chart_validator()
@@ -188,13 +249,14 @@ class HTMLRenderer:
         cdn_url: str,
         check_expression: str,
         lib_name: str,
-        is_defer: bool = False
+        is_defer: bool = False,
+        src_url: str | None = None
     ) -> str:
         """
         构建带有CDN fallback机制的script标签
 
         策略：
-        1. 优先嵌入本地库代码
+        1. 优先嵌入本地库代码（external模式下改为引用 src_url）
         2. 添加检测脚本，验证库是否成功加载
         3. 如果检测失败，动态加载CDN版本作为备用
 
@@ -204,15 +266,18 @@ class HTMLRenderer:
             check_expression: JavaScript表达式，用于检测库是否加载成功
             lib_name: 库名称（用于日志输出）
             is_defer: 是否使用defer属性
+            src_url: 外部静态库地址，提供时不再内联代码
 
         返回:
             str: 完整的script标签HTML
         """
         defer_attr = ' defer' if is_defer else ''
 
-        if inline_code:
-            # 嵌入本地库代码，并添加fallback检测
-            return f"""
+        if src_url:
+            load_tag = f"""
+  <script{defer_attr} src="{self._escape_attr(src_url)}"></script>"""
+        elif inline_code:
+            load_tag = f"""
   <script{defer_attr}>
     // {lib_name} - 嵌入式版本
     try {{
@@ -220,7 +285,13 @@ class HTMLRenderer:
     }} catch (e) {{
       console.error('{lib_name}嵌入式加载失败:', e);
     }}
-  </script>
+  </script>"""
+        else:
+            load_tag = ""
+
+        if load_tag:
+            # 加载本地库，并添加fallback检测
+            return f"""{load_tag}
   <script{defer_attr}>
     // {lib_name} - CDN Fallback检测
     (function() {{
@@ -254,6 +325,95 @@ class HTMLRenderer:
             logger.warning(f"{lib_name}本地文件未找到或读取失败，将直接使用CDN")
             return f'  <script{defer_attr} src="{cdn_url}"></script>'
 
+    def _asset_mode(self) -> str:
+        mode = str(self.config.get("assetMode") or "inline").lower()
+        return mode if mode in {"inline", "external"} else "inline"
+
+    def _publish_external_asset(self, filename: str) -> str | None:
+        """
+        将库文件按内容哈希写入静态目录（已存在则复用），返回HTML中引用的URL。
+
+        文件名形如 chart.<sha256前16位>.js，内容变化即换名，可安全设置长期缓存。
+        读取或写入失败时返回None，调用方回退为内联。
+        """
+        asset_dir = Path(self.config.get("assetDir") or self.DEFAULT_ASSET_DIR)
+        key = (str(asset_dir.resolve()), filename)
+        with self._published_assets_lock:
+            hashed_name = self._published_assets.get(key)
+            if hashed_name is None or not (asset_dir / hashed_name).exists():
+                try:
+                    data = (self._get_lib_path() / filename).read_bytes()
+                    digest = hashlib.sha256(data).hexdigest()[:16]
+                    source = Path(filename)
+                    hashed_name = f"{source.stem}.{digest}{source.suffix}"
+                    target = asset_dir / hashed_name
+                    if not target.exists():
+                        asset_dir.mkdir(parents=True, exist_ok=True)
+                        tmp_path = asset_dir / f".{hashed_name}.{os.getpid()}.tmp"
+                        tmp_path.write_bytes(data)
+                        os.replace(tmp_path, target)
+                        logger.info(f"已写出静态库文件: {target}")
+                except OSError as exc:
+                    logger.warning(f"写出静态库文件 {filename} 失败，改为内联: {exc}")
+                    return None
+                self._published_assets[key] = hashed_name
+        prefix = str(self.config.get("assetUrlPrefix") or self.DEFAULT_ASSET_URL_PREFIX).rstrip("/")
+        return f"{prefix}/{hashed_name}"
+
+    def _build_lib_tag(self, key: str) -> str:
+        """按当前资源模式构建单个第三方库的script标签"""
+        filename, cdn_url, check_expression, lib_name, is_defer = self.THIRD_PARTY_LIBS[key]
+        src_url = self._publish_external_asset(filename) if self._asset_mode() == "external" else None
+        return self._build_script_with_fallback(
+            inline_code="" if src_url else self._load_lib(filename),
+            cdn_url=cdn_url,
+            check_expression=check_expression,
+            lib_name=lib_name,
+            is_defer=is_defer,
+            src_url=src_url,
+        )
+
+    def _detect_required_libs(self, body_html: str) -> set[str]:
+        """根据已渲染的正文判断需要加载的第三方库"""
+        # 导出按钮依赖 html2canvas + jsPDF，始终加载
+        required = {"html2canvas", "jspdf"}
+        if self.widget_scripts:
+            required.add("chartjs")
+            if any("sankey" in script.lower() for script in self.widget_scripts):
+                required.add("sankey")
+        if "wordcloud-card" in body_html:
+            required.add("wordcloud")
+        if 'class="math-block"' in body_html or 'class="math-inline"' in body_html:
+            required.add("mathjax")
+        return required
+
+    def set_static_media(
+        self,
+        widget_html: Dict[str, str] | None = None,
+        math_svg: Dict[str, str] | None = None,
+    ) -> None:
+        """
+        设置PDF导出使用的静态替身，渲染时直接替换对应的canvas与公式占位。
+
+        参数:
+            widget_html: widgetId -> 替换canvas的HTML（SVG图表或词云图片），对应fallback会被隐藏；
+            math_svg: mathId -> 公式SVG（已去除XML声明）。
+            均为空时恢复交互式输出。
+        """
+        self.static_widget_html = dict(widget_html or {})
+        self.static_math_svg = dict(math_svg or {})
+
+    def _static_math_html(self, math_id: Any, display: bool) -> str | None:
+        """若存在公式的静态SVG，返回块级/行内容器HTML"""
+        if not math_id or not isinstance(math_id, str):
+            return None
+        svg_content = self.static_math_svg.get(math_id)
+        if not svg_content:
+            return None
+        if display:
+            return f'<div class="math-svg-container">{svg_content}</div>'
+        return f'<span class="math-svg-inline">{svg_content}</span>'
+
     # ====== 公共入口 ======
 
     def render(self, document_ir: Dict[str, Any]) -> str:
@@ -299,8 +459,9 @@ class HTMLRenderer:
         hero_kpis = (metadata.get("hero") or {}).get("kpis")
         self.hero_kpi_signature = self._kpi_signature_from_items(hero_kpis)
 
-        head = self._render_head(title, theme_tokens)
+        # 先渲染正文，再根据正文实际用到的组件决定<head>加载哪些第三方库
         body = self._render_body()
+        head = self._render_head(title, theme_tokens, self._detect_required_libs(body))
 
         # 输出图表验证统计
         self._log_chart_validation_stats()
@@ -342,7 +503,12 @@ class HTMLRenderer:
             result["dark"] = self._resolve_color_value(value.get("dark") or value.get("darker"), result["dark"])
         return result
 
-    def _render_head(self, title: str, theme_tokens: Dict[str, Any]) -> str:
+    def _render_head(
+        self,
+        title: str,
+        theme_tokens: Dict[str, Any],
+        required_libs: set[str] | None = None,
+    ) -> str:
         """
         渲染<head>部分，加载主题CSS与必要的脚本依赖。
 
@@ -352,69 +518,37 @@ class HTMLRenderer:
               - colors: {primary/secondary/bg/text/card/border/...}
               - typography: {fontFamily, fonts:{body,heading}}，body/heading 为空时回落到系统字体
               - spacing: {container,gutter/pagePadding}
+            required_libs: 需要加载的第三方库（THIRD_PARTY_LIBS 的key），None 表示全部加载。
 
         返回:
             str: head片段HTML。
         """
         css = self._build_css(theme_tokens)
 
-        # 加载第三方库
-        chartjs = self._load_lib("chart.js")
-        chartjs_sankey = self._load_lib("chartjs-chart-sankey.js")
-        html2canvas = self._load_lib("html2canvas.min.js")
-        jspdf = self._load_lib("jspdf.umd.min.js")
-        mathjax = self._load_lib("mathjax.js")
-        wordcloud2 = self._load_lib("wordcloud2.min.js")
-
-        # 生成嵌入式script标签，并为每个库添加CDN fallback机制
-        # Chart.js - 主要图表库
-        chartjs_tag = self._build_script_with_fallback(
-            inline_code=chartjs,
-            cdn_url="https://cdn.jsdelivr.net/npm/chart.js",
-            check_expression="typeof Chart !== 'undefined'",
-            lib_name="Chart.js"
-        )
-
-        # Chart.js Sankey插件
-        sankey_tag = self._build_script_with_fallback(
-            inline_code=chartjs_sankey,
-            cdn_url="https://cdn.jsdelivr.net/npm/chartjs-chart-sankey@4",
-            check_expression="typeof Chart !== 'undefined' && Chart.controllers && Chart.controllers.sankey",
-            lib_name="chartjs-chart-sankey"
-        )
-
-        # wordcloud2 - 词云渲染
-        wordcloud_tag = self._build_script_with_fallback(
-            inline_code=wordcloud2,
-            cdn_url="https://cdnjs.cloudflare.com/ajax/libs/wordcloud2.js/1.2.2/wordcloud2.min.js",
-            check_expression="typeof WordCloud !== 'undefined'",
-            lib_name="wordcloud2"
-        )
-
-        # html2canvas - 用于截图
-        html2canvas_tag = self._build_script_with_fallback(
-            inline_code=html2canvas,
-            cdn_url="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js",
-            check_expression="typeof html2canvas !== 'undefined'",
-            lib_name="html2canvas"
-        )
-
-        # jsPDF - 用于PDF导出
-        jspdf_tag = self._build_script_with_fallback(
-            inline_code=jspdf,
-            cdn_url="https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js",
-            check_expression="typeof jspdf !== 'undefined'",
-            lib_name="jsPDF"
-        )
-
-        # MathJax - 数学公式渲染
-        mathjax_tag = self._build_script_with_fallback(
-            inline_code=mathjax,
-            cdn_url="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js",
-            check_expression="typeof MathJax !== 'undefined'",
-            lib_name="MathJax",
-            is_defer=True
-        )
+        # 生成第三方库script标签，并为每个库添加CDN fallback机制；未用到的库不再加载
+        lib_tags = {
+            key: self._build_lib_tag(key) if required_libs is None or key in required_libs else ""
+            for key in self.THIRD_PARTY_LIBS
+        }
+        chartjs_tag = lib_tags["chartjs"]
+        sankey_tag = lib_tags["sankey"]
+        wordcloud_tag = lib_tags["wordcloud"]
+        html2canvas_tag = lib_tags["html2canvas"]
+        jspdf_tag = lib_tags["jspdf"]
+        mathjax_tag = lib_tags["mathjax"]
+
+        mathjax_config = """<script>
+    window.MathJax = {
+      tex: {
+        inlineMath: [['$', '$'], ['\\\\(', '\\\\)']],
+        displayMath: [['$$','$$'], ['\\\\[','\\\\]']]
+      },
+      options: {
+        skipHtmlTags: ['script','noscript','style','textarea','pre','code'],
+        processEscapes: true
+      }
+    };
+  </script>""" if mathjax_tag else ""
 
         # PDF字体数据不再嵌入HTML，减小文件体积
         pdf_font_script = ""
@@ -430,18 +564,7 @@ class HTMLRenderer:
   {wordcloud_tag}
   {html2canvas_tag}
   {jspdf_tag}
-  <script>
-    window.MathJax = {{
-      tex: {{
-        inlineMath: [['$', '$'], ['\\\\(', '\\\\)']],
-        displayMath: [['$$','$$'], ['\\\\[','\\\\]']]
-      }},
-      options: {{
-        skipHtmlTags: ['script','noscript','style','textarea','pre','code'],
-        processEscapes: true
-      }}
-    }};
-  </script>
+  {mathjax_config}
   {mathjax_tag}
   {pdf_font_script}
   <style>
@@ -1187,7 +1310,7 @@ class HTMLRenderer:
             math_id_hint,
             allow_display_block=True
         )
-        if rendered and rendered.strip().startswith('<div class="math-block"'):
+        if rendered and rendered.strip().startswith(('<div class="math-block"', '<div class="math-svg-container"')):
             return rendered
         return None
 
@@ -1873,6 +1996,9 @@ class HTMLRenderer:
 
     def _render_math(self, block: Dict[str, Any]) -> str:
         """渲染数学公式，占位符交给外部MathJax或后处理"""
+        static_html = self._static_math_html(block.get("mathId"), display=True)
+        if static_html:
+            return static_html
         latex_raw = block.get("latex", "")
         latex = self._escape_html(self._normalize_latex_string(latex_raw))
         math_id = self._escape_attr(block.get("mathId", "")) if block.get("mathId") else ""
@@ -2325,11 +2451,17 @@ class HTMLRenderer:
             if is_wordcloud
             else self._render_widget_fallback(normalized_data, block.get("widgetId"))
         )
+        canvas_html = f'<canvas id="{canvas_id}" data-config-id="{config_id}"></canvas>'
+        static_html = self.static_widget_html.get(widget_id) if widget_id else None
+        if static_html:
+            # PDF模式：直接输出SVG/图片，并隐藏兜底表格避免重复
+            canvas_html = static_html
+            fallback_html = fallback_html.replace('class="chart-fallback"', 'class="chart-fallback svg-hidden"', 1)
         return f"""
         <div class="chart-card{' wordcloud-card' if is_wordcloud else ''}">
           {title_html}
           <div class="chart-container">
-            <canvas id="{canvas_id}" data-config-id="{config_id}"></canvas>
+            {canvas_html}
           </div>
           {fallback_html}
         </div>
@@ -2690,15 +2822,16 @@ class HTMLRenderer:
                 not text[end:].strip()
             )
             use_block = allow_display_block and is_display and is_standalone
+            static_html = self._static_math_html(mid, display=use_block)
             if use_block:
                 # 独立display公式，跳过两侧空白，直接渲染块级
-                parts.append(f'<div class="math-block"{id_attr}>$$ {self._escape_html(latex)} $$</div>')
+                parts.append(static_html or f'<div class="math-block"{id_attr}>$$ {self._escape_html(latex)} $$</div>')
                 cursor = len(text)
                 break
             else:
                 if prefix:
                     parts.append(self._escape_html(prefix))
-                parts.append(f'<span class="math-inline"{id_attr}>\\( {self._escape_html(latex)} \\)</span>')
+                parts.append(static_html or f'<span class="math-inline"{id_attr}>\\( {self._escape_html(latex)} \\)</span>')
             cursor = end
 
         if cursor < len(text):
@@ -2733,6 +2866,9 @@ class HTMLRenderer:
             latex = self._normalize_latex_string(math_mark.get("value"))
             if not isinstance(latex, str) or not latex.strip():
                 latex = self._normalize_latex_string(text_value)
+            static_html = self._static_math_html(run.get("mathId"), display=False)
+            if static_html:
+                return static_html
             math_id = self._escape_attr(run.get("mathId", "")) if run.get("mathId") else ""
             id_attr = f' data-math-id="{math_id}"' if math_id else ""
             return f'<span class="math-inline"{id_attr}>\\( {self._escape_html(latex)} \\)</span>'
@@ -170,8 +170,7 @@ def convert_math_block_to_svg(
     Returns:
         SVG 字符串，如果转换失败则返回 None
     """
-    converter = MathToSVG(font_size=font_size, color=color)
-    return converter.convert_display_to_svg(latex)
+    return _cached_convert(latex, True, font_size, color)
 
 
 def convert_math_inline_to_svg(
@@ -190,8 +189,22 @@ def convert_math_inline_to_svg(
     Returns:
         SVG 字符串，如果转换失败则返回 None
     """
-    converter = MathToSVG(font_size=font_size, color=color)
-    return converter.convert_inline_to_svg(latex)
+    return _cached_convert(latex, False, font_size, color)
+
+
+def _cached_convert(latex: str, display_mode: bool, font_size: int, color: str) -> Optional[str]:
+    """经由SVG磁盘缓存转换，与PDF渲染器共用同一份缓存"""
+    from .svg_cache import get_svg_cache, math_svg_key
+
+    cache = get_svg_cache()
+    key = math_svg_key(latex, display_mode, font_size, color)
+    svg = cache.get(key)
+    if svg:
+        return svg
+    svg = MathToSVG(font_size=font_size, color=color).convert_to_svg(latex, display_mode=display_mode)
+    if svg:
+        cache.put(key, svg)
+    return svg
 
 
 if __name__ == "__main__":
@@ -11,8 +11,9 @@ import os
 import sys
 import io
 import re
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 from ReportEngine.utils.dependency_check import (
@@ -67,10 +68,23 @@ except Exception as e:
     PDF_DEP_STATUS = f"WeasyPrint 加载失败: {e}，PDF导出功能将不可用"
     logger.warning(PDF_DEP_STATUS)
 
+from ReportEngine.utils.config import settings
+
+# PDF生成阶段进度回调：(阶段说明, 进度百分比)
+ProgressCallback = Callable[[str, int], None]
 from .html_renderer import HTMLRenderer
 from .pdf_layout_optimizer import PDFLayoutOptimizer, PDFLayoutConfig
 from .chart_to_svg import create_chart_converter
 from .math_to_svg import MathToSVG
+from .svg_cache import chart_svg_key, get_svg_cache, math_svg_key
+from .svg_worker_pool import (
+    CHART_SVG_SIZE,
+    MATH_COLOR,
+    MATH_FONT_SIZE,
+    SVGJob,
+    get_svg_worker_pool,
+    resolve_worker_count,
+)
 try:
     from wordcloud import WordCloud
     WORDCLOUD_AVAILABLE = True
@@ -112,8 +126,10 @@ class PDFRenderer:
             )
 
         # 初始化图表转换器
+        self._chart_font_path: Optional[str] = None
         try:
             font_path = self._get_font_path()
+            self._chart_font_path = str(font_path)
             self.chart_converter = create_chart_converter(font_path=str(font_path))
             logger.info("图表SVG转换器初始化成功")
         except Exception as e:
@@ -121,12 +137,18 @@ class PDFRenderer:
 
         # 初始化数学公式转换器
         try:
-            self.math_converter = MathToSVG(font_size=16, color='black')
+            self.math_converter = MathToSVG(font_size=MATH_FONT_SIZE, color=MATH_COLOR)
             logger.info("数学公式SVG转换器初始化成功")
         except Exception as e:
             logger.warning(f"数学公式SVG转换器初始化失败: {e}，公式将显示为文本")
             self.math_converter = None
 
+        # 图表/公式SVG转换进程数：0 为自动，1 为串行
+        configured_workers = self.config.get('svgWorkers')
+        if configured_workers is None:
+            configured_workers = settings.PDF_SVG_WORKERS
+        self.svg_workers = resolve_worker_count(int(configured_workers))
+
     @staticmethod
     def _get_font_path() -> Path:
         """获取字体文件路径"""
@@ -262,6 +284,60 @@ class PDFRenderer:
 
         return ir_copy
 
+    def _run_svg_jobs(self, jobs: List[SVGJob]) -> Dict[str, Optional[str]]:
+        """
+        执行收集到的SVG转换任务
+
+        先查磁盘缓存，未命中的任务在多于一个时分发给预热的进程池并行转换，
+        进程池不可用时退回串行；返回ID到SVG（失败为None）的映射，顺序与jobs一致。
+        """
+        if not jobs:
+            return {}
+        cache = get_svg_cache()
+        cache_keys = {key: self._svg_cache_key(kind, payload) for kind, key, payload in jobs}
+        cached: Dict[str, str] = {}
+        for _, key, _ in jobs:
+            svg_content = cache.get(cache_keys[key])
+            if svg_content:
+                cached[key] = svg_content
+        pending = [job for job in jobs if job[1] not in cached]
+        if cached:
+            logger.info(f"SVG缓存命中 {len(cached)} 个，需重新渲染 {len(pending)} 个")
+
+        converted: Dict[str, Optional[str]] | None = None
+        if len(pending) > 1:
+            pool = get_svg_worker_pool(self.svg_workers, self._chart_font_path)
+            if pool is not None:
+                converted = pool.convert(pending, timeout=settings.PDF_SVG_TIMEOUT)
+        if converted is None:
+            converted = {key: self._convert_svg_job(kind, key, payload) for kind, key, payload in pending}
+        for key, svg_content in converted.items():
+            if svg_content:
+                cache.put(cache_keys[key], svg_content)
+
+        return {key: cached.get(key) or converted.get(key) for _, key, _ in jobs}
+
+    def _svg_cache_key(self, kind: str, payload: Any) -> str:
+        if kind == 'chart':
+            return chart_svg_key(payload, CHART_SVG_SIZE, self._chart_font_path)
+        latex, is_display = payload
+        return math_svg_key(latex, is_display, MATH_FONT_SIZE, MATH_COLOR)
+
+    def _convert_svg_job(self, kind: str, key: str, payload: Any) -> Optional[str]:
+        """在当前进程中串行转换单个任务"""
+        try:
+            if kind == 'chart':
+                return self.chart_converter.convert_widget_to_svg(payload, **CHART_SVG_SIZE)
+            latex, is_display = payload
+            return (
+                self.math_converter.convert_display_to_svg(latex)
+                if is_display else
+                self.math_converter.convert_inline_to_svg(latex)
+            )
+        except Exception as e:
+            logger.error(f"转换 {key} 为SVG时出错: {e}")
+            return None
+
     def _convert_charts_to_svg(self, document_ir: Dict[str, Any]) -> Dict[str, str]:
         """
         将document_ir中的所有图表转换为SVG
@@ -278,11 +354,19 @@ class PDFRenderer:
             logger.warning("图表转换器未初始化，跳过图表转换")
             return svg_map
 
-        # 遍历所有章节
+        # 先收集全部图表，再统一分发给进程池（或串行）转换
+        jobs: List[SVGJob] = []
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_and_convert_widgets(blocks, svg_map)
+            self._extract_and_convert_widgets(blocks, jobs)
+
+        for widget_id, svg_content in self._run_svg_jobs(jobs).items():
+            if svg_content:
+                svg_map[widget_id] = svg_content
+                logger.debug(f"图表 {widget_id} 转换为SVG成功")
+            else:
+                logger.warning(f"图表 {widget_id} 转换为SVG失败")
 
         logger.info(f"成功转换 {len(svg_map)} 个图表为SVG")
         return svg_map
@@ -310,14 +394,14 @@ class PDFRenderer:
     def _extract_and_convert_widgets(
         self,
         blocks: list,
-        svg_map: Dict[str, str]
+        jobs: List[SVGJob]
     ) -> None:
         """
-        递归遍历blocks，找到所有widget并转换为SVG
+        递归遍历blocks，找到所有需要转换为SVG的widget
 
         参数:
             blocks: block列表
-            svg_map: 用于存储转换结果的字典
+            jobs: 用于收集转换任务的列表（按文档顺序）
         """
         for block in blocks:
             if not isinstance(block, dict):
@@ -346,32 +430,19 @@ class PDFRenderer:
                             f"{f'，原因: {fail_reason}' if fail_reason else ''}"
                         )
                         continue
-                    try:
-                        svg_content = self.chart_converter.convert_widget_to_svg(
-                            block,
-                            width=800,
-                            height=500,
-                            dpi=100
-                        )
-                        if svg_content:
-                            svg_map[widget_id] = svg_content
-                            logger.debug(f"图表 {widget_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"图表 {widget_id} 转换为SVG失败")
-                    except Exception as e:
-                        logger.error(f"转换图表 {widget_id} 时出错: {e}")
+                    jobs.append(('chart', widget_id, block))
 
             # 递归处理嵌套的blocks
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_and_convert_widgets(nested_blocks, svg_map)
+                self._extract_and_convert_widgets(nested_blocks, jobs)
 
             # 处理列表项
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_and_convert_widgets(item, svg_map)
+                        self._extract_and_convert_widgets(item, jobs)
 
             # 处理表格单元格
             if block_type == 'table':
@@ -381,7 +452,7 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_and_convert_widgets(cell_blocks, svg_map)
+                            self._extract_and_convert_widgets(cell_blocks, jobs)
 
     def _extract_wordcloud_widgets(
         self,
@@ -510,12 +581,24 @@ class PDFRenderer:
             logger.warning("数学公式转换器未初始化，跳过公式转换")
             return svg_map
 
-        # 遍历所有章节，保持全局计数器避免ID重复
+        # 遍历所有章节，保持全局计数器避免ID重复；先收集公式，再统一转换
         block_counter = [0]
+        jobs: List[SVGJob] = []
+        math_blocks: Dict[str, Dict[str, Any]] = {}
         chapters = document_ir.get('chapters', [])
         for chapter in chapters:
             blocks = chapter.get('blocks', [])
-            self._extract_and_convert_math_blocks(blocks, svg_map, block_counter)
+            self._extract_and_convert_math_blocks(blocks, jobs, block_counter, math_blocks)
+
+        for math_id, svg_content in self._run_svg_jobs(jobs).items():
+            if svg_content:
+                svg_map[math_id] = svg_content
+                # 将ID添加到block中，以便渲染时识别
+                if math_id in math_blocks:
+                    math_blocks[math_id]['mathId'] = math_id
+                logger.debug(f"公式 {math_id} 转换为SVG成功")
+            else:
+                logger.warning(f"公式 {math_id} 转换为SVG失败")
 
         logger.info(f"成功转换 {len(svg_map)} 个数学公式为SVG")
         return svg_map
@@ -523,19 +606,23 @@ class PDFRenderer:
     def _extract_and_convert_math_blocks(
         self,
         blocks: list,
-        svg_map: Dict[str, str],
-        block_counter: list = None
+        jobs: List[SVGJob],
+        block_counter: list = None,
+        math_blocks: Dict[str, Dict[str, Any]] | None = None
     ) -> None:
         """
-        递归遍历blocks，找到所有math块并转换为SVG
+        递归遍历blocks，找到所有数学公式并收集为SVG转换任务
 
         参数:
             blocks: block列表
-            svg_map: 用于存储转换结果的字典
+            jobs: 用于收集转换任务的列表（按文档顺序）
             block_counter: 用于生成唯一ID的计数器
+            math_blocks: 公式块ID到block的映射，转换成功后回写mathId
         """
         if block_counter is None:
             block_counter = [0]
+        if math_blocks is None:
+            math_blocks = {}
 
         def _extract_inline_math_from_inlines(inlines: list):
             """从段落内联节点中提取数学公式"""
@@ -558,19 +645,7 @@ class PDFRenderer:
                     block_counter[0] += 1
                     math_id = run.get('mathId') or f"math-inline-{block_counter[0]}"
                     run['mathId'] = math_id
-                    try:
-                        svg_content = (
-                            self.math_converter.convert_display_to_svg(latex)
-                            if is_display else
-                            self.math_converter.convert_inline_to_svg(latex)
-                        )
-                        if svg_content:
-                            svg_map[math_id] = svg_content
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
-                    except Exception as exc:
-                        logger.error(f"转换内联公式 {latex[:50]}... 时出错: {exc}")
+                    jobs.append(('math', math_id, (latex, is_display)))
                     continue
 
                 # 无math mark，尝试解析文本中的多个公式
@@ -587,19 +662,7 @@ class PDFRenderer:
                     block_counter[0] += 1
                     math_id = f"auto-math-{block_counter[0]}"
                     ids_for_html.append(math_id)
-                    try:
-                        svg_content = (
-                            self.math_converter.convert_display_to_svg(latex)
-                            if is_display else
-                            self.math_converter.convert_inline_to_svg(latex)
-                        )
-                        if svg_content:
-                            svg_map[math_id] = svg_content
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
-                    except Exception as exc:
-                        logger.error(f"转换内联公式 {latex[:50]}... 时出错: {exc}")
+                    jobs.append(('math', math_id, (latex, is_display)))
                 if ids_for_html:
                     # 将ID列表写回run，便于HTML渲染时使用相同ID（顺序对应segments）
                     run['mathIds'] = ids_for_html
@@ -616,17 +679,8 @@ class PDFRenderer:
                 if latex:
                     block_counter[0] += 1
                     math_id = f"math-block-{block_counter[0]}"
-                    try:
-                        svg_content = self.math_converter.convert_display_to_svg(latex)
-                        if svg_content:
-                            svg_map[math_id] = svg_content
-                            # 将ID添加到block中，以便后续注入时识别
-                            block['mathId'] = math_id
-                            logger.debug(f"公式 {math_id} 转换为SVG成功")
-                        else:
-                            logger.warning(f"公式 {math_id} 转换为SVG失败: {latex[:50]}...")
-                    except Exception as e:
-                        logger.error(f"转换公式 {latex[:50]}... 时出错: {e}")
+                    math_blocks[math_id] = block
+                    jobs.append(('math', math_id, (latex, True)))
             else:
                 # 提取段落、表格等内部的内联公式
                 inlines = block.get('inlines')
@@ -636,14 +690,14 @@ class PDFRenderer:
             # 递归处理嵌套的blocks
             nested_blocks = block.get('blocks')
             if isinstance(nested_blocks, list):
-                self._extract_and_convert_math_blocks(nested_blocks, svg_map, block_counter)
+                self._extract_and_convert_math_blocks(nested_blocks, jobs, block_counter, math_blocks)
 
             # 处理列表项
             if block_type == 'list':
                 items = block.get('items', [])
                 for item in items:
                     if isinstance(item, list):
-                        self._extract_and_convert_math_blocks(item, svg_map, block_counter)
+                        self._extract_and_convert_math_blocks(item, jobs, block_counter, math_blocks)
 
             # 处理表格单元格
             if block_type == 'table':
@@ -653,73 +707,50 @@ class PDFRenderer:
                     for cell in cells:
                         cell_blocks = cell.get('blocks', [])
                         if isinstance(cell_blocks, list):
-                            self._extract_and_convert_math_blocks(cell_blocks, svg_map, block_counter)
+                            self._extract_and_convert_math_blocks(cell_blocks, jobs, block_counter, math_blocks)
 
             # 处理callout内部的blocks
             if block_type == 'callout':
                 callout_blocks = block.get('blocks', [])
                 if isinstance(callout_blocks, list):
-                    self._extract_and_convert_math_blocks(callout_blocks, svg_map, block_counter)
+                    self._extract_and_convert_math_blocks(callout_blocks, jobs, block_counter, math_blocks)
 
-    def _inject_svg_into_html(self, html: str, svg_map: Dict[str, str]) -> str:
-        """
-        将SVG内容直接注入到HTML中（不使用JavaScript）
+    @staticmethod
+    def _strip_svg_prolog(svg_content: str) -> str:
+        """移除XML声明与DOCTYPE，SVG将直接嵌入HTML"""
+        svg_content = re.sub(r'<\?xml[^>]+\?>', '', svg_content)
+        svg_content = re.sub(r'<!DOCTYPE[^>]+>', '', svg_content)
+        return svg_content.strip()
 
-        参数:
-            html: 原始HTML内容
-            svg_map: widgetId到SVG内容的映射
+    def _build_static_media(
+        self,
+        svg_map: Dict[str, str],
+        wordcloud_map: Dict[str, str],
+        math_svg_map: Dict[str, str],
+    ) -> tuple[Dict[str, str], Dict[str, str]]:
+        """
+        把图表SVG、词云图片与公式SVG整理为HTMLRenderer渲染时直接输出的替身，
+        取代渲染后逐个用正则改写整份HTML的做法。
 
         返回:
-            str: 注入SVG后的HTML
+            (widgetId -> 替换canvas的HTML, mathId -> 公式SVG)
         """
-        if not svg_map:
-            return html
-
-        import re
-
-        # 为每个widgetId查找对应的canvas并替换为SVG
+        widget_html: Dict[str, str] = {}
         for widget_id, svg_content in svg_map.items():
-            # 清理SVG内容（移除XML声明，因为SVG将嵌入HTML）
-            svg_content = re.sub(r'<\?xml[^>]+\?>', '', svg_content)
-            svg_content = re.sub(r'<!DOCTYPE[^>]+>', '', svg_content)
-            svg_content = svg_content.strip()
-
-            # 创建SVG容器HTML
-            svg_html = f'<div class="chart-svg-container">{svg_content}</div>'
-
-            # 查找包含此widgetId的配置脚本（限制在同一个</script>内，避免跨标签误配）
-            config_pattern = rf'<script[^>]+id="([^"]+)"[^>]*>(?:(?!</script>).)*?"widgetId"\s*:\s*"{re.escape(widget_id)}"(?:(?!</script>).)*?</script>'
-            match = re.search(config_pattern, html, re.DOTALL)
-
-            if match:
-                config_id = match.group(1)
-
-                # 查找对应的canvas元素
-                # 格式: <canvas id="chart-N" data-config-id="chart-config-N"></canvas>
-                canvas_pattern = rf'<canvas[^>]+data-config-id="{re.escape(config_id)}"[^>]*></canvas>'
-
-                # 【修复】替换canvas为SVG，使用lambda避免反斜杠转义问题
-                html, replaced = re.subn(canvas_pattern, lambda m: svg_html, html, count=1)
-                if replaced:
-                    logger.debug(f"已替换图表 {widget_id} 的canvas为SVG")
-                else:
-                    logger.warning(f"未找到图表 {widget_id} 的canvas进行替换")
-
-                # 将对应fallback标记为隐藏，避免PDF中出现重复表格
-                fallback_pattern = rf'<div class="chart-fallback"([^>]*data-widget-id="{re.escape(widget_id)}"[^>]*)>'
-
-                def _hide_fallback(m: re.Match) -> str:
-                    """为匹配到的图表fallback添加隐藏类，防止PDF中重复渲染"""
-                    tag = m.group(0)
-                    if 'svg-hidden' in tag:
-                        return tag
-                    return tag.replace('chart-fallback"', 'chart-fallback svg-hidden"', 1)
-
-                html = re.sub(fallback_pattern, _hide_fallback, html, count=1)
-            else:
-                logger.warning(f"未找到图表 {widget_id} 对应的配置脚本")
-
-        return html
+            widget_html[widget_id] = (
+                f'<div class="chart-svg-container">{self._strip_svg_prolog(svg_content)}</div>'
+            )
+        for widget_id, data_uri in wordcloud_map.items():
+            widget_html[widget_id] = (
+                f'<div class="chart-svg-container wordcloud-img">'
+                f'<img src="{data_uri}" alt="词云" />'
+                f'</div>'
+            )
+        math_svg = {
+            math_id: self._strip_svg_prolog(svg_content)
+            for math_id, svg_content in math_svg_map.items()
+        }
+        return widget_html, math_svg
 
     @staticmethod
     def _normalize_latex(raw: Any) -> str:
@@ -789,107 +820,12 @@ class PDFRenderer:
             results.append((latex, is_display))
         return results
 
-    def _inject_wordcloud_images(self, html: str, img_map: Dict[str, str]) -> str:
-        """
-        将词云PNG data URI注入HTML，替换对应canvas
-        """
-        if not img_map:
-            return html
-
-        import re
-
-        for widget_id, data_uri in img_map.items():
-            img_html = (
-                f'<div class="chart-svg-container wordcloud-img">'
-                f'<img src="{data_uri}" alt="词云" />'
-                f'</div>'
-            )
-
-            config_pattern = rf'<script[^>]+id="([^"]+)"[^>]*>(?:(?!</script>).)*?"widgetId"\s*:\s*"{re.escape(widget_id)}"(?:(?!</script>).)*?</script>'
-            match = re.search(config_pattern, html, re.DOTALL)
-            if not match:
-                logger.debug(f"未找到词云 {widget_id} 的配置脚本，跳过注入")
-                continue
-
-            config_id = match.group(1)
-            canvas_pattern = rf'<canvas[^>]+data-config-id="{re.escape(config_id)}"[^>]*></canvas>'
-
-            html, replaced = re.subn(canvas_pattern, lambda m: img_html, html, count=1)
-            if replaced:
-                logger.debug(f"已替换词云 {widget_id} 的canvas为PNG图片")
-            else:
-                logger.warning(f"未找到词云 {widget_id} 的canvas进行替换")
-
-            fallback_pattern = rf'<div class="chart-fallback"([^>]*data-widget-id="{re.escape(widget_id)}"[^>]*)>'
-
-            def _hide_fallback(m: re.Match) -> str:
-                """匹配词云表格兜底并打上隐藏标记，避免SVG/图片重复显示"""
-                tag = m.group(0)
-                if 'svg-hidden' in tag:
-                    return tag
-                return tag.replace('chart-fallback"', 'chart-fallback svg-hidden"', 1)
-
-            html = re.sub(fallback_pattern, _hide_fallback, html, count=1)
-
-        return html
-
-    def _inject_math_svg_into_html(self, html: str, svg_map: Dict[str, str]) -> str:
-        """
-        将数学公式SVG内容注入到HTML中
-
-        参数:
-            html: 原始HTML内容
-            svg_map: 公式ID到SVG内容的映射
-
-        返回:
-            str: 注入SVG后的HTML
-        """
-        if not svg_map:
-            return html
-
-        import re
-
-        # 优先替换内联公式，再替换块级公式，保持顺序一致
-        for math_id, svg_content in svg_map.items():
-            # 清理SVG内容（移除XML声明，因为SVG将嵌入HTML）
-            svg_content = re.sub(r'<\?xml[^>]+\?>', '', svg_content)
-            svg_content = re.sub(r'<!DOCTYPE[^>]+>', '', svg_content)
-            svg_content = svg_content.strip()
-
-            svg_block_html = f'<div class="math-svg-container">{svg_content}</div>'
-            svg_inline_html = f'<span class="math-svg-inline">{svg_content}</span>'
-
-            replaced = False
-            # 优先按 data-math-id 精确替换
-            inline_pattern = rf'<span class="math-inline"[^>]*data-math-id="{re.escape(math_id)}"[^>]*>.*?</span>'
-            if re.search(inline_pattern, html, re.DOTALL):
-                html = re.sub(inline_pattern, lambda m: svg_inline_html, html, count=1)
-                replaced = True
-            else:
-                block_pattern = rf'<div class="math-block"[^>]*data-math-id="{re.escape(math_id)}"[^>]*>.*?</div>'
-                if re.search(block_pattern, html, re.DOTALL):
-                    html = re.sub(block_pattern, lambda m: svg_block_html, html, count=1)
-                    replaced = True
-
-            # 如果没有找到特定ID，按出现顺序兜底替换
-            if not replaced:
-                html, sub_inline = re.subn(r'<span class="math-inline">[^<]*</span>', lambda m: svg_inline_html, html, count=1)
-                if sub_inline:
-                    replaced = True
-                else:
-                    html, sub_block = re.subn(r'<div class="math-block">\$\$[^$]*\$\$</div>', lambda m: svg_block_html, html, count=1)
-                    if sub_block:
-                        replaced = True
-
-            if replaced:
-                logger.debug(f"已替换公式 {math_id} 为SVG")
-
-        return html
-
     def _get_pdf_html(
         self,
         document_ir: Dict[str, Any],
-        optimize_layout: bool = True
+        optimize_layout: bool = True,
+        embed_font: bool = True,
+        progress_callback: ProgressCallback | None = None
     ) -> str:
         """
         生成适用于PDF的HTML内容
@@ -903,13 +839,23 @@ class PDFRenderer:
         参数:
             document_ir: Document IR数据
             optimize_layout: 是否启用布局优化
+            embed_font: 是否以base64内嵌字体（交给PDFRenderService渲染时无需内嵌）
+            progress_callback: 阶段进度回调 (阶段说明, 进度百分比)
 
         返回:
             str: 优化后的HTML内容
         """
+        def report(stage: str, progress: int):
+            if progress_callback is not None:
+                try:
+                    progress_callback(stage, progress)
+                except Exception as exc:
+                    logger.debug(f"PDF进度回调失败: {exc}")
+
         # 如果启用布局优化，先分析文档并生成优化配置
         if optimize_layout:
             logger.info("启用PDF布局优化...")
+            report("布局优化", 5)
             layout_config = self.layout_optimizer.optimize_for_document(document_ir)
 
             # 保存优化日志
@@ -929,44 +875,47 @@ class PDFRenderer:
 
         # 关键修复：先预处理图表，确保数据有效
         logger.info("预处理图表数据...")
+        report("预处理图表数据", 10)
         preprocessed_ir = self._preprocess_charts(document_ir)
 
         # 转换图表为SVG（使用预处理后的IR）
         logger.info("开始转换图表为SVG矢量图形...")
+        report("转换图表为SVG", 25)
         svg_map = self._convert_charts_to_svg(preprocessed_ir)
 
         # 转换词云为PNG
         logger.info("开始转换词云为图片...")
+        report("转换词云为图片", 45)
         wordcloud_map = self._convert_wordclouds_to_images(preprocessed_ir)
 
         # 转换数学公式为SVG
         logger.info("开始转换数学公式为SVG矢量图形...")
+        report("转换数学公式为SVG", 55)
         math_svg_map = self._convert_math_to_svg(preprocessed_ir)
 
-        # 使用HTML渲染器生成基础HTML（使用预处理后的IR，以便复用mathId等标记）
-        html = self.html_renderer.render(preprocessed_ir)
-
-        # 注入图表SVG
-        if svg_map:
-            html = self._inject_svg_into_html(html, svg_map)
-            logger.info(f"已注入 {len(svg_map)} 个SVG图表")
-
-        if wordcloud_map:
-            html = self._inject_wordcloud_images(html, wordcloud_map)
-            logger.info(f"已注入 {len(wordcloud_map)} 个词云图片")
-
-        # 注入数学公式SVG
-        if math_svg_map:
-            html = self._inject_math_svg_into_html(html, math_svg_map)
-            logger.info(f"已注入 {len(math_svg_map)} 个SVG公式")
-
-        # 获取字体路径并转换为base64（用于嵌入）
-        font_path = self._get_font_path()
-        font_data = font_path.read_bytes()
-        font_base64 = base64.b64encode(font_data).decode('ascii')
+        # 使用HTML渲染器生成基础HTML（使用预处理后的IR，以便复用mathId等标记），
+        # 图表/词云/公式在渲染时直接输出静态SVG或图片，无需事后改写HTML
+        report("生成HTML", 65)
+        widget_html, math_svg = self._build_static_media(svg_map, wordcloud_map, math_svg_map)
+        self.html_renderer.set_static_media(widget_html, math_svg)
+        try:
+            html = self.html_renderer.render(preprocessed_ir)
+        finally:
+            self.html_renderer.set_static_media()
+        if widget_html or math_svg:
+            logger.info(
+                f"已嵌入 {len(svg_map)} 个SVG图表、{len(wordcloud_map)} 个词云图片、{len(math_svg)} 个SVG公式"
+            )
 
-        # 判断字体格式
-        font_format = 'opentype' if font_path.suffix == '.otf' else 'truetype'
+        # 获取字体路径并转换为base64（用于嵌入）；由PDFRenderService渲染时字体已预先加载
+        font_face_css = ""
+        if embed_font:
+            font_path = self._get_font_path()
+            font_base64 = base64.b64encode(font_path.read_bytes()).decode('ascii')
+            font_face_css = build_font_face_css(
+                f"data:font/{font_format_for(font_path)};base64,{font_base64}",
+                font_format_for(font_path)
+            )
 
         # 生成优化后的CSS
         optimized_css = self.layout_optimizer.generate_pdf_css()
@@ -974,13 +923,7 @@ class PDFRenderer:
         # 添加PDF专用CSS
         pdf_css = f"""
 <style>
-/* PDF专用字体嵌入 */
-@font-face {{
-    font-family: 'SourceHanSerif';
-    src: url(data:font/{font_format};base64,{font_base64}) format('{font_format}');
-    font-weight: normal;
-    font-style: normal;
-}}
+{font_face_css}
 
 /* 强制所有文本使用思源宋体 */
 body, h1, h2, h3, h4, h5, h6, p, li, td, th, div, span {{
@@ -1562,7 +1505,8 @@ body {{
         self,
         document_ir: Dict[str, Any],
         output_path: str | Path,
-        optimize_layout: bool = True
+        optimize_layout: bool = True,
+        progress_callback: ProgressCallback | None = None
     ) -> Path:
         """
         将Document IR渲染为PDF文件
@@ -1571,6 +1515,7 @@ body {{
             document_ir: Document IR数据
             output_path: PDF输出路径
             optimize_layout: 是否启用布局优化（默认True）
+            progress_callback: 阶段进度回调 (阶段说明, 进度百分比)
 
         返回:
             Path: 生成的PDF文件路径
@@ -1579,22 +1524,16 @@ body {{
 
         logger.info(f"开始生成PDF: {output_path}")
 
-        # 生成HTML内容
-        html_content = self._get_pdf_html(document_ir, optimize_layout)
-
-        # 配置字体
-        font_config = FontConfiguration()
-
-        # 从HTML字符串创建WeasyPrint HTML对象
-        html_doc = HTML(string=html_content, base_url=str(Path.cwd()))
+        # 生成HTML内容（字体由常驻的渲染服务提供，不再内嵌）
+        html_content = self._get_pdf_html(
+            document_ir, optimize_layout, embed_font=False, progress_callback=progress_callback
+        )
 
         # 生成PDF
+        if progress_callback is not None:
+            progress_callback("排版生成PDF", 75)
         try:
-            html_doc.write_pdf(
-                output_path,
-                font_config=font_config,
-                presentational_hints=True  # 保留HTML的呈现提示
-            )
+            get_pdf_render_service(self._get_font_path()).write_pdf(html_content, output_path)
             logger.info(f"✓ PDF生成成功: {output_path}")
             return output_path
 
@@ -1605,7 +1544,8 @@ body {{
     def render_to_bytes(
         self,
         document_ir: Dict[str, Any],
-        optimize_layout: bool = True
+        optimize_layout: bool = True,
+        progress_callback: ProgressCallback | None = None
     ) -> bytes:
         """
         将Document IR渲染为PDF字节流
@@ -1613,18 +1553,106 @@ body {{
         参数:
             document_ir: Document IR数据
             optimize_layout: 是否启用布局优化（默认True）
+            progress_callback: 阶段进度回调 (阶段说明, 进度百分比)
 
         返回:
             bytes: PDF文件的字节内容
         """
-        html_content = self._get_pdf_html(document_ir, optimize_layout)
-        font_config = FontConfiguration()
-        html_doc = HTML(string=html_content, base_url=str(Path.cwd()))
+        html_content = self._get_pdf_html(
+            document_ir, optimize_layout, embed_font=False, progress_callback=progress_callback
+        )
+        if progress_callback is not None:
+            progress_callback("排版生成PDF", 75)
+        return get_pdf_render_service(self._get_font_path()).write_pdf(html_content)
 
-        return html_doc.write_pdf(
+
+def font_format_for(font_path: Path) -> str:
+    """根据字体文件后缀判断@font-face的format"""
+    return 'opentype' if font_path.suffix == '.otf' else 'truetype'
+
+
+def build_font_face_css(src_url: str, font_format: str) -> str:
+    """生成PDF正文字体的@font-face规则"""
+    return f"""/* PDF专用字体嵌入 */
+@font-face {{
+    font-family: 'SourceHanSerif';
+    src: url({src_url}) format('{font_format}');
+    font-weight: normal;
+    font-style: normal;
+}}"""
+
+
+class PDFRenderService:
+    """
+    常驻的WeasyPrint渲染服务
+
+    原实现每次导出都新建 FontConfiguration，并把3.9MB的思源宋体以base64内嵌进HTML，
+    WeasyPrint 每次都要重新解码、写出并加载字体。这里把加载好的字体常驻复用：
+    - FontConfiguration 与字体的 @font-face 样式表（直接引用字体文件）成对缓存在空闲池中；
+    - 每次导出只需传入文档HTML；
+    - FontConfiguration 不是线程安全的，每次渲染独占一份，并发渲染时按需新建，
+      用完放回池中，排版可在多个导出线程间并行。
+
+    @font-face 与层叠顺序无关，可以作为预编译样式表传入；其余PDF样式仍写在文档内，
+    因为 write_pdf 的 stylesheets 属于 user 来源，优先级低于文档自身的非 !important 规则。
+    """
+
+    def __init__(self, font_path: Path):
+        self.font_path = Path(font_path)
+        # 空闲的 (FontConfiguration, 字体样式表)，锁只保护这个列表
+        self._idle: List[tuple] = [self._load_fonts()]
+        self._lock = threading.Lock()
+
+    def _load_fonts(self) -> tuple:
+        font_config = FontConfiguration()
+        font_css = CSS(
+            string=build_font_face_css(self.font_path.resolve().as_uri(), font_format_for(self.font_path)),
             font_config=font_config,
-            presentational_hints=True
         )
+        return font_config, font_css
+
+    def write_pdf(self, html_content: str, target: str | Path | None = None) -> bytes | None:
+        """
+        渲染文档HTML
+
+        参数:
+            html_content: 不含字体内嵌的PDF专用HTML
+            target: 输出路径；为None时返回PDF字节
+
+        返回:
+            bytes | None: target为None时返回PDF字节
+        """
+        html_doc = HTML(string=html_content, base_url=str(Path.cwd()))
+        with self._lock:
+            fonts = self._idle.pop() if self._idle else None
+        if fonts is None:
+            fonts = self._load_fonts()
+        font_config, font_css = fonts
+        try:
+            return html_doc.write_pdf(
+                target,
+                stylesheets=[font_css],
+                font_config=font_config,
+                presentational_hints=True  # 保留HTML的呈现提示
+            )
+        finally:
+            with self._lock:
+                self._idle.append(fonts)
+
+
+_render_services: Dict[Path, PDFRenderService] = {}
+_render_services_lock = threading.Lock()
+
+
+def get_pdf_render_service(font_path: Path) -> PDFRenderService:
+    """获取指定字体的共享渲染服务（首次调用时创建）"""
+    key = Path(font_path).resolve()
+    with _render_services_lock:
+        service = _render_services.get(key)
+        if service is None:
+            service = _render_services[key] = PDFRenderService(key)
+            logger.info(f"PDF渲染服务已初始化，字体: {key}")
+        return service
 
 
-__all__ = ["PDFRenderer"]
+__all__ = ["PDFRenderer", "PDFRenderService", "get_pdf_render_service"]
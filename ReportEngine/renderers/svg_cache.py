@@ -0,0 +1,88 @@
+"""
+图表/公式SVG的持久化缓存
+
+同一份 Document IR 反复导出PDF时（export_pdf.py、regenerate_latest_pdf.py、
+/api/report/export/pdf-from-ir），大多数图表和公式都没有变化。这里把 matplotlib
+生成的SVG按内容寻址保存到磁盘：
+- 图表键：归一化的 widget 内容（widgetType/data/props，忽略 widgetId）+ 尺寸/DPI
+  + 字体指纹 + 渲染代码指纹；
+- 公式键：LaTeX + 显示模式 + 字号/颜色 + mathtext 字体配置指纹 + 渲染代码指纹。
+字体文件、mathtext 字体配置或 chart_to_svg.py / math_to_svg.py 变化后旧条目自然失效，由LRU淘汰。
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ReportEngine.utils.disk_cache import DiskLRUCache, file_fingerprint, make_cache_key
+
+_RENDERER_DIR = Path(__file__).parent
+_CHART_CODE = file_fingerprint(_RENDERER_DIR / "chart_to_svg.py")
+_MATH_CODE = file_fingerprint(_RENDERER_DIR / "math_to_svg.py")
+
+try:
+    import matplotlib
+    _MATPLOTLIB_VERSION = matplotlib.__version__
+except ImportError:
+    _MATPLOTLIB_VERSION = ""
+
+
+def chart_svg_key(
+    block: Dict[str, Any],
+    size: Dict[str, int],
+    font_path: Optional[str] = None,
+) -> str:
+    """图表SVG缓存键：只取影响绘图的字段，同内容不同ID的图表共用缓存"""
+    content = {
+        "widgetType": block.get("widgetType"),
+        "data": block.get("data"),
+        "props": block.get("props"),
+    }
+    return make_cache_key(
+        "chart", content, size, file_fingerprint(font_path), _CHART_CODE, _MATPLOTLIB_VERSION
+    )
+
+
+def mathtext_font_fingerprint() -> Dict[str, Any]:
+    """当前 matplotlib 中影响公式字形的配置（mathtext.* 与字体族），随运行时设置变化"""
+    try:
+        from matplotlib import rcParams
+    except ImportError:
+        return {}
+    return {
+        name: rcParams[name]
+        for name in sorted(rcParams.keys())
+        if name.startswith("mathtext.") or name in ("font.family", "font.serif", "font.sans-serif")
+    }
+
+
+def math_svg_key(latex: str, display: bool, font_size: int = 16, color: str = "black") -> str:
+    """公式SVG缓存键"""
+    return make_cache_key(
+        "math", latex, bool(display), font_size, color,
+        mathtext_font_fingerprint(), _MATH_CODE, _MATPLOTLIB_VERSION,
+    )
+
+
+_cache: Optional[DiskLRUCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_svg_cache() -> DiskLRUCache:
+    """获取进程内共享的SVG缓存（目录与容量取自 ReportEngine 配置）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from ReportEngine.utils.config import settings
+
+            _cache = DiskLRUCache(
+                settings.SVG_CACHE_DIR,
+                max(0, settings.SVG_CACHE_MAX_MB) * 1024 * 1024,
+                suffix=".svg",
+            )
+        return _cache
+
+
+__all__ = ["chart_svg_key", "get_svg_cache", "math_svg_key"]
@@ -0,0 +1,246 @@
+"""
+图表/公式SVG转换进程池
+
+matplotlib 构建图形与 savefig(format='svg') 都是占用GIL的CPU密集操作，
+PDF导出时逐个转换会让图表较多的报告长时间卡在单核上。SVGWorkerPool 把转换任务
+分发给常驻的工作进程：
+- 工作进程启动时即加载中文字体并预热 mathtext，后续任务无需重复初始化；
+- 任务以 (类型, ID, 参数) 形式提交，结果按ID收集，调用方按提交顺序合并，输出确定；
+- 进程池不可用、崩溃或等待结果超时时返回 None，由调用方退回串行转换；
+  超时的进程池（如 fork 时继承了被占用的锁而卡住的工作进程）会被终止，下次获取时重建。
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# 任务: ("chart", widgetId, widget块) 或 ("math", mathId, (latex, 是否display))
+SVGJob = Tuple[str, str, Any]
+
+# 图表SVG尺寸，与串行路径保持一致
+CHART_SVG_SIZE = {"width": 800, "height": 500, "dpi": 100}
+# 公式字号与颜色
+MATH_FONT_SIZE = 16
+MATH_COLOR = "black"
+# 单次转换等待全部结果的默认最长时间（秒）
+DEFAULT_CONVERT_TIMEOUT = 120
+
+# ======== 工作进程 ========
+
+_worker_chart_converter = None
+_worker_math_converter = None
+
+
+def _init_worker(font_path: Optional[str], math_font_size: int, math_color: str):
+    """工作进程初始化：加载字体、创建转换器并预热"""
+    global _worker_chart_converter, _worker_math_converter
+    from .chart_to_svg import create_chart_converter
+    from .math_to_svg import MathToSVG
+
+    try:
+        _worker_chart_converter = create_chart_converter(font_path=font_path)
+    except Exception as e:
+        logger.warning(f"SVG工作进程: 图表转换器初始化失败: {e}")
+    try:
+        _worker_math_converter = MathToSVG(font_size=math_font_size, color=math_color)
+        # 首次渲染会加载 mathtext 字体，放在初始化阶段完成
+        _worker_math_converter.convert_inline_to_svg("x")
+    except Exception as e:
+        logger.warning(f"SVG工作进程: 公式转换器初始化失败: {e}")
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+def _convert_job(job: SVGJob) -> Tuple[str, Optional[str], Optional[str]]:
+    """在工作进程中执行单个转换任务，返回 (ID, SVG, 错误信息)"""
+    kind, key, payload = job
+    try:
+        if kind == "chart":
+            if _worker_chart_converter is None:
+                return key, None, "图表转换器不可用"
+            return key, _worker_chart_converter.convert_widget_to_svg(payload, **CHART_SVG_SIZE), None
+        if kind == "math":
+            if _worker_math_converter is None:
+                return key, None, "公式转换器不可用"
+            latex, is_display = payload
+            svg = (
+                _worker_math_converter.convert_display_to_svg(latex)
+                if is_display else
+                _worker_math_converter.convert_inline_to_svg(latex)
+            )
+            return key, svg, None
+        return key, None, f"未知任务类型: {kind}"
+    except Exception as e:
+        return key, None, str(e)
+
+
+# ======== 主进程 ========
+
+class SVGWorkerPool:
+    """预热的SVG转换进程池"""
+
+    def __init__(
+        self,
+        max_workers: int,
+        font_path: Optional[str] = None,
+        math_font_size: int = MATH_FONT_SIZE,
+        math_color: str = MATH_COLOR,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_workers: 工作进程数
+            font_path: 图表使用的中文字体路径
+            math_font_size: 公式字号
+            math_color: 公式颜色
+            start_method: 进程启动方式，默认见 default_start_method()
+        """
+        self.max_workers = max_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(start_method or default_start_method()),
+            initializer=_init_worker,
+            initargs=(font_path, math_font_size, math_color),
+        )
+        self._broken = False
+
+    @property
+    def available(self) -> bool:
+        return not self._broken
+
+    def warm_up(self):
+        """提前拉起全部工作进程并完成初始化，不等待结果"""
+        try:
+            for _ in range(self.max_workers):
+                self._executor.submit(_noop)
+        except Exception as e:
+            logger.warning(f"SVG进程池预热失败: {e}")
+
+    def convert(
+        self, jobs: List[SVGJob], timeout: Optional[float] = DEFAULT_CONVERT_TIMEOUT
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        并行执行转换任务
+
+        Args:
+            jobs: 转换任务
+            timeout: 等待全部结果的最长时间（秒），None 或 <= 0 表示不限
+
+        Returns:
+            ID -> SVG（失败为None）的映射，键顺序与 jobs 一致；进程池不可用或超时时返回None
+        """
+        if self._broken:
+            return None
+        results: Dict[str, Optional[str]] = {}
+        chunksize = max(1, len(jobs) // (self.max_workers * 4))
+        try:
+            for key, svg, error in self._executor.map(
+                _convert_job, jobs, timeout=timeout if timeout and timeout > 0 else None, chunksize=chunksize
+            ):
+                if error:
+                    logger.error(f"转换 {key} 为SVG时出错: {error}")
+                results[key] = svg
+        except FuturesTimeoutError:
+            logger.warning(f"SVG进程池超过 {timeout} 秒未返回结果，终止工作进程并改为串行转换")
+            self._broken = True
+            self.terminate()
+            return None
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.warning(f"SVG进程池不可用，改为串行转换: {e}")
+            self._broken = True
+            self.shutdown()
+            return None
+        return results
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def terminate(self):
+        """强制结束工作进程：卡住的进程不会响应 shutdown"""
+        processes = list((getattr(self._executor, "_processes", None) or {}).values())
+        self.shutdown()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def default_start_method() -> str:
+    """
+    Linux 使用 fork：工作进程直接继承已导入的模块，不会重新执行主模块
+    （app.py 的模块级代码会重置 forum.log 并启动线程）；其他平台使用 spawn。
+    """
+    if sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods():
+        return "fork"
+    return "spawn"
+
+
+def resolve_worker_count(configured: int) -> int:
+    """
+    把配置的进程数换算为实际值
+
+    configured <= 0 表示自动：仅在可 fork 的平台按CPU核数启用（最多8个）；
+    返回值 <= 1 表示使用串行转换。
+    """
+    if configured > 0:
+        return configured
+    if default_start_method() != "fork":
+        return 1
+    return min(8, max(1, (os.cpu_count() or 1) - 1))
+
+
+_pools: Dict[Tuple[int, Optional[str]], SVGWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_svg_worker_pool(max_workers: int, font_path: Optional[str] = None) -> Optional[SVGWorkerPool]:
+    """获取共享的SVG进程池（首次调用时创建并预热），max_workers <= 1 或创建失败时返回None"""
+    if max_workers <= 1:
+        return None
+    key = (max_workers, font_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.available:
+            return pool
+        try:
+            pool = SVGWorkerPool(max_workers, font_path=font_path)
+        except Exception as e:
+            logger.warning(f"创建SVG进程池失败，使用串行转换: {e}")
+            return None
+        pool.warm_up()
+        _pools[key] = pool
+        logger.info(f"SVG转换进程池已启动: {max_workers} 个工作进程")
+        return pool
+
+
+@atexit.register
+def shutdown_svg_worker_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+__all__ = [
+    "CHART_SVG_SIZE",
+    "DEFAULT_CONVERT_TIMEOUT",
+    "MATH_COLOR",
+    "MATH_FONT_SIZE",
+    "SVGJob",
+    "SVGWorkerPool",
+    "default_start_method",
+    "get_svg_worker_pool",
+    "resolve_worker_count",
+    "shutdown_svg_worker_pools",
+]
@@ -0,0 +1,29 @@
+"""
+报告任务的协作式取消。
+
+调度器为每个任务创建一个 threading.Event，工作线程把它绑定到所用 ReportAgent
+的全部 LLMClient 上；LLMClient 在发起请求前和流式读取的每个分片之间检查该事件，
+一旦置位即关闭HTTP流并抛出 TaskCancelledError。
+
+TaskCancelledError 与 asyncio.CancelledError 一样继承 BaseException：
+节点、章节重试与 with_retry 装饰器普遍使用 ``except Exception`` 兜底，
+若继承 Exception，取消会被当作普通失败反复重试（LLM重试首轮即等待60秒）。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+
+class TaskCancelledError(BaseException):
+    """任务已被用户取消"""
+
+
+def raise_if_cancelled(cancel_event: Optional[threading.Event]):
+    """事件已置位时抛出 TaskCancelledError"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise TaskCancelledError("任务已被取消")
+
+
+__all__ = ["TaskCancelledError", "raise_if_cancelled"]
@@ -0,0 +1,92 @@
+"""
+ChartRepairer 的跨进程持久化缓存
+
+ChartRepairer 的内存缓存随渲染器重建而丢失，无法修复的图表在每次渲染
+（HTMLRenderer、PDFRenderer._preprocess_charts、regenerate 脚本）时都会重新走一遍
+最多四个Engine的LLM修复链。这里把经过API修复的结果（包括LLM返回后仍无效的否定结果，
+不包括超时、限流等没有任何Engine返回的暂时失败）写入磁盘，带有效期与容量上限，
+由 create_chart_repairer 创建的修复器共享。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ReportEngine.utils.disk_cache import DiskLRUCache, make_cache_key
+
+
+class ChartRepairCache:
+    """图表修复结果的磁盘缓存"""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int, ttl_seconds: float):
+        """
+        Args:
+            directory: 缓存目录
+            max_bytes: 容量上限（字节），<= 0 表示禁用
+            ttl_seconds: 条目有效期（秒），<= 0 表示不过期
+        """
+        self._store = DiskLRUCache(directory, max_bytes, suffix=".json")
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self._store.enabled
+
+    @staticmethod
+    def _key(cache_key: str) -> str:
+        return make_cache_key("chart-repair", cache_key)
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取修复记录
+
+        Returns:
+            {"success", "repaired_block", "method", "changes"}；未命中或已过期返回None
+        """
+        text = self._store.get(self._key(cache_key))
+        if not text:
+            return None
+        try:
+            record = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(record, dict):
+            return None
+        if self.ttl_seconds > 0 and time.time() - record.get("created", 0) > self.ttl_seconds:
+            return None
+        return record
+
+    def put(self, cache_key: str, record: Dict[str, Any]):
+        """写入修复记录（记录创建时间用于过期判断）"""
+        payload = dict(record, created=time.time())
+        try:
+            text = json.dumps(payload, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return
+        self._store.put(self._key(cache_key), text)
+
+
+_cache: Optional[ChartRepairCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_repair_cache() -> ChartRepairCache:
+    """获取进程内共享的图表修复缓存（目录、容量与有效期取自 ReportEngine 配置）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from ReportEngine.utils.config import settings
+
+            _cache = ChartRepairCache(
+                settings.CHART_REPAIR_CACHE_DIR,
+                max(0, settings.CHART_REPAIR_CACHE_MAX_MB) * 1024 * 1024,
+                settings.CHART_REPAIR_CACHE_TTL_HOURS * 3600,
+            )
+        return _cache
+
+
+__all__ = ["ChartRepairCache", "get_chart_repair_cache"]
@@ -22,10 +22,13 @@ from __future__ import annotations
 import copy
 import json
 import hashlib
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Callable
 from dataclasses import dataclass
 from loguru import logger
 
+if TYPE_CHECKING:
+    from ReportEngine.utils.chart_repair_cache import ChartRepairCache
+
 
 @dataclass
 class ValidationResult:
@@ -374,7 +377,8 @@ class ChartRepairer:
     def __init__(
         self,
         validator: ChartValidator,
-        llm_repair_fns: Optional[List[Callable]] = None
+        llm_repair_fns: Optional[List[Callable]] = None,
+        persistent_cache: Optional["ChartRepairCache"] = None
     ):
         """
         初始化修复器。
@@ -382,11 +386,13 @@ class ChartRepairer:
         Args:
             validator: 图表验证器实例
             llm_repair_fns: LLM修复函数列表（对应4个Engine）
+            persistent_cache: 跨进程的持久化缓存（可选），保存经过API修复的结果
         """
         self.validator = validator
         self.llm_repair_fns = llm_repair_fns or []
         # 缓存修复结果，避免同一个图表在多处被重复调用LLM
         self._result_cache: Dict[str, RepairResult] = {}
+        self.persistent_cache = persistent_cache
 
     def build_cache_key(self, widget_block: Dict[str, Any]) -> str:
         """
@@ -432,14 +438,22 @@ class ChartRepairer:
             # 返回缓存的深拷贝，避免外部修改影响缓存
             return copy.deepcopy(cached)
 
-        def _cache_and_return(res: RepairResult) -> RepairResult:
+        def _cache_and_return(res: RepairResult, persist: bool = False) -> RepairResult:
             """写入修复结果缓存并返回，避免重复调用下游修复逻辑"""
             try:
                 self._result_cache[cache_key] = copy.deepcopy(res)
             except Exception:
                 self._result_cache[cache_key] = res
+            if persist:
+                self._persist_result(cache_key, res)
             return res
 
+        # 之前的渲染已经为该图表调用过LLM并得到结论（修复成功或返回的图表仍无效），直接复用
+        persisted = self._load_persisted_result(cache_key, widget_block)
+        if persisted is not None:
+            logger.info(f"使用持久化的图表修复结果: {persisted.method}, success={persisted.success}")
+            return _cache_and_return(persisted)
+
         # 1. 如果没有验证结果，先验证
         if validation_result is None:
             validation_result = self.validator.validate(widget_block)
@@ -469,10 +483,17 @@ class ChartRepairer:
                 repaired_validation = self.validator.validate(api_result.repaired_block)
                 if repaired_validation.is_valid:
                     logger.info(f"API修复成功: {api_result.changes}")
-                    return _cache_and_return(api_result)
+                    return _cache_and_return(api_result, persist=True)
                 else:
                     logger.warning(f"API修复后仍然无效: {repaired_validation.errors}")
 
+            # 有Engine返回了图表但仍无效时才持久化否定结果，后续渲染不再调用LLM；
+            # 全部Engine都没有返回（超时、限流、服务异常等）只记在内存中，下次渲染重试
+            logger.warning("所有修复尝试失败，保持原始数据")
+            return _cache_and_return(
+                RepairResult(False, widget_block, 'none', []), persist=api_result.has_changes()
+            )
+
         # 5. 如果验证通过，返回原始或修复后的数据
         if validation_result.is_valid:
             if local_result.has_changes():
@@ -486,6 +507,46 @@ class ChartRepairer:
         logger.warning("所有修复尝试失败，保持原始数据")
         return _cache_and_return(RepairResult(False, widget_block, 'none', []))
 
+    def _load_persisted_result(
+        self,
+        cache_key: str,
+        widget_block: Dict[str, Any]
+    ) -> Optional[RepairResult]:
+        """从持久化缓存读取修复结果；仅在配置了LLM修复时使用"""
+        if self.persistent_cache is None or not self.llm_repair_fns:
+            return None
+        try:
+            record = self.persistent_cache.get(cache_key)
+        except Exception as e:
+            logger.debug(f"读取图表修复缓存失败: {e}")
+            return None
+        if not record:
+            return None
+        repaired_block = record.get('repaired_block')
+        if not isinstance(repaired_block, dict):
+            # 否定结果不保存图表本身，沿用原始数据
+            repaired_block = copy.deepcopy(widget_block)
+        return RepairResult(
+            bool(record.get('success')),
+            repaired_block,
+            record.get('method') or 'none',
+            list(record.get('changes') or []),
+        )
+
+    def _persist_result(self, cache_key: str, result: RepairResult) -> None:
+        """把经过API修复的结果写入持久化缓存"""
+        if self.persistent_cache is None:
+            return
+        try:
+            self.persistent_cache.put(cache_key, {
+                'success': result.success,
+                'repaired_block': result.repaired_block if result.success else None,
+                'method': result.method,
+                'changes': result.changes,
+            })
+        except Exception as e:
+            logger.debug(f"写入图表修复缓存失败: {e}")
+
     def repair_locally(
         self,
         widget_block: Dict[str, Any],
@@ -661,11 +722,13 @@ class ChartRepairer:
         """
         使用API修复（调用4个Engine的LLM）。
 
-        策略：按顺序尝试不同的Engine，直到修复成功
+        策略：按顺序尝试不同的Engine，直到修复成功。
+        失败时 changes 记录返回了图表但仍无效的Engine，为空表示没有任何Engine给出结果。
         """
         if not self.llm_repair_fns:
             return RepairResult(False, None, 'api', [])
 
+        rejected = []
         for idx, repair_fn in enumerate(self.llm_repair_fns):
             try:
                 logger.info(f"尝试使用Engine {idx + 1}修复图表")
@@ -681,11 +744,12 @@ class ChartRepairer:
                             'api',
                             [f"使用Engine {idx + 1}修复成功"]
                         )
+                    rejected.append(f"Engine {idx + 1}返回的图表仍无效")
             except Exception as e:
                 logger.error(f"Engine {idx + 1}修复失败: {e}")
                 continue
 
-        return RepairResult(False, None, 'api', [])
+        return RepairResult(False, None, 'api', rejected)
 
 
 def create_chart_validator() -> ChartValidator:
@@ -697,7 +761,14 @@ def create_chart_repairer(
     validator: Optional[ChartValidator] = None,
     llm_repair_fns: Optional[List[Callable]] = None
 ) -> ChartRepairer:
-    """创建图表修复器实例"""
+    """创建图表修复器实例；配置了LLM修复时挂载共享的持久化修复缓存"""
     if validator is None:
         validator = create_chart_validator()
-    return ChartRepairer(validator, llm_repair_fns)
+    persistent_cache = None
+    if llm_repair_fns:
+        try:
+            from ReportEngine.utils.chart_repair_cache import get_chart_repair_cache
+            persistent_cache = get_chart_repair_cache()
+        except Exception as e:
+            logger.warning(f"图表修复持久化缓存不可用: {e}")
+    return ChartRepairer(validator, llm_repair_fns, persistent_cache)
@@ -56,6 +56,15 @@ class Settings(BaseSettings):
     CHAPTER_JSON_MAX_ATTEMPTS: int = Field(
         2, description="章节JSON解析失败时的最大尝试次数"
     )
+    # 章节之间互不依赖，可并发调用LLM；1 表示逐章顺序生成
+    CHAPTER_CONCURRENCY: int = Field(
+        1, description="章节并发生成的最大线程数"
+    )
+    # 三引擎报告与论坛日志按段落建立BM25索引，每章只携带相关段落；0 表示每章携带全文
+    CHAPTER_CONTEXT_MAX_TOKENS: int = Field(
+        16000, description="每章提示词中报告与论坛摘录的token预算（计数器同全局 PROMPT_TOKENIZER_FILE 配置）"
+    )
+    CHAPTER_CONTEXT_PASSAGE_CHARS: int = Field(800, description="上下文检索的单段最大字符数")
     TEMPLATE_DIR: str = Field("ReportEngine/report_template", description="多模板目录")
     API_TIMEOUT: float = Field(900.0, description="单API超时时间（秒）")
     MAX_RETRY_DELAY: float = Field(180.0, description="最大重试间隔（秒）")
@@ -63,6 +72,38 @@ class Settings(BaseSettings):
     LOG_FILE: str = Field("logs/report.log", description="日志输出文件")
     ENABLE_PDF_EXPORT: bool = Field(True, description="是否允许导出PDF")
     CHART_STYLE: str = Field("modern", description="图表样式：modern/classic/")
+    # inline: 第三方JS内联进HTML（自包含，适合离线导出）；external: 按内容哈希写入静态目录并以<script src>引用
+    HTML_ASSET_MODE: str = Field("inline", description="HTML报告第三方库引用方式：inline/external")
+    HTML_ASSET_DIR: str = Field("final_reports/assets", description="external模式下第三方库的静态目录")
+    HTML_ASSET_URL_PREFIX: str = Field(
+        "/api/report/assets", description="external模式下HTML中引用第三方库的URL前缀"
+    )
+    # matplotlib 绘图占用GIL，PDF导出时图表/公式SVG转换分发到进程池；0 为按CPU核数自动，1 为串行
+    PDF_SVG_WORKERS: int = Field(0, description="PDF导出时图表与公式SVG转换的进程数")
+    PDF_SVG_TIMEOUT: int = Field(120, description="SVG转换进程池等待结果的最长时间（秒），超时后重建进程池并改为串行转换")
+    # 按内容寻址缓存matplotlib生成的图表/公式SVG，重复导出时未变化的图表无需重绘
+    SVG_CACHE_DIR: str = Field("final_reports/.svg_cache", description="图表与公式SVG缓存目录")
+    SVG_CACHE_MAX_MB: int = Field(256, description="SVG缓存容量上限（MB），0 表示禁用")
+    # 经LLM修复的图表结果（含无法修复的否定结果）持久化，重复渲染不再调用LLM
+    CHART_REPAIR_CACHE_DIR: str = Field(
+        "final_reports/.chart_repair_cache", description="图表LLM修复结果缓存目录"
+    )
+    CHART_REPAIR_CACHE_MAX_MB: int = Field(64, description="图表修复缓存容量上限（MB），0 表示禁用")
+    CHART_REPAIR_CACHE_TTL_HOURS: float = Field(168.0, description="图表修复缓存有效期（小时），0 表示不过期")
+    # PDF导出在后台线程池中执行，结果按IR内容哈希落盘，重复下载直接复用
+    PDF_EXPORT_DIR: str = Field("final_reports/pdf_exports", description="PDF导出结果目录")
+    PDF_EXPORT_WORKERS: int = Field(2, description="同时进行的PDF导出任务数")
+    PDF_EXPORT_MAX_MB: int = Field(1024, description="PDF导出结果目录容量上限（MB），超出后淘汰最久未下载的PDF")
+    PDF_EXPORT_SYNC_TIMEOUT: int = Field(
+        300, description="同步导出PDF时等待的最长秒数，超时返回202与导出任务，可继续轮询或下载"
+    )
+    # 报告生成任务进入优先级队列，由固定数量的工作线程（各自持有独立的ReportAgent）消费
+    REPORT_WORKERS: int = Field(1, description="同时生成的报告任务数")
+    REPORT_QUEUE_MAX: int = Field(20, description="排队中的报告任务上限，0 表示不限")
+    REPORT_TASK_HISTORY: int = Field(20, description="内存中保留的已结束报告任务数")
+    REPORT_TASK_HISTORY_MAX_MB: int = Field(
+        64, description="内存中已结束报告任务（HTML与事件历史）的估算占用上限（MB）"
+    )
     JSON_ERROR_LOG_DIR: str = Field(
         "logs/json_repair_failures", description="无法修复的JSON块落盘目录"
     )
@@ -92,13 +133,21 @@ def print_config(config: Settings):
     message += f"输出目录: {config.OUTPUT_DIR}\n"
     message += f"章节JSON目录: {config.CHAPTER_OUTPUT_DIR}\n"
     message += f"章节JSON最大尝试次数: {config.CHAPTER_JSON_MAX_ATTEMPTS}\n"
+    message += f"章节并发数: {config.CHAPTER_CONCURRENCY}\n"
+    message += f"章节上下文预算: {config.CHAPTER_CONTEXT_MAX_TOKENS or '全文'} token\n"
     message += f"整本IR目录: {config.DOCUMENT_IR_OUTPUT_DIR}\n"
     message += f"模板目录: {config.TEMPLATE_DIR}\n"
+    message += f"HTML资源模式: {config.HTML_ASSET_MODE}\n"
     message += f"API 超时时间: {config.API_TIMEOUT} 秒\n"
     message += f"最大重试间隔: {config.MAX_RETRY_DELAY} 秒\n"
     message += f"最大重试次数: {config.MAX_RETRIES}\n"
     message += f"日志文件: {config.LOG_FILE}\n"
+    message += f"报告生成并发数: {config.REPORT_WORKERS} (排队上限 {config.REPORT_QUEUE_MAX or '不限'})\n"
     message += f"PDF 导出: {config.ENABLE_PDF_EXPORT}\n"
+    message += f"PDF 导出并发数: {config.PDF_EXPORT_WORKERS} (目录上限 {config.PDF_EXPORT_MAX_MB} MB)\n"
+    message += f"PDF SVG转换进程数: {config.PDF_SVG_WORKERS or '自动'} (超时 {config.PDF_SVG_TIMEOUT} 秒)\n"
+    message += f"SVG缓存: {config.SVG_CACHE_DIR} (上限 {config.SVG_CACHE_MAX_MB} MB)\n"
+    message += f"图表修复缓存: {config.CHART_REPAIR_CACHE_DIR} (有效期 {config.CHART_REPAIR_CACHE_TTL_HOURS} 小时)\n"
     message += f"图表样式: {config.CHART_STYLE}\n"
     message += f"LLM API Key: {'已配置' if config.REPORT_ENGINE_API_KEY else '未配置'}\n"
     message += "=========================\n"
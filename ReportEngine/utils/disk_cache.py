@@ -0,0 +1,203 @@
+"""
+按内容寻址的磁盘LRU缓存
+
+每个条目以键的 sha256 命名保存为单独文件，写入采用临时文件 + os.replace，
+多个进程共享同一目录也不会读到半个文件。命中时刷新文件 mtime，
+总大小超过上限时按 mtime 从旧到新淘汰。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from loguru import logger
+
+
+def make_cache_key(*parts: Any) -> str:
+    """把任意可JSON序列化的内容稳定地哈希为缓存键"""
+    serialized = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def file_fingerprint(path: Union[str, Path, None]) -> str:
+    """文件指纹（路径+大小+修改时间），文件变化后相关缓存自动失效"""
+    if not path:
+        return ""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return str(path)
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class DiskLRUCache:
+    """大小受限的磁盘文本缓存"""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int, suffix: str = ".txt"):
+        """
+        Args:
+            directory: 缓存目录，不存在时自动创建
+            max_bytes: 缓存总大小上限（字节），<= 0 表示禁用缓存
+            suffix: 缓存文件后缀
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        # 键 -> 文件大小，按最近使用顺序排列（最旧的在前）
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def _load_index(self):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.directory.glob(f"*{self.suffix}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, path.name[: -len(self.suffix)], st.st_size))
+        except OSError as e:
+            logger.warning(f"缓存目录不可用，已禁用缓存 {self.directory}: {e}")
+            self.max_bytes = 0
+            return
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中返回None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            with self._lock:
+                self.misses += 1
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self._total -= size
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:
+                # 其他进程写入的条目
+                size = len(text.encode("utf-8"))
+                self._index[key] = size
+                self._total += size
+        return text
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """命中时返回缓存文件路径并刷新最近使用时间（用于需要按文件发送的二进制条目），未命中返回None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+            size = path.stat().st_size
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                old = self._index.pop(key, None)
+                if old is not None:
+                    self._total -= old
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:
+                self._index[key] = size
+                self._total += size
+        return path
+
+    def put(self, key: str, text: str):
+        """写入缓存，超出上限时淘汰最久未使用的条目"""
+        if text is None:
+            return
+        self.put_bytes(key, text.encode("utf-8"))
+
+    def put_bytes(self, key: str, data: bytes) -> Optional[Path]:
+        """
+        写入二进制条目，超出上限时淘汰最久未使用的条目
+
+        Returns:
+            写入的文件路径；缓存被禁用、条目超过容量上限或写入失败时返回None
+        """
+        if not self.enabled or len(data) > self.max_bytes:
+            return None
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=self.suffix + ".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.warning(f"写入缓存失败 {path}: {e}")
+            return None
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._total -= old
+            self._index[key] = len(data)
+            self._total += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"淘汰缓存失败 {key}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+__all__ = ["DiskLRUCache", "file_fingerprint", "make_cache_key"]
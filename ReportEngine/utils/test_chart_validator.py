@@ -451,6 +451,89 @@ class TestValidatorIntegration:
         assert final_validation.is_valid
 
 
+
+class TestPersistentRepairCache:
+    """测试图表LLM修复结果的持久化缓存"""
+
+    BROKEN_CHART = {
+        "widgetId": "broken",
+        "widgetType": "chart.js/bar",
+        "data": {"datasets": [{"data": "x"}]},
+    }
+
+    def _repairer(self, cache, llm_fn):
+        return ChartRepairer(create_chart_validator(), [llm_fn], persistent_cache=cache)
+
+    def test_negative_result_survives_new_repairer(self, tmp_path):
+        from ReportEngine.utils.chart_repair_cache import ChartRepairCache
+
+        calls = []
+
+        def failing_llm(block, errors):
+            calls.append(block.get("widgetId"))
+            # 返回了图表但仍然无效
+            return {"widgetType": "chart.js/bar", "data": {"datasets": [{"data": "x"}]}}
+
+        cache = ChartRepairCache(tmp_path, 1024 * 1024, ttl_seconds=3600)
+        first = self._repairer(cache, failing_llm).repair(self.BROKEN_CHART)
+        assert not first.success and calls == ["broken"]
+
+        # 新建修复器（模拟重新渲染），不再调用LLM
+        second = self._repairer(ChartRepairCache(tmp_path, 1024 * 1024, 3600), failing_llm).repair(
+            self.BROKEN_CHART
+        )
+        assert not second.success
+        assert second.repaired_block == self.BROKEN_CHART
+        assert calls == ["broken"]
+
+    def test_unanswered_repair_is_not_persisted(self, tmp_path):
+        from ReportEngine.utils.chart_repair_cache import ChartRepairCache
+
+        calls = []
+
+        def unavailable_llm(block, errors):
+            # chart_repair_api 在超时、限流等异常时返回None
+            calls.append(1)
+            return None
+
+        cache = ChartRepairCache(tmp_path, 1024 * 1024, ttl_seconds=3600)
+        repairer = self._repairer(cache, unavailable_llm)
+        assert not repairer.repair(self.BROKEN_CHART).success
+        # 同一修复器内复用内存结果
+        repairer.repair(self.BROKEN_CHART)
+        assert len(calls) == 1
+
+        # 重新渲染时再次尝试LLM
+        self._repairer(ChartRepairCache(tmp_path, 1024 * 1024, 3600), unavailable_llm).repair(self.BROKEN_CHART)
+        assert len(calls) == 2
+
+    def test_api_repair_is_reused_and_expires(self, tmp_path):
+        from ReportEngine.utils.chart_repair_cache import ChartRepairCache
+
+        fixed = {
+            "widgetId": "broken",
+            "widgetType": "chart.js/bar",
+            "props": {"type": "bar"},
+            "data": {"labels": ["a"], "datasets": [{"label": "数据", "data": [1]}]},
+        }
+        calls = []
+
+        def fixing_llm(block, errors):
+            calls.append(1)
+            return fixed
+
+        cache = ChartRepairCache(tmp_path, 1024 * 1024, ttl_seconds=3600)
+        self._repairer(cache, fixing_llm).repair(self.BROKEN_CHART)
+        reused = self._repairer(cache, fixing_llm).repair(self.BROKEN_CHART)
+        assert reused.success and reused.method == "api"
+        assert reused.repaired_block == fixed
+        assert len(calls) == 1
+
+        expired = ChartRepairCache(tmp_path, 1024 * 1024, ttl_seconds=1e-9)
+        self._repairer(expired, fixing_llm).repair(self.BROKEN_CHART)
+        assert len(calls) == 2
+
+
 if __name__ == "__main__":
     # 运行测试
     pytest.main([__file__, "-v", "--tb=short"])
@@ -15,7 +15,7 @@ import time
 import threading
 from datetime import datetime
 from queue import Queue
-from flask import Flask, render_template, request, jsonify, Response
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_socketio import SocketIO, emit
 import atexit
 import requests
@@ -23,6 +23,10 @@ from loguru import logger
 import importlib
 from pathlib import Path
 from MindSpider.main import MindSpider
+from utils.forum_bus import ensure_bus_authkey
+from utils.forum_log_store import get_forum_log_store
+from utils.log_reader import read_since, read_tail, stream_lines
+from utils.log_writer import BufferedLogWriter
 
 # 导入ReportEngine
 try:
@@ -69,6 +73,9 @@ def _patch_eventlet_disconnect_logging():
 
 _patch_eventlet_disconnect_logging()
 
+# 论坛事件总线的握手密钥需在启动各引擎子进程之前确定，子进程经环境变量继承
+ensure_bus_authkey()
+
 # 注册ReportEngine Blueprint
 if REPORT_ENGINE_AVAILABLE:
     app.register_blueprint(report_bp, url_prefix='/api/report')
@@ -532,33 +539,59 @@ output_queues = {
     'forum': Queue()
 }
 
-def write_log_to_file(app_name, line):
-    """将日志写入文件"""
+# 每个应用一个后台写入线程：常驻文件句柄、批量落盘，并把同批次的行合并为一个console_output帧
+log_writers = {}
+log_writers_lock = threading.Lock()
+
+def _emit_console_batch(app_name, lines):
+    """批量推送控制台输出；line字段保留换行拼接的全部内容，兼容逐行处理的前端"""
+    socketio.emit('console_output', {
+        'app': app_name,
+        'line': '\n'.join(lines),
+        'lines': lines
+    })
+
+def get_log_writer(app_name):
+    """获取（必要时创建）应用的日志写入器"""
+    with log_writers_lock:
+        writer = log_writers.get(app_name)
+        if writer is None:
+            writer = BufferedLogWriter(
+                LOG_DIR / f"{app_name}.log",
+                on_batch=lambda lines: _emit_console_batch(app_name, lines),
+                name=app_name
+            )
+            log_writers[app_name] = writer
+        return writer
+
+def close_log_writers(timeout=2.0):
+    """关闭所有日志写入器，确保缓冲中的日志写入文件"""
+    with log_writers_lock:
+        writers = list(log_writers.values())
+        log_writers.clear()
+    for writer in writers:
+        writer.close(timeout)
+
+def write_log_to_file(app_name, line, emit=False):
+    """将日志写入文件（异步批量写入，顺序与调用顺序一致）；emit为True时同时推送到前端"""
     try:
-        log_file_path = LOG_DIR / f"{app_name}.log"
-        with open(log_file_path, 'a', encoding='utf-8') as f:
-            f.write(line + '\n')
-            f.flush()
+        get_log_writer(app_name).write(line, notify=emit)
     except Exception as e:
         logger.error(f"Error writing log for {app_name}: {e}")
 
-def read_log_from_file(app_name, tail_lines=None):
-    """从文件读取日志"""
+def read_log_from_file(app_name, tail_count=None):
+    """
+    从文件读取日志；指定tail_count时从文件末尾反向读取最后N行
+
+    Returns:
+        (日志行列表, 与这些行同一次读取得到的游标)
+    """
     try:
-        log_file_path = LOG_DIR / f"{app_name}.log"
-        if not log_file_path.exists():
-            return []
-        
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
-            
-            if tail_lines:
-                return lines[-tail_lines:]
-            return lines
+        chunk = read_tail(LOG_DIR / f"{app_name}.log", tail_count or None)
+        return chunk.lines, chunk.cursor
     except Exception as e:
         logger.exception(f"Error reading log for {app_name}: {e}")
-        return []
+        return [], 0
 
 def read_process_output(process, app_name):
     """读取进程输出并写入文件"""
@@ -577,11 +610,7 @@ def read_process_output(process, app_name):
                         if line:
                             timestamp = datetime.now().strftime('%H:%M:%S')
                             formatted_line = f"[{timestamp}] {line}"
-                            write_log_to_file(app_name, formatted_line)
-                            socketio.emit('console_output', {
-                                'app': app_name,
-                                'line': formatted_line
-                            })
+                            write_log_to_file(app_name, formatted_line, emit=True)
                 break
             
             # 使用非阻塞读取
@@ -594,14 +623,8 @@ def read_process_output(process, app_name):
                         timestamp = datetime.now().strftime('%H:%M:%S')
                         formatted_line = f"[{timestamp}] {line}"
                         
-                        # 写入日志文件
-                        write_log_to_file(app_name, formatted_line)
-                        
-                        # 发送到前端
-                        socketio.emit('console_output', {
-                            'app': app_name,
-                            'line': formatted_line
-                        })
+                        # 写入日志文件并批量推送到前端
+                        write_log_to_file(app_name, formatted_line, emit=True)
                 else:
                     # 没有输出时短暂休眠
                     time.sleep(0.1)
@@ -616,14 +639,8 @@ def read_process_output(process, app_name):
                             timestamp = datetime.now().strftime('%H:%M:%S')
                             formatted_line = f"[{timestamp}] {line}"
                             
-                            # 写入日志文件
-                            write_log_to_file(app_name, formatted_line)
-                            
-                            # 发送到前端
-                            socketio.emit('console_output', {
-                                'app': app_name,
-                                'line': formatted_line
-                            })
+                            # 写入日志文件并批量推送到前端
+                            write_log_to_file(app_name, formatted_line, emit=True)
                             
         except Exception as e:
             error_msg = f"Error reading output for {app_name}: {e}"
@@ -642,9 +659,7 @@ def start_streamlit_app(app_name, script_path, port):
             return False, f"文件不存在: {script_path}"
         
         # 清空之前的日志文件
-        log_file_path = LOG_DIR / f"{app_name}.log"
-        if log_file_path.exists():
-            log_file_path.unlink()
+        get_log_writer(app_name).truncate()
         
         # 创建启动日志
         start_msg = f"[{datetime.now().strftime('%H:%M:%S')}] 启动 {app_name} 应用..."
@@ -810,6 +825,7 @@ def cleanup_processes():
         stop_forum_engine()
     except Exception:  # pragma: no cover
         logger.exception("停止ForumEngine失败")
+    close_log_writers()
     _log_shutdown_step("子进程清理完成")
     _set_system_state(started=False, starting=False)
 
@@ -979,29 +995,51 @@ def stop_app(app_name):
 
 @app.route('/api/output/<app_name>')
 def get_output(app_name):
-    """获取应用输出"""
+    """
+    获取应用输出
+
+    查询参数（均可选，不传时返回完整日志）：
+        since: 上次返回的cursor，只返回其后新增的行
+        tail: 只返回最后N行
+        stream: 为1时以分块文本流返回（可配合since）
+    """
     if app_name not in processes:
         return jsonify({'success': False, 'message': '未知应用'})
     
-    # 特殊处理Forum Engine
-    if app_name == 'forum':
-        try:
-            forum_log_content = read_log_from_file('forum')
+    log_file_path = LOG_DIR / f"{app_name}.log"
+    since = request.args.get('since', type=int)
+    tail = request.args.get('tail', type=int)
+    
+    if request.args.get('stream') == '1':
+        return Response(
+            stream_with_context(stream_lines(log_file_path, since or 0)),
+            mimetype='text/plain; charset=utf-8'
+        )
+    
+    try:
+        if since is not None:
+            chunk = read_since(log_file_path, since, max_lines=request.args.get('max_lines', type=int))
             return jsonify({
                 'success': True,
-                'output': forum_log_content,
-                'total_lines': len(forum_log_content)
+                'output': chunk.lines,
+                'cursor': chunk.cursor,
+                'has_more': chunk.has_more,
+                'reset': chunk.reset
             })
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'读取forum日志失败: {str(e)}'})
-    
-    # 从文件读取完整日志
-    output_lines = read_log_from_file(app_name)
+        
+        output_lines, cursor = read_log_from_file(app_name, tail_count=tail)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'读取{app_name}日志失败: {str(e)}'})
     
-    return jsonify({
+    # cursor为返回的最后一个完整行之后的偏移，下次可通过since只获取新增内容
+    result = {
         'success': True,
-        'output': output_lines
-    })
+        'output': output_lines,
+        'cursor': cursor
+    }
+    if app_name == 'forum':
+        result['total_lines'] = len(output_lines)
+    return jsonify(result)
 
 @app.route('/api/test_log/<app_name>')
 def test_log(app_name):
@@ -1011,13 +1049,8 @@ def test_log(app_name):
     
     # 写入测试消息
     test_msg = f"[{datetime.now().strftime('%H:%M:%S')}] 测试日志消息 - {datetime.now()}"
-    write_log_to_file(app_name, test_msg)
-    
-    # 通过Socket.IO发送
-    socketio.emit('console_output', {
-        'app': app_name,
-        'line': test_msg
-    })
+    # 写入日志并通过Socket.IO发送
+    write_log_to_file(app_name, test_msg, emit=True)
     
     return jsonify({
         'success': True,
@@ -1049,20 +1082,15 @@ def stop_forum_monitoring_api():
 
 @app.route('/api/forum/log')
 def get_forum_log():
-    """获取ForumEngine的forum.log内容"""
+    """获取ForumEngine的forum.log内容（支持 offset/limit 按条目分页，offset为负数时从末尾倒数）"""
     try:
-        forum_log_file = LOG_DIR / "forum.log"
-        if not forum_log_file.exists():
-            return jsonify({
-                'success': True,
-                'log_lines': [],
-                'parsed_messages': [],
-                'total_lines': 0
-            })
+        offset = request.args.get('offset', default=0, type=int)
+        limit = request.args.get('limit', default=None, type=int)
         
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
+        store = get_forum_log_store(str(LOG_DIR))
+        entries = store.entries(offset=offset, limit=limit)
+        lines = [entry.raw for entry in entries]
+        total_lines = store.count()
         
         # 解析每一行日志并提取对话信息
         parsed_messages = []
@@ -1071,11 +1099,14 @@ def get_forum_log():
             if parsed_message:
                 parsed_messages.append(parsed_message)
         
+        start = offset if offset >= 0 else max(0, total_lines + offset)
         return jsonify({
             'success': True,
             'log_lines': lines,
             'parsed_messages': parsed_messages,
-            'total_lines': len(lines)
+            'total_lines': total_lines,
+            'offset': start,
+            'has_more': start + len(lines) < total_lines
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'读取forum.log失败: {str(e)}'})
@@ -1088,45 +1119,18 @@ def get_forum_log_history():
         start_position = data.get('position', 0)  # 客户端上次接收的位置
         max_lines = data.get('max_lines', 1000)   # 最多返回的行数
 
-        forum_log_file = LOG_DIR / "forum.log"
-        if not forum_log_file.exists():
-            return jsonify({
-                'success': True,
-                'log_lines': [],
-                'position': 0,
-                'has_more': False
-            })
+        # 基于字节偏移只读取新增部分，不再遍历整个文件
+        chunk = read_since(LOG_DIR / "forum.log", start_position, max_lines=max_lines)
 
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            # 从指定位置开始读取
-            f.seek(start_position)
-            lines = []
-            line_count = 0
-
-            for line in f:
-                if line_count >= max_lines:
-                    break
-                line = line.rstrip('\n\r')
-                if line.strip():
-                    # 添加时间戳
-                    timestamp = datetime.now().strftime('%H:%M:%S')
-                    formatted_line = f"[{timestamp}] {line}"
-                    lines.append(formatted_line)
-                    line_count += 1
-
-            # 记录当前位置
-            current_position = f.tell()
-
-            # 检查是否还有更多内容
-            f.seek(0, 2)  # 移到文件末尾
-            end_position = f.tell()
-            has_more = current_position < end_position
+        # 添加时间戳
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        lines = [f"[{timestamp}] {line}" for line in chunk.lines]
 
         return jsonify({
             'success': True,
             'log_lines': lines,
-            'position': current_position,
-            'has_more': has_more
+            'position': chunk.cursor,
+            'has_more': chunk.has_more
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'读取forum历史失败: {str(e)}'})
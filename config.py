@@ -37,6 +37,9 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = Field("your_db_password", description="数据库密码")
     DB_NAME: str = Field("your_db_name", description="数据库名称")
     DB_CHARSET: str = Field("utf8mb4", description="数据库字符集，推荐utf8mb4，兼容emoji")
+    DB_QUERY_CONCURRENCY: int = Field(8, description="Insight Engine 多表搜索时的最大并发查询数")
+    DB_QUERY_TIMEOUT: float = Field(30.0, description="单条数据库查询超时（秒），<=0 表示不限制")
+    TOPIC_SEARCH_BACKEND: str = Field("auto", description="话题检索后端：auto 按方言使用全文索引（无索引时回退 LIKE），like 强制使用 LIKE")
     
     # ======================= LLM 相关 =======================
     # 我们的LLM模型API赞助商有：https://share.302.ai/P66Qe3、https://aihubmix.com/?aff=8Ds9，提供了非常全面的模型api
@@ -70,12 +73,25 @@ class Settings(BaseSettings):
     FORUM_HOST_API_KEY: Optional[str] = Field(None, description="Forum Host（推荐 qwen-plus，官方申请地址：https://www.aliyun.com/product/bailian）API 密钥")
     FORUM_HOST_BASE_URL: Optional[str] = Field(None, description="Forum Host LLM BaseUrl，可按所选服务配置")
     FORUM_HOST_MODEL_NAME: Optional[str] = Field(None, description="Forum Host LLM 模型名称，例如 qwen-plus")
+    # 论坛事件总线：引擎直接发布段落总结并订阅主持人发言，不可用时回退为日志解析
+    FORUM_BUS_ENABLED: bool = Field(True, description="是否启用论坛结构化事件总线")
+    FORUM_BUS_HOST: str = Field("127.0.0.1", description="论坛事件总线监听地址，仅建议本机地址")
+    FORUM_BUS_PORT: int = Field(5010, description="论坛事件总线端口")
+    FORUM_BUS_AUTHKEY: str = Field("", description="论坛事件总线连接握手密钥，为空时由主程序启动时随机生成并传给各引擎子进程")
+    FORUM_BUS_JOURNAL: str = Field("logs/forum_events.jsonl", description="论坛事件JSONL日志路径，用于回放")
     
     # SQL keyword Optimizer（小参数Qwen3模型，这里我使用了硅基流动这个平台，申请地址：https://cloud.siliconflow.cn/）
     KEYWORD_OPTIMIZER_API_KEY: Optional[str] = Field(None, description="SQL Keyword Optimizer（推荐 qwen-plus，官方申请地址：https://www.aliyun.com/product/bailian）API 密钥")
     KEYWORD_OPTIMIZER_BASE_URL: Optional[str] = Field(None, description="Keyword Optimizer BaseUrl，可按所选服务配置")
     KEYWORD_OPTIMIZER_MODEL_NAME: Optional[str] = Field(None, description="Keyword Optimizer LLM 模型名称，例如 qwen-plus")
     
+    # ================== 提示词Token预算 ====================
+    # 各引擎总结节点按token装入搜索结果；tokenizer文件与tiktoken均不可用时按字符估算
+    PROMPT_TOKENIZER_FILE: Optional[str] = Field(None, description="HuggingFace tokenizer.json 路径，配置后优先用于token计数")
+    PROMPT_TIKTOKEN_ENCODING: str = Field("", description="tiktoken编码名，例如 cl100k_base；需自行安装 tiktoken 并预先缓存编码文件（首次加载会联网下载），默认留空不使用")
+    SUMMARY_PROMPT_MAX_TOKENS: int = Field(32000, description="总结节点单次提示词（含系统提示词）的token上限")
+    SEARCH_RESULT_MAX_TOKENS: int = Field(2000, description="单条搜索结果装入提示词的token上限，0表示不限")
+
     # ================== 网络工具配置 ====================
     # Tavily API（申请地址：https://www.tavily.com/）
     TAVILY_API_KEY: Optional[str] = Field(None, description="Tavily API（申请地址：https://www.tavily.com/）API密钥，用于Tavily网络搜索")
@@ -100,6 +116,7 @@ class Settings(BaseSettings):
     MAX_HIGH_CONFIDENCE_SENTIMENT_RESULTS: int = Field(0, description="高置信度情感分析最大数")
     MAX_REFLECTIONS: int = Field(3, description="最大反思次数")
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
+    PARAGRAPH_CONCURRENCY: int = Field(1, description="段落并发研究的最大线程数，1表示按顺序处理")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
     MAX_CONTENT_LENGTH: int = Field(500000, description="搜索最大内容长度")
     
@@ -0,0 +1,135 @@
+"""
+测试 ReportAgent 的章节并发生成
+
+替换章节生成节点，保留真实的调度、重试与事件推送，覆盖：
+并发数不超过 CHAPTER_CONCURRENCY、章节按模板顺序返回（与完成顺序无关）、
+流式事件带有各自的 chapterId、单章重试不影响其他章节、
+并发数为1时按顺序生成、任一章节最终失败时取消未开始的章节并抛出异常。
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.agent import ReportAgent
+from ReportEngine.core import TemplateSection
+from ReportEngine.nodes import ChapterJsonParseError
+
+SECTIONS = [
+    TemplateSection(
+        title=f"{i}.0 章节{i}",
+        slug=f"section-{i}-0",
+        order=i * 10,
+        depth=1,
+        raw_title=f"{i}.0 章节{i}",
+        number=f"{i}.0",
+        chapter_id=f"S{i}",
+    )
+    for i in range(1, 7)
+]
+
+
+class FakeChapterNode:
+    """按章节模拟生成：delays 为各章耗时，failures 记录每章需要先失败的次数"""
+
+    def __init__(self, delays=None, failures=None):
+        self.delays = delays or {}
+        self.failures = dict(failures or {})
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self.finished = []
+
+    def run(self, section, generation_context, run_dir, stream_callback=None):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.started.append(section.chapter_id)
+        try:
+            time.sleep(self.delays.get(section.chapter_id, 0.01))
+            with self.lock:
+                remaining = self.failures.get(section.chapter_id, 0)
+                if remaining:
+                    self.failures[section.chapter_id] = remaining - 1
+            if remaining:
+                raise ChapterJsonParseError(f"{section.chapter_id} JSON解析失败")
+            stream_callback(f"{section.title}正文", {})
+            with self.lock:
+                self.finished.append(section.chapter_id)
+            return {"chapterId": section.chapter_id, "title": section.title}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def _agent(concurrency, node):
+    agent = ReportAgent.__new__(ReportAgent)
+    agent.config = SimpleNamespace(CHAPTER_CONCURRENCY=concurrency, CHAPTER_JSON_MAX_ATTEMPTS=2)
+    agent.chapter_generation_node = node
+    return agent
+
+
+def _run(agent, tmp_path):
+    events = []
+    lock = threading.Lock()
+
+    def emit(event_type, payload):
+        with lock:
+            events.append((event_type, payload))
+
+    chapters = agent._generate_chapters(SECTIONS, {}, tmp_path, emit)
+    return chapters, events
+
+
+def test_concurrent_chapters_keep_template_order(tmp_path):
+    # 越靠前的章节越慢，完成顺序与模板顺序相反
+    node = FakeChapterNode(delays={s.chapter_id: 0.04 * (len(SECTIONS) - i) for i, s in enumerate(SECTIONS)})
+    chapters, events = _run(_agent(3, node), tmp_path)
+
+    assert node.peak == 3
+    assert node.finished != [s.chapter_id for s in SECTIONS]
+    assert [c["chapterId"] for c in chapters] == [s.chapter_id for s in SECTIONS]
+
+    chunks = [payload for event_type, payload in events if event_type == "chapter_chunk"]
+    assert {c["chapterId"]: c["delta"] for c in chunks} == {s.chapter_id: f"{s.title}正文" for s in SECTIONS}
+    progress = [payload["progress"] for event_type, payload in events if event_type == "progress"]
+    assert progress == sorted(progress) and progress[-1] == 100
+
+
+def test_retry_stays_within_its_chapter(tmp_path):
+    node = FakeChapterNode(failures={"S2": 1})
+    chapters, events = _run(_agent(3, node), tmp_path)
+
+    assert [c["chapterId"] for c in chapters] == [s.chapter_id for s in SECTIONS]
+    assert node.started.count("S2") == 2
+    assert all(node.started.count(s.chapter_id) == 1 for s in SECTIONS if s.chapter_id != "S2")
+    retrying = [p for t, p in events if t == "chapter_status" and p["status"] == "retrying"]
+    assert [p["chapterId"] for p in retrying] == ["S2"]
+
+
+def test_single_worker_runs_in_order(tmp_path):
+    node = FakeChapterNode()
+    chapters, _ = _run(_agent(1, node), tmp_path)
+
+    assert node.peak == 1
+    assert node.started == [s.chapter_id for s in SECTIONS]
+    assert [c["chapterId"] for c in chapters] == [s.chapter_id for s in SECTIONS]
+
+
+def test_failed_chapter_cancels_pending_ones(tmp_path):
+    # S1 的失败次数超过最大尝试次数
+    node = FakeChapterNode(delays={s.chapter_id: 0.2 for s in SECTIONS[1:]}, failures={"S1": 10})
+
+    with pytest.raises(ChapterJsonParseError, match="S1"):
+        _run(_agent(2, node), tmp_path)
+
+    assert len(set(node.started)) < len(SECTIONS)
@@ -0,0 +1,89 @@
+"""
+测试章节级上下文检索
+
+覆盖：原文不超预算时返回全文、按章节标题检索相关段落、每个来源至少保留一段、
+摘录保持原文顺序并在token预算之内。
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core.context_retriever import ContextRetriever, split_markdown
+from ReportEngine.core.template_parser import TemplateSection
+from utils.prompt_budget import TokenCounter
+
+# 固定使用字符估算，结果不受本机tokenizer配置影响
+COUNTER = TokenCounter()
+
+FILLER = "本段为与主题无关的填充内容，用于撑大篇幅。" * 20
+
+QUERY_REPORT = f"""# 舆情总览
+## 樱花季热度
+樱花预约话题阅读量达到三亿，游客抢票引发讨论。
+## 食堂话题
+{FILLER}
+## 校史争议
+建校年份争议持续发酵，校友群体情绪分化。
+"""
+
+MEDIA_REPORT = f"""# 媒体视角
+## 短视频传播
+樱花季短视频播放量激增，樱花打卡成为热门内容。
+## 其他
+{FILLER}
+"""
+
+INSIGHT_REPORT = f"""# 洞察
+## 情绪结构
+{FILLER}
+"""
+
+
+def make_section(title, outline=None):
+    return TemplateSection(
+        title=title, slug="s", order=1, depth=1, raw_title=title, chapter_id="S1", outline=outline or []
+    )
+
+
+def test_small_inputs_return_full_text():
+    reports = {"query_engine": "短报告", "media_engine": "", "insight_engine": ""}
+    retriever = ContextRetriever(reports, "论坛日志", max_tokens=1000, counter=COUNTER)
+
+    assert not retriever.enabled
+    assert retriever.select(make_section("任意章节")) == {"reports": {**reports}, "forum_logs": "论坛日志"}
+
+
+def test_selects_relevant_passages_within_budget():
+    reports = {"query_engine": QUERY_REPORT, "media_engine": MEDIA_REPORT, "insight_engine": INSIGHT_REPORT}
+    forum = "\n".join(["[10:00] [QUERY] 樱花预约系统崩溃"] + ["[10:01] [MEDIA] 无关闲聊"] * 50)
+    retriever = ContextRetriever(reports, forum, max_tokens=400, passage_chars=200, counter=COUNTER)
+    assert retriever.enabled
+
+    result = retriever.select(make_section("樱花季热度分析", ["预约与游客反馈"]))
+    query_text = result["reports"]["query_engine"]
+
+    assert "樱花预约话题" in query_text
+    assert FILLER[:20] not in query_text
+    assert "樱花季短视频" in result["reports"]["media_engine"]
+    assert "樱花预约系统崩溃" in result["forum_logs"]
+    # 没有命中的来源不强行塞入内容
+    assert result["reports"]["insight_engine"] == ""
+    total = sum(map(COUNTER.count, result["reports"].values())) + COUNTER.count(result["forum_logs"])
+    assert total <= 400 + 50  # 预算只计正文，另含少量标题与分隔符
+
+
+def test_excerpts_keep_document_order_and_heading_path():
+    passages = split_markdown(QUERY_REPORT, "query_engine", max_chars=200)
+    assert passages[0].heading == "舆情总览"
+    assert passages[1].heading == "舆情总览 / 樱花季热度"
+    assert passages[-1].heading == "舆情总览 / 校史争议"
+
+    reports = {"query_engine": QUERY_REPORT, "media_engine": "", "insight_engine": ""}
+    retriever = ContextRetriever(reports, max_tokens=300, passage_chars=200, counter=COUNTER)
+    text = retriever.select(make_section("樱花与校史争议"))["reports"]["query_engine"]
+    assert text.index("樱花预约") < text.index("建校年份")
+    assert "……" in text  # 中间跳过的段落以省略号分隔
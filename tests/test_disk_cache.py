@@ -0,0 +1,80 @@
+"""
+测试磁盘LRU缓存与SVG缓存键
+
+覆盖：跨实例持久化、超出容量按最近使用淘汰、图表键忽略widgetId但随内容变化、公式键随mathtext字体配置变化。
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers.svg_cache import chart_svg_key, math_svg_key
+from ReportEngine.utils.disk_cache import DiskLRUCache
+
+
+def test_entries_persist_across_instances(tmp_path):
+    DiskLRUCache(tmp_path, 1024, suffix=".svg").put("k", "<svg/>")
+
+    cache = DiskLRUCache(tmp_path, 1024, suffix=".svg")
+    assert cache.get("k") == "<svg/>"
+    assert cache.get("missing") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskLRUCache(tmp_path, 25, suffix=".svg")
+    cache.put("a", "a" * 10)
+    cache.put("b", "b" * 10)
+    assert cache.get("a")            # a 变为最近使用
+    cache.put("c", "c" * 10)         # 超出容量，淘汰 b
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.svg", "c.svg"]
+
+
+def test_startup_eviction_uses_file_mtime(tmp_path):
+    for i, name in enumerate(["old", "new"]):
+        path = tmp_path / f"{name}.svg"
+        path.write_text("x" * 10, encoding="utf-8")
+        mtime = time.time() - 100 + i
+        os.utime(path, (mtime, mtime))
+
+    cache = DiskLRUCache(tmp_path, 15, suffix=".svg")
+
+    assert cache.get("old") is None
+    assert cache.get("new") == "x" * 10
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = DiskLRUCache(tmp_path / "off", 0)
+    cache.put("k", "v")
+    assert cache.get("k") is None
+    assert not (tmp_path / "off").exists()
+
+
+def test_chart_key_ignores_widget_id():
+    size = {"width": 800, "height": 500, "dpi": 100}
+    block = {"widgetId": "a", "widgetType": "chart.js/bar", "data": {"labels": ["x"]}, "props": {}}
+
+    same = dict(block, widgetId="b")
+    changed = dict(block, data={"labels": ["y"]})
+    assert chart_svg_key(block, size) == chart_svg_key(same, size)
+    assert chart_svg_key(block, size) != chart_svg_key(changed, size)
+    assert chart_svg_key(block, size) != chart_svg_key(block, dict(size, dpi=200))
+    assert math_svg_key("x^2", True) != math_svg_key("x^2", False)
+
+
+def test_math_key_tracks_mathtext_fonts():
+    matplotlib = pytest.importorskip("matplotlib")
+    key = math_svg_key("x^2", True)
+    with matplotlib.rc_context({"mathtext.fontset": "stix"}):
+        assert math_svg_key("x^2", True) != key
+    assert math_svg_key("x^2", True) == key
@@ -0,0 +1,105 @@
+"""
+测试utils/forum_bus.py中的论坛事件总线
+
+覆盖：客户端发布事件送达服务端订阅者、订阅者收到最新主持人发言、JSONL事件日志。
+"""
+
+import socket
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.forum_bus import (
+    TOPIC_AGENT_SUMMARY,
+    TOPIC_HOST_SPEECH,
+    ForumBusClient,
+    ForumEventHub,
+    read_journal,
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_hub_client_roundtrip(tmp_path):
+    address = ("127.0.0.1", _free_port())
+    journal = tmp_path / "forum_events.jsonl"
+    hub = ForumEventHub(address, b"test-key", str(journal))
+    assert hub.start()
+    received = []
+    hub.subscribe(received.append, topics=[TOPIC_AGENT_SUMMARY])
+
+    client = ForumBusClient(address, b"test-key", source="insight")
+    try:
+        assert client.publish(TOPIC_AGENT_SUMMARY, {"node": "FirstSummaryNode", "content": "段落总结"})
+        assert _wait_until(lambda: len(received) == 1)
+        assert received[0]["source"] == "insight"
+        assert received[0]["payload"]["content"] == "段落总结"
+        assert hub.connected_sources() == {"insight"}
+
+        hub.publish(TOPIC_HOST_SPEECH, {"content": "主持人发言"})
+        assert _wait_until(lambda: client.latest(TOPIC_HOST_SPEECH) is not None)
+        assert client.latest(TOPIC_HOST_SPEECH)["payload"]["content"] == "主持人发言"
+
+        topics = [event["topic"] for event in read_journal(str(journal))]
+        assert topics == [TOPIC_AGENT_SUMMARY, TOPIC_HOST_SPEECH]
+        assert len(read_journal(str(journal), topics=[TOPIC_HOST_SPEECH])) == 1
+
+        # 新会话清空事件日志，客户端缓存的主持人发言随之失效
+        hub.reset_session()
+        assert _wait_until(lambda: client.latest(TOPIC_HOST_SPEECH) is None)
+    finally:
+        client.close()
+        hub.stop()
+
+
+def test_client_without_hub_does_not_raise():
+    client = ForumBusClient(("127.0.0.1", _free_port()), b"test-key", source="media")
+    assert client.publish(TOPIC_AGENT_SUMMARY, {"content": "x"}) is False
+    assert client.latest(TOPIC_HOST_SPEECH) is None
+    assert client.is_connected is False
+
+
+def test_failed_publish_is_resent_after_reconnect(tmp_path):
+    address = ("127.0.0.1", _free_port())
+    hub = ForumEventHub(address, b"test-key", str(tmp_path / "forum_events.jsonl"))
+    assert hub.start()
+    received = []
+    hub.subscribe(received.append, topics=[TOPIC_AGENT_SUMMARY])
+
+    client = ForumBusClient(address, b"test-key", source="query")
+    client.RECONNECT_INTERVAL = 0
+    try:
+        assert client.is_connected is False
+        assert client._ensure_connected() is not None
+        # 模拟连接中途断开：发送失败的事件进入待发队列
+        def broken_send(data):
+            raise OSError("connection reset")
+
+        client._conn.send_bytes = broken_send
+        assert client.publish(TOPIC_AGENT_SUMMARY, {"content": "断线时的总结"}) is False
+        assert len(client._pending) == 1
+
+        assert client.publish(TOPIC_AGENT_SUMMARY, {"content": "重连后的总结"})
+        assert _wait_until(lambda: len(received) == 2)
+        assert [event["payload"]["content"] for event in received] == ["断线时的总结", "重连后的总结"]
+        assert not client._pending
+    finally:
+        client.close()
+        hub.stop()
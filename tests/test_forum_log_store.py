@@ -0,0 +1,74 @@
+"""
+测试utils/forum_log_store.py中的forum.log索引存储
+
+覆盖：尾部优先读取最新HOST发言、增量索引、分页、清空重写后重建索引。
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.forum_log_store import ForumLogStore
+
+
+def _append(path: Path, *lines: str):
+    with open(path, "a", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+
+
+def test_latest_host_speech_tail_first(tmp_path):
+    log = tmp_path / "forum.log"
+    _append(log, "[10:00:00] [SYSTEM] === ForumEngine 监控开始 - 2025-01-01 10:00:00 ===")
+    store = ForumLogStore(log)
+    assert store.latest_host_speech() is None
+
+    _append(log, "[10:00:01] [INSIGHT] 洞察", "[10:00:02] [HOST] 第一轮\\n总结", "[10:00:03] [QUERY] 查询")
+    assert store.latest_host_speech() == "第一轮\n总结"
+
+    _append(log, "[10:00:04] [HOST] 第二轮总结")
+    assert store.latest_host_speech() == "第二轮总结"
+
+    # 末尾尚未写完的半行不参与查找
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("[10:00:05] [HOST] 未写完")
+    assert store.latest_host_speech() == "第二轮总结"
+
+
+def test_latest_host_speech_from_index_when_tail_has_none(tmp_path):
+    log = tmp_path / "forum.log"
+    store = ForumLogStore(log)
+    store.BLOCK_SIZE = 16  # 强制跨块读取
+    _append(log, "[10:00:00] [SYSTEM] start", "[10:00:01] [HOST] 主持人发言")
+    assert store.count() == 2
+    _append(log, *[f"[10:00:02] [MEDIA] 发言{i}" for i in range(20)])
+    assert store.latest_host_speech() == "主持人发言"
+    assert store.count(["HOST"]) == 1
+
+
+def test_entries_pagination(tmp_path):
+    log = tmp_path / "forum.log"
+    _append(log, *[f"[10:00:{i:02d}] [{'HOST' if i % 3 == 0 else 'INSIGHT'}] 条目{i}" for i in range(10)])
+    store = ForumLogStore(log)
+    assert [e.content for e in store.entries(offset=2, limit=3)] == ["条目2", "条目3", "条目4"]
+    assert [e.content for e in store.entries(offset=-2)] == ["条目8", "条目9"]
+    assert [e.content for e in store.host_speeches(offset=1)] == ["条目3", "条目6", "条目9"]
+    assert store.entries(offset=20) == []
+
+
+def test_rewritten_log_rebuilds_index(tmp_path):
+    log = tmp_path / "forum.log"
+    _append(log, "[10:00:00] [SYSTEM] === ForumEngine 监控开始 - 2025-01-01 10:00:00 ===",
+            "[10:00:01] [HOST] 旧会话")
+    store = ForumLogStore(log)
+    assert store.count() == 2
+
+    # 清空重写后，即使新文件比旧索引位置更长也要重建索引
+    log.write_text("", encoding="utf-8")
+    _append(log, "[11:00:00] [SYSTEM] === ForumEngine 监控开始 - 2025-01-01 11:00:00 ===",
+            *[f"[11:00:01] [QUERY] 新会话发言{i}" for i in range(5)])
+    assert store.latest_host_speech() is None
+    assert store.count() == 6
@@ -0,0 +1,86 @@
+"""
+测试HTMLRenderer的第三方库加载模式与PDF静态替身
+
+覆盖：按正文内容裁剪库、external模式按内容哈希写出静态文件并以<script src>引用、
+渲染时直接输出图表/公式的静态SVG。
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers.html_renderer import HTMLRenderer
+
+
+def _document(blocks):
+    return {
+        "metadata": {"title": "测试报告"},
+        "chapters": [{"chapterId": "c1", "title": "第一章", "anchor": "c1", "blocks": blocks}],
+    }
+
+
+MATH_AND_CHART = [
+    {"type": "math", "latex": "x^2"},
+    {
+        "type": "widget",
+        "widgetType": "chart.js/bar",
+        "widgetId": "w1",
+        "props": {"type": "bar"},
+        "data": {"labels": ["a", "b"], "datasets": [{"label": "x", "data": [1, 2]}]},
+    },
+]
+
+
+def test_inline_mode_only_includes_used_libraries():
+    renderer = HTMLRenderer()
+    plain = renderer.render(_document([{"type": "paragraph", "inlines": [{"text": "正文"}]}]))
+    assert "window.MathJax" not in plain
+    assert "Chart.js - 嵌入式版本" not in plain
+    assert "jsPDF - 嵌入式版本" in plain
+
+    rich = renderer.render(_document(MATH_AND_CHART))
+    assert "window.MathJax" in rich
+    assert "Chart.js - 嵌入式版本" in rich
+    assert "wordcloud2 - 嵌入式版本" not in rich
+
+
+def test_external_mode_writes_hashed_assets(tmp_path):
+    renderer = HTMLRenderer({"assetMode": "external", "assetDir": str(tmp_path), "assetUrlPrefix": "/static/libs/"})
+    html = renderer.render(_document(MATH_AND_CHART))
+
+    sources = re.findall(r'<script(?: defer)? src="([^"]+)"', html)
+    assert sources and all(src.startswith("/static/libs/") for src in sources)
+    written = {path.name for path in tmp_path.iterdir()}
+    assert {src.rsplit("/", 1)[1] for src in sources} == written
+    assert any(re.fullmatch(r"mathjax\.[0-9a-f]{16}\.js", name) for name in written)
+    assert "嵌入式版本" not in html
+    assert len(html) < 500 * 1024
+
+    # 再次渲染复用同一文件名
+    again = HTMLRenderer({"assetMode": "external", "assetDir": str(tmp_path), "assetUrlPrefix": "/static/libs/"})
+    assert re.findall(r'<script(?: defer)? src="([^"]+)"', again.render(_document(MATH_AND_CHART))) == sources
+
+
+def test_static_media_is_emitted_at_render_time():
+    renderer = HTMLRenderer()
+    blocks = [dict(block) for block in MATH_AND_CHART]
+    blocks[0]["mathId"] = "math-block-1"
+    blocks.append({"type": "paragraph", "inlines": [{"text": "行内 $y$ 公式", "mathIds": ["auto-math-2"]}]})
+    renderer.set_static_media(
+        {"w1": '<div class="chart-svg-container"><svg id="chart-svg"></svg></div>'},
+        {"math-block-1": '<svg id="block-svg"></svg>', "auto-math-2": '<svg id="inline-svg"></svg>'},
+    )
+    html = renderer.render(_document(blocks))
+
+    assert '<svg id="chart-svg"></svg>' in html
+    assert 'data-config-id="chart-config-1"></canvas>' not in html
+    assert 'class="chart-fallback svg-hidden"' in html
+    assert '<div class="math-svg-container"><svg id="block-svg"></svg></div>' in html
+    assert '<span class="math-svg-inline"><svg id="inline-svg"></svg></span>' in html
+
+    renderer.set_static_media()
+    assert "<canvas" in renderer.render(_document(MATH_AND_CHART))
@@ -0,0 +1,85 @@
+"""
+测试 InsightEngine 多表并发查询
+
+覆盖：结果顺序与查询顺序一致、并发数不超过上限、单条查询失败或超时不影响其他查询、
+MediaCrawlerDB 把失败的表记为空结果。
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+# InsightEngine 导入时会创建关键词优化器，需要配置API密钥（测试中不会调用）
+os.environ.setdefault("KEYWORD_OPTIMIZER_API_KEY", "test-key")
+
+from InsightEngine.tools.search import MediaCrawlerDB
+from InsightEngine.utils import db
+
+
+def _fake_fetch_all(delays, failures=(), state=None):
+    """按SQL文本模拟查询：delays 为各查询的耗时，failures 中的查询抛出异常"""
+    state = state if state is not None else {}
+
+    async def fetch_all(query, params=None):
+        state["running"] = state.get("running", 0) + 1
+        state["peak"] = max(state.get("peak", 0), state["running"])
+        try:
+            await asyncio.sleep(delays.get(query, 0))
+            if query in failures:
+                raise RuntimeError(f"{query} failed")
+            return [{"query": query, "params": params}]
+        finally:
+            state["running"] -= 1
+
+    return fetch_all
+
+
+def test_results_keep_query_order(monkeypatch):
+    # 先提交的查询最后完成
+    delays = {"q0": 0.06, "q1": 0.04, "q2": 0.02, "q3": 0}
+    monkeypatch.setattr(db, "fetch_all", _fake_fetch_all(delays))
+
+    queries = [(f"q{i}", {"i": i}) for i in range(4)]
+    results = asyncio.run(db.fetch_all_concurrently(queries, max_concurrency=4, timeout=5))
+
+    assert [rows[0]["query"] for rows in results] == ["q0", "q1", "q2", "q3"]
+    assert [rows[0]["params"] for rows in results] == [{"i": i} for i in range(4)]
+
+
+def test_concurrency_is_capped(monkeypatch):
+    state = {}
+    monkeypatch.setattr(db, "fetch_all", _fake_fetch_all({f"q{i}": 0.02 for i in range(8)}, state=state))
+
+    asyncio.run(db.fetch_all_concurrently([(f"q{i}", None) for i in range(8)], max_concurrency=3, timeout=5))
+
+    assert state["peak"] == 3
+
+
+def test_failure_and_timeout_are_isolated(monkeypatch):
+    delays = {"slow": 1}
+    monkeypatch.setattr(db, "fetch_all", _fake_fetch_all(delays, failures={"broken"}))
+
+    results = asyncio.run(db.fetch_all_concurrently(
+        [("ok", None), ("broken", None), ("slow", None), ("also_ok", None)], max_concurrency=4, timeout=0.2
+    ))
+
+    assert results[0][0]["query"] == "ok"
+    assert isinstance(results[1], RuntimeError)
+    assert isinstance(results[2], asyncio.TimeoutError)
+    assert results[3][0]["query"] == "also_ok"
+
+
+def test_media_crawler_db_returns_empty_rows_for_failed_tables(monkeypatch):
+    monkeypatch.setattr(db, "fetch_all", _fake_fetch_all({}, failures={"broken"}))
+
+    results = MediaCrawlerDB()._execute_queries_concurrently([("ok", {}), ("broken", {}), ("last", {})])
+
+    assert results == [[{"query": "ok", "params": {}}], [], [{"query": "last", "params": {}}]]
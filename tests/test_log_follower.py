@@ -0,0 +1,98 @@
+"""
+测试ForumEngine/log_follower.py中的增量日志跟随器
+
+覆盖：只读取新追加内容、半行暂存、截断与轮转识别、多字节字符跨读取边界。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine.log_follower import LogChangeWaiter, LogFollower
+
+
+class TestLogFollower:
+    """测试LogFollower的增量读取"""
+
+    def test_seek_to_end_skips_existing_content(self, tmp_path):
+        log_file = tmp_path / "insight.log"
+        log_file.write_text("old line\n", encoding="utf-8")
+        follower = LogFollower(log_file)
+        follower.seek_to_end()
+        assert follower.poll().lines == []
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("new line 1\nnew line 2\n")
+        result = follower.poll()
+        assert result.lines == ["new line 1", "new line 2"]
+        assert result.reset is False
+        assert follower.poll().lines == []
+
+    def test_partial_line_is_buffered(self, tmp_path):
+        log_file = tmp_path / "media.log"
+        log_file.write_bytes(b"")
+        follower = LogFollower(log_file)
+        follower.seek_to_end()
+
+        with open(log_file, "ab") as f:
+            f.write("完整的一行\n未写完的".encode("utf-8"))
+        assert follower.poll().lines == ["完整的一行"]
+
+        with open(log_file, "ab") as f:
+            f.write("半行\n".encode("utf-8"))
+        assert follower.poll().lines == ["未写完的半行"]
+
+    def test_multibyte_character_split_across_writes(self, tmp_path):
+        log_file = tmp_path / "query.log"
+        log_file.write_bytes(b"")
+        follower = LogFollower(log_file)
+        follower.seek_to_end()
+
+        encoded = "舆情\n".encode("utf-8")
+        with open(log_file, "ab") as f:
+            f.write(encoded[:4])
+        assert follower.poll().lines == []
+        with open(log_file, "ab") as f:
+            f.write(encoded[4:])
+        assert follower.poll().lines == ["舆情"]
+
+    def test_truncation_is_reported(self, tmp_path):
+        log_file = tmp_path / "insight.log"
+        log_file.write_text("line 1\nline 2\n", encoding="utf-8")
+        follower = LogFollower(log_file)
+        follower.seek_to_end()
+
+        log_file.write_text("a\n", encoding="utf-8")
+        result = follower.poll()
+        assert result.reset is True
+        assert result.lines == ["a"]
+
+    def test_rotation_is_reported(self, tmp_path):
+        log_file = tmp_path / "insight.log"
+        log_file.write_text("before rotation\n", encoding="utf-8")
+        follower = LogFollower(log_file)
+        follower.seek_to_end()
+
+        os.rename(log_file, tmp_path / "insight.log.1")
+        log_file.write_text("after rotation, longer than before\n", encoding="utf-8")
+        result = follower.poll()
+        assert result.reset is True
+        assert result.lines == ["after rotation, longer than before"]
+
+    def test_missing_file(self, tmp_path):
+        follower = LogFollower(tmp_path / "missing.log")
+        follower.seek_to_end()
+        result = follower.poll()
+        assert result.lines == []
+        assert result.reset is False
+
+
+def test_change_waiter_polling_fallback(tmp_path):
+    waiter = LogChangeWaiter(tmp_path, ["insight.log"], use_inotify=False)
+    assert waiter.uses_inotify is False
+    waiter.wait(0.01)
+    waiter.close()
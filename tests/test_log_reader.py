@@ -0,0 +1,67 @@
+"""
+测试utils/log_reader.py中的日志读取工具
+
+覆盖：反向读取末尾N行、末尾N行与游标出自同一次读取、基于游标的增量读取、截断后重置、分块流式输出。
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.log_reader import read_since, read_tail, stream_lines, tail_lines
+
+
+def test_tail_lines_reads_backward_across_blocks(tmp_path):
+    log = tmp_path / "insight.log"
+    log.write_text("".join(f"第{i}行\n" for i in range(1000)) + "\n", encoding="utf-8")
+    assert tail_lines(log, 3) == ["第997行", "第998行", "第999行"]
+    assert tail_lines(tmp_path / "missing.log", 3) == []
+
+
+def test_read_tail_cursor_matches_lines(tmp_path):
+    log = tmp_path / "media.log"
+    log.write_text("a\nb\nc\n未写完", encoding="utf-8")
+    chunk = read_tail(log, 2)
+    assert chunk.lines == ["b", "c"]
+    assert read_tail(log).lines == ["a", "b", "c"]
+
+    # 读取之后追加的内容由游标轮询取得，既不重复也不遗漏
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("的行\nd\n")
+    assert read_since(log, chunk.cursor).lines == ["未写完的行", "d"]
+    assert read_tail(tmp_path / "missing.log", 2).cursor == 0
+
+
+def test_read_since_cursor(tmp_path):
+    log = tmp_path / "query.log"
+    log.write_text("a\nb\n", encoding="utf-8")
+    first = read_since(log, 0)
+    assert first.lines == ["a", "b"]
+    assert first.has_more is False
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("c\n未写完")
+    second = read_since(log, first.cursor)
+    assert second.lines == ["c"]
+    assert second.has_more is True  # 半行留到下次
+
+    limited = read_since(log, 0, max_lines=1)
+    assert limited.lines == ["a"]
+    assert read_since(log, limited.cursor, max_lines=1).lines == ["b"]
+
+    log.write_text("x\n", encoding="utf-8")
+    reset = read_since(log, second.cursor)
+    assert reset.reset is True
+    assert reset.lines == ["x"]
+
+
+def test_stream_lines(tmp_path):
+    log = tmp_path / "report.log"
+    content = "".join(f"日志{i}\n" for i in range(100))
+    log.write_text(content, encoding="utf-8")
+    chunks = list(stream_lines(log, block_size=7))
+    assert "".join(chunks) == content
+    assert all(chunk.endswith("\n") for chunk in chunks)
@@ -0,0 +1,61 @@
+"""
+测试utils/log_writer.py中的缓冲异步日志写入器
+
+覆盖：批量写入且顺序不变、批次回调只包含需要推送的行、truncate 与写入的先后顺序。
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.log_writer import BufferedLogWriter
+
+
+def test_lines_are_batched_in_order(tmp_path):
+    log = tmp_path / "insight.log"
+    batches = []
+    writer = BufferedLogWriter(log, on_batch=batches.append, flush_interval=5, max_batch_lines=100)
+
+    for i in range(250):
+        writer.write(f"line {i}")
+    writer.write("only in file", notify=False)
+    assert writer.flush(timeout=5)
+
+    expected = [f"line {i}" for i in range(250)]
+    assert log.read_text(encoding="utf-8").splitlines() == expected + ["only in file"]
+    assert [line for batch in batches for line in batch] == expected
+    assert all(len(batch) <= 100 for batch in batches)
+    writer.close(timeout=5)
+
+
+def test_concurrent_writers_do_not_lose_lines(tmp_path):
+    log = tmp_path / "media.log"
+    writer = BufferedLogWriter(log, flush_interval=0.01)
+    threads = [
+        threading.Thread(target=lambda n=n: [writer.write(f"{n}-{i}") for i in range(200)])
+        for n in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close(timeout=5)
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 800
+    for n in range(4):
+        assert [line for line in lines if line.startswith(f"{n}-")] == [f"{n}-{i}" for i in range(200)]
+
+
+def test_truncate_applies_after_pending_lines(tmp_path):
+    log = tmp_path / "query.log"
+    writer = BufferedLogWriter(log, flush_interval=5)
+    writer.write("old")
+    assert writer.truncate(timeout=5)
+    assert not log.exists()
+    writer.write("new")
+    writer.close(timeout=5)
+    assert log.read_text(encoding="utf-8") == "new\n"
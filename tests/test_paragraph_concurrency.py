@@ -0,0 +1,99 @@
+"""
+测试 DeepSearchAgent 的段落并发研究
+
+以 InsightEngine 的 Agent 为例（三个Engine的实现一致），替换搜索与总结步骤，覆盖：
+并发数不超过 PARAGRAPH_CONCURRENCY、各段落结果写回自己的位置且顺序与规划一致、
+并发数为1时按顺序处理、任一段落失败时取消未开始的段落并抛出异常。
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+# InsightEngine 导入时会创建关键词优化器，需要配置API密钥（测试中不会调用）
+os.environ.setdefault("KEYWORD_OPTIMIZER_API_KEY", "test-key")
+
+from InsightEngine.agent import DeepSearchAgent
+from InsightEngine.state import State
+
+TITLES = [f"段落{i}" for i in range(6)]
+
+
+def _agent(concurrency, delays=None, fail_index=None):
+    """只替换单段落的搜索与反思步骤，保留真实的调度与状态写入"""
+    agent = DeepSearchAgent.__new__(DeepSearchAgent)
+    agent.config = SimpleNamespace(PARAGRAPH_CONCURRENCY=concurrency)
+    agent.state = State(query="测试")
+    for title in TITLES:
+        agent.state.add_paragraph(title, f"{title}的内容")
+
+    lock = threading.Lock()
+    stats = {"running": 0, "peak": 0, "started": [], "finished": []}
+
+    def initial_search_and_summary(index):
+        with lock:
+            stats["running"] += 1
+            stats["peak"] = max(stats["peak"], stats["running"])
+            stats["started"].append(index)
+        try:
+            if index == fail_index:
+                raise RuntimeError(f"段落{index}失败")
+            time.sleep((delays or {}).get(index, 0.01))
+            agent.state.update_paragraph_summary(index, f"总结{index}")
+        finally:
+            with lock:
+                stats["running"] -= 1
+
+    def reflection_loop(index):
+        agent.state.update_paragraph_summary(index, f"总结{index}（反思后）", increment_reflection=True)
+        with lock:
+            stats["finished"].append(index)
+
+    agent._initial_search_and_summary = initial_search_and_summary
+    agent._reflection_loop = reflection_loop
+    return agent, stats
+
+
+def test_concurrent_paragraphs_keep_planned_order():
+    # 越靠前的段落越慢，完成顺序与规划顺序相反
+    delays = {i: 0.05 * (len(TITLES) - i) for i in range(len(TITLES))}
+    agent, stats = _agent(3, delays)
+
+    agent._process_paragraphs()
+
+    assert stats["peak"] == 3
+    assert stats["finished"] != sorted(stats["finished"])
+    paragraphs = agent.state.to_dict()["paragraphs"]
+    assert [p["title"] for p in paragraphs] == TITLES
+    assert [p["research"]["latest_summary"] for p in paragraphs] == [f"总结{i}（反思后）" for i in range(6)]
+    assert all(p.research.is_completed and p.research.reflection_iteration == 1 for p in agent.state.paragraphs)
+
+
+def test_single_worker_runs_in_order():
+    agent, stats = _agent(1)
+
+    agent._process_paragraphs()
+
+    assert stats["peak"] == 1
+    assert stats["started"] == list(range(len(TITLES)))
+    assert agent.state.get_completed_paragraphs_count() == len(TITLES)
+
+
+def test_failed_paragraph_cancels_pending_ones():
+    agent, stats = _agent(2, delays={i: 0.2 for i in range(len(TITLES))}, fail_index=0)
+
+    with pytest.raises(RuntimeError, match="段落0失败"):
+        agent._process_paragraphs()
+
+    assert len(stats["started"]) < len(TITLES)
+    assert not agent.state.paragraphs[0].research.is_completed
@@ -0,0 +1,192 @@
+"""
+测试PDF导出后台队列
+
+覆盖：相同IR复用磁盘上的PDF、导出目录容量上限、并发提交合并为同一任务、失败状态与事件、
+下载接口的ETag与Range支持、同步导出等待超时、被淘汰的PDF不再按已就绪发送。
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core.pdf_export_queue import PDFExportQueue
+
+IR = {"metadata": {"topic": "测试"}, "chapters": []}
+
+
+class FakeRenderer:
+    def __init__(self, gate=None, fail=False):
+        self.calls = 0
+        self.gate = gate
+        self.fail = fail
+
+    def __call__(self, document_ir, optimize, progress_callback):
+        self.calls += 1
+        progress_callback("转换图表为SVG", 25)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("boom")
+        return b"%PDF-1.7 " + b"x" * 100
+
+
+def test_same_ir_reuses_stored_pdf(tmp_path):
+    render = FakeRenderer()
+    queue = PDFExportQueue(tmp_path, render, broadcast=None)
+
+    first = queue.submit(IR, True, "a.pdf")
+    assert first.done.wait(5) and first.status == "completed"
+    second = queue.submit(dict(IR), True, "b.pdf")
+
+    assert second.status == "completed" and second.cached
+    assert second.file_path == first.file_path
+    assert render.calls == 1
+    # 布局开关不同视为不同内容
+    third = queue.submit(IR, False, "c.pdf")
+    assert third.done.wait(5) and render.calls == 2
+    queue.shutdown()
+
+
+def test_output_dir_is_capped(tmp_path):
+    render = FakeRenderer()
+    # 每个PDF 109 字节，上限只容得下两个
+    queue = PDFExportQueue(tmp_path, render, max_bytes=250)
+
+    jobs = []
+    for index in range(3):
+        job = queue.submit({"metadata": {"topic": f"测试{index}"}, "chapters": []}, True, "a.pdf")
+        assert job.done.wait(5) and job.status == "completed"
+        jobs.append(job)
+
+    assert len(list(tmp_path.glob("*.pdf"))) == 2
+    assert not Path(jobs[0].file_path).exists()
+    # 被淘汰的内容再次导出时重新生成
+    again = queue.submit({"metadata": {"topic": "测试0"}, "chapters": []}, True, "a.pdf")
+    assert again.done.wait(5) and not again.cached and render.calls == 4
+    queue.shutdown()
+
+
+def test_concurrent_submissions_share_job_and_broadcast_progress(tmp_path):
+    gate = threading.Event()
+    events = []
+    render = FakeRenderer(gate=gate)
+    queue = PDFExportQueue(tmp_path, render, broadcast=lambda job_id, event: events.append(event))
+
+    first = queue.submit(IR, True, "a.pdf")
+    second = queue.submit(IR, True, "a.pdf")
+    gate.set()
+
+    assert second is first
+    assert first.done.wait(5)
+    assert render.calls == 1
+    stages = [e["payload"]["stage"] for e in events if e["type"] == "status"]
+    assert "转换图表为SVG" in stages and stages[-1] == "PDF已生成"
+    assert events[-1]["type"] == "completed"
+    queue.shutdown()
+
+
+def test_failed_job_reports_error_and_is_retried(tmp_path):
+    render = FakeRenderer(fail=True)
+    queue = PDFExportQueue(tmp_path, render)
+
+    job = queue.submit(IR, True, "a.pdf")
+    assert job.done.wait(5)
+    assert job.status == "error" and job.error_message == "boom"
+    assert not list(tmp_path.glob("*.pdf"))
+
+    render.fail = False
+    retry = queue.submit(IR, True, "a.pdf")
+    assert retry.done.wait(5) and retry.status == "completed"
+    queue.shutdown()
+
+
+def test_download_supports_etag_and_range(tmp_path, monkeypatch):
+    from flask import Flask
+    from ReportEngine import flask_interface
+
+    queue = PDFExportQueue(tmp_path, FakeRenderer(), broadcast=flask_interface._broadcast_event)
+    monkeypatch.setattr(flask_interface, "pdf_export_queue", queue)
+    monkeypatch.setattr(flask_interface, "_pdf_dependency_error", lambda: None)
+    app = Flask(__name__)
+    app.register_blueprint(flask_interface.report_bp, url_prefix="/api/report")
+    client = app.test_client()
+
+    resp = client.post("/api/report/export/pdf-from-ir", json={"document_ir": IR, "async": True})
+    job = resp.get_json()["job"]
+    assert queue.get(job["job_id"]).done.wait(5)
+
+    full = client.get(f"/api/report/export/pdf/jobs/{job['job_id']}/download")
+    assert full.status_code == 200 and full.data.startswith(b"%PDF")
+    etag = full.headers["ETag"]
+
+    cached = client.get(
+        f"/api/report/export/pdf/jobs/{job['job_id']}/download", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+
+    partial = client.get(
+        f"/api/report/export/pdf/jobs/{job['job_id']}/download", headers={"Range": "bytes=0-3"}
+    )
+    assert partial.status_code == 206 and partial.data == b"%PDF"
+
+    # 同步接口直接返回缓存的文件
+    sync = client.post("/api/report/export/pdf-from-ir", json={"document_ir": IR})
+    assert sync.status_code == 200 and sync.headers["ETag"] == etag
+    queue.shutdown()
+
+
+def test_sync_export_times_out_with_202(tmp_path, monkeypatch):
+    from flask import Flask
+    from ReportEngine import flask_interface
+
+    gate = threading.Event()
+    queue = PDFExportQueue(tmp_path, FakeRenderer(gate=gate))
+    monkeypatch.setattr(flask_interface, "pdf_export_queue", queue)
+    monkeypatch.setattr(flask_interface, "_pdf_dependency_error", lambda: None)
+    monkeypatch.setattr(flask_interface.settings, "PDF_EXPORT_SYNC_TIMEOUT", 1)
+    app = Flask(__name__)
+    app.register_blueprint(flask_interface.report_bp, url_prefix="/api/report")
+
+    resp = app.test_client().post("/api/report/export/pdf-from-ir", json={"document_ir": IR})
+    assert resp.status_code == 202
+    job = queue.get(resp.get_json()["job"]["job_id"])
+    gate.set()
+    assert job.done.wait(5) and job.status == "completed"
+    queue.shutdown()
+
+
+def test_evicted_pdf_is_not_served(tmp_path, monkeypatch):
+    from flask import Flask
+    from ReportEngine import flask_interface
+
+    render = FakeRenderer()
+    # 上限只容得下一个PDF，第二个任务完成后第一个被淘汰
+    queue = PDFExportQueue(tmp_path, render, max_bytes=150)
+    monkeypatch.setattr(flask_interface, "pdf_export_queue", queue)
+    monkeypatch.setattr(flask_interface, "_pdf_dependency_error", lambda: None)
+    app = Flask(__name__)
+    app.register_blueprint(flask_interface.report_bp, url_prefix="/api/report")
+    client = app.test_client()
+
+    other_ir = {"metadata": {"topic": "其他"}, "chapters": []}
+    first = queue.submit(IR, True, "a.pdf")
+    assert first.done.wait(5)
+    second = queue.submit(other_ir, True, "b.pdf")
+    assert second.done.wait(5)
+
+    status = client.get(f"/api/report/export/pdf/jobs/{first.job_id}").get_json()["job"]
+    assert status["status"] == "completed" and not status["file_ready"]
+    assert client.get(f"/api/report/export/pdf/jobs/{first.job_id}/download").status_code == 410
+
+    # 复用缓存时文件尚在、发送前已被淘汰：同步导出重新生成一次
+    get_path = queue._store.get_path
+    stale = [Path(first.file_path)]
+    monkeypatch.setattr(queue._store, "get_path", lambda key: stale.pop() if stale else get_path(key))
+    sync = client.post("/api/report/export/pdf-from-ir", json={"document_ir": IR})
+    assert sync.status_code == 200 and sync.data.startswith(b"%PDF")
+    assert render.calls == 3
+    queue.shutdown()
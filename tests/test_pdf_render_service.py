@@ -0,0 +1,62 @@
+"""
+测试常驻的PDF渲染服务
+
+覆盖：并发导出各自占用一份字体配置、排版并行执行，渲染结束后字体配置放回池中复用。
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.renderers import pdf_renderer
+
+
+class FakeFontConfiguration:
+    created = 0
+
+    def __init__(self):
+        FakeFontConfiguration.created += 1
+
+
+class FakeCSS:
+    def __init__(self, string, font_config):
+        self.font_config = font_config
+
+
+def test_concurrent_renders_use_separate_font_configs(tmp_path, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+    used = []
+
+    class FakeHTML:
+        def __init__(self, string, base_url):
+            pass
+
+        def write_pdf(self, target, stylesheets, font_config, presentational_hints):
+            assert stylesheets[0].font_config is font_config
+            used.append(font_config)
+            # 两次渲染同时处于排版阶段才能通过栅栏
+            barrier.wait()
+            return b"%PDF"
+
+    FakeFontConfiguration.created = 0
+    monkeypatch.setattr(pdf_renderer, "FontConfiguration", FakeFontConfiguration, raising=False)
+    monkeypatch.setattr(pdf_renderer, "CSS", FakeCSS, raising=False)
+    monkeypatch.setattr(pdf_renderer, "HTML", FakeHTML, raising=False)
+
+    service = pdf_renderer.PDFRenderService(tmp_path / "font.ttf")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda _: service.write_pdf("<html></html>"), range(2)))
+
+    assert results == [b"%PDF", b"%PDF"]
+    assert used[0] is not used[1]
+    assert FakeFontConfiguration.created == 2
+
+    # 之后的串行导出复用池中的字体配置
+    barrier = threading.Barrier(1)
+    service.write_pdf("<html></html>")
+    assert FakeFontConfiguration.created == 2
@@ -0,0 +1,80 @@
+"""
+测试提示词Token预算
+
+覆盖：字符估算计数与截断、搜索结果按预算装箱（热度优先、多样性、单条上限）、
+总结节点消息组装不超过上限。
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.prompt_budget import TokenCounter, build_budgeted_message, pack_search_results
+
+COUNTER = TokenCounter()
+
+
+def test_estimate_count_and_truncate():
+    assert COUNTER.count("") == 0
+    assert COUNTER.count("舆情分析") == 4
+    assert COUNTER.count("abcdefgh") == 2
+    assert COUNTER.count("舆情abcd") == 3
+
+    text = "樱花" * 50 + "abc" * 40
+    truncated = COUNTER.truncate(text, 60)
+    assert text.startswith(truncated)
+    assert COUNTER.count(truncated) <= 60
+    assert COUNTER.truncate(text, 0) == ""
+
+
+def test_pack_respects_budget_and_item_limit():
+    results = [{"title": f"t{i}", "content": f"第{i}条" + "热点内容" * 100} for i in range(10)]
+    packed = pack_search_results(results, 500, COUNTER, max_item_tokens=150, min_item_tokens=10)
+
+    assert packed.used_tokens <= 500
+    assert all(COUNTER.count(item) <= 150 for item in packed.items)
+    assert packed.truncated == len(packed.items)
+    assert packed.candidates == 10 and packed.dropped == 10 - len(packed.items)
+
+
+def test_pack_prefers_hot_and_diverse_results():
+    results = [
+        {"content": "普通微博A", "score": 1, "platform": "weibo"},
+        {"content": "普通微博B", "score": 1, "platform": "weibo"},
+        {"content": "爆款微博", "score": 100, "platform": "weibo"},
+        {"content": "抖音视频", "score": 1, "platform": "douyin"},
+        {"content": "重复内容", "score": 1, "platform": "weibo"},
+        {"content": "重复内容", "score": 1, "platform": "weibo"},
+    ]
+    packed = pack_search_results(results, 1000, COUNTER, min_item_tokens=1)
+    plain = pack_search_results(results, 1000, COUNTER, min_item_tokens=1, diversity_penalty=0)
+
+    assert packed.candidates == 5  # 相同正文只保留一条
+    assert packed.items[0] == "爆款微博"
+    assert plain.items == ["爆款微博", "普通微博A", "普通微博B", "抖音视频", "重复内容"]
+    # 同平台重复入选会降低优先级，其他平台的结果得以提前
+    assert packed.items.index("抖音视频") < plain.items.index("抖音视频")
+
+
+def test_build_message_stays_within_budget():
+    data = {
+        "title": "段落标题",
+        "content": "段落预期内容",
+        "search_query": "樱花季",
+        "search_results": [{"content": f"第{i}条结果：" + "带\"引号\"的正文\n" * 60} for i in range(30)],
+    }
+    system_prompt = "系统提示词" * 50
+    message, packed = build_budgeted_message(
+        system_prompt, data, max_tokens=3000, prefix="主持人发言", max_item_tokens=400, counter=COUNTER
+    )
+
+    assert COUNTER.count(system_prompt) + COUNTER.count(message) <= 3000
+    assert message.startswith("主持人发言\n")
+    payload = json.loads(message.split("\n", 1)[1])
+    assert payload["search_query"] == "樱花季"
+    assert payload["search_results"] == packed.items
+    assert 0 < len(packed.items) < 30
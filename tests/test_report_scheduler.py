@@ -0,0 +1,121 @@
+"""
+测试报告任务调度器与取消
+
+覆盖：优先级+先进先出的执行顺序与排队位置回调、队列上限、排队任务出队、
+运行中任务的取消标记会中断LLM流式读取。
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.core.report_scheduler import ReportScheduler, SchedulerQueueFull
+from ReportEngine.llms import LLMClient
+from ReportEngine.utils.cancellation import TaskCancelledError
+
+
+def make_task(task_id, priority=0):
+    return SimpleNamespace(task_id=task_id, priority=priority, cancel_event=threading.Event())
+
+
+class BlockingRunner:
+    """第一个任务阻塞到 gate 打开，以便在其运行期间排队其他任务"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.order = []
+        self.finished = threading.Semaphore(0)
+
+    def __call__(self, task, worker_index):
+        self.order.append(task.task_id)
+        self.started.set()
+        self.gate.wait(5)
+        self.finished.release()
+
+
+def test_priority_then_fifo_order_with_position_events():
+    runner = BlockingRunner()
+    positions = []
+    scheduler = ReportScheduler(
+        runner, max_workers=1, on_position=lambda t, pos, total: positions.append((t.task_id, pos))
+    )
+
+    scheduler.submit(make_task("first"))
+    assert runner.started.wait(5)
+    assert scheduler.submit(make_task("a")) == 1
+    assert scheduler.submit(make_task("b")) == 2
+    assert scheduler.submit(make_task("urgent", priority=5)) == 1
+
+    # 高优先级插队后 a、b 各后移一位
+    assert ("a", 2) in positions and ("b", 3) in positions
+    runner.gate.set()
+    for _ in range(4):
+        assert runner.finished.acquire(timeout=5)
+    assert runner.order == ["first", "urgent", "a", "b"]
+    scheduler.shutdown()
+
+
+def test_queue_limit_and_dequeue_on_cancel():
+    runner = BlockingRunner()
+    scheduler = ReportScheduler(runner, max_workers=1, max_queue=1)
+
+    running = make_task("running")
+    scheduler.submit(running)
+    assert runner.started.wait(5)
+    scheduler.submit(make_task("queued"))
+    with pytest.raises(SchedulerQueueFull):
+        scheduler.submit(make_task("overflow"))
+
+    assert scheduler.cancel("queued") == "dequeued"
+    assert scheduler.cancel("running") == "signalled"
+    assert running.cancel_event.is_set()
+    assert scheduler.cancel("missing") is None
+    runner.gate.set()
+    assert runner.finished.acquire(timeout=5)
+    assert runner.order == ["running"]
+    scheduler.shutdown()
+
+
+class FakeStream:
+    def __init__(self, deltas, on_chunk):
+        self.deltas = deltas
+        self.on_chunk = on_chunk
+        self.closed = False
+
+    def __iter__(self):
+        for index, text in enumerate(self.deltas):
+            self.on_chunk(index)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    def close(self):
+        self.closed = True
+
+
+def test_cancel_event_stops_llm_streaming():
+    client = LLMClient(api_key="test", model_name="test-model")
+    cancel_event = threading.Event()
+    client.cancel_event = cancel_event
+    # 读到第二个分片时用户取消
+    stream = FakeStream(["a", "b", "c"], lambda index: index == 1 and cancel_event.set())
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: stream))
+    )
+
+    received = []
+    with pytest.raises(TaskCancelledError):
+        for delta in client.stream_invoke("system", "user"):
+            received.append(delta)
+
+    assert received == ["a"]
+    assert stream.closed
+    # 取消后重试装饰器不会再次发起请求
+    with pytest.raises(TaskCancelledError):
+        client.stream_invoke_to_string("system", "user")
@@ -0,0 +1,93 @@
+"""
+测试情感分析的批量推理
+
+使用随机初始化的小型BERT与本地词表（无需下载模型），覆盖：
+按长度分批推理的结果与逐条推理一致且按输入顺序返回、空文本保留单条错误结果、
+某一批推理失败时退化为逐条推理。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+pytest.importorskip("sentence_transformers")
+# InsightEngine 导入时会创建关键词优化器，需要配置API密钥（测试中不会调用）
+os.environ.setdefault("KEYWORD_OPTIMIZER_API_KEY", "test-key")
+
+from InsightEngine.tools.sentiment_analyzer import WeiboMultilingualSentimentAnalyzer
+
+TEXTS = [
+    "这个产品非常好用，强烈推荐给大家",
+    "",
+    "太差了",
+    "物流很快，包装也不错，但是价格有点贵，总体来说还可以接受吧",
+    "一般",
+    "客服态度很差，问题一直没有解决",
+    "   ",
+]
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    chars = sorted({char for text in TEXTS for char in text if not char.isspace()})
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text(
+        "\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars), encoding="utf-8"
+    )
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(chars) + 5,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        num_labels=5,
+    )
+    model = transformers.BertForSequenceClassification(config).eval()
+
+    instance = WeiboMultilingualSentimentAnalyzer(batch_size=2)
+    instance.enable()
+    instance.tokenizer = tokenizer
+    instance.model = model
+    instance.device = torch.device("cpu")
+    instance.is_initialized = True
+    return instance
+
+
+def test_batched_predictions_match_single_predictions(analyzer):
+    batch = analyzer.analyze_batch(TEXTS, show_progress=False)
+
+    assert [result.text for result in batch.results] == TEXTS
+    assert batch.total_processed == len(TEXTS)
+    assert batch.success_count == 5 and batch.failed_count == 2
+    for text, result in zip(TEXTS, batch.results):
+        single = analyzer.analyze_single_text(text)
+        assert result.success == single.success
+        if not single.success:
+            assert result.error_message == single.error_message
+            continue
+        assert result.sentiment_label == single.sentiment_label
+        for label, probability in single.probability_distribution.items():
+            assert result.probability_distribution[label] == pytest.approx(probability, abs=1e-5)
+
+
+def test_failed_batch_falls_back_to_single_inference(analyzer, monkeypatch):
+    expected = analyzer.analyze_batch(TEXTS, show_progress=False)
+
+    def broken_batch(encodings):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(analyzer, "_predict_batch", broken_batch)
+    fallback = analyzer.analyze_batch(TEXTS, show_progress=False)
+
+    assert [r.sentiment_label for r in fallback.results] == [r.sentiment_label for r in expected.results]
+    assert fallback.success_count == expected.success_count
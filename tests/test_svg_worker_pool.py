@@ -0,0 +1,102 @@
+"""
+测试PDF导出的SVG转换进程池
+
+覆盖：进程池按任务顺序返回结果、与串行转换结果一致、单个任务失败不影响其他任务、
+卡住的工作进程超时后被终止并重建进程池。
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("matplotlib")
+
+from ReportEngine.renderers.chart_to_svg import create_chart_converter
+from ReportEngine.renderers.math_to_svg import MathToSVG
+from ReportEngine.renderers.svg_worker_pool import CHART_SVG_SIZE, SVGWorkerPool
+
+
+def _bar_widget(widget_id, values):
+    return {
+        "type": "widget",
+        "widgetId": widget_id,
+        "widgetType": "chart.js/bar",
+        "data": {"labels": ["A", "B", "C"], "datasets": [{"label": "数量", "data": values}]},
+        "props": {"type": "bar"},
+    }
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SVGWorkerPool(2)
+    yield pool
+    pool.shutdown()
+
+
+def test_results_follow_job_order(pool):
+    jobs = [("math", f"m{i}", (f"x^{i}", i % 2 == 0)) for i in range(6)]
+    jobs.insert(3, ("chart", "chart-1", _bar_widget("chart-1", [1, 2, 3])))
+
+    results = pool.convert(jobs)
+
+    assert list(results) == [key for _, key, _ in jobs]
+    assert all(svg and "<svg" in svg for svg in results.values())
+
+
+def test_matches_serial_conversion(pool):
+    widget = _bar_widget("chart-2", [3, 1, 2])
+    results = pool.convert([("chart", "chart-2", widget), ("math", "m", ("a+b", True))])
+
+    def _shape(svg):
+        # 去掉matplotlib写入的元数据与随机clip id，只比较图形元素数量
+        return svg.count("<path"), svg.count("<text"), svg.count("<use")
+
+    serial_chart = create_chart_converter().convert_widget_to_svg(widget, **CHART_SVG_SIZE)
+    serial_math = MathToSVG(font_size=16).convert_display_to_svg("a+b")
+    assert _shape(results["chart-2"]) == _shape(serial_chart)
+    assert _shape(results["m"]) == _shape(serial_math)
+
+
+def test_failed_job_does_not_affect_others(pool):
+    results = pool.convert([
+        ("chart", "empty", {"widgetType": "chart.js/bar", "data": {}}),
+        ("unknown", "x", None),
+        ("math", "ok", ("y", False)),
+    ])
+
+    assert results["empty"] is None
+    assert results["x"] is None
+    assert results["ok"]
+
+
+def _hang(job):
+    time.sleep(60)
+
+
+def test_stuck_worker_times_out_and_pool_is_rebuilt(monkeypatch):
+    from ReportEngine.renderers import svg_worker_pool
+
+    monkeypatch.setattr(svg_worker_pool, "_convert_job", _hang)
+    stuck = svg_worker_pool.get_svg_worker_pool(2)
+    processes = list(stuck._executor._processes.values())
+
+    start = time.monotonic()
+    assert stuck.convert([("math", "m", ("x", False))], timeout=1) is None
+    assert time.monotonic() - start < 10
+    assert not stuck.available
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
+
+    # 下次获取时重建进程池
+    monkeypatch.undo()
+    fresh = svg_worker_pool.get_svg_worker_pool(2)
+    assert fresh is not stuck
+    assert fresh.convert([("math", "m", ("x", False))])["m"]
+    svg_worker_pool.shutdown_svg_worker_pools()
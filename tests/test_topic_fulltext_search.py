@@ -0,0 +1,121 @@
+"""
+测试话题检索的全文索引后端（SQLite FTS5）
+
+覆盖：存在FTS5索引时话题匹配走 MATCH、没有索引或关键词过短时回退为 LIKE 且结果一致、
+索引建立后在否定缓存过期时重新探测。
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "MindSpider" / "schema"))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("aiosqlite")
+# InsightEngine 导入时会创建关键词优化器，需要配置API密钥（测试中不会调用）
+os.environ.setdefault("KEYWORD_OPTIMIZER_API_KEY", "test-key")
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from init_fulltext_index import TOPIC_SEARCH_FIELDS, sqlite_ddl
+from InsightEngine.tools.search import MediaCrawlerDB
+from InsightEngine.utils import db
+from InsightEngine.utils.config import settings
+
+NOTES = ["新能源汽车销量创新高", "今天天气不错", "讨论新能源汽车的补贴政策"]
+COMMENTS = ["新能源汽车续航还是不够", "哈哈哈"]
+
+
+def _create_index(db_path):
+    with sqlite3.connect(db_path) as conn:
+        for table in ("weibo_note", "weibo_note_comment"):
+            for stmt in sqlite_ddl(table, TOPIC_SEARCH_FIELDS[table]):
+                conn.execute(stmt)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "topic.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE weibo_note (id INTEGER PRIMARY KEY, content TEXT, source_keyword TEXT, "
+            "note_url TEXT, create_date_time TEXT, nickname TEXT)"
+        )
+        conn.execute("CREATE TABLE weibo_note_comment (id INTEGER PRIMARY KEY, content TEXT, nickname TEXT)")
+        conn.executemany("INSERT INTO weibo_note (content, source_keyword) VALUES (?, '')", [(c,) for c in NOTES])
+        conn.executemany("INSERT INTO weibo_note_comment (content) VALUES (?)", [(c,) for c in COMMENTS])
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    monkeypatch.setattr(db, "_engine", engine)
+    monkeypatch.setattr(settings, "TOPIC_SEARCH_BACKEND", "auto")
+    monkeypatch.setattr(MediaCrawlerDB, "_fulltext_index_cache", {})
+    monkeypatch.setattr(MediaCrawlerDB, "_fulltext_index_missing_at", {})
+
+    # 记录实际执行的SQL
+    executed = []
+    fetch_all = db.fetch_all
+
+    async def recording_fetch_all(query, params=None):
+        executed.append(query)
+        return await fetch_all(query, params)
+
+    monkeypatch.setattr(db, "fetch_all", recording_fetch_all)
+    monkeypatch.setattr("InsightEngine.tools.search.fetch_all", recording_fetch_all)
+    yield db_path, executed
+    db.run_sync(engine.dispose())
+
+
+def _search(topic):
+    response = MediaCrawlerDB().search_topic_on_platform("weibo", topic)
+    assert response.error_message is None
+    return sorted(result.title_or_content for result in response.results)
+
+
+def _topic_queries(executed):
+    return [query for query in executed if query.startswith("SELECT * FROM")]
+
+
+EXPECTED = sorted([NOTES[0], NOTES[2], COMMENTS[0]])
+
+
+def test_fts5_index_is_used(sqlite_db):
+    db_path, executed = sqlite_db
+    _create_index(db_path)
+
+    assert _search("新能源汽车") == EXPECTED
+    queries = _topic_queries(executed)
+    assert len(queries) == 2 and all("MATCH" in query for query in queries)
+
+
+def test_falls_back_to_like_without_index(sqlite_db):
+    _, executed = sqlite_db
+
+    assert _search("新能源汽车") == EXPECTED
+    assert all("LIKE" in query and "MATCH" not in query for query in _topic_queries(executed))
+
+
+def test_short_term_uses_like_even_with_index(sqlite_db):
+    db_path, executed = sqlite_db
+    _create_index(db_path)
+
+    # trigram 分词器无法匹配少于3个字符的关键词
+    assert _search("汽车") == EXPECTED
+    assert all("MATCH" not in query for query in _topic_queries(executed))
+
+
+def test_index_created_later_is_picked_up_after_ttl(sqlite_db, monkeypatch):
+    db_path, executed = sqlite_db
+    assert _search("新能源汽车") == EXPECTED
+
+    _create_index(db_path)
+    monkeypatch.setattr(MediaCrawlerDB, "_FULLTEXT_NEGATIVE_TTL", 0)
+    executed.clear()
+    assert _search("新能源汽车") == EXPECTED
+    assert all("MATCH" in query for query in _topic_queries(executed))
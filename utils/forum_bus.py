@@ -0,0 +1,471 @@
+"""
+论坛结构化事件总线
+
+替代"引擎写日志 → ForumEngine正则解析日志 → 写forum.log → 引擎再解析forum.log"的链路：
+- ForumEventHub 运行在 ForumEngine 所在进程（app.py），监听本地端口；
+- 各引擎进程通过 ForumBusClient 连接总线，直接发布段落总结事件，并订阅主持人发言；
+- 所有事件按行追加到 JSONL 日志（logs/forum_events.jsonl），可用于回放与排查，
+  总线重启时也会从中恢复各主题的最新事件。
+
+传输基于 multiprocessing.connection（TCP + authkey 握手，跨平台），消息体为 UTF-8 JSON，
+不使用 pickle。握手密钥未配置时由主程序启动时随机生成，经环境变量传给各引擎子进程。
+总线不可用时发布会直接返回 False，调用方继续走原有的日志解析流程。
+"""
+
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+# 事件主题
+TOPIC_AGENT_SUMMARY = "agent_summary"  # 引擎段落总结（首次/反思）
+TOPIC_HOST_SPEECH = "host_speech"      # 论坛主持人发言
+TOPIC_SESSION = "session"              # 论坛会话开始/结束
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+def _load_bus_settings() -> Tuple[bool, Tuple[str, int], bytes, str]:
+    from config import settings
+    return (
+        settings.FORUM_BUS_ENABLED,
+        (settings.FORUM_BUS_HOST, settings.FORUM_BUS_PORT),
+        settings.FORUM_BUS_AUTHKEY.encode("utf-8"),
+        settings.FORUM_BUS_JOURNAL,
+    )
+
+
+def ensure_bus_authkey() -> str:
+    """
+    确保总线握手密钥可用：未配置时随机生成一个，写入当前进程的配置与环境变量
+
+    需在启动引擎子进程之前调用，子进程继承环境变量后使用同一个密钥连接总线。
+    """
+    from config import settings
+    if not settings.FORUM_BUS_AUTHKEY:
+        authkey = secrets.token_hex(16)
+        os.environ["FORUM_BUS_AUTHKEY"] = authkey
+        settings.FORUM_BUS_AUTHKEY = authkey
+    return settings.FORUM_BUS_AUTHKEY
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode("utf-8")
+
+
+def _decode(data: bytes) -> Dict[str, Any]:
+    return json.loads(data.decode("utf-8"))
+
+
+def read_journal(journal_path: str, topics: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    读取事件日志用于回放
+
+    Args:
+        journal_path: JSONL事件日志路径
+        topics: 只返回这些主题的事件，None表示全部
+
+    Returns:
+        按写入顺序排列的事件列表（损坏的行会被跳过）
+    """
+    wanted = set(topics) if topics else None
+    events: List[Dict[str, Any]] = []
+    path = Path(journal_path)
+    if not path.exists():
+        return events
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if wanted is None or event.get("topic") in wanted:
+                events.append(event)
+    return events
+
+
+class ForumEventHub:
+    """论坛事件总线服务端（单进程内唯一）"""
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, journal_path: str):
+        self.address = address
+        self.authkey = authkey
+        self.journal_path = Path(journal_path)
+        self._listener: Optional[Listener] = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._next_id = 1
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        # 远程订阅者: 连接 -> (订阅主题集合, 发送锁)
+        self._remote: Dict[Connection, Tuple[Set[str], threading.Lock]] = {}
+        self._remote_sources: Dict[Connection, str] = {}
+        self._local: List[Tuple[Optional[Set[str]], EventCallback]] = []
+
+    # ======== 生命周期 ========
+
+    def start(self) -> bool:
+        """启动监听线程，端口被占用等情况下返回False"""
+        if self._running:
+            return True
+        try:
+            self._listener = Listener(self.address, authkey=self.authkey)
+        except OSError as e:
+            logger.warning(f"ForumBus: 无法监听 {self.address[0]}:{self.address[1]}，事件总线未启用: {e}")
+            return False
+        self._restore_latest()
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="forum-bus-accept", daemon=True).start()
+        logger.info(f"ForumBus: 事件总线已启动 {self.address[0]}:{self.address[1]}")
+        return True
+
+    def stop(self):
+        self._running = False
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+        with self._lock:
+            connections = list(self._remote)
+            self._remote.clear()
+            self._remote_sources.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    # ======== 发布与订阅 ========
+
+    def subscribe(self, callback: EventCallback, topics: Optional[Iterable[str]] = None):
+        """进程内订阅，callback 在发布方线程中同步调用，应尽快返回"""
+        with self._lock:
+            self._local.append((set(topics) if topics else None, callback))
+
+    def publish(self, topic: str, payload: Dict[str, Any], source: str = "forum") -> Dict[str, Any]:
+        """发布事件：写入JSONL日志、更新最新事件并分发给全部订阅者"""
+        with self._lock:
+            event = {
+                "id": self._next_id,
+                "ts": datetime.now().isoformat(timespec="milliseconds"),
+                "topic": topic,
+                "source": source,
+                "payload": payload,
+            }
+            self._next_id += 1
+            self._latest[topic] = event
+            local = [cb for topics, cb in self._local if topics is None or topic in topics]
+            remote = [(conn, send_lock) for conn, (topics, send_lock) in self._remote.items() if topic in topics]
+        self._append_journal(event)
+        for callback in local:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.exception(f"ForumBus: 本地订阅者处理事件失败: {e}")
+        for conn, send_lock in remote:
+            self._send(conn, send_lock, {"op": "event", "event": event})
+        return event
+
+    def latest(self, topic: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._latest.get(topic)
+
+    def connected_sources(self) -> Set[str]:
+        """当前已连接总线的引擎来源（如 insight/media/query）"""
+        with self._lock:
+            return {source for source in self._remote_sources.values() if source}
+
+    def reset_session(self):
+        """开始新的论坛会话：清空事件日志与最新事件缓存，并通知订阅者"""
+        with self._journal_lock:
+            try:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self.journal_path.write_text("", encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"ForumBus: 清空事件日志失败: {e}")
+        with self._lock:
+            self._latest.clear()
+        self.publish(TOPIC_SESSION, {"state": "started"})
+
+    # ======== 内部实现 ========
+
+    def _restore_latest(self):
+        for event in read_journal(str(self.journal_path)):
+            topic = event.get("topic")
+            if topic:
+                self._latest[topic] = event
+            if isinstance(event.get("id"), int):
+                self._next_id = max(self._next_id, event["id"] + 1)
+
+    def _append_journal(self, event: Dict[str, Any]):
+        with self._journal_lock:
+            try:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"ForumBus: 写入事件日志失败: {e}")
+
+    def _accept_loop(self):
+        while self._running and self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                # authkey 校验失败只影响该连接；监听器被关闭时退出循环
+                if not self._running:
+                    break
+                logger.warning(f"ForumBus: 接受连接失败: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), name="forum-bus-conn", daemon=True).start()
+
+    def _serve(self, conn: Connection):
+        send_lock = threading.Lock()
+        try:
+            while self._running:
+                message = _decode(conn.recv_bytes())
+                op = message.get("op")
+                if op == "hello":
+                    topics = set(message.get("subscribe") or [])
+                    with self._lock:
+                        self._remote[conn] = (topics, send_lock)
+                        self._remote_sources[conn] = message.get("source") or ""
+                        snapshot = [self._latest[t] for t in topics if t in self._latest]
+                    # 新订阅者先收到各主题的最新事件
+                    for event in snapshot:
+                        self._send(conn, send_lock, {"op": "event", "event": event})
+                elif op == "publish":
+                    self.publish(
+                        message.get("topic", ""),
+                        message.get("payload") or {},
+                        source=message.get("source") or "unknown",
+                    )
+        except (EOFError, OSError):
+            pass
+        except Exception as e:
+            logger.exception(f"ForumBus: 处理连接消息失败: {e}")
+        finally:
+            with self._lock:
+                self._remote.pop(conn, None)
+                self._remote_sources.pop(conn, None)
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _send(self, conn: Connection, send_lock: threading.Lock, message: Dict[str, Any]):
+        try:
+            with send_lock:
+                conn.send_bytes(_encode(message))
+        except (OSError, ValueError):
+            with self._lock:
+                self._remote.pop(conn, None)
+                self._remote_sources.pop(conn, None)
+
+
+class ForumBusClient:
+    """引擎进程使用的总线客户端：发布事件并缓存订阅主题的最新事件"""
+
+    RECONNECT_INTERVAL = 5.0
+    # 连接中发送失败的事件暂存上限，重连后按顺序补发到总线（由服务端写入事件日志）
+    PENDING_LIMIT = 1000
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        authkey: bytes,
+        source: str = "",
+        topics: Iterable[str] = (TOPIC_HOST_SPEECH, TOPIC_SESSION),
+    ):
+        self.address = address
+        self.authkey = authkey
+        self.source = source
+        self.topics = list(topics)
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._last_attempt = 0.0
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._pending: deque = deque(maxlen=self.PENDING_LIMIT)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._conn is not None
+
+    def _ensure_connected(self) -> Optional[Connection]:
+        with self._lock:
+            if self._conn is not None:
+                return self._conn
+            now = time.monotonic()
+            if now - self._last_attempt < self.RECONNECT_INTERVAL:
+                return None
+            self._last_attempt = now
+            try:
+                conn = Client(self.address, authkey=self.authkey)
+                conn.send_bytes(_encode({"op": "hello", "source": self.source, "subscribe": self.topics}))
+            except Exception as e:
+                logger.debug(f"ForumBus: 无法连接事件总线 {self.address}: {e}")
+                return None
+            self._conn = conn
+        threading.Thread(target=self._recv_loop, args=(conn,), name="forum-bus-client", daemon=True).start()
+        self._flush_pending(conn)
+        return self._conn
+
+    def _flush_pending(self, conn: Connection):
+        """重连后补发之前发送失败的事件，再次失败的留在队列中"""
+        with self._send_lock:
+            while self._pending:
+                message = self._pending[0]
+                try:
+                    conn.send_bytes(_encode(message))
+                except (OSError, ValueError) as e:
+                    logger.debug(f"ForumBus: 补发事件失败: {e}")
+                    break
+                self._pending.popleft()
+            else:
+                return
+        self._drop(conn)
+
+    def _recv_loop(self, conn: Connection):
+        try:
+            while True:
+                message = _decode(conn.recv_bytes())
+                event = message.get("event")
+                if message.get("op") != "event" or not event:
+                    continue
+                with self._lock:
+                    if event.get("topic") == TOPIC_SESSION:
+                        # 新会话开始，旧会话的主持人发言不再有效
+                        self._latest.clear()
+                    self._latest[event.get("topic")] = event
+        except (EOFError, OSError):
+            pass
+        except Exception as e:
+            logger.warning(f"ForumBus: 接收事件失败: {e}")
+        finally:
+            self._drop(conn, close=True)
+
+    def _drop(self, conn: Connection, close: bool = False):
+        """
+        断开连接
+
+        只有接收线程关闭连接；其他线程只关停套接字使接收线程退出，
+        避免接收线程阻塞期间句柄被关闭后复用给新连接。
+        """
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+                # 断开期间无法得知会话变化，缓存的事件不再可信
+                self._latest.clear()
+        if not close:
+            try:
+                with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+                    sock.shutdown(socket.SHUT_RDWR)
+                return
+            except (OSError, ValueError):
+                pass
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def publish(self, topic: str, payload: Dict[str, Any]) -> bool:
+        """
+        发布事件，总线不可用时返回False（不抛异常）
+
+        已连接但发送失败时事件进入待发队列，下次连上总线后补发，不会丢失。
+        """
+        conn = self._ensure_connected()
+        if conn is None:
+            return False
+        message = {"op": "publish", "topic": topic, "source": self.source, "payload": payload}
+        try:
+            with self._send_lock:
+                conn.send_bytes(_encode(message))
+            return True
+        except (OSError, ValueError) as e:
+            logger.debug(f"ForumBus: 发布事件失败，待重连后补发: {e}")
+            self._pending.append(message)
+            self._drop(conn)
+            return False
+
+    def latest(self, topic: str) -> Optional[Dict[str, Any]]:
+        """返回订阅主题的最新事件；未连接总线时返回None"""
+        if self._ensure_connected() is None:
+            return None
+        with self._lock:
+            return self._latest.get(topic)
+
+    def close(self):
+        conn = self._conn
+        if conn is not None:
+            self._drop(conn)
+
+
+_client: Optional[ForumBusClient] = None
+_client_lock = threading.Lock()
+
+
+def get_bus_client(source: str = "") -> Optional[ForumBusClient]:
+    """获取当前进程的总线客户端单例；总线被禁用或未取得握手密钥时返回None"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                enabled, address, authkey, _ = _load_bus_settings()
+            except Exception as e:
+                logger.debug(f"ForumBus: 读取配置失败，事件总线不可用: {e}")
+                return None
+            if not enabled or not authkey:
+                return None
+            _client = ForumBusClient(address, authkey, source=source)
+        elif source and not _client.source:
+            _client.source = source
+        return _client
+
+
+def publish_agent_summary(source: str, node: str, content: str, paragraph_title: str = "") -> bool:
+    """
+    引擎发布段落总结事件
+
+    Args:
+        source: 引擎名称，insight/media/query
+        node: 产生总结的节点名称，FirstSummaryNode/ReflectionSummaryNode
+        content: 段落最新总结
+        paragraph_title: 段落标题
+    """
+    client = get_bus_client(source)
+    if client is None or not content:
+        return False
+    return client.publish(TOPIC_AGENT_SUMMARY, {
+        "node": node,
+        "content": content,
+        "paragraph_title": paragraph_title,
+    })
+
+
+def create_hub() -> Optional[ForumEventHub]:
+    """按配置创建总线服务端；总线被禁用时返回None"""
+    enabled, address, authkey, journal_path = _load_bus_settings()
+    if not enabled:
+        return None
+    if not authkey:
+        authkey = ensure_bus_authkey().encode("utf-8")
+    return ForumEventHub(address, authkey, journal_path)
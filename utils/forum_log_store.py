@@ -0,0 +1,218 @@
+"""
+forum.log 索引存储
+
+forum.log 每行一条发言（格式: [HH:MM:SS] [SOURCE] 内容，内容中的换行已转义为 \\n），
+各引擎的每次段落总结都会查询最新的HOST发言，原实现每次都 readlines() 整个文件。
+ForumLogStore 改为：
+- 最新HOST发言：从文件末尾按块向前读取，找到最后一条HOST行即返回；
+- 内存中维护每条发言的字节偏移索引，每次只扫描上次索引之后新追加的字节；
+- 按条目偏移分页读取历史，只 seek 读取需要的行。
+查询代价只与新增内容和返回条目数有关，不随论坛运行时长增长。
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.log_reader import BLOCK_SIZE, iter_lines_reverse
+
+# 匹配格式: [时间] [来源] 内容（来源允许大小写及空格）
+LINE_PATTERN = re.compile(r'\[(\d{2}:\d{2}:\d{2})\]\s*\[([^\]]+)\]\s*(.*)')
+
+
+@dataclass
+class ForumEntry:
+    """forum.log 中的一条记录"""
+    raw: str                  # 原始行（不含换行符）
+    timestamp: str = ""
+    source: str = ""          # 大写来源标签，如 HOST/INSIGHT/SYSTEM；无法解析时为空
+    content: str = ""         # 已还原转义换行的内容
+
+    @classmethod
+    def parse(cls, raw: str) -> "ForumEntry":
+        match = LINE_PATTERN.match(raw)
+        if not match:
+            return cls(raw=raw)
+        timestamp, source, content = match.groups()
+        return cls(
+            raw=raw,
+            timestamp=timestamp,
+            source=source.strip().upper(),
+            content=content.replace('\\n', '\n').strip(),
+        )
+
+
+class ForumLogStore:
+    """forum.log 的增量索引与尾部优先读取"""
+
+    # 反向读取的块大小
+    BLOCK_SIZE = BLOCK_SIZE
+    # 用文件开头的若干字节识别 forum.log 是否被清空重写（首行带有会话开始时间）
+    HEAD_SIZE = 128
+
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self._lock = threading.Lock()
+        self._reset_index()
+
+    def _reset_index(self):
+        # 每条非空行的 (起始偏移, 结束偏移, 来源)
+        self._entries: List[Tuple[int, int, str]] = []
+        self._host_indexes: List[int] = []
+        self._indexed_offset = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._head = b""
+
+    # ======== 索引维护 ========
+
+    def _validate(self, f, st: os.stat_result):
+        """文件被替换、截断或清空重写时丢弃旧索引"""
+        file_id = (st.st_dev, st.st_ino)
+        if self._file_id is not None and file_id != self._file_id:
+            self._reset_index()
+        elif st.st_size < self._indexed_offset:
+            self._reset_index()
+        elif self._head:
+            f.seek(0)
+            if f.read(len(self._head)) != self._head:
+                self._reset_index()
+        self._file_id = file_id
+
+    def _refresh(self, f, size: int):
+        """索引上次位置之后新追加的完整行"""
+        if size <= self._indexed_offset:
+            return
+        f.seek(self._indexed_offset)
+        data = f.read(size - self._indexed_offset)
+        end = data.rfind(b"\n")
+        if end < 0:
+            return
+        pos = self._indexed_offset
+        for line in data[:end + 1].split(b"\n")[:-1]:
+            start = pos
+            pos += len(line) + 1
+            raw = line.decode("utf-8", errors="ignore").rstrip("\r")
+            if not raw.strip():
+                continue
+            source = ForumEntry.parse(raw).source
+            if source == "HOST":
+                self._host_indexes.append(len(self._entries))
+            self._entries.append((start, pos, source))
+        self._indexed_offset = pos
+        if len(self._head) < self.HEAD_SIZE:
+            f.seek(0)
+            self._head = f.read(min(self.HEAD_SIZE, self._indexed_offset))
+
+    def _open_indexed(self):
+        """打开文件并更新索引，文件不存在时返回None"""
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            self._reset_index()
+            return None
+        st = os.fstat(f.fileno())
+        self._validate(f, st)
+        self._refresh(f, st.st_size)
+        return f
+
+    def _read_entry(self, f, entry: Tuple[int, int, str]) -> ForumEntry:
+        start, end, _ = entry
+        f.seek(start)
+        raw = f.read(end - start).decode("utf-8", errors="ignore").rstrip("\r\n")
+        return ForumEntry.parse(raw)
+
+    # ======== 查询接口 ========
+
+    def latest_host_speech(self) -> Optional[str]:
+        """获取最新的HOST发言，先从文件末尾反向查找未索引的部分，再查索引"""
+        with self._lock:
+            try:
+                f = open(self.log_path, "rb")
+            except FileNotFoundError:
+                self._reset_index()
+                return None
+            with f:
+                st = os.fstat(f.fileno())
+                self._validate(f, st)
+                lines = iter_lines_reverse(f, st.st_size, self._indexed_offset, self.BLOCK_SIZE)
+                # 第一段是最后一个换行符之后的内容：为空或尚未写完的半行，跳过
+                next(lines, None)
+                for line in lines:
+                    entry = ForumEntry.parse(line.decode("utf-8", errors="ignore").rstrip("\r"))
+                    if entry.source == "HOST" and entry.content:
+                        return entry.content
+                # 新增部分没有HOST发言：把它纳入索引，下次无需重复扫描
+                self._refresh(f, st.st_size)
+                for index in reversed(self._host_indexes):
+                    entry = self._read_entry(f, self._entries[index])
+                    if entry.content:
+                        return entry.content
+                return None
+
+    def count(self, sources: Optional[Iterable[str]] = None) -> int:
+        """返回条目总数；指定 sources 时只统计这些来源"""
+        with self._lock:
+            f = self._open_indexed()
+            if f is None:
+                return 0
+            f.close()
+            if sources is None:
+                return len(self._entries)
+            if set(sources) == {"HOST"}:
+                return len(self._host_indexes)
+            wanted = set(sources)
+            return sum(1 for _, _, source in self._entries if source in wanted)
+
+    def entries(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sources: Optional[Iterable[str]] = None,
+    ) -> List[ForumEntry]:
+        """
+        按条目偏移分页读取记录
+
+        Args:
+            offset: 跳过的条目数（在 sources 过滤后计数）；为负数时表示从末尾倒数
+            limit: 最多返回的条目数，None 表示不限制
+            sources: 只返回这些来源（大写）的条目，None 表示全部
+        """
+        with self._lock:
+            f = self._open_indexed()
+            if f is None:
+                return []
+            with f:
+                if sources is None:
+                    selected = self._entries
+                elif set(sources) == {"HOST"}:
+                    selected = [self._entries[i] for i in self._host_indexes]
+                else:
+                    wanted = set(sources)
+                    selected = [e for e in self._entries if e[2] in wanted]
+                if offset < 0:
+                    offset = max(0, len(selected) + offset)
+                end = len(selected) if limit is None else offset + max(0, limit)
+                return [self._read_entry(f, entry) for entry in selected[offset:end]]
+
+    def host_speeches(self, offset: int = 0, limit: Optional[int] = None) -> List[ForumEntry]:
+        return self.entries(offset, limit, sources=["HOST"])
+
+
+_stores: Dict[Path, ForumLogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_forum_log_store(log_dir: str = "logs") -> ForumLogStore:
+    """获取指定日志目录下 forum.log 的共享索引存储"""
+    path = (Path(log_dir) / "forum.log").resolve()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ForumLogStore(path)
+            logger.debug(f"ForumLogStore: 创建索引 {path}")
+        return store
@@ -3,11 +3,28 @@ Forum日志读取工具
 用于读取forum.log中的最新HOST发言
 """
 
-import re
-from pathlib import Path
 from typing import Optional, List, Dict
 from loguru import logger
 
+from utils.forum_log_store import get_forum_log_store
+
+
+def _get_host_speech_from_bus() -> Optional[str]:
+    """从论坛事件总线获取最新的HOST发言，总线未启用或未连接时返回None"""
+    try:
+        from utils.forum_bus import TOPIC_HOST_SPEECH, get_bus_client
+    except ImportError:
+        return None
+    client = get_bus_client()
+    if client is None:
+        return None
+    event = client.latest(TOPIC_HOST_SPEECH)
+    if not event:
+        return None
+    content = (event.get("payload") or {}).get("content")
+    return content.strip() if content else None
+
+
 def get_latest_host_speech(log_dir: str = "logs") -> Optional[str]:
     """
     获取forum.log中最新的HOST发言
@@ -18,26 +35,14 @@ def get_latest_host_speech(log_dir: str = "logs") -> Optional[str]:
     Returns:
         最新的HOST发言内容，如果没有则返回None
     """
+    # 优先从论坛事件总线读取（无需重复解析forum.log），总线不可用时回退到日志文件
+    bus_speech = _get_host_speech_from_bus()
+    if bus_speech:
+        return bus_speech
+    
     try:
-        forum_log_path = Path(log_dir) / "forum.log"
-        
-        if not forum_log_path.exists():
-            logger.debug("forum.log文件不存在")
-            return None
-            
-        with open(forum_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
-        # 从后往前查找最新的HOST发言
-        host_speech = None
-        for line in reversed(lines):
-            # 匹配格式: [时间] [HOST] 内容
-            match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*\[HOST\]\s*(.+)', line)
-            if match:
-                _, content = match.groups()
-                # 处理转义的换行符，还原为实际换行
-                host_speech = content.replace('\\n', '\n').strip()
-                break
+        # 从文件末尾反向查找，不再读取整个forum.log
+        host_speech = get_forum_log_store(log_dir).latest_host_speech()
         
         if host_speech:
             logger.info(f"找到最新的HOST发言，长度: {len(host_speech)}字符")
@@ -62,27 +67,10 @@ def get_all_host_speeches(log_dir: str = "logs") -> List[Dict[str, str]]:
         包含所有HOST发言的列表，每个元素是包含timestamp和content的字典
     """
     try:
-        forum_log_path = Path(log_dir) / "forum.log"
-        
-        if not forum_log_path.exists():
-            logger.debug("forum.log文件不存在")
-            return []
-            
-        with open(forum_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
-        host_speeches = []
-        for line in lines:
-            # 匹配格式: [时间] [HOST] 内容
-            match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*\[HOST\]\s*(.+)', line)
-            if match:
-                timestamp, content = match.groups()
-                # 处理转义的换行符
-                content = content.replace('\\n', '\n').strip()
-                host_speeches.append({
-                    'timestamp': timestamp,
-                    'content': content
-                })
+        host_speeches = [
+            {'timestamp': entry.timestamp, 'content': entry.content}
+            for entry in get_forum_log_store(log_dir).host_speeches()
+        ]
         
         logger.info(f"找到{len(host_speeches)}条HOST发言")
         return host_speeches
@@ -104,32 +92,14 @@ def get_recent_agent_speeches(log_dir: str = "logs", limit: int = 5) -> List[Dic
         包含最近Agent发言的列表
     """
     try:
-        forum_log_path = Path(log_dir) / "forum.log"
-        
-        if not forum_log_path.exists():
-            return []
-            
-        with open(forum_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
-        agent_speeches = []
-        for line in reversed(lines):  # 从后往前读取
-            # 匹配格式: [时间] [AGENT_NAME] 内容
-            match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*\[(INSIGHT|MEDIA|QUERY)\]\s*(.+)', line)
-            if match:
-                timestamp, agent, content = match.groups()
-                # 处理转义的换行符
-                content = content.replace('\\n', '\n').strip()
-                agent_speeches.append({
-                    'timestamp': timestamp,
-                    'agent': agent,
-                    'content': content
-                })
-                if len(agent_speeches) >= limit:
-                    break
-        
-        agent_speeches.reverse()  # 恢复时间顺序
-        return agent_speeches
+        # 只读取索引中最后limit条Agent发言
+        entries = get_forum_log_store(log_dir).entries(
+            offset=-limit, sources=['INSIGHT', 'MEDIA', 'QUERY']
+        ) if limit > 0 else []
+        return [
+            {'timestamp': entry.timestamp, 'agent': entry.source, 'content': entry.content}
+            for entry in entries
+        ]
         
     except Exception as e:
         logger.error(f"读取forum.log失败: {str(e)}")
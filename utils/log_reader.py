@@ -0,0 +1,179 @@
+"""
+日志文件读取工具
+
+供 app.py 与 ReportEngine 的日志接口共用，避免每次轮询都 readlines() 整个文件：
+- tail_lines: 从文件末尾按块反向读取最后N行；
+- read_tail: 同上，并返回与这些行出自同一次读取的游标，供后续增量轮询；
+- read_since: 基于字节偏移游标读取新增的完整行，代价只与新增数据有关；
+- stream_lines: 分块产出日志内容，用于 Flask 流式响应。
+"""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+PathLike = Union[str, Path]
+
+# 反向/分块读取的块大小
+BLOCK_SIZE = 64 * 1024
+
+
+@dataclass
+class LogChunk:
+    """一次游标读取的结果"""
+    lines: List[str] = field(default_factory=list)  # 新增的非空完整行
+    cursor: int = 0                                  # 下次读取使用的字节偏移
+    has_more: bool = False                           # 游标之后是否还有未返回的内容
+    reset: bool = False                              # 文件被截断/重建，已从头开始读取
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def iter_lines_reverse(f, end: int, stop: int = 0, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    从二进制文件的 end 位置向前按块读取到 stop，逐行倒序产出（不含换行符）。
+
+    第一段是 end 之前最后一个换行符之后的内容（文件以换行结尾时为空），
+    stop 需位于行首，否则最后产出的一段可能是半行。
+    """
+    pos = end
+    carry = b""
+    while pos > stop:
+        size = min(block_size, pos - stop)
+        pos -= size
+        f.seek(pos)
+        lines = (f.read(size) + carry).split(b"\n")
+        carry = lines[0]
+        for line in reversed(lines[1:]):
+            yield line
+    yield carry
+
+
+def tail_lines(path: PathLike, count: int) -> List[str]:
+    """返回文件最后 count 行非空内容（按原顺序），文件不存在时返回空列表"""
+    if count <= 0:
+        return []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        end = os.fstat(f.fileno()).st_size
+        result: List[str] = []
+        for line in iter_lines_reverse(f, end):
+            text = _decode(line)
+            if text.strip():
+                result.append(text)
+                if len(result) >= count:
+                    break
+    result.reverse()
+    return result
+
+
+def read_tail(path: PathLike, count: Optional[int] = None) -> LogChunk:
+    """
+    读取文件最后 count 行完整内容（None 表示全部），游标取自同一次读取。
+
+    末尾尚未写完的半行不返回，游标停在该行开头，之后用 read_since 轮询不会重复或遗漏。
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return LogChunk()
+    with f:
+        end = os.fstat(f.fileno()).st_size
+        lines = iter_lines_reverse(f, end)
+        partial = next(lines)
+        chunk = LogChunk(cursor=end - len(partial))
+        for line in lines:
+            if count is not None and len(chunk.lines) >= count:
+                break
+            text = _decode(line)
+            if text.strip():
+                chunk.lines.append(text)
+    chunk.lines.reverse()
+    return chunk
+
+
+def read_since(
+    path: PathLike,
+    cursor: int = 0,
+    max_lines: Optional[int] = None,
+    max_bytes: int = 4 * 1024 * 1024,
+) -> LogChunk:
+    """
+    读取字节偏移 cursor 之后新增的完整行。
+
+    Args:
+        path: 日志文件路径
+        cursor: 上次返回的游标（首次读取传0）
+        max_lines: 最多返回的行数，None 表示不限制
+        max_bytes: 单次最多读取的字节数，超出部分通过 has_more 提示继续读取
+
+    Returns:
+        LogChunk；末尾尚未写完的半行不会返回，游标停在该行开头
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return LogChunk(cursor=0, reset=cursor > 0)
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        chunk = LogChunk(cursor=max(0, cursor))
+        if chunk.cursor > size:
+            # 文件被截断或重建，从头读取
+            chunk.cursor = 0
+            chunk.reset = True
+        if chunk.cursor == size:
+            return chunk
+        f.seek(chunk.cursor)
+        data = f.read(min(size - chunk.cursor, max_bytes))
+        end = data.rfind(b"\n")
+        if end < 0:
+            if len(data) < max_bytes:
+                return chunk
+            # 单行超过 max_bytes 时整块返回，避免游标无法前进
+            chunk.lines.append(_decode(data))
+            chunk.cursor += len(data)
+            chunk.has_more = chunk.cursor < size
+            return chunk
+        pos = chunk.cursor
+        for line in data[:end + 1].split(b"\n")[:-1]:
+            if max_lines is not None and len(chunk.lines) >= max_lines:
+                break
+            pos += len(line) + 1
+            text = _decode(line)
+            if text.strip():
+                chunk.lines.append(text)
+        chunk.cursor = min(pos, size)
+        chunk.has_more = chunk.cursor < size
+        return chunk
+
+
+def stream_lines(path: PathLike, cursor: int = 0, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """从游标位置开始分块产出日志文本（只到调用时的文件末尾），用于流式响应"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        end = os.fstat(f.fileno()).st_size
+        pos = cursor if 0 <= cursor <= end else 0
+        f.seek(pos)
+        pending = b""
+        while pos < end:
+            data = f.read(min(block_size, end - pos))
+            if not data:
+                break
+            pos += len(data)
+            data = pending + data
+            split = data.rfind(b"\n") + 1
+            pending = data[split:]
+            if split:
+                # 只在换行处切分，避免多字节字符被拆开
+                yield data[:split].decode("utf-8", errors="replace")
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
@@ -0,0 +1,170 @@
+"""
+缓冲异步日志写入器
+
+app.py 逐行转发 Streamlit 子进程输出时，原实现每行都 open/write/flush/close 日志文件
+并单独 socketio.emit 一次。BufferedLogWriter 为每个应用启动一个写入线程：
+- 持有常驻文件句柄，按行数/时间阈值批量写入并 flush；
+- 同一批次的行通过一次回调（如合并后的 console_output 帧）推送给前端；
+- 所有操作经同一队列串行执行，行不会丢失且顺序与写入顺序一致。
+"""
+
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+BatchCallback = Callable[[List[str]], None]
+
+
+class BufferedLogWriter:
+    """单个日志文件的后台批量写入线程"""
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        on_batch: Optional[BatchCallback] = None,
+        flush_interval: float = 0.2,
+        max_batch_lines: int = 500,
+        name: str = "",
+    ):
+        """
+        Args:
+            file_path: 日志文件路径（追加写入）
+            on_batch: 每批行写入文件后调用，用于合并推送到前端
+            flush_interval: 批次最长等待时间（秒）
+            max_batch_lines: 单批最多行数，达到后立即写入
+            name: 写入线程名称后缀
+        """
+        self.file_path = Path(file_path)
+        self.on_batch = on_batch
+        self.flush_interval = flush_interval
+        self.max_batch_lines = max_batch_lines
+        self._queue: "queue.Queue" = queue.Queue()
+        self._file = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"log-writer-{name or self.file_path.stem}", daemon=True
+        )
+        self._thread.start()
+
+    # ======== 对外接口（任意线程调用） ========
+
+    def write(self, line: str, notify: bool = True):
+        """
+        追加一行（不含换行符），立即返回
+
+        Args:
+            line: 日志行
+            notify: 是否随批次传给 on_batch（仅写文件的行传False）
+        """
+        self._queue.put(("line", (line, notify)))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待此前写入的所有行落盘并推送完毕"""
+        return self._call("flush", timeout)
+
+    def truncate(self, timeout: Optional[float] = None) -> bool:
+        """在此前的行写完后删除日志文件，之后的写入从空文件开始"""
+        return self._call("truncate", timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """写完剩余内容后关闭文件并结束线程"""
+        if self._closed:
+            return
+        self._call("close", timeout)
+        self._closed = True
+
+    def _call(self, op: str, timeout: Optional[float]) -> bool:
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put((op, done))
+        return done.wait(timeout)
+
+    # ======== 写入线程 ========
+
+    def _run(self):
+        pending: List[Tuple[str, bool]] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                op, arg = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_batch(pending)
+                pending, deadline = [], None
+                continue
+
+            if op == "line":
+                pending.append(arg)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(pending) >= self.max_batch_lines:
+                    self._write_batch(pending)
+                    pending, deadline = [], None
+                continue
+
+            # 控制操作：先写出此前缓冲的行，保证顺序
+            self._write_batch(pending)
+            pending, deadline = [], None
+            if op == "truncate":
+                self._close_file()
+                try:
+                    self.file_path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error(f"清空日志文件失败 {self.file_path}: {e}")
+            elif op == "close":
+                self._close_file()
+            arg.set()
+            if op == "close":
+                return
+
+    def _open_file(self):
+        # 文件被外部删除或替换时重新打开，避免写入已不可见的旧文件
+        if self._file is not None:
+            try:
+                if not self.file_path.exists():
+                    self._close_file()
+            except OSError:
+                self._close_file()
+        if self._file is None:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.file_path, "a", encoding="utf-8")
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _write_batch(self, entries: List[Tuple[str, bool]]):
+        if not entries:
+            return
+        data = "".join(f"{line}\n" for line, _ in entries)
+        # 写入失败时重新打开文件再试一次，尽量不丢行
+        for attempt in range(2):
+            try:
+                f = self._open_file()
+                f.write(data)
+                f.flush()
+                break
+            except Exception as e:
+                self._close_file()
+                if attempt:
+                    logger.error(f"写入日志失败 {self.file_path}: {e}")
+        if self.on_batch is not None:
+            lines = [line for line, notify in entries if notify]
+            if not lines:
+                return
+            try:
+                self.on_batch(lines)
+            except Exception as e:
+                logger.error(f"推送日志批次失败 {self.file_path}: {e}")
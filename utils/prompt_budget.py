@@ -0,0 +1,323 @@
+"""
+提示词Token预算工具
+
+各引擎原先按字符截断提示词素材（truncate_content 的 max_length），没有真实的token计数，
+提示词要么超出上下文被迫重试，要么白白浪费上下文。本模块提供：
+- TokenCounter：优先使用 HuggingFace tokenizer.json（PROMPT_TOKENIZER_FILE），
+  其次 tiktoken 编码（PROMPT_TIKTOKEN_ENCODING，默认不启用；tiktoken 不在依赖中，
+  且编码文件未缓存时首次加载会联网下载），
+  均不可用时按“中文1字≈1 token、其他约4字符≈1 token”估算；
+- pack_search_results：按相关度（检索排序）、热度与来源/情感多样性为搜索结果排序，
+  逐条装入给定预算，超出单条上限或剩余预算的结果按token截断；
+- build_budgeted_message：总结节点使用的提示词组装，扣除系统提示词与其他字段后，
+  把剩余预算全部留给搜索结果，并保证最终消息不超过上限。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from loguru import logger
+
+_CJK_RE = re.compile(r"[　-〿㐀-鿿＀-￯]")
+
+
+class TokenCounter:
+    """字符估算计数器，也是各tokenizer后端的基类"""
+
+    name = "estimate"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        cjk = len(_CJK_RE.findall(text))
+        return cjk + math.ceil((len(text) - cjk) / 4)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """截断到不超过 max_tokens 个token"""
+        if max_tokens <= 0 or not text:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        used = 0.0
+        for index, char in enumerate(text):
+            used += 1 if _CJK_RE.match(char) else 0.25
+            if math.ceil(used) > max_tokens:
+                return text[:index]
+        return text
+
+
+class TiktokenCounter(TokenCounter):
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.name = f"tiktoken:{encoding.name}"
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text or "", disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0 or not text:
+            return ""
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        # 截断点可能落在多字节字符中间，去掉解码出的替换字符
+        return self.encoding.decode(tokens[:max_tokens]).rstrip("�")
+
+
+class HFTokenizerCounter(TokenCounter):
+    def __init__(self, tokenizer, path: str):
+        self.tokenizer = tokenizer
+        self.name = f"hf:{path}"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0 or not text:
+            return ""
+        encoding = self.tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        return text[:encoding.offsets[max_tokens - 1][1]]
+
+
+_counters: Dict[Tuple[Optional[str], Optional[str]], TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def _load_counter(tokenizer_file: Optional[str], encoding_name: Optional[str]) -> TokenCounter:
+    if tokenizer_file:
+        try:
+            from tokenizers import Tokenizer
+
+            return HFTokenizerCounter(Tokenizer.from_file(tokenizer_file), tokenizer_file)
+        except Exception as e:
+            logger.warning(f"加载tokenizer文件失败，尝试tiktoken: {tokenizer_file} ({e})")
+    if encoding_name:
+        try:
+            import tiktoken
+
+            return TiktokenCounter(tiktoken.get_encoding(encoding_name))
+        except Exception as e:
+            logger.warning(f"加载tiktoken编码 {encoding_name} 失败，改用字符估算: {e}")
+    return TokenCounter()
+
+
+def get_token_counter(
+    tokenizer_file: Optional[str] = None,
+    encoding_name: Optional[str] = None,
+) -> TokenCounter:
+    """
+    获取进程内共享的token计数器
+
+    参数均为None时取自全局配置（PROMPT_TOKENIZER_FILE / PROMPT_TIKTOKEN_ENCODING）。
+    """
+    if tokenizer_file is None and encoding_name is None:
+        from config import settings
+
+        tokenizer_file = settings.PROMPT_TOKENIZER_FILE or None
+        encoding_name = settings.PROMPT_TIKTOKEN_ENCODING or None
+    key = (tokenizer_file, encoding_name)
+    with _counters_lock:
+        counter = _counters.get(key)
+        if counter is None:
+            counter = _load_counter(tokenizer_file, encoding_name)
+            logger.info(f"提示词token计数器: {counter.name}")
+            _counters[key] = counter
+        return counter
+
+
+@dataclass
+class PackedResults:
+    """装箱结果及统计"""
+
+    items: List[str] = field(default_factory=list)
+    used_tokens: int = 0
+    budget_tokens: int = 0
+    candidates: int = 0
+    truncated: int = 0
+    counter: str = "estimate"
+
+    @property
+    def dropped(self) -> int:
+        return self.candidates - len(self.items)
+
+    def describe(self) -> str:
+        return (
+            f"搜索结果装入 {len(self.items)}/{self.candidates} 条（截断 {self.truncated} 条），"
+            f"{self.used_tokens}/{self.budget_tokens} tokens [{self.counter}]"
+        )
+
+
+def _result_text(result: Any) -> str:
+    if isinstance(result, str):
+        return result
+    return str(result.get("content") or result.get("title") or "")
+
+
+def _numeric(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _diversity_group(result: Any) -> str:
+    """多样性分组：优先情感标签，其次平台，再次来源域名"""
+    if not isinstance(result, dict):
+        return ""
+    for key in ("sentiment", "sentiment_label", "platform"):
+        if result.get(key):
+            return f"{key}:{result[key]}"
+    url = result.get("url") or ""
+    return f"site:{urlparse(url).netloc}" if url else ""
+
+
+def pack_search_results(
+    results: Sequence[Any],
+    budget_tokens: int,
+    counter: Optional[TokenCounter] = None,
+    max_item_tokens: int = 0,
+    min_item_tokens: int = 32,
+    diversity_penalty: float = 0.5,
+) -> PackedResults:
+    """
+    按优先级把搜索结果装入token预算
+
+    优先级 = 相关度（检索返回顺序）与热度（score字段，按最大值归一）的加权；
+    同一情感/平台/站点每多选一条，该组后续结果的优先级按 1/(1+penalty*n) 衰减。
+
+    Args:
+        results: 搜索结果（dict，至少含content或title；也接受纯字符串）
+        budget_tokens: 搜索结果可用的token预算
+        counter: token计数器，默认取全局配置
+        max_item_tokens: 单条结果的token上限，<= 0 表示不限
+        min_item_tokens: 剩余预算低于该值时停止装箱，避免塞入过短的残片
+        diversity_penalty: 同组重复的衰减系数
+
+    Returns:
+        PackedResults，items 按优先级排列
+    """
+    counter = counter or get_token_counter()
+    packed = PackedResults(budget_tokens=max(0, budget_tokens), counter=counter.name)
+
+    candidates: List[Tuple[float, int, str, str]] = []
+    seen = set()
+    total = len(results)
+    max_hot = max((_numeric(r.get("score")) for r in results if isinstance(r, dict)), default=0.0)
+    for rank, result in enumerate(results):
+        text = _result_text(result).strip()
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        relevance = 1 - rank / total
+        if max_hot > 0 and isinstance(result, dict):
+            priority = 0.6 * relevance + 0.4 * _numeric(result.get("score")) / max_hot
+        else:
+            priority = relevance
+        candidates.append((priority, rank, _diversity_group(result), text))
+    packed.candidates = len(candidates)
+
+    # 每组内部按优先级排队，每轮在各组队首中选出衰减后优先级最高的一条
+    groups: Dict[str, List[Tuple[float, int, str]]] = {}
+    for priority, rank, group, text in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        groups.setdefault(group, []).append((priority, rank, text))
+    picked: Dict[str, int] = {group: 0 for group in groups}
+    remaining = packed.budget_tokens
+    while groups and remaining >= min_item_tokens:
+        group = max(
+            groups,
+            key=lambda g: (
+                groups[g][0][0] / (1 + diversity_penalty * picked[g]) if g else groups[g][0][0],
+                -groups[g][0][1],
+            ),
+        )
+        _, _, text = groups[group].pop(0)
+        if not groups[group]:
+            del groups[group]
+        picked[group] += 1
+
+        limit = min(remaining, max_item_tokens) if max_item_tokens > 0 else remaining
+        tokens = counter.count(text)
+        if tokens > limit:
+            text = counter.truncate(text, limit)
+            tokens = counter.count(text)
+            packed.truncated += 1
+            if not text:
+                continue
+        packed.items.append(text)
+        packed.used_tokens += tokens
+        remaining -= tokens
+    return packed
+
+
+def build_budgeted_message(
+    system_prompt: str,
+    data: Dict[str, Any],
+    max_tokens: Optional[int] = None,
+    results_key: str = "search_results",
+    prefix: str = "",
+    max_item_tokens: Optional[int] = None,
+    counter: Optional[TokenCounter] = None,
+) -> Tuple[str, PackedResults]:
+    """
+    组装总结节点的用户消息，使 系统提示词 + 消息 不超过 max_tokens
+
+    data[results_key] 中的搜索结果按剩余预算装箱（替换为字符串列表），其余字段原样保留；
+    JSON转义带来的额外token通过按超出量收紧预算重新装箱消除。
+    max_tokens / max_item_tokens 为None时取自全局配置
+    （SUMMARY_PROMPT_MAX_TOKENS / SEARCH_RESULT_MAX_TOKENS）。
+
+    Returns:
+        (消息文本, 装箱统计)
+    """
+    if max_tokens is None or max_item_tokens is None:
+        from config import settings
+
+        if max_tokens is None:
+            max_tokens = settings.SUMMARY_PROMPT_MAX_TOKENS
+        if max_item_tokens is None:
+            max_item_tokens = settings.SEARCH_RESULT_MAX_TOKENS
+    counter = counter or get_token_counter()
+    results = data.get(results_key) or []
+    skeleton = dict(data, **{results_key: []})
+
+    def render(payload: Dict[str, Any]) -> str:
+        message = json.dumps(payload, ensure_ascii=False)
+        return f"{prefix}\n{message}" if prefix else message
+
+    fixed = counter.count(system_prompt) + counter.count(render(skeleton))
+    budget = max_tokens - fixed
+    packed = pack_search_results(results, budget, counter, max_item_tokens=max_item_tokens)
+    for _ in range(4):
+        message = render(dict(data, **{results_key: packed.items}))
+        overflow = counter.count(system_prompt) + counter.count(message) - max_tokens
+        if overflow <= 0 or not packed.items:
+            break
+        budget = max(0, budget - overflow - len(packed.items))
+        packed = pack_search_results(results, budget, counter, max_item_tokens=max_item_tokens)
+    else:
+        message = render(dict(data, **{results_key: packed.items}))
+    if budget <= 0:
+        logger.warning(f"提示词固定部分已占用 {fixed} tokens，超出上限 {max_tokens}，搜索结果全部省略")
+    return message, packed
+
+
+__all__ = [
+    "HFTokenizerCounter",
+    "PackedResults",
+    "TiktokenCounter",
+    "TokenCounter",
+    "build_budgeted_message",
+    "get_token_counter",
+    "pack_search_results",
+]